@@ -0,0 +1,227 @@
+from collections import deque
+from exceptions import ServerOverloaded
+from Logger import Logger
+from threading import Condition
+from time import time
+
+
+class AdmissionTicket:
+    """
+    The admission of a request, its work units are in flight until the ticket is released.
+
+    Attributes:
+        cost (int): The amount of work units of the request.
+        released (bool): Whether the work units have been released.
+    """
+
+    def __init__(self, cost: int):
+        """
+        Initialises an admitted ticket.
+
+        Parameters:
+            cost (int): The amount of work units of the request.
+        """
+
+        self.cost = cost
+        self.released = False
+
+    def release(self):
+        """
+        Releases the work units of the request, so waiting requests can be admitted. Releasing again does nothing.
+        """
+
+        AdmissionController.release(self)
+
+
+class AdmissionController:
+    """
+    A process-wide limit on the work that the server calculates at the same time.
+    The cost of a request is estimated in work units, one unit is a vehicle calculated for one scenario and strategy.
+    A request is admitted while the work units in flight stay within the capacity. Otherwise it waits in a bounded
+    queue for at most the queue timeout, and it's rejected with ServerOverloaded when the queue is full or the
+    timeout expires, so the server doesn't accept more work than it can finish. The queue is admitted strictly in
+    order of arrival, so a large request isn't starved by smaller requests that arrive after it.
+    A request that costs more than the capacity is admitted when nothing else is in flight.
+
+    Attributes:
+        capacity (int): The maximum amount of work units in flight.
+        queue_capacity (int): The maximum amount of work units waiting to be admitted.
+        queue_timeout (float): The maximum amount of seconds a request waits to be admitted.
+        retry_after (int): The amount of seconds a rejected client is asked to wait before it retries.
+        in_flight (int): The amount of work units in flight.
+        queued (int): The amount of work units waiting to be admitted.
+        requests_in_flight (int): The amount of requests in flight.
+        requests_queued (int): The amount of requests waiting to be admitted.
+        waiting (deque): The tickets of the waiting requests, in order of arrival.
+        admitted (int): The amount of requests that were admitted since the process started.
+        rejected (int): The amount of requests that were rejected since the process started.
+    """
+
+    capacity: int = 100000
+    queue_capacity: int = 200000
+    queue_timeout: float = 30
+    retry_after: int = 30
+    in_flight: int = 0
+    queued: int = 0
+    requests_in_flight: int = 0
+    requests_queued: int = 0
+    waiting: deque = deque()
+    admitted: int = 0
+    rejected: int = 0
+    condition: Condition = Condition()
+
+    @classmethod
+    def initialize(cls, capacity: int, queue_capacity: int, queue_timeout: float = 30):
+        """
+        Sets the limits of the admission control.
+
+        Parameters:
+            capacity (int): The maximum amount of work units in flight.
+            queue_capacity (int): The maximum amount of work units waiting to be admitted, 0 rejects immediately.
+            queue_timeout (float): The maximum amount of seconds a request waits to be admitted.
+        """
+
+        with cls.condition:
+            cls.capacity = max(1, capacity)
+            cls.queue_capacity = max(0, queue_capacity)
+            cls.queue_timeout = queue_timeout
+            cls.retry_after = max(1, round(queue_timeout))
+            cls.condition.notify_all()
+
+        Logger.warning(f"Admission control: {cls.capacity} work units in flight, {cls.queue_capacity} queued")
+
+    @classmethod
+    def can_admit(cls, cost: int):
+        """
+        Checks whether a request fits in the capacity, the condition should be held.
+
+        Parameters:
+            cost (int): The amount of work units of the request.
+
+        Returns:
+            bool: Whether the request can be admitted now.
+        """
+
+        return cls.in_flight + cost <= cls.capacity or cls.in_flight == 0
+
+    @classmethod
+    def admit(cls, cost: int, timeout: float = None):
+        """
+        Admits a request, it waits in the queue if the capacity is in use.
+
+        Parameters:
+            cost (int): The amount of work units of the request.
+            timeout (float): The maximum amount of seconds the request waits, if it's shorter than the queue timeout.
+
+        Returns:
+            AdmissionTicket: The admission of the request, it should be released when the request is done.
+
+        Raises:
+            ServerOverloaded: Raised if the queue is full or the request waited for the queue timeout.
+        """
+
+        ticket = AdmissionTicket(max(1, cost))
+        with cls.condition:
+
+            # Requests that wait are admitted first, so a small request doesn't overtake them
+            if not cls.waiting and cls.can_admit(ticket.cost):
+                return cls.take(ticket)
+
+            if cls.queued + ticket.cost > cls.queue_capacity:
+                cls.reject(ticket.cost, "the queue is full")
+
+            cls.queued += ticket.cost
+            cls.requests_queued += 1
+            cls.waiting.append(ticket)
+            wait_timeout = cls.queue_timeout if timeout is None else min(cls.queue_timeout, timeout)
+            wait_until = time() + wait_timeout
+            try:
+                # Only the first request of the queue is admitted, the others wait until it leaves the queue
+                while cls.waiting[0] is not ticket or not cls.can_admit(ticket.cost):
+                    remaining = wait_until - time()
+                    if remaining <= 0:
+                        cls.reject(ticket.cost, f"it waited {wait_timeout} s")
+                    cls.condition.wait(remaining)
+            finally:
+                cls.waiting.remove(ticket)
+                cls.queued -= ticket.cost
+                cls.requests_queued -= 1
+
+                # The next request of the queue may fit in the capacity that is left
+                cls.condition.notify_all()
+
+            return cls.take(ticket)
+
+    @classmethod
+    def take(cls, ticket: AdmissionTicket):
+        """
+        Puts the work units of an admitted request in flight, the condition should be held.
+
+        Parameters:
+            ticket (AdmissionTicket): The admission of the request.
+
+        Returns:
+            AdmissionTicket: The admission of the request.
+        """
+
+        cls.in_flight += ticket.cost
+        cls.requests_in_flight += 1
+        cls.admitted += 1
+        return ticket
+
+    @classmethod
+    def reject(cls, cost: int, reason: str):
+        """
+        Rejects a request, the condition should be held.
+
+        Parameters:
+            cost (int): The amount of work units of the request.
+            reason (str): Why the request is rejected, for the log.
+
+        Raises:
+            ServerOverloaded: Always.
+        """
+
+        cls.rejected += 1
+        Logger.warning(f"Admission control: rejected a request of {cost} work units, because {reason}")
+        raise ServerOverloaded(cls.retry_after)
+
+    @classmethod
+    def release(cls, ticket: AdmissionTicket):
+        """
+        Releases the work units of an admitted request and wakes up the waiting requests.
+
+        Parameters:
+            ticket (AdmissionTicket): The admission of the request.
+        """
+
+        with cls.condition:
+            if ticket.released:
+                return
+            ticket.released = True
+            cls.in_flight -= ticket.cost
+            cls.requests_in_flight -= 1
+            cls.condition.notify_all()
+
+    @classmethod
+    def get_statistics(cls):
+        """
+        Gets the limits and the current load of the admission control.
+
+        Returns:
+            dict: The capacities, the work units and requests in flight and queued, and the admitted
+                and rejected requests since the process started.
+        """
+
+        with cls.condition:
+            return {
+                "capacity": cls.capacity,
+                "queue_capacity": cls.queue_capacity,
+                "queue_timeout": cls.queue_timeout,
+                "in_flight": cls.in_flight,
+                "queued": cls.queued,
+                "requests_in_flight": cls.requests_in_flight,
+                "requests_queued": cls.requests_queued,
+                "admitted": cls.admitted,
+                "rejected": cls.rejected
+            }
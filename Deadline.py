@@ -0,0 +1,74 @@
+from exceptions import DeadlineExceeded, RequestCancelled
+from time import time
+
+
+class Deadline:
+    """
+    The deadline of a request, which is checked at the checkpoints in the loops of the calculation.
+    A checkpoint raises DeadlineExceeded when the deadline has passed, or RequestCancelled when the request has been
+    cancelled, for example because the client disconnected. The exception stops the calculation, so the interface
+    of the request is returned to the pool and its capacity can be used by other requests.
+
+    A deadline can be sent to the worker processes of the TCO process pool, the cancellation check stays behind.
+
+    Attributes:
+        default_timeout (float): The amount of seconds a request may take when it doesn't specify a timeout,
+            or None for no limit.
+        expires_at (float): The time at which the deadline passes, or None for no limit.
+        is_cancelled (callable): Returns whether the request has been cancelled, or None.
+        cancelled (bool): Whether the request has been cancelled with cancel.
+    """
+
+    default_timeout: float = None
+
+    def __init__(self, timeout: float = None, is_cancelled: callable = None):
+        """
+        Initialises a deadline that passes after the timeout.
+
+        Parameters:
+            timeout (float): The amount of seconds until the deadline passes, defaults to no limit.
+            is_cancelled (callable): Returns whether the request has been cancelled, defaults to None.
+        """
+
+        self.expires_at = None if timeout is None else time() + timeout
+        self.is_cancelled = is_cancelled
+        self.cancelled = False
+
+    def __getstate__(self):
+
+        return {"expires_at": self.expires_at, "is_cancelled": None, "cancelled": self.cancelled}
+
+    def cancel(self):
+        """
+        Cancels the request, the next checkpoint raises RequestCancelled.
+        """
+
+        self.cancelled = True
+
+    def remaining(self):
+        """
+        Gets the amount of seconds until the deadline passes.
+
+        Returns:
+            float: The remaining seconds, 0 when the deadline has passed, or None for no limit.
+        """
+
+        if self.expires_at is None:
+            return None
+
+        return max(0.0, self.expires_at - time())
+
+    def check(self):
+        """
+        A checkpoint, it raises if the request shouldn't continue.
+
+        Raises:
+            RequestCancelled: Raised if the request has been cancelled.
+            DeadlineExceeded: Raised if the deadline has passed.
+        """
+
+        if self.cancelled or (self.is_cancelled is not None and self.is_cancelled()):
+            self.cancelled = True
+            raise RequestCancelled
+        if self.expires_at is not None and time() >= self.expires_at:
+            raise DeadlineExceeded
@@ -0,0 +1,187 @@
+from database_interfaces.JobDatabaseInterface import JobDatabaseInterface
+from exceptions import JobQueueNotStarted
+from Logger import Logger
+from threading import Condition, Event, Thread
+from time import time
+from uuid import uuid4
+
+
+class JobQueue:
+    """
+    A process-wide queue of jobs that are calculated by background worker threads.
+    The jobs are stored in a SQLite database, so their status and results can be read by every thread
+    and jobs that were running when the server stopped are calculated again after a restart.
+
+    Attributes:
+        workers (int): The amount of worker threads.
+        handler (callable): The function that calculates a job, it's called with the parameters of the job
+            and a progress callback, and returns the result of the job.
+        database (JobDatabaseInterface): The database of the jobs, or None if the queue hasn't been started.
+        poll_interval (float): The amount of seconds a worker waits before it checks for new jobs again.
+        progress_interval (float): The minimum amount of seconds between two progress updates of a job.
+        retention (float): The amount of seconds the finished and failed jobs are kept.
+    """
+
+    workers: int = 1
+    handler: callable = None
+    database: JobDatabaseInterface = None
+    poll_interval: float = 5
+    progress_interval: float = 1
+    retention: float = 24 * 60 * 60
+    threads: list = []
+    condition: Condition = Condition()
+    stopping: Event = Event()
+
+    @classmethod
+    def initialize(cls, workers: int, handler: callable, filename: str = "./data/jobs.sqlite"):
+        """
+        Starts the worker threads, the jobs that were running when the server stopped are queued again.
+
+        Parameters:
+            workers (int): The amount of worker threads, at least 1 is started.
+            handler (callable): The function that calculates a job.
+            filename (str): The filename of the database of the jobs.
+        """
+
+        cls.shutdown()
+        cls.workers = max(1, workers)
+        cls.handler = handler
+        cls.database = JobDatabaseInterface(filename)
+
+        requeued_jobs = cls.database.requeue_running_jobs()
+        expired_jobs = cls.database.delete_jobs_finished_before(time() - cls.retention)
+        Logger.warning(f"Job queue: {requeued_jobs} jobs queued again, {expired_jobs} expired jobs deleted")
+
+        cls.stopping.clear()
+        cls.threads = [Thread(target=cls.work, name=f"job-worker-{index}", daemon=True)
+                       for index in range(cls.workers)]
+        for thread in cls.threads:
+            thread.start()
+
+        Logger.warning(f"Job queue started with {cls.workers} workers")
+
+    @classmethod
+    def shutdown(cls):
+        """
+        Stops the worker threads, after they finished their current jobs.
+        """
+
+        cls.stopping.set()
+        with cls.condition:
+            cls.condition.notify_all()
+        for thread in cls.threads:
+            thread.join()
+        cls.threads = []
+
+    @classmethod
+    def submit(cls, parameters: any, progress_total: int = 0):
+        """
+        Queues a job and wakes up a worker.
+
+        Parameters:
+            parameters (any): The parameters of the job, they're given to the handler.
+            progress_total (int): The amount of vehicles of the job.
+
+        Returns:
+            str: The id of the job.
+
+        Raises:
+            JobQueueNotStarted: Raised if the queue hasn't been started.
+        """
+
+        if cls.database is None:
+            raise JobQueueNotStarted
+
+        job_id = uuid4().hex
+        cls.database.insert_job(job_id, parameters, progress_total)
+        with cls.condition:
+            cls.condition.notify()
+
+        return job_id
+
+    @classmethod
+    def get_job(cls, job_id: str):
+        """
+        Gets the status and progress of a job.
+
+        Parameters:
+            job_id (str): The id of the job.
+
+        Returns:
+            dict: The status, progress, error and timestamps of the job.
+            None: The job doesn't exist.
+
+        Raises:
+            JobQueueNotStarted: Raised if the queue hasn't been started.
+        """
+
+        if cls.database is None:
+            raise JobQueueNotStarted
+
+        return cls.database.read_job(job_id)
+
+    @classmethod
+    def get_job_result(cls, job_id: str):
+        """
+        Gets the result of a finished job.
+
+        Parameters:
+            job_id (str): The id of the job.
+
+        Returns:
+            any: The result of the job.
+            None: The job doesn't exist or hasn't finished.
+
+        Raises:
+            JobQueueNotStarted: Raised if the queue hasn't been started.
+        """
+
+        if cls.database is None:
+            raise JobQueueNotStarted
+
+        return cls.database.read_job_result(job_id)
+
+    @classmethod
+    def work(cls):
+        """
+        Calculates the queued jobs one at a time, until the queue is stopped.
+        """
+
+        while not cls.stopping.is_set():
+            job = cls.database.claim_next_job()
+            if job is None:
+                with cls.condition:
+                    cls.condition.wait(cls.poll_interval)
+                continue
+
+            cls.run_job(*job)
+
+    @classmethod
+    def run_job(cls, job_id: str, parameters: any):
+        """
+        Calculates a job with the handler and stores its result or error.
+
+        Parameters:
+            job_id (str): The id of the job.
+            parameters (any): The parameters of the job.
+        """
+
+        Logger.warning(f"Job {job_id}: started")
+        last_update = [0.0]
+
+        # The progress is written at most once per progress interval, and always when the fleet is done
+        def update_progress(vehicles_done: int, vehicles_total: int):
+            now = time()
+            if now - last_update[0] >= cls.progress_interval or vehicles_done >= vehicles_total:
+                last_update[0] = now
+                cls.database.update_progress(job_id, vehicles_done, vehicles_total)
+
+        try:
+            result = cls.handler(parameters, update_progress)
+        except Exception as exception:
+            Logger.error(f"Job {job_id}: failed with {type(exception).__name__}: {exception}")
+            cls.database.fail_job(job_id, f"{type(exception).__name__}: {exception}")
+            return
+
+        cls.database.finish_job(job_id, result)
+        Logger.warning(f"Job {job_id}: finished")
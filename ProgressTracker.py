@@ -0,0 +1,263 @@
+from json import dumps
+from Logger import Logger
+from threading import Condition, Lock
+from time import time
+
+
+class ProgressTracker:
+    """
+    Tracks the progress of a request, so it can be streamed to the client as server-sent events by /progress/<id>.
+    A request is split into consecutive stages, a stage ends when the next one starts or when the request finishes.
+    The elapsed time of every stage is logged when the request finishes, also when nobody follows its progress.
+    The tracker is a context manager that fails the request when its with-block raises an exception.
+
+    The trackers with a progress id are kept process-wide, so the client can follow the progress of a request
+    from another connection. The client chooses the id, so it can subscribe before or after it sends the request.
+
+    Events:
+        stage: A stage started, with the elapsed time of the previous stage.
+        vehicles: The amount of calculated vehicles and the size of the fleet.
+        step: The scenario that is calculated and the strategies that are calculated at once.
+        finished: The request finished, with the elapsed time of every stage.
+        failed: The request raised an exception.
+
+    Attributes:
+        trackers (dict): The trackers with a progress id, organised by progress id.
+        retention (float): The amount of seconds a tracker is kept after its last event.
+        progress_interval (float): The minimum amount of seconds between two vehicles events.
+        heartbeat_interval (float): The amount of seconds after which an idle stream sends a comment,
+            so proxies don't close the connection.
+    """
+
+    trackers: dict = {}
+    lock: Lock = Lock()
+    retention: float = 10 * 60
+    progress_interval: float = 0.25
+    heartbeat_interval: float = 15
+
+    @classmethod
+    def start(cls, progress_id: str = None):
+        """
+        Starts tracking a request. A tracker without progress id only logs the elapsed time of its stages.
+        If a client already subscribed to the progress id, its tracker is used for the request.
+
+        Parameters:
+            progress_id (str): The id the client uses to follow the progress, defaults to None.
+
+        Returns:
+            ProgressTracker: The tracker of the request.
+        """
+
+        if not progress_id:
+            return ProgressTracker()
+
+        # A tracker of an earlier request with the same id is replaced
+        with cls.lock:
+            cls.remove_expired_trackers()
+            tracker = cls.trackers.get(progress_id)
+            if tracker is None or tracker.done:
+                tracker = cls.trackers[progress_id] = ProgressTracker(progress_id)
+            tracker.started_at = time()
+            return tracker
+
+    @classmethod
+    def get(cls, progress_id: str):
+        """
+        Gets the tracker of a progress id, it's created if the request hasn't started yet.
+
+        Parameters:
+            progress_id (str): The id the client uses to follow the progress.
+
+        Returns:
+            ProgressTracker: The tracker of the progress id.
+        """
+
+        with cls.lock:
+            cls.remove_expired_trackers()
+            if progress_id not in cls.trackers:
+                cls.trackers[progress_id] = ProgressTracker(progress_id)
+            return cls.trackers[progress_id]
+
+    @classmethod
+    def remove_expired_trackers(cls):
+        """
+        Removes the trackers that didn't change during the retention, the lock should be held.
+        """
+
+        expired_before = time() - cls.retention
+        for expired_id in [progress_id for progress_id, tracker in cls.trackers.items()
+                           if tracker.updated_at < expired_before]:
+            del cls.trackers[expired_id]
+
+    def __init__(self, progress_id: str = None):
+        """
+        Initialises a tracker, use start to track a request.
+
+        Parameters:
+            progress_id (str): The id the client uses to follow the progress, defaults to None.
+        """
+
+        self.progress_id = progress_id
+        self.started_at = time()
+        self.updated_at = self.started_at
+        self.condition = Condition()
+        self.events = []
+        self.stages = {}
+        self.current_stage = None
+        self.stage_started_at = None
+        self.last_step = None
+        self.last_vehicles_event = 0.0
+        self.done = False
+
+    def add_event(self, event: str, data: dict):
+        """
+        Adds an event with the elapsed time of the request and wakes up the subscribers.
+        Only the trackers with a progress id keep their events.
+
+        Parameters:
+            event (str): The name of the event.
+            data (dict): The data of the event.
+        """
+
+        with self.condition:
+            self.updated_at = time()
+            if self.progress_id is not None:
+                self.events.append((event, {**data, "elapsed": round(self.updated_at - self.started_at, 3)}))
+            self.condition.notify_all()
+
+    def end_stage(self):
+        """
+        Ends the current stage and stores its elapsed time.
+
+        Returns:
+            float: The elapsed time of the stage in seconds, or None if no stage was running.
+        """
+
+        if self.current_stage is None:
+            return None
+
+        elapsed = round(time() - self.stage_started_at, 3)
+        self.stages[self.current_stage] = self.stages.get(self.current_stage, 0) + elapsed
+        self.current_stage = None
+        return elapsed
+
+    def start_stage(self, stage: str):
+        """
+        Starts a stage of the request, the current stage ends.
+
+        Parameters:
+            stage (str): The name of the stage, for example "fleet", "scenarios", "TCO", "graphs" or "serialization".
+        """
+
+        previous_stage = self.current_stage
+        previous_elapsed = self.end_stage()
+        self.current_stage = stage
+        self.stage_started_at = time()
+        self.add_event("stage", {"stage": stage, "previous_stage": previous_stage,
+                                 "previous_stage_elapsed": previous_elapsed})
+
+    def update_vehicles(self, vehicles_done: int, vehicles_total: int):
+        """
+        Reports the amount of calculated vehicles, at most once per progress interval and always when they're done.
+
+        Parameters:
+            vehicles_done (int): The amount of calculated vehicles.
+            vehicles_total (int): The size of the fleet.
+        """
+
+        now = time()
+        if now - self.last_vehicles_event >= self.progress_interval or vehicles_done >= vehicles_total:
+            self.last_vehicles_event = now
+            self.add_event("vehicles", {"done": vehicles_done, "total": vehicles_total})
+
+    def update_step(self, scenario: str, strategies: tuple):
+        """
+        Reports the scenario and the strategies that are calculated, when they differ from the previous step.
+
+        Parameters:
+            scenario (str): The name of the scenario.
+            strategies (tuple): The names of the strategies that are calculated at once.
+        """
+
+        step = (scenario, tuple(strategies))
+        if step != self.last_step:
+            self.last_step = step
+            self.add_event("step", {"scenario": scenario, "strategies": list(step[1])})
+
+    def finish(self):
+        """
+        Finishes the request, the current stage ends and the elapsed time of every stage is logged.
+        """
+
+        if self.done:
+            return
+
+        self.end_stage()
+        elapsed = round(time() - self.started_at, 3)
+
+        # The last event is added with the done flag, so the subscribers don't stop before they sent it
+        with self.condition:
+            self.done = True
+            self.add_event("finished", {"stages": self.stages})
+
+        stages = ", ".join(f"{stage} {seconds:.3f} s" for stage, seconds in self.stages.items())
+        Logger.warning(f"Request finished in {elapsed:.3f} s: {stages}")
+
+    def fail(self, exception: Exception):
+        """
+        Fails the request, the current stage ends.
+
+        Parameters:
+            exception (Exception): The exception the request raised.
+        """
+
+        if self.done:
+            return
+
+        self.end_stage()
+        with self.condition:
+            self.done = True
+            self.add_event("failed", {"stages": self.stages,
+                                      "error": f"{type(exception).__name__}: {exception}"})
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exception_type, exception, traceback):
+
+        if exception is not None:
+            self.fail(exception)
+
+    def stream_events(self, last_event_id: int = 0):
+        """
+        Yields the events of the request as server-sent events, until the request finished or failed.
+        The events after the last event id are sent, so a client that reconnects doesn't miss events.
+
+        Parameters:
+            last_event_id (int): The id of the last event the client received, defaults to 0.
+
+        Returns:
+            Iterator[str]: The server-sent events.
+        """
+
+        next_index = max(0, last_event_id)
+        while True:
+            with self.condition:
+                if next_index >= len(self.events) and not self.done:
+                    self.condition.wait(self.heartbeat_interval)
+                events = self.events[next_index:]
+                done = self.done
+
+            for event, data in events:
+                next_index += 1
+                yield f"id: {next_index}\nevent: {event}\ndata: {dumps(data, separators=(',', ':'))}\n\n"
+
+            if done and next_index >= len(self.events):
+                return
+
+            # A tracker that nobody started is removed after the retention, its subscribers stop too
+            if not events:
+                if time() - self.updated_at > self.retention:
+                    return
+                yield ": heartbeat\n\n"
@@ -0,0 +1,138 @@
+from concurrent.futures import Future, wait
+from hashlib import sha256
+from json import dumps
+from Logger import Logger
+from threading import Lock
+
+
+def to_serializable(value: any):
+    """
+    Converts a value that json can't serialize, for the canonical key of an analysis.
+
+    Parameters:
+        value (any): The value, for example a vehicle, a scenario or an array.
+
+    Returns:
+        any: The information of the value as dictionary or list, or its string otherwise.
+    """
+
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+def get_analysis_key(analysis: dict):
+    """
+    Gets the canonical key of an analysis, analyses with the same inputs have the same key.
+    The order of the keys of dictionaries doesn't matter, the order of lists does.
+
+    Parameters:
+        analysis (dict): The inputs of the analysis organised by name.
+
+    Returns:
+        str: The SHA-256 hash of the inputs.
+    """
+
+    return sha256(dumps(analysis, sort_keys=True, separators=(",", ":"), default=to_serializable).encode()).hexdigest()
+
+
+class RequestCoalescer:
+    """
+    A process-wide single-flight layer, identical analyses that run at the same time are calculated once.
+    The first caller of a key calculates the analysis, callers of the same key that arrive while it's running
+    wait for its future and get the same result, or the same exception. The key is forgotten when the analysis
+    finishes, so results aren't kept and later requests are calculated again.
+
+    Attributes:
+        flights (dict): The futures of the running analyses organised by key.
+        poll_interval (float): The amount of seconds between two checks of a waiting caller.
+        calculated (int): The amount of analyses that were calculated.
+        coalesced (int): The amount of analyses that waited for an identical analysis.
+    """
+
+    flights: dict = {}
+    poll_interval: float = 0.5
+    calculated: int = 0
+    coalesced: int = 0
+    lock: Lock = Lock()
+
+    @classmethod
+    def run(cls,
+            key: str,
+            function: callable,
+            *arguments: any,
+            on_wait: callable = None,
+            check: callable = None,
+            retry_on: tuple = ()):
+        """
+        Calculates an analysis, or waits for the identical analysis that is already running.
+        The result is shared by every caller, so it shouldn't be changed.
+
+        Parameters:
+            key (str): The canonical key of the analysis, see get_analysis_key.
+            function (callable): The function that calculates the analysis.
+            *arguments (any): The arguments of the function.
+            on_wait (callable): Called before the caller waits for an identical analysis, defaults to None.
+            check (callable): Called every poll interval while the caller waits, it raises to stop waiting.
+            retry_on (tuple): The exceptions of the analysis after which a waiting caller runs it again,
+                for example because the caller that calculated it was cancelled.
+
+        Returns:
+            any: The result of the function.
+
+        Raises:
+            Exception: The exception the function raised, also for the callers that waited.
+        """
+
+        while True:
+            with cls.lock:
+                future = cls.flights.get(key)
+                is_leader = future is None
+                if is_leader:
+                    future = cls.flights[key] = Future()
+                    cls.calculated += 1
+                else:
+                    cls.coalesced += 1
+
+            if is_leader:
+                break
+
+            Logger.warning(f"Request coalescer: waiting for the identical analysis {key[:12]}")
+            if on_wait is not None:
+                on_wait()
+            while check is not None and not wait([future], cls.poll_interval).done:
+                check()
+
+            try:
+                return future.result()
+            except retry_on:
+                continue
+
+        # The key is forgotten before the future is resolved, so a caller that retries doesn't find it again
+        try:
+            result = function(*arguments)
+        except BaseException as exception:
+            with cls.lock:
+                del cls.flights[key]
+            future.set_exception(exception)
+            raise
+
+        with cls.lock:
+            del cls.flights[key]
+        future.set_result(result)
+
+        return result
+
+    @classmethod
+    def get_statistics(cls):
+        """
+        Gets the amount of calculated and coalesced analyses since the process started.
+
+        Returns:
+            dict: The amount of calculated and coalesced analyses, and the amount of running analyses.
+        """
+
+        with cls.lock:
+            return {"calculated": cls.calculated, "coalesced": cls.coalesced, "running": len(cls.flights)}
@@ -1,16 +1,56 @@
+from data_objects.FleetColumns import from_vehicles as fleet_columns_from_vehicles
+from data_objects.FleetResults import FleetResults, add_results, collect_labels, from_vehicle_results
+from data_objects.FleetStrategyRunner import FleetStrategyRunner
 from data_objects.Strategy1 import Strategy1
 from data_objects.Strategy2 import Strategy2
 from data_objects.Strategy3 import Strategy3
 from data_objects.Strategy4 import Strategy4
 from data_objects.Strategy5 import Strategy5
+from data_objects.StrategyRunner import StrategyRunner
 from data_objects.Vehicle import Vehicle
+from excel_interfaces.GeneratedPANTEIAInterface import GeneratedPANTEIAInterface
+from excel_interfaces.NativePANTEIAInterface import NativePANTEIAInterface
 from excel_interfaces.PANTEIAInterface import PANTEIAInterface
-from exceptions import InvalidScenarioSpecified, OutputIsNotSupported
+from excel_interfaces.PANTEIAInterfacePool import PANTEIAInterfacePool
+from exceptions import InvalidEngineSpecified, InvalidScenarioSpecified, OutputIsNotSupported
 from helpers.GraphHelper import GraphHelper
 from Logger import Logger
+from ProgressTracker import ProgressTracker
+from TCOProcessPool import TCOProcessPool
 from datetime import date
+from Deadline import Deadline
 import csv
 
+
+def calculate_vehicles_TCO(vehicles: list,
+                           interface_class: type,
+                           scenarios: dict,
+                           strategies: dict,
+                           model_constants: dict):
+
+    """Calculate the TCO values for a chunk of vehicles in a worker process of the TCO process pool.
+
+    :param vehicles: The vehicles to calculate the TCO for.
+    :type vehicles: list
+    :param interface_class: The class of the interface that calculates the PANTEIA model.
+    :type interface_class: type
+    :param scenarios: The scenarios that will be used.
+    :type scenarios: dict
+    :param strategies: The strategies that will be applied to each scenario.
+    :type strategies: dict
+    :param model_constants: The constants of the model, see TCOModel.get_model_constants.
+    :type model_constants: dict
+
+    :return: The calculated TCO values of every vehicle, in the order of the vehicles.
+    :rtype: list
+    """
+
+    # Every worker keeps its interfaces warm in its own pool
+    with PANTEIAInterfacePool.checkout(interface_class) as PANTEIA_interface:
+        model = TCOModel({}, scenarios, (), PANTEIA_interface=PANTEIA_interface, **model_constants)
+        return [model.calculate_TCO(vehicle, scenarios, strategies) for vehicle in vehicles]
+
+
 class TCOModel:
 
     # Model data
@@ -27,7 +67,41 @@ class TCOModel:
     current_year: int = None,
     final_year: int = None
     valid_scenario_types: tuple = ()
-    valid_strategies: dict = {}
+    valid_strategies: dict = None
+
+    # Whether the vehicles are calculated by the workers of the TCO process pool, if it has been started
+    use_process_pool: bool = False
+
+    # Whether the vehicles are calculated at once with the vectorized PANTEIA model
+    use_vectorized_model: bool = False
+
+    # The ways a request can calculate its fleet: at once with the vectorized model, or per vehicle with the
+    # PANTEIA interface, which is the reference of the vectorized model. The server sets the default on startup
+    calculation_models: tuple = ("vectorized", "per_vehicle")
+    default_calculation_model: str = "vectorized"
+
+    # Whether only the transition years are calculated, because no other results or graphs are expected
+    only_transition_year: bool = False
+
+    # The amount of vehicles that the vectorized model calculates at once, progress is reported per chunk
+    vectorized_chunk_size: int = 2000
+
+    # Called with the amount of calculated vehicles and the size of the fleet while the fleet is calculated
+    progress_callback: callable = None
+    calculated_vehicles: int = 0
+
+    # Reports the stages, the calculated vehicles and the current scenario and strategies of the request
+    progress_tracker: ProgressTracker = None
+
+    # Checked in the fleet, scenario, strategy and year loops, the calculation stops when the request is cancelled
+    deadline: Deadline = None
+
+    # The engines that can calculate the PANTEIA model, pycel is kept as the reference
+    engines: dict = {
+        "native": NativePANTEIAInterface,
+        "generated": GeneratedPANTEIAInterface,
+        "pycel": PANTEIAInterface
+    }
 
     def __init__(self,
                  fleet: dict,
@@ -39,7 +113,14 @@ class TCOModel:
                  transition_margin: float = 0.03,
                  tax_percentage: float = 0.25,
                  current_year: int = date.today().year,
-                 final_year: int = date.today().year + 10):
+                 final_year: int = date.today().year + 10,
+                 engine: str = "native",
+                 PANTEIA_interface: PANTEIAInterface = None,
+                 use_process_pool: bool = False,
+                 use_vectorized_model: bool = False,
+                 progress_callback: callable = None,
+                 progress_tracker: ProgressTracker = None,
+                 deadline: Deadline = None):
 
         """Initialises a model to calculate TCO.
 
@@ -61,9 +142,24 @@ class TCOModel:
         :type tax_percentage: float
         :param current_year: First year of calculation.
         :type current_year: int
-        :param final_year: Final year of calculation.
+        :param final_year: The year after the last year of calculation, the final year itself isn't calculated.
         :type final_year: int
-
+        :param engine: The engine that calculates the PANTEIA model, "native", "generated" or "pycel".
+        :type engine: str
+        :param PANTEIA_interface: A reset interface to use instead of creating one, for example from the pool.
+        :type PANTEIA_interface: PANTEIAInterface
+        :param use_process_pool: Whether the vehicles are calculated by the workers of the TCO process pool.
+        :type use_process_pool: bool
+        :param use_vectorized_model: Whether the vehicles are calculated at once with the vectorized PANTEIA model.
+        :type use_vectorized_model: bool
+        :param progress_callback: Called with the amount of calculated vehicles and the size of the fleet.
+        :type progress_callback: callable
+        :param progress_tracker: Reports the progress of the request, see ProgressTracker.
+        :type progress_tracker: ProgressTracker
+        :param deadline: The deadline of the request, defaults to no limit.
+        :type deadline: Deadline
+
+        :raise InvalidEngineSpecified: Raised if the engine doesn't exist.
 
         :return: An instance of TCOModel.
         :rtype: TCOModel
@@ -77,6 +173,12 @@ class TCOModel:
         self.current_year = current_year
         self.final_year = final_year
         self.output = output
+        self.only_transition_year = "transition_year" in output and "results" not in output and "graphs" not in output
+        self.use_process_pool = use_process_pool
+        self.use_vectorized_model = use_vectorized_model
+        self.progress_callback = progress_callback
+        self.progress_tracker = progress_tracker
+        self.deadline = deadline or Deadline()
 
         self.valid_scenario_types = valid_scenario_names
         strategy_1 = Strategy1()
@@ -93,21 +195,25 @@ class TCOModel:
         }
 
         # Initialise excel interface
-        self.PANTEIA_interface = PANTEIAInterface()
+        if engine not in self.engines:
+            raise InvalidEngineSpecified
+        self.PANTEIA_interface = PANTEIA_interface or self.engines[engine]()
         self.fleet = fleet
         self.scenarios = scenarios
 
-    def compare_strategies(self, scenario_type: str, strategy_names: tuple = None):
+    def select_strategies(self, scenario_type: str, strategy_names: tuple = None):
 
-        """Compare a list of strategies against a single scenario.
+        """Select the scenario and the strategies to compare the strategies against a single scenario.
 
         :param scenario_type: The specified scenario to use.
         :type scenario_type: str
-        :param strategy_names: The names of the strategies to compare.
+        :param strategy_names: The names of the strategies to compare, defaults to all strategies.
         :type strategy_names: tuple
 
-        :return: The expected output organised by scenario and strategy.
-        :rtype: dict
+        :raise InvalidScenarioSpecified: Raised if the scenario doesn't exist.
+
+        :return: The selected scenario and strategies.
+        :rtype: tuple
         """
 
         # Check if scenario name is valid
@@ -129,72 +235,131 @@ class TCOModel:
         if len(strategies) < 1:
             strategies = self.valid_strategies
 
+        return scenario, strategies
+
+    def select_scenarios(self, strategy_name: str, scenario_names: tuple):
+
+        """Select the scenarios and the strategy to compare the scenarios against a single strategy.
+
+        :param strategy_name: The specified strategy to use.
+        :type strategy_name: str
+        :param scenario_names: The names of the scenarios to compare, defaults to all scenarios.
+        :type scenario_names: tuple
+
+        :raise InvalidScenarioSpecified: Raised if the strategy doesn't exist.
+
+        :return: The selected scenarios and strategy.
+        :rtype: tuple
+        """
+
+        # Check if scenario name is valid
+        if strategy_name not in self.valid_strategies.keys():
+            raise InvalidScenarioSpecified
+        strategy = {
+            strategy_name: self.valid_strategies[strategy_name]
+        }
+
+        # Add only valid scenarios
+        scenarios = {}
+        if scenario_names is not None:
+            scenarios = {scenario_type: self.valid_scenario_types[scenario_type]
+                         for scenario_type in scenario_names
+                         if scenario_type in self.valid_scenario_types}
+
+        # Default to all available scenarios
+        if len(scenarios) < 1:
+            scenarios = self.scenarios
+
+        return scenarios, strategy
+
+    def compare_strategies(self, scenario_type: str, strategy_names: tuple = None):
+
+        """Compare a list of strategies against a single scenario.
+
+        :param scenario_type: The specified scenario to use.
+        :type scenario_type: str
+        :param strategy_names: The names of the strategies to compare.
+        :type strategy_names: tuple
+
+        :return: The expected output organised by scenario and strategy.
+        :rtype: dict
+        """
+
         # Calculate TCO for vehicles in fleet
-        fleet_TCO = {number_plate: self.calculate_TCO(vehicle, scenario, strategies)
-                     for number_plate, vehicle in self.fleet.items()}
+        scenario, strategies = self.select_strategies(scenario_type, strategy_names)
+        self.report_stage("TCO")
+        fleet_TCO, metadata = self.calculate_fleet_TCO(scenario, strategies)
+
+        # Skip the graphs and fleet totals if only the transition years are expected
+        if self.only_transition_year:
+            return self.format_data({"fleet_transition_year": self.calculate_transition_year(fleet_TCO),
+                                     "metadata": metadata})
 
         # Create graphs
+        self.report_stage("graphs")
         graphs = {}
 
         # Initialise Graph Helper
-        graph_helper = GraphHelper()
+        graph_helper = GraphHelper(self.current_year)
 
         # Create TCO graphs for every vehicle if 10 or less, but skip the first (example).
         if 2 < len(fleet_TCO) < 11:
             vehicle_TCO = {}
-            for number_plate in fleet_TCO:
+            for number_plate in fleet_TCO.number_plates:
 
                 if number_plate == "voorbeeld":
                     continue
 
-                vehicle_data = fleet_TCO[number_plate]
+                vehicle_data = fleet_TCO.get_vehicle_results(number_plate)
                 vehicle_TCO[number_plate] = graph_helper.plot_vehicle_TCO(number_plate,
                                                                           vehicle_data)
             graphs["vehicle_TCO"] = vehicle_TCO
 
             # Create charging capacity graphs for every vehicle, but skip the first (example)
             vehicle_charging_capacity = {}
-            for number_plate in fleet_TCO:
+            for number_plate in fleet_TCO.number_plates:
 
                 if number_plate == "voorbeeld":
                     continue
 
-                vehicle_data = fleet_TCO[number_plate]
+                vehicle_data = fleet_TCO.get_vehicle_results(number_plate)
                 vehicle_charging_capacity[number_plate] = graph_helper.plot_vehicle_charging_capacity(number_plate,
                                                                                                       vehicle_data)
             graphs["vehicle_charging_capacity"] = vehicle_charging_capacity
 
             vehicle_charging_time = {}
-            for number_plate in fleet_TCO:
+            for number_plate in fleet_TCO.number_plates:
 
                 if number_plate == "voorbeeld":
                     continue
 
-                vehicle_data = fleet_TCO[number_plate]
+                vehicle_data = fleet_TCO.get_vehicle_results(number_plate)
                 vehicle_charging_time[number_plate] = graph_helper.plot_vehicle_charging_time(number_plate,
                                                                                               vehicle_data)
             graphs["vehicle_charging_time"] = vehicle_charging_time
 
         # Calculate fleet averages
-        fleet_TCO["sum"] = self.calculate_fleet_sum(fleet_TCO)
+        fleet_sum = self.calculate_fleet_sum(fleet_TCO)
 
         # Calculate transition year
         fleet_transition_year = self.calculate_transition_year(fleet_TCO)
 
         # Create average fleet graphs
-        graphs["TCO_total_bar"] = graph_helper.plot_TCO_fleet_averages_bar(fleet_TCO["sum"])
-        graphs["TCO_total_cost"] = graph_helper.plot_TCO_fleet_average_cost(fleet_TCO["sum"])
-        graphs["TCO_costs_breakdown"] = graph_helper.plot_TCO_costs_breakdown(fleet_TCO["sum"])
-        graphs["CO2_total_bar"] = graph_helper.plot_CO2_fleet_averages_bar(fleet_TCO["sum"])
-        graphs["CO2_total_emissions"] = graph_helper.plot_TCO_fleet_average_emissions(fleet_TCO["sum"])
-        graphs["Capacity_total_bar"] = graph_helper.plot_TCO_fleet_average_charging_capacity(fleet_TCO["sum"])
-        graphs["Charging_time_total_bar"] = graph_helper.plot_TCO_fleet_average_charging_time(fleet_TCO["sum"])
+        graphs["TCO_total_bar"] = graph_helper.plot_TCO_fleet_averages_bar(fleet_sum)
+        graphs["TCO_total_cost"] = graph_helper.plot_TCO_fleet_average_cost(fleet_sum)
+        graphs["TCO_costs_breakdown"] = graph_helper.plot_TCO_costs_breakdown(fleet_sum)
+        graphs["CO2_total_bar"] = graph_helper.plot_CO2_fleet_averages_bar(fleet_sum)
+        graphs["CO2_total_emissions"] = graph_helper.plot_TCO_fleet_average_emissions(fleet_sum)
+        graphs["Capacity_total_bar"] = graph_helper.plot_TCO_fleet_average_charging_capacity(fleet_sum)
+        graphs["Charging_time_total_bar"] = graph_helper.plot_TCO_fleet_average_charging_time(fleet_sum)
 
         # Add relevant data to data
         data = {
             "fleet_TCO": fleet_TCO,
+            "fleet_sum": fleet_sum,
             "fleet_transition_year": fleet_transition_year,
-            "graphs": graphs
+            "graphs": graphs,
+            "metadata": metadata
         }
 
         return self.format_data(data)
@@ -212,90 +377,81 @@ class TCOModel:
         :rtype: dict
         """
 
-        # Check if scenario name is valid
-        if strategy_name not in self.valid_strategies.keys():
-            raise InvalidScenarioSpecified
-        strategy = {
-            strategy_name: self.valid_strategies[strategy_name]
-        }
-
-        # Add only valid scenarios
-        scenarios = {}
-        if scenario_names is not None:
-            scenarios = {scenario_type: self.valid_scenario_types[scenario_type]
-                         for scenario_type in scenario_names
-                         if scenario_type in self.valid_scenario_types}
-
-        # Default to all available scenarios
-        if len(scenarios) < 1:
-            scenarios = self.scenarios
-
         # Calculate TCO for vehicles in fleet
-        fleet_TCO = {number_plate: self.calculate_TCO(vehicle, scenarios, strategy)
-                     for number_plate, vehicle in self.fleet.items()}
+        scenarios, strategy = self.select_scenarios(strategy_name, scenario_names)
+        self.report_stage("TCO")
+        fleet_TCO, metadata = self.calculate_fleet_TCO(scenarios, strategy)
+
+        # Skip the graphs and fleet totals if only the transition years are expected
+        if self.only_transition_year:
+            return self.format_data({"fleet_transition_year": self.calculate_transition_year(fleet_TCO),
+                                     "metadata": metadata})
 
         # Create graphs dict
+        self.report_stage("graphs")
         graphs = {}
 
         # Initialise Graph Helper
-        graph_helper = GraphHelper()
+        graph_helper = GraphHelper(self.current_year)
 
         # Create TCO graphs for every vehicle if 10 or less but skip the first (example).
         if 2 < len(fleet_TCO) < 11:
             vehicle_TCO = {}
-            for number_plate in list(fleet_TCO.values())[1:]:
+            for number_plate in fleet_TCO.number_plates[1:]:
 
                 if number_plate == "voorbeeld":
                     continue
 
-                vehicle_data = fleet_TCO[number_plate]
+                vehicle_data = fleet_TCO.get_vehicle_results(number_plate)
                 vehicle_TCO[number_plate] = graph_helper.plot_vehicle_TCO_scenarios(number_plate,
                                                                           vehicle_data)
             graphs["vehicle_TCO"] = vehicle_TCO
 
             # Create charging capacity graphs for every vehicle
             vehicle_charging_capacity = {}
-            for number_plate in fleet_TCO:
+            for number_plate in fleet_TCO.number_plates:
 
                 if number_plate == "voorbeeld":
                     continue
 
-                vehicle_data = fleet_TCO[number_plate]
+                vehicle_data = fleet_TCO.get_vehicle_results(number_plate)
                 vehicle_charging_capacity[number_plate] = graph_helper.plot_vehicle_charging_capacity(number_plate,
                                                                                                       vehicle_data)
             graphs["vehicle_charging_capacity"] = vehicle_charging_capacity
 
             vehicle_charging_time = {}
-            for number_plate in fleet_TCO:
+            for number_plate in fleet_TCO.number_plates:
 
                 if number_plate == "voorbeeld":
                     continue
 
-                vehicle_data = fleet_TCO[number_plate]
+                vehicle_data = fleet_TCO.get_vehicle_results(number_plate)
                 vehicle_charging_time[number_plate] = graph_helper.plot_vehicle_charging_time(number_plate,
                                                                                               vehicle_data)
             graphs["vehicle_charging_time"] = vehicle_charging_time
 
         # Calculate fleet total
-        fleet_TCO["sum"] = self.calculate_fleet_sum(fleet_TCO)
+        fleet_sum = self.calculate_fleet_sum(fleet_TCO)
 
         # Calculate transition year
         fleet_transition_year = self.calculate_transition_year(fleet_TCO)
 
         # Create fleet graphs
-        graphs["TCO_total_bar"] = graph_helper.plot_TCO_fleet_averages_bar_scenarios(fleet_TCO["sum"])
-        graphs["TCO_total_cost"] = graph_helper.plot_TCO_fleet_average_cost_scenarios(fleet_TCO["sum"])
-        graphs["TCO_costs_breakdown"] = graph_helper.plot_TCO_costs_breakdown(fleet_TCO["sum"])
-        graphs["CO2_total_bar"] = graph_helper.plot_CO2_fleet_averages_bar_scenarios(fleet_TCO["sum"])
-        graphs["CO2_total_emissions"] = graph_helper.plot_TCO_fleet_average_emissions_scenarios(fleet_TCO["sum"])
-        graphs["Capacity_total_bar"] = graph_helper.plot_TCO_fleet_average_charging_capacity_scenarios(fleet_TCO["sum"])
+        graphs["TCO_total_bar"] = graph_helper.plot_TCO_fleet_averages_bar_scenarios(fleet_sum)
+        graphs["TCO_total_cost"] = graph_helper.plot_TCO_fleet_average_cost_scenarios(fleet_sum)
+        graphs["TCO_costs_breakdown"] = graph_helper.plot_TCO_costs_breakdown(fleet_sum)
+        graphs["CO2_total_bar"] = graph_helper.plot_CO2_fleet_averages_bar_scenarios(fleet_sum)
+        graphs["CO2_total_emissions"] = graph_helper.plot_TCO_fleet_average_emissions_scenarios(fleet_sum)
+        graphs["Capacity_total_bar"] = graph_helper.plot_TCO_fleet_average_charging_capacity_scenarios(fleet_sum)
 
 
         # Add relevant data to data
         data = {
             "fleet_TCO": fleet_TCO,
+            "fleet_sum": fleet_sum,
             "fleet_transition_year": fleet_transition_year,
-            "graphs": graphs
+            "graphs": graphs,
+            "metadata": metadata
         }
 
         return self.format_data(data)
@@ -329,149 +485,395 @@ class TCOModel:
                                                            for vehicle_type, year_data in scenario_data.items()}
                                            for scenario_type, scenario_data in self.scenarios.items()}
 
+        # Check transition years
+        if "transition_year" in self.output:
+            if "fleet_transition_year" in data.keys():
+                formatted_data["transition_year"] = data["fleet_transition_year"]
+            else:
+                formatted_data["transition_year"] = "Transition years couldn't be found."
+
         # Check results
         if "results" in self.output:
             if "fleet_TCO" in data.keys():
-                formatted_data["results"] = data["fleet_TCO"]
+                formatted_data["results"] = data["fleet_TCO"].to_dict()
+                formatted_data["results"]["sum"] = data["fleet_sum"]
                 formatted_data["transition_year"] = data["fleet_transition_year"]
             else:
                 formatted_data["results"] = "Results couldn't be found."
 
-        if len(formatted_data.keys()) > 0:
-            return formatted_data
-        else:
+        if len(formatted_data.keys()) < 1:
             raise OutputIsNotSupported
 
-    def calculate_TCO(self, vehicle: Vehicle, scenarios: dict, strategies: dict):
+        # Add the amount of evaluations that were saved by calculating equivalent vehicles once
+        if "metadata" in data.keys():
+            formatted_data["metadata"] = data["metadata"]
 
-        """Calculate the TCO values for a vehicle.
+        return formatted_data
+
+    def calculate_fleet_TCO(self, scenarios: dict, strategies: dict):
+
+        """Calculate the TCO values for every vehicle in the fleet.
+        Vehicles with the same model inputs are calculated once, their results are copied to every number plate.
 
-        :param vehicle: The vehicle to calculate the TCO for.
-        :type vehicle: Vehicle
         :param scenarios: The scenarios that will be used.
         :type scenarios: dict
-        :param strategies: The that will be applied to each scenario.
+        :param strategies: The strategies that will be applied to each scenario.
         :type strategies: dict
 
-        :return: The calculated TCO values organised by scenario and strategy.
-        :rtype: dict
+        :raise DeadlineExceeded: Raised if the deadline passed.
+        :raise RequestCancelled: Raised if the request has been cancelled.
+
+        :return: The calculated TCO values of the fleet, and the amount of evaluations.
+        :rtype: tuple
         """
 
-        # Iterate over the different scenarios and strategies
-        results = {}
-        for scenario in scenarios:
-            scenario_results = {}
-            for strategy in strategies:
+        equivalent_number_plates = self.group_equivalent_vehicles()
+
+        # Calculate the first vehicle of every group, at once with the vectorized model if it's used,
+        # otherwise per vehicle in the worker processes if the process pool has been started
+        first_number_plates = [number_plates[0] for number_plates in equivalent_number_plates.values()]
+        vehicles = [self.fleet[number_plate] for number_plate in first_number_plates]
+        group_sizes = [len(number_plates) for number_plates in equivalent_number_plates.values()]
+        self.calculated_vehicles = 0
+        calculation_model = "vectorized" if self.use_vectorized_model and len(vehicles) > 1 else "per_vehicle"
+        processes = 1
+        if calculation_model == "vectorized":
+            group_results = self.calculate_vectorized_TCO(first_number_plates, vehicles, scenarios, strategies,
+                                                          lambda groups: self.report_progress(group_sizes, groups))
+        elif self.use_process_pool and TCOProcessPool.executor is not None and len(vehicles) > 1:
+            processes = min(TCOProcessPool.workers, len(vehicles))
+            vehicles_results = TCOProcessPool.map(calculate_vehicles_TCO,
+                                                  vehicles,
+                                                  type(self.PANTEIA_interface),
+                                                  scenarios,
+                                                  strategies,
+                                                  self.get_model_constants(),
+                                                  callback=lambda groups: self.report_progress(group_sizes, groups))
+            group_results = from_vehicle_results(first_number_plates, vehicles_results)
+        else:
+            vehicles_results = []
+            for group_index, vehicle in enumerate(vehicles):
+                self.deadline.check()
+                vehicles_results.append(self.calculate_TCO(vehicle, scenarios, strategies))
+                self.report_progress(group_sizes, range(group_index, group_index + 1))
+            group_results = from_vehicle_results(first_number_plates, vehicles_results)
+
+        # Every vehicle of a group gets a copy of the row of its group
+        group_indices = {}
+        for group_index, number_plates in enumerate(equivalent_number_plates.values()):
+            for number_plate in number_plates:
+                group_indices[number_plate] = group_index
+        fleet_TCO = group_results.take([group_indices[number_plate] for number_plate in self.fleet], list(self.fleet))
+
+        return fleet_TCO, self.create_metadata(equivalent_number_plates, scenarios, strategies, calculation_model,
+                                               processes)
+
+    def stream_fleet_TCO(self, scenarios: dict, strategies: dict):
+
+        """Calculate the TCO values for every vehicle in the fleet and yield the output line by line.
+        A line is yielded for every vehicle as soon as its group of equivalent vehicles is calculated,
+        followed by lines for the sum, the transition years and the metadata. Graphs aren't created.
+        Only the sum and the transition years are kept, so the memory doesn't grow with the results of the fleet.
 
-                # Reset values
-                self.PANTEIA_interface.reset_values()
+        :param scenarios: The scenarios that will be used.
+        :type scenarios: dict
+        :param strategies: The strategies that will be applied to each scenario.
+        :type strategies: dict
 
-                # Input vehicle information
-                self.PANTEIA_interface.input_vehicle_data(vehicle)
+        :return: The lines of the output, organised by the name of the output.
+        :rtype: Iterator[dict]
+        """
 
-                # Calculate result
-                result = strategies[strategy].calculate_TCO(scenarios[scenario][str(vehicle.category+1)],
-                                                            vehicle,
-                                                            self.PANTEIA_interface,
-                                                            self.extra_years_after_lifespan,
-                                                            self.increase_factor_after_lifespan,
-                                                            self.transition_margin,
-                                                            self.tax_percentage,
-                                                            self.current_year,
-                                                            self.final_year)
+        equivalent_number_plates = self.group_equivalent_vehicles()
+        groups_number_plates = list(equivalent_number_plates.values())
+        first_number_plates = [number_plates[0] for number_plates in groups_number_plates]
+        group_sizes = [len(number_plates) for number_plates in groups_number_plates]
+        self.calculated_vehicles = 0
+        self.report_stage("TCO")
+
+        # The vectorized model calculates a chunk of groups at once, otherwise the groups are calculated one at a time
+        chunk_size = self.vectorized_chunk_size if self.use_vectorized_model and len(first_number_plates) > 1 else 1
+
+        fleet_sum = {}
+        fleet_transition_year = {}
+        for start in range(0, len(first_number_plates), chunk_size):
+            self.deadline.check()
+            groups = range(start, min(start + chunk_size, len(first_number_plates)))
+            vehicles = [self.fleet[first_number_plates[index]] for index in groups]
+            if chunk_size > 1:
+                group_results = self.calculate_vectorized_TCO([first_number_plates[index] for index in groups],
+                                                              vehicles, scenarios, strategies)
+            else:
+                group_results = from_vehicle_results([first_number_plates[start]],
+                                                     [self.calculate_TCO(vehicles[0], scenarios, strategies)])
 
-                # Reset lifespan values
-                self.PANTEIA_interface.reset_technological_lifespan()
+            # Every vehicle of a group gets a copy of the row of its group
+            number_plates = [number_plate for index in groups for number_plate in groups_number_plates[index]]
+            fleet_TCO = group_results.take([group_index for group_index, index in enumerate(groups)
+                                            for _ in range(group_sizes[index])], number_plates)
+            self.report_progress(group_sizes, groups)
 
-                # Append result
-                scenario_results[strategy] = result
+            fleet_transition_year.update(self.calculate_transition_year(fleet_TCO))
+            if not self.only_transition_year:
+                add_results(fleet_sum, self.calculate_fleet_sum(fleet_TCO))
+                for number_plate, vehicle_results in fleet_TCO.items():
+                    yield {"number_plate": number_plate, "results": vehicle_results}
 
-            # Append scenario results
-            results[scenario] = scenario_results
+        if "results" in self.output:
+            yield {"sum": fleet_sum}
+        if "results" in self.output or "transition_year" in self.output:
+            yield {"transition_year": fleet_transition_year}
+        yield {"metadata": self.create_metadata(equivalent_number_plates, scenarios, strategies,
+                                                "vectorized" if chunk_size > 1 else "per_vehicle", 1)}
 
-        return results
+    def group_equivalent_vehicles(self):
 
-    def calculate_fleet_sum(self, fleet_TCO: dict):
+        """Group the vehicles of the fleet that have the same model inputs.
 
-        """Calculates the total TCO value for a fleet.
+        :return: The number plates of every group, organised by the model inputs of the group.
+        :rtype: dict
+        """
 
-        :param fleet_TCO: The fleet data to get the sum from.
-        :type fleet_TCO: dict
+        equivalent_number_plates = {}
+        for number_plate, vehicle in self.fleet.items():
+            equivalent_number_plates.setdefault(vehicle.get_model_inputs(), []).append(number_plate)
+
+        return equivalent_number_plates
+
+    def create_metadata(self, equivalent_number_plates: dict, scenarios: dict, strategies: dict,
+                        calculation_model: str, processes: int):
+
+        """Create the metadata of a calculated fleet.
+
+        :param equivalent_number_plates: The number plates of every group of equivalent vehicles.
+        :type equivalent_number_plates: dict
+        :param scenarios: The scenarios that were used.
+        :type scenarios: dict
+        :param strategies: The strategies that were applied to each scenario.
+        :type strategies: dict
+        :param calculation_model: The model that calculated the fleet, "vectorized" or "per_vehicle".
+        :type calculation_model: str
+        :param processes: The amount of worker processes that calculated the fleet, 1 for the process of the request.
+        :type processes: int
 
-        :return: The average TCO values
+        :return: The amount of vehicles, groups, evaluations and saved evaluations, the model and the processes.
         :rtype: dict
         """
 
-        amount_of_vehicles = len(fleet_TCO)
-        sums = {}
+        evaluations_per_vehicle = len(scenarios) * len(strategies)
+        return {
+            "vehicles": len(self.fleet),
+            "equivalent_vehicle_groups": len(equivalent_number_plates),
+            "evaluations": len(equivalent_number_plates) * evaluations_per_vehicle,
+            "saved_evaluations": (len(self.fleet) - len(equivalent_number_plates)) * evaluations_per_vehicle,
+            "model": calculation_model,
+            "processes": processes
+        }
 
-        # Get the sum for all the values
-        for number_plate, scenarios in fleet_TCO.items():
+    def report_progress(self, group_sizes: list, groups: range):
 
-            if number_plate == "voorbeeld":
-                continue
+        """Report the progress of the fleet to the progress callback, after groups of vehicles have been calculated.
+        The deadline is checked first, so the fleet also stops when it's calculated by the process pool.
 
-            for scenario, strategies in scenarios.items():
+        :param group_sizes: The amount of vehicles in every group of equivalent vehicles.
+        :type group_sizes: list
+        :param groups: The indices of the groups that have been calculated.
+        :type groups: range
+        """
 
-                if scenario not in sums:
-                    sums[scenario] = {}
+        self.deadline.check()
+        self.calculated_vehicles += sum(group_sizes[groups.start:groups.stop])
+        if self.progress_callback is not None:
+            self.progress_callback(self.calculated_vehicles, len(self.fleet))
+        if self.progress_tracker is not None:
+            self.progress_tracker.update_vehicles(self.calculated_vehicles, len(self.fleet))
 
-                for strategy, years in strategies.items():
+    def report_stage(self, stage: str):
 
-                    if strategy not in sums[scenario]:
-                        sums[scenario][strategy] = {}
+        """Report to the progress tracker that a stage of the request starts.
 
-                    for year, year_data in years.items():
+        :param stage: The name of the stage, "TCO" or "graphs".
+        :type stage: str
+        """
 
-                        if year not in sums[scenario][strategy]:
-                            sums[scenario][strategy][year] = {}
+        if self.progress_tracker is not None:
+            self.progress_tracker.start_stage(stage)
 
-                        for prop, value in year_data.items():
+    def report_step(self, scenario: str, strategies: dict):
 
-                            try:
-                                sums[scenario][strategy][year][prop] = sums[scenario][strategy][year][prop] + value
-                            except:
-                                sums[scenario][strategy][year][prop] = value
+        """Report to the progress tracker which scenario and strategies are calculated.
+        The strategies of a scenario are calculated at once, so they're reported together.
 
-        # # Get the average
-        # averages = {scenario: {strategy: {year: {prop: value/amount_of_vehicles
-        #                                          for prop, value in props.items()}
-        #                                   for year, props in years.items()}
-        #                        for strategy, years in strategies.items()}
-        #             for scenario, strategies in sums.items()}
+        :param scenario: The name of the scenario.
+        :type scenario: str
+        :param strategies: The strategies that are calculated.
+        :type strategies: dict
+        """
 
-        return sums
+        if self.progress_tracker is not None:
+            self.progress_tracker.update_step(scenario, tuple(strategies))
 
-    def calculate_transition_year(self, fleet_TCO: dict):
+    def get_model_constants(self):
 
-        """Calculates the transition year for each vehicle
+        """Get the model constants, so a model with the same constants can be created in another process.
 
-        :param fleet_TCO: The fleet data to get the transition year from.
-        :type fleet_TCO: dict
+        :return: The model constants organised by parameter name.
+        :rtype: dict
+        """
 
-        :return: The transition year of each vehicle
+        return {
+            "output": self.output,
+            "extra_years_after_lifespan": self.extra_years_after_lifespan,
+            "increase_factor_after_lifespan": self.increase_factor_after_lifespan,
+            "transition_margin": self.transition_margin,
+            "tax_percentage": self.tax_percentage,
+            "current_year": self.current_year,
+            "final_year": self.final_year,
+            "deadline": self.deadline
+        }
+
+    def calculate_TCO(self, vehicle: Vehicle, scenarios: dict, strategies: dict):
+
+        """Calculate the TCO values for a vehicle.
+
+        :param vehicle: The vehicle to calculate the TCO for.
+        :type vehicle: Vehicle
+        :param scenarios: The scenarios that will be used.
+        :type scenarios: dict
+        :param strategies: The that will be applied to each scenario.
+        :type strategies: dict
+
+        :return: The calculated TCO values organised by scenario and strategy.
+        :rtype: dict
+        """
+
+        # Iterate over the different scenarios, the strategies are calculated at once
+        results = {}
+        for scenario in scenarios:
+            self.deadline.check()
+            self.report_step(scenario, strategies)
+
+            # Reset values
+            self.PANTEIA_interface.reset_values()
+
+            # Input vehicle information
+            self.PANTEIA_interface.input_vehicle_data(vehicle)
+
+            # Calculate result, the years that the strategies share are only calculated once
+            runner = StrategyRunner(scenarios[scenario][str(vehicle.category+1)],
+                                    vehicle,
+                                    self.PANTEIA_interface,
+                                    self.extra_years_after_lifespan,
+                                    self.increase_factor_after_lifespan,
+                                    self.transition_margin,
+                                    self.tax_percentage,
+                                    self.current_year,
+                                    self.final_year,
+                                    self.only_transition_year,
+                                    self.deadline)
+
+            # Append scenario results
+            results[scenario] = runner.calculate_TCO(strategies)
+
+            # Reset lifespan values
+            self.PANTEIA_interface.reset_technological_lifespan()
+
+        return results
+
+    def calculate_vectorized_TCO(self,
+                                 number_plates: list,
+                                 vehicles: list,
+                                 scenarios: dict,
+                                 strategies: dict,
+                                 callback: callable = None):
+
+        """Calculate the TCO values for many vehicles at once with the vectorized PANTEIA model.
+        The vehicles are calculated in chunks of vectorized_chunk_size vehicles.
+        Vehicles that can't be calculated with arrays are calculated one at a time with calculate_TCO,
+        which raises the same exceptions as when the vectorized model isn't used.
+
+        :param number_plates: The number plates of the vehicles.
+        :type number_plates: list
+        :param vehicles: The vehicles to calculate the TCO for.
+        :type vehicles: list
+        :param scenarios: The scenarios that will be used.
+        :type scenarios: dict
+        :param strategies: The strategies that will be applied to each scenario.
+        :type strategies: dict
+        :param callback: Called with the range of the indices of the vehicles of a chunk when it's calculated.
+        :type callback: callable
+
+        :return: The calculated TCO values of the vehicles.
+        :rtype: FleetResults
+        """
+
+        columns = fleet_columns_from_vehicles(vehicles)
+        chunks = []
+        failed_results = {}
+
+        for start in range(0, len(vehicles), self.vectorized_chunk_size):
+            self.deadline.check()
+            chunk = slice(start, min(start + self.vectorized_chunk_size, len(vehicles)))
+            chunk_columns = columns.take(chunk)
+            chunk_arrays = {}
+            failed_vehicles = set()
+
+            # Iterate over the different scenarios, the vehicles and strategies are calculated at once
+            for scenario in scenarios:
+                self.deadline.check()
+                self.report_step(scenario, strategies)
+                runner = FleetStrategyRunner(scenarios[scenario],
+                                             chunk_columns,
+                                             self.extra_years_after_lifespan,
+                                             self.increase_factor_after_lifespan,
+                                             self.transition_margin,
+                                             self.tax_percentage,
+                                             self.current_year,
+                                             self.final_year,
+                                             self.only_transition_year,
+                                             self.deadline)
+                chunk_arrays[scenario] = runner.calculate_TCO(strategies)
+                failed_vehicles.update((runner.failed_vehicles.nonzero()[0] + start).tolist())
+
+            # The results of the vehicles that failed replace their rows of the arrays
+            for index in sorted(failed_vehicles):
+                failed_results[index] = self.calculate_TCO(vehicles[index], scenarios, strategies)
+
+            chunks.append((chunk, chunk_arrays))
+            if callback is not None:
+                callback(range(chunk.start, chunk.stop))
+
+        fleet_results = FleetResults(number_plates, *collect_labels([chunk_arrays for _, chunk_arrays in chunks]
+                                                                    + list(failed_results.values())))
+        for chunk, chunk_arrays in chunks:
+            fleet_results.set_results(chunk, chunk_arrays)
+        for index, vehicle_results in failed_results.items():
+            fleet_results.set_results(index, vehicle_results)
+
+        return fleet_results
+
+    def calculate_fleet_sum(self, fleet_TCO: FleetResults):
+
+        """Calculates the total TCO value for a fleet.
+
+        :param fleet_TCO: The fleet data to get the sum from.
+        :type fleet_TCO: FleetResults
+
+        :return: The total TCO values
         :rtype: dict
         """
 
-        transition_year = {}
+        return fleet_TCO.calculate_fleet_sum()
+
+    def calculate_transition_year(self, fleet_TCO: FleetResults):
 
-        # Get the sum for all the values
-        for number_plate, scenarios in fleet_TCO.items():
+        """Calculates the transition year for each vehicle
 
-            if number_plate == "sum" or number_plate == "voorbeeld":
-                continue
-            if number_plate not in transition_year:
-                transition_year[number_plate] = {}
-            for scenario, strategies in scenarios.items():
-                if scenario not in transition_year[number_plate]:
-                    transition_year[number_plate][scenario] = {}
-                for strategy, years in strategies.items():
-                    for year, year_data in years.items():
-                        if year_data['transition_year'] != 0:
-                            transition_year[number_plate][scenario][strategy] = year
-                            break
-                        else:
-                            transition_year[number_plate][scenario][strategy] = ">" + str(self.final_year - 1)
+        :param fleet_TCO: The fleet data to get the transition year from.
+        :type fleet_TCO: FleetResults
 
-        return transition_year
+        :return: The transition year of each vehicle
+        :rtype: dict
+        """
 
+        return fleet_TCO.calculate_transition_year(self.final_year)
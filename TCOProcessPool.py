@@ -0,0 +1,94 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from excel_interfaces.NativePANTEIAInterface import NativePANTEIAInterface
+from excel_interfaces.PANTEIAInterfacePool import PANTEIAInterfacePool
+from Logger import Logger
+from math import ceil
+from threading import Lock
+
+
+class TCOProcessPool:
+    """
+    A process-wide pool of worker processes that calculate the vehicles of a fleet in parallel.
+    Every worker keeps warm PANTEIA interfaces in its own PANTEIAInterfacePool, so they're only created once.
+    The pool should be initialised before the server starts its threads, because the workers are forked.
+
+    Attributes:
+        workers (int): The amount of worker processes, 1 calculates the fleet in the process of the request.
+        chunks_per_worker (int): The amount of chunks the fleet is split into per worker, to balance the load.
+        executor (ProcessPoolExecutor): The executor of the worker processes, or None if there are no workers.
+    """
+
+    workers: int = 1
+    chunks_per_worker: int = 4
+    executor: ProcessPoolExecutor = None
+    lock: Lock = Lock()
+
+    @classmethod
+    def initialize(cls, workers: int, interface_classes: tuple = (NativePANTEIAInterface,)):
+        """
+        Starts the worker processes, every worker creates a warm interface of the interface classes.
+
+        Parameters:
+            workers (int): The amount of worker processes, 1 or less doesn't start any.
+            interface_classes (tuple): The interface classes of which every worker creates an instance up-front.
+        """
+
+        with cls.lock:
+            cls.shutdown()
+            cls.workers = max(1, workers)
+            if cls.workers < 2:
+                return
+
+            cls.executor = ProcessPoolExecutor(max_workers=cls.workers,
+                                               initializer=PANTEIAInterfacePool.initialize,
+                                               initargs=(1, interface_classes))
+
+            # Submitting a task starts the workers now instead of during a request
+            cls.executor.submit(int).result()
+
+        Logger.warning(f"TCO process pool started with {cls.workers} workers")
+
+    @classmethod
+    def shutdown(cls):
+        """
+        Stops the worker processes, after they finished their tasks.
+        """
+
+        if cls.executor is not None:
+            cls.executor.shutdown()
+            cls.executor = None
+
+    @classmethod
+    def map(cls, function, items: list, *arguments: any, callback: callable = None):
+        """
+        Calls a function in the worker processes for chunks of the items.
+        The items are processed in their original order, regardless of the order in which the chunks finish.
+
+        Parameters:
+            function (callable): A function on module level, that is called with a chunk and the arguments.
+                It should return a list with a result for every item of the chunk.
+            items (list): The items to split into chunks.
+            *arguments (any): The other arguments of the function, which are the same for every chunk.
+            callback (callable): Called with the range of the indices of the items of a chunk when it's finished.
+                If it raises an exception, the chunks that haven't started are cancelled.
+
+        Returns:
+            list: The results of the items, in the order of the items.
+        """
+
+        chunk_size = max(1, ceil(len(items) / (cls.workers * cls.chunks_per_worker)))
+        chunks = [items[index:index + chunk_size] for index in range(0, len(items), chunk_size)]
+
+        futures = [cls.executor.submit(function, chunk, *arguments) for chunk in chunks]
+        if callback is not None:
+            chunk_indices = {future: index for index, future in enumerate(futures)}
+            try:
+                for future in as_completed(futures):
+                    start = chunk_indices[future] * chunk_size
+                    callback(range(start, min(start + chunk_size, len(items))))
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
+
+        return [result for future in futures for result in future.result()]
@@ -1,7 +1,18 @@
+from AdmissionController import AdmissionController
+from Deadline import Deadline
+from excel_interfaces.PANTEIAInterface import PANTEIAInterface
+from excel_interfaces.PANTEIAInterfacePool import PANTEIAInterfacePool
+from JobQueue import JobQueue
 from Logger import Logger
-from flask import Flask, render_template, request, Response
+from ProgressTracker import ProgressTracker
+from TCOModel import TCOModel
+from TCOProcessPool import TCOProcessPool
+from flask import Flask, abort, g, jsonify, render_template, request, Response, url_for
+from functools import partial
 from waitress import serve
 
+import exceptions as Exceptions
+import os
 import request_functions as helper
 
 # Create app
@@ -45,94 +56,319 @@ def process_local_excel():
 
     # Log the request
     Logger.warning("Request: Local Excel Analyses")
-
-    # Read input
-    Logger.warning("Processing parameters")
-    company = helper.get_company_from_parameters(request)
-    comparing = helper.get_comparing_from_parameters(request)
-    selected_scenarios = helper.get_scenarios_from_parameters(request)
-    selected_strategies = helper.get_strategies_from_parameters(request)
-    output = helper.get_output_from_parameters(request)
-
-    Logger.warning("Processing fleet data")
-    fleet, fleet_errors = helper.get_fleet_data_from_parameters(request, company)
-
-    Logger.warning("Processing scenario data")
-    scenarios, valid_scenario_names = helper.get_scenarios()
-
-    # Process data
-    data = helper.process_data(fleet,
-                        scenarios,
-                        valid_scenario_names,
-                        output,
-                        comparing,
-                        selected_scenarios,
-                        selected_strategies)
- 
-    # Return output
-    output_format = request.args.get("output_format")
-    return helper.format_output(output_format, data, fleet_errors)
+    progress_tracker = helper.get_progress_tracker_from_parameters(request)
+    deadline = helper.get_deadline_from_parameters(request)
+
+    with progress_tracker:
+
+        # Read input
+        Logger.warning("Processing parameters")
+        company = helper.get_company_from_parameters(request)
+        comparing = helper.get_comparing_from_parameters(request)
+        selected_scenarios = helper.get_scenarios_from_parameters(request)
+        selected_strategies = helper.get_strategies_from_parameters(request)
+        output = helper.get_output_from_parameters(request)
+        current_year, final_year = helper.get_horizon_from_parameters(request)
+        calculation_model = helper.get_calculation_model_from_parameters(request)
+
+        Logger.warning("Processing fleet data")
+        progress_tracker.start_stage("fleet")
+        fleet, fleet_errors = helper.get_fleet_data_from_parameters(request, company)
+
+        Logger.warning("Processing scenario data")
+        progress_tracker.start_stage("scenarios")
+        scenarios, valid_scenario_names = helper.get_scenarios()
+
+        # Only the request that calculates the analysis waits for capacity, identical requests wait for it instead.
+        # The work units are released when the response is closed
+        admit = partial(admit_request, fleet, scenarios, comparing, selected_scenarios, selected_strategies,
+                        progress_tracker, deadline)
+
+        # Process data, ndjson is streamed while it's calculated
+        output_format = request.args.get("output_format")
+        data = helper.process_data(fleet,
+                            scenarios,
+                            valid_scenario_names,
+                            output,
+                            comparing,
+                            selected_scenarios,
+                            selected_strategies,
+                            current_year,
+                            final_year,
+                            stream=output_format == "ndjson",
+                            coalesce=True,
+                            progress_tracker=progress_tracker,
+                            deadline=deadline,
+                            calculation_model=calculation_model,
+                            admit=admit)
+
+        # Return output
+        return helper.format_output(output_format, data, fleet_errors, progress_tracker)
 
 
 @app.route("/external_excel", methods=["POST"])
 def process_external_excel():
 
-    # Read input
-    Logger.warning("Processing parameters")
-    company = helper.get_company_from_parameters(request)
-    comparing = helper.get_comparing_from_parameters(request)
-    selected_scenarios = helper.get_scenarios_from_parameters(request)
-    selected_strategies = helper.get_strategies_from_parameters(request)
-    output = helper.get_output_from_parameters(request)
-
-    # Get the fleet and scenario data
-    fleet, fleet_errors = helper.get_excel_fleet_data_from_body(request, company)
-    scenarios, valid_scenario_names = helper.get_scenarios()
-
-    # Process data
-    Logger.warning("Predicting")
-    data = helper.process_data(
-        fleet,
-        scenarios,
-        valid_scenario_names,
-        output,
-        comparing,
-        selected_scenarios,
-        selected_strategies
-    )
-
-    # Return output
-    Logger.warning("Outputting")
-    output_format = request.args.get("output_format")
-    return helper.format_output(output_format, data, fleet_errors)
+    progress_tracker = helper.get_progress_tracker_from_parameters(request)
+    deadline = helper.get_deadline_from_parameters(request)
+
+    with progress_tracker:
+
+        # Read input
+        Logger.warning("Processing parameters")
+        company = helper.get_company_from_parameters(request)
+        comparing = helper.get_comparing_from_parameters(request)
+        selected_scenarios = helper.get_scenarios_from_parameters(request)
+        selected_strategies = helper.get_strategies_from_parameters(request)
+        output = helper.get_output_from_parameters(request)
+        current_year, final_year = helper.get_horizon_from_parameters(request)
+        calculation_model = helper.get_calculation_model_from_parameters(request)
+
+        # Get the fleet and scenario data
+        progress_tracker.start_stage("fleet")
+        fleet, fleet_errors = helper.get_excel_fleet_data_from_body(request, company)
+        progress_tracker.start_stage("scenarios")
+        scenarios, valid_scenario_names = helper.get_scenarios()
+
+        # Only the request that calculates the analysis waits for capacity, identical requests wait for it instead.
+        # The work units are released when the response is closed
+        admit = partial(admit_request, fleet, scenarios, comparing, selected_scenarios, selected_strategies,
+                        progress_tracker, deadline)
+
+        # Process data, ndjson is streamed while it's calculated
+        Logger.warning("Predicting")
+        output_format = request.args.get("output_format")
+        data = helper.process_data(
+            fleet,
+            scenarios,
+            valid_scenario_names,
+            output,
+            comparing,
+            selected_scenarios,
+            selected_strategies,
+            current_year,
+            final_year,
+            stream=output_format == "ndjson",
+            coalesce=True,
+            progress_tracker=progress_tracker,
+            deadline=deadline,
+            calculation_model=calculation_model,
+            admit=admit
+        )
+
+        # Return output
+        Logger.warning("Outputting")
+        return helper.format_output(output_format, data, fleet_errors, progress_tracker)
 
 
 @app.route("/json_data", methods=["POST"])
 def process_json_data():
 
-    # Read input
-    comparing = helper.get_comparing_from_parameters(request)
-    selected_scenarios = helper.get_scenarios_from_parameters(request)
-    selected_strategies = helper.get_strategies_from_parameters(request)
-    output = helper.get_output_from_parameters(request)
-
-    json_data = helper.get_json_data_from_body(request)
-    fleet = json_data["fleet"]
-    scenarios = json_data["scenarios"]
-    valid_scenario_names = json_data["scenario_names"]
-
-    # Process data
-    data = helper.process_data(fleet,
-                        scenarios,
-                        valid_scenario_names,
-                        output,
-                        comparing,
-                        selected_scenarios,
-                        selected_strategies)
-
-    # Return output
+    progress_tracker = helper.get_progress_tracker_from_parameters(request)
+    deadline = helper.get_deadline_from_parameters(request)
+
+    with progress_tracker:
+
+        # Read input
+        comparing = helper.get_comparing_from_parameters(request)
+        selected_scenarios = helper.get_scenarios_from_parameters(request)
+        selected_strategies = helper.get_strategies_from_parameters(request)
+        output = helper.get_output_from_parameters(request)
+        current_year, final_year = helper.get_horizon_from_parameters(request)
+        calculation_model = helper.get_calculation_model_from_parameters(request)
+
+        # The fleet and the scenarios are both read from the body
+        progress_tracker.start_stage("fleet")
+        json_data = helper.get_json_data_from_body(request)
+        fleet = json_data["fleet"]
+        scenarios = json_data["scenarios"]
+        valid_scenario_names = json_data["scenario_names"]
+
+        # Only the request that calculates the analysis waits for capacity, identical requests wait for it instead.
+        # The work units are released when the response is closed
+        admit = partial(admit_request, fleet, scenarios, comparing, selected_scenarios, selected_strategies,
+                        progress_tracker, deadline)
+
+        # Process data, ndjson is streamed while it's calculated
+        output_format = request.args.get("output_format")
+        data = helper.process_data(fleet,
+                            scenarios,
+                            valid_scenario_names,
+                            output,
+                            comparing,
+                            selected_scenarios,
+                            selected_strategies,
+                            current_year,
+                            final_year,
+                            stream=output_format == "ndjson",
+                            coalesce=True,
+                            progress_tracker=progress_tracker,
+                            deadline=deadline,
+                            calculation_model=calculation_model,
+                            admit=admit)
+
+        # Return output
+        return helper.format_output(output_format, data, progress_tracker=progress_tracker)
+
+
+@app.route("/jobs", methods=["POST"])
+def submit_job():
+    """
+    Queue an analysis of a fleet, the fleet is read now and the analysis is calculated by a job worker.
+    The parameters are the same as those of /external_excel, or /local_excel if the request has no body.
+
+    Returns:
+        Response: The id of the job and the URLs of its status and result.
+    """
+
+    Logger.warning("Request: Submit Job")
+
+    parameters = helper.get_job_parameters(request)
+    job_id = JobQueue.submit(parameters, len(parameters["fleet"]))
+
+    status_url = url_for("get_job_status", job_id=job_id)
+    response = jsonify({
+        "id": job_id,
+        "status": "queued",
+        "status_url": status_url,
+        "result_url": url_for("get_job_result", job_id=job_id)
+    })
+    response.status_code = 202
+    response.headers["Location"] = status_url
+    return response
+
+
+@app.route("/jobs/<job_id>")
+def get_job_status(job_id: str):
+    """
+    Report the status of a job and its progress in vehicles.
+
+    Returns:
+        Response: The status, progress, error and timestamps of the job.
+    """
+
+    job = JobQueue.get_job(job_id)
+    if job is None:
+        abort(404)
+
+    return jsonify(job)
+
+
+@app.route("/jobs/<job_id>/result")
+def get_job_result(job_id: str):
+    """
+    Return the result of a finished job in the requested output format.
+
+    Returns:
+        str: The results, or the status of the job if it hasn't finished.
+    """
+
+    job = JobQueue.get_job(job_id)
+    if job is None:
+        abort(404)
+
+    # The status is returned until the job has finished, failed jobs return their error
+    if job["status"] != "finished":
+        response = jsonify(job)
+        response.status_code = 500 if job["status"] == "failed" else 409
+        return response
+
+    data, fleet_errors = JobQueue.get_job_result(job_id)
     output_format = request.args.get("output_format")
-    return helper.format_output(output_format, data)
+    return helper.format_output(output_format, data, fleet_errors)
+
+
+@app.route("/progress/<progress_id>")
+def stream_progress(progress_id: str):
+    """
+    Stream the progress of a request as server-sent events, the request should have the same progress_id parameter.
+    The stream can be opened before the request is sent and ends when the request finished or failed.
+
+    Returns:
+        Response: The events of the request, see ProgressTracker.
+    """
+
+    # A client that reconnects continues after the last event it received
+    last_event_id = request.headers.get("Last-Event-ID", "0")
+    last_event_id = int(last_event_id) if last_event_id.isdigit() else 0
+
+    progress_tracker = ProgressTracker.get(progress_id)
+    return Response(progress_tracker.stream_events(last_event_id),
+                    mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.route("/capacity")
+def get_capacity():
+    """
+    Report the limits of the admission control and the current load of the server.
+
+    Returns:
+        Response: The capacities, the work units and requests in flight and queued, and the admitted
+            and rejected requests, see AdmissionController.
+    """
+
+    return jsonify(AdmissionController.get_statistics())
+
+
+def admit_request(*arguments: any):
+    """
+    Wait until the server has the capacity to calculate the analysis of the request, see helper.admit_analysis.
+    The admission is kept by the request, so it's released when the response is closed.
+
+    Parameters:
+        *arguments (any): The arguments of helper.admit_analysis.
+    """
+
+    g.admission_ticket = helper.admit_analysis(*arguments)
+
+
+@app.after_request
+def release_admission(response: Response):
+    """
+    Release the work units of an admitted analysis when the response is closed,
+    which is after the last line when the results are streamed.
+
+    Returns:
+        Response: The response.
+    """
+
+    admission_ticket = g.pop("admission_ticket", None)
+    if admission_ticket is not None:
+        response.call_on_close(admission_ticket.release)
+    return response
+
+
+@app.errorhandler(Exceptions.ServerOverloaded)
+def return_overloaded_response(exception):
+
+    return Response(response=render_template("exception.html",
+                                             exception=type(exception).__name__,
+                                             message=exception),
+                    status=503,
+                    headers={"Retry-After": str(exception.retry_after)},
+                    mimetype="text/html")
+
+
+@app.errorhandler(Exceptions.DeadlineExceeded)
+def return_deadline_exceeded_response(exception):
+
+    return Response(response=render_template("exception.html",
+                                             exception=type(exception).__name__,
+                                             message=exception),
+                    status=504,
+                    mimetype="text/html")
+
+
+@app.errorhandler(Exceptions.RequestCancelled)
+def return_cancelled_response(exception):
+
+    # The client has disconnected, the status is only logged by the server
+    return Response(response=render_template("exception.html",
+                                             exception=type(exception).__name__,
+                                             message=exception),
+                    status=499,
+                    mimetype="text/html")
 
 
 @app.errorhandler(403)
@@ -178,8 +414,43 @@ if __name__ == "__main__":
     # Setup logger 
     Logger.initialize(timezone_string="Europe/Amsterdam", level="WARNING")
 
+    # Load the PANTEIA model before the first request, it's compiled again when the model has changed
+    compiled_model_path = PANTEIAInterface.load_compiled_model()
+    Logger.warning(f"PANTEIA model loaded, compiled model: {compiled_model_path}")
+
+    # Every thread of the server and every job worker gets a warm PANTEIA interface
+    threads = int(os.environ.get("ZET_COMPASS_THREADS", 4))
+    job_workers = int(os.environ.get("ZET_COMPASS_JOB_WORKERS", 1))
+    PANTEIAInterfacePool.initialize(threads + job_workers)
+
+    # Analyses stop when their timeout passes, requests without timeout_ms get the default timeout
+    default_timeout_ms = os.environ.get("ZET_COMPASS_TIMEOUT_MS", "300000")
+    Deadline.default_timeout = int(default_timeout_ms) / 1000 if int(default_timeout_ms) > 0 else None
+
+    # Analyses wait for capacity in a bounded queue, requests that don't fit are rejected with 503
+    AdmissionController.initialize(int(os.environ.get("ZET_COMPASS_CAPACITY", 100000)),
+                                   int(os.environ.get("ZET_COMPASS_QUEUE_CAPACITY", 200000)),
+                                   float(os.environ.get("ZET_COMPASS_QUEUE_TIMEOUT", 30)))
+
+    # Fleets are calculated with the vectorized model by default, requests can select the other model
+    calculation_model = os.environ.get("ZET_COMPASS_MODEL", "vectorized")
+    if calculation_model not in TCOModel.calculation_models:
+        raise ValueError(f"ZET_COMPASS_MODEL should be one of {', '.join(TCOModel.calculation_models)}")
+    TCOModel.default_calculation_model = calculation_model
+
+    # The per-vehicle model calculates the vehicles of a fleet in worker processes, the vectorized model doesn't use
+    # them. The workers are started before the threads
+    workers = int(os.environ.get("ZET_COMPASS_WORKERS", 1))
+    TCOProcessPool.initialize(workers)
+    if workers > 1 and TCOModel.default_calculation_model != "per_vehicle":
+        Logger.warning(f"The {workers} workers only calculate requests with model=per_vehicle, "
+                       f"set ZET_COMPASS_MODEL=per_vehicle to use them for every request")
+
+    # The jobs are calculated in the background by the job workers
+    JobQueue.initialize(job_workers, helper.process_job)
+
     # Print running message
     print("Running on http://127.0.0.1:5000/ (Press CTRL+C to quit)")
 
-    # Serve app
-    serve(app, host="127.0.0.1", port="5000")
+    # Serve app, reading ahead lets waitress detect clients that disconnect while their analysis is calculated
+    serve(app, host="127.0.0.1", port="5000", threads=threads, channel_request_lookahead=1)
@@ -0,0 +1,394 @@
+"""
+Calculates a directory of fleets without the server, for example to analyse many fleets overnight.
+Every fleet is an Excel workbook in the format of wagenpark.xlsx, or a JSON file in the format of
+request_examples/json_data_example.json. The scenarios of a JSON file are used if it contains them,
+otherwise the scenarios are read from the database, run data/database_seeder.py first.
+
+The fleets are calculated in parallel by the workers of the TCO process pool, every worker keeps one warm
+PANTEIA interface. The results of every fleet are written to the output directory as CSV, or as Parquet if
+pyarrow is installed, together with the transition years and optionally the graphs as PNG files.
+A summary of the throughput is printed at the end.
+
+Run from the root of the project: python batch.py <input directory> <output directory> [options]
+"""
+
+from argparse import ArgumentParser
+from base64 import b64decode
+from csv import DictWriter
+from database_interfaces.ScenarioDatabaseInterface import ScenarioDatabaseInterface
+from data_objects.Scenario import from_dict as scenario_from_dict
+from data_objects.Vehicle import from_dict as vehicle_from_dict
+from datetime import date
+from excel_interfaces.FleetInterface import FleetInterface
+from excel_interfaces.PANTEIAInterface import PANTEIAInterface
+from excel_interfaces.PANTEIAInterfacePool import PANTEIAInterfacePool
+from excel_interfaces.ScenariosInterface import ScenariosInterface
+from json import load
+from Logger import Logger
+from TCOModel import TCOModel
+from TCOProcessPool import TCOProcessPool
+from time import perf_counter
+import os
+import sys
+
+fleet_extensions = (".xlsx", ".xlsm", ".json")
+output_formats = ("csv", "parquet")
+
+
+def find_fleet_files(input_directory: str):
+    """
+    Finds the fleets in a directory, temporary files of Excel are skipped.
+
+    Parameters:
+        input_directory (str): The directory with the fleets.
+
+    Returns:
+        list: The paths of the fleets, sorted by name.
+    """
+
+    return [os.path.join(input_directory, filename) for filename in sorted(os.listdir(input_directory))
+            if filename.lower().endswith(fleet_extensions) and not filename.startswith("~$")]
+
+
+def read_json_fleet(path: str):
+    """
+    Reads a fleet from a JSON file with the fleet organised by number plate and optionally the scenarios
+    organised by scenario type and vehicle type, like the body of /json_data.
+
+    Parameters:
+        path (str): The path of the JSON file.
+
+    Returns:
+        tuple: The fleet, its errors, and the scenarios or None if the file doesn't contain them.
+    """
+
+    with open(path, encoding="utf-8") as file:
+        data = load(file)
+
+    fleet = {}
+    errors = {"skipped_invalid_rows": {}}
+    for number_plate, vehicle_data in data["fleet"].items():
+        try:
+            fleet[number_plate] = vehicle_from_dict({**vehicle_data, "number_plate": number_plate})
+        except (KeyError, TypeError, ValueError) as e:
+            errors["skipped_invalid_rows"][number_plate] = repr(e)
+
+    scenarios = None
+    if "scenarios" in data:
+        scenarios = {scenario_type: {vehicle_type: scenario_from_dict(scenario_data)
+                                     for vehicle_type, scenario_data in scenario_type_data.items()}
+                     for scenario_type, scenario_type_data in data["scenarios"].items()}
+
+    return fleet, errors, scenarios
+
+
+def read_fleet(path: str, company: str = None):
+    """
+    Reads a fleet from an Excel workbook or a JSON file.
+
+    Parameters:
+        path (str): The path of the fleet.
+        company (str): The company of the sheet of the workbook, defaults to the name of the file.
+
+    Returns:
+        tuple: The fleet, its errors, and the scenarios or None if they should be read from the database.
+    """
+
+    if path.lower().endswith(".json"):
+        return read_json_fleet(path)
+
+    name = os.path.splitext(os.path.basename(path))[0]
+    fleet_data = FleetInterface(company or name, path)
+    errors = {**fleet_data.errors,
+              "skipped_invalid_rows": {number_plate: repr(e)
+                                       for number_plate, e in fleet_data.errors["skipped_invalid_rows"].items()}}
+    return fleet_data.fleet, errors, None
+
+
+def get_result_rows(results: dict):
+    """
+    Flattens the results of a fleet into a row per vehicle, scenario, strategy and year.
+
+    Parameters:
+        results (dict): The results organised by number plate, scenario, strategy, year and metric.
+
+    Returns:
+        list: The rows, with the number plate, scenario, strategy, year and the value of every metric.
+    """
+
+    return [{"number_plate": number_plate, "scenario": scenario, "strategy": strategy, "year": year, **metrics}
+            for number_plate, vehicle_results in results.items()
+            for scenario, scenario_results in vehicle_results.items()
+            for strategy, strategy_results in scenario_results.items()
+            for year, metrics in strategy_results.items()]
+
+
+def get_transition_year_rows(transition_years: dict):
+    """
+    Flattens the transition years of a fleet into a row per vehicle, scenario and strategy.
+
+    Parameters:
+        transition_years (dict): The transition years organised by number plate, scenario and strategy.
+
+    Returns:
+        list: The rows, with the number plate, scenario, strategy and transition year.
+    """
+
+    return [{"number_plate": number_plate, "scenario": scenario, "strategy": strategy,
+             "transition_year": str(transition_year)}
+            for number_plate, vehicle_years in transition_years.items()
+            for scenario, scenario_years in vehicle_years.items()
+            for strategy, transition_year in scenario_years.items()]
+
+
+def write_rows(rows: list, path: str, output_format: str):
+    """
+    Writes rows to a CSV or Parquet file, the columns are the keys of the rows in the order they're found.
+
+    Parameters:
+        rows (list): The rows as dictionaries.
+        path (str): The path of the file without extension.
+        output_format (str): "csv" or "parquet".
+
+    Returns:
+        str: The path of the file.
+    """
+
+    columns = list(dict.fromkeys(column for row in rows for column in row))
+    path = f"{path}.{output_format}"
+
+    if output_format == "parquet":
+        from pyarrow import Table
+        from pyarrow.parquet import write_table
+        write_table(Table.from_pylist(rows), path)
+    else:
+        with open(path, "w", newline="", encoding="utf-8") as file:
+            writer = DictWriter(file, fieldnames=columns)
+            writer.writeheader()
+            writer.writerows(rows)
+
+    return path
+
+
+def write_graphs(graphs: any, path: str):
+    """
+    Writes the base 64 encoded graphs as PNG files, a file is named after the keys under which the graph is found.
+
+    Parameters:
+        graphs (any): The graphs, organised in dictionaries, or a graph.
+        path (str): The path of the graph without extension.
+
+    Returns:
+        int: The amount of written graphs.
+    """
+
+    if isinstance(graphs, dict):
+        return sum(write_graphs(graph, f"{path}_{key}") for key, graph in graphs.items())
+
+    if not isinstance(graphs, str):
+        return 0
+
+    with open(f"{path}.png", "wb") as file:
+        file.write(b64decode(graphs))
+    return 1
+
+
+def calculate_fleet(path: str, scenarios: dict, valid_scenario_names: tuple, options: dict):
+    """
+    Calculates a fleet with the warm PANTEIA interface of the process and writes its results.
+
+    Parameters:
+        path (str): The path of the fleet.
+        scenarios (dict): The scenarios of the database.
+        valid_scenario_names (tuple): The valid scenario names.
+        options (dict): The options of the batch, see get_options.
+
+    Returns:
+        dict: The summary of the fleet, with the amount of vehicles, the written files and the errors.
+    """
+
+    started_at = perf_counter()
+    name = os.path.splitext(os.path.basename(path))[0]
+    fleet, fleet_errors, fleet_scenarios = read_fleet(path, options["company"])
+
+    output = ("results", "transition_year", "graphs") if options["graphs"] else ("results", "transition_year")
+    with PANTEIAInterfacePool.checkout() as PANTEIA_interface:
+        model = TCOModel(fleet, fleet_scenarios or scenarios, valid_scenario_names, output,
+                         current_year=options["current_year"], final_year=options["final_year"],
+                         PANTEIA_interface=PANTEIA_interface,
+                         use_vectorized_model=options["model"] == "vectorized")
+
+        if options["comparing"] == "strategies":
+            data = model.compare_strategies(options["scenarios"][0], options["strategies"] or None)
+        else:
+            data = model.compare_scenarios(options["strategies"][0], options["scenarios"] or None)
+
+    output_path = os.path.join(options["output_directory"], name)
+    files = [write_rows(get_result_rows(data["results"]), f"{output_path}_results", options["output_format"]),
+             write_rows(get_transition_year_rows(data["transition_year"]), f"{output_path}_transition_year",
+                        options["output_format"])]
+
+    graph_count = 0
+    if options["graphs"] and isinstance(data.get("graphs"), dict):
+        os.makedirs(f"{output_path}_graphs", exist_ok=True)
+        graph_count = write_graphs(data["graphs"], os.path.join(f"{output_path}_graphs", name))
+
+    return {
+        "path": path,
+        "vehicles": len(fleet),
+        "files": files,
+        "graphs": graph_count,
+        "errors": fleet_errors,
+        "seconds": perf_counter() - started_at
+    }
+
+
+def calculate_fleets(paths: list, scenarios: dict, valid_scenario_names: tuple, options: dict):
+    """
+    Calculates a chunk of fleets in a worker, a fleet that can't be calculated doesn't stop the others.
+
+    Parameters:
+        paths (list): The paths of the fleets.
+        scenarios (dict): The scenarios of the database.
+        valid_scenario_names (tuple): The valid scenario names.
+        options (dict): The options of the batch, see get_options.
+
+    Returns:
+        list: The summary of every fleet, a fleet that failed has its exception instead of its files.
+    """
+
+    summaries = []
+    for path in paths:
+        try:
+            summaries.append(calculate_fleet(path, scenarios, valid_scenario_names, options))
+        except Exception as e:
+            Logger.error(f"Batch: {path} failed: {e!r}")
+            summaries.append({"path": path, "vehicles": 0, "exception": repr(e)})
+
+    return summaries
+
+
+def get_options(arguments: list):
+    """
+    Parses the command-line arguments of the batch.
+
+    Parameters:
+        arguments (list): The command-line arguments, without the name of the script.
+
+    Returns:
+        dict: The options organised by name.
+    """
+
+    parser = ArgumentParser(description="Calculates the TCO of every fleet in a directory.")
+    parser.add_argument("input_directory", help="the directory with the fleets, .xlsx, .xlsm or .json")
+    parser.add_argument("output_directory", help="the directory to which the results are written")
+    parser.add_argument("--comparing", choices=("strategies", "scenarios"), default="strategies",
+                        help="compare the strategies of a scenario or the scenarios of a strategy")
+    parser.add_argument("--scenarios", nargs="+", default=[],
+                        help="the scenarios, the first is used when comparing strategies (default: midden)")
+    parser.add_argument("--strategies", nargs="+", default=[],
+                        help="the strategies, the first is used when comparing scenarios (default: all strategies)")
+    parser.add_argument("--company", help="the company of the sheet of the workbooks, defaults to the file name")
+    parser.add_argument("--current-year", type=int, default=date.today().year, help="the first year of calculation")
+    parser.add_argument("--final-year", type=int,
+                        help="the year after the last year of calculation, defaults to 10 years after the first")
+    parser.add_argument("--format", dest="output_format", choices=output_formats, default="csv",
+                        help="the format of the results, parquet requires pyarrow")
+    parser.add_argument("--graphs", action="store_true", help="also write the graphs as PNG files")
+    parser.add_argument("--model", choices=TCOModel.calculation_models, default="vectorized",
+                        help="calculate the vehicles at once or one at a time with the PANTEIA interface")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="the amount of worker processes (default: the amount of cores)")
+    options = vars(parser.parse_args(arguments))
+
+    if options["comparing"] == "strategies" and len(options["scenarios"]) < 1:
+        options["scenarios"] = ["midden"]
+    if options["comparing"] == "scenarios" and len(options["strategies"]) < 1:
+        parser.error("--strategies is required when comparing scenarios")
+    if options["final_year"] is None:
+        options["final_year"] = options["current_year"] + 10
+
+    # Fail before any fleet is calculated, instead of in every worker
+    if options["output_format"] == "parquet":
+        try:
+            import pyarrow.parquet
+        except ImportError:
+            parser.error("--format parquet requires pyarrow, install it with: pip install pyarrow")
+
+    return options
+
+
+def print_summary(summaries: list, workers: int, seconds: float):
+    """
+    Prints the throughput of the batch and the fleets that failed.
+
+    Parameters:
+        summaries (list): The summary of every fleet, see calculate_fleet.
+        workers (int): The amount of worker processes.
+        seconds (float): The amount of seconds the batch took.
+    """
+
+    failed = [summary for summary in summaries if "exception" in summary]
+    vehicles = sum(summary["vehicles"] for summary in summaries)
+    skipped = sum(len(summary["errors"]["skipped_invalid_rows"]) for summary in summaries if "errors" in summary)
+
+    print(f"{'fleets':>10} {'failed':>8} {'vehicles':>10} {'skipped':>8} {'workers':>8} {'seconds':>9} "
+          f"{'vehicles/s':>11} {'fleets/min':>11}")
+    print(f"{len(summaries):>10} {len(failed):>8} {vehicles:>10} {skipped:>8} {workers:>8} {seconds:>9.1f} "
+          f"{vehicles / max(seconds, 1e-9):>11.1f} {len(summaries) * 60 / max(seconds, 1e-9):>11.1f}")
+
+    for summary in failed:
+        print(f"Failed: {summary['path']}: {summary['exception']}")
+
+
+def main(arguments: list):
+    """
+    Calculates the fleets of the input directory and prints the summary.
+
+    Parameters:
+        arguments (list): The command-line arguments, without the name of the script.
+
+    Returns:
+        int: The exit code, 1 if a fleet failed.
+    """
+
+    options = get_options(arguments)
+    Logger.initialize(timezone_string="Europe/Amsterdam", level="WARNING")
+
+    paths = find_fleet_files(options["input_directory"])
+    if len(paths) < 1:
+        print(f"No fleets found in {options['input_directory']}")
+        return 1
+    os.makedirs(options["output_directory"], exist_ok=True)
+
+    # The model is loaded before the workers are forked, so it's only compiled once
+    PANTEIAInterface.load_compiled_model()
+    scenarios = ScenarioDatabaseInterface().read_all_scenario_data()
+    valid_scenario_names = ScenariosInterface.valid_scenario_names
+
+    # Every worker gets one warm interface, a fleet is calculated by one worker
+    workers = min(options["workers"], len(paths))
+    started_at = perf_counter()
+    if workers < 2:
+        PANTEIAInterfacePool.initialize(1)
+        summaries = calculate_fleets(paths, scenarios, valid_scenario_names, options)
+    else:
+        TCOProcessPool.initialize(workers)
+        finished = []
+
+        def report_progress(indices: range):
+            finished.extend(indices)
+            print(f"{len(finished)}/{len(paths)} fleets calculated", file=sys.stderr)
+
+        try:
+            summaries = TCOProcessPool.map(calculate_fleets, paths, scenarios, valid_scenario_names, options,
+                                           callback=report_progress)
+        finally:
+            TCOProcessPool.shutdown()
+
+    print_summary(summaries, workers, perf_counter() - started_at)
+    return 1 if any("exception" in summary for summary in summaries) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
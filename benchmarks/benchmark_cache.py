@@ -0,0 +1,61 @@
+"""
+Benchmarks the results cache of the PANTEIA interfaces, which is keyed by the values of the input cells.
+Evaluates the fleet with and without the cache for every engine and reports the hits and misses.
+
+Run from the root of the project: python -m benchmarks.benchmark_cache
+"""
+
+from excel_interfaces.FleetInterface import FleetInterface
+from excel_interfaces.GeneratedPANTEIAInterface import GeneratedPANTEIAInterface
+from excel_interfaces.NativePANTEIAInterface import NativePANTEIAInterface
+from excel_interfaces.PANTEIAInterface import PANTEIAInterface
+from time import perf_counter
+
+
+def measure_cache(interface: PANTEIAInterface, is_memoized: bool, vehicles: list):
+    """
+    Measures the average time to evaluate a vehicle, starting with an empty cache.
+
+    Parameters:
+        interface (PANTEIAInterface): The interface that evaluates the vehicles.
+        is_memoized (bool): Whether the results are cached.
+        vehicles (list): The vehicles to evaluate.
+
+    Returns:
+        dict: The time per vehicle in ms, the amount of hits and the amount of misses.
+    """
+
+    interface.is_memoized = is_memoized
+    results_cache = interface.get_results_cache()
+    results_cache.clear()
+
+    start_time = perf_counter()
+    for vehicle in vehicles:
+        interface.reset_values()
+        interface.input_vehicle_data(vehicle)
+        results = interface.read_results()
+        interface.get_TCO_diesel(results=results)
+        interface.get_TCO_electric(results=results)
+    total_time = perf_counter() - start_time
+
+    statistics = results_cache.get_statistics()
+    return {
+        "time": total_time / len(vehicles) * 1000,
+        "hits": statistics["hits"],
+        "misses": statistics["misses"]
+    }
+
+
+if __name__ == "__main__":
+
+    # Every vehicle is evaluated a few times, like a vehicle under strategies that haven't diverged yet
+    repetitions = 5
+    vehicles = list(FleetInterface("BENCHMARK", "./input/wagenpark.xlsx").fleet.values()) * repetitions
+
+    for interface_class in (NativePANTEIAInterface, GeneratedPANTEIAInterface, PANTEIAInterface):
+        interface = interface_class()
+        for is_memoized in (False, True):
+            measurement = measure_cache(interface, is_memoized, vehicles)
+            print(f"{interface_class.__name__} {'with' if is_memoized else 'without'} cache: "
+                  f"{measurement['time']:.2f} ms per vehicle, "
+                  f"{measurement['hits']} hits, {measurement['misses']} misses")
@@ -0,0 +1,67 @@
+"""
+Benchmarks the full compiled PANTEIA model against the pruned compiled model.
+Reports the amount of cells and formulas, the size of the artifact, the memory of a loaded model
+and the time to evaluate a vehicle.
+
+Run from the root of the project: python -m benchmarks.benchmark_compile
+"""
+
+from excel_interfaces.FleetInterface import FleetInterface
+from excel_interfaces.PANTEIAInterface import PANTEIAInterface
+from pickle import loads
+from time import perf_counter
+from tracemalloc import get_traced_memory, start, stop
+
+
+def measure_model(is_pruned: bool, repetitions: int):
+    """
+    Measures a compiled model, the model is compiled first if it doesn't exist yet.
+
+    Parameters:
+        is_pruned (bool): Whether the pruned model is measured.
+        repetitions (int): The amount of times every vehicle is evaluated.
+
+    Returns:
+        dict: The amount of cells and formulas, the size in kB, the memory in kB and the time per vehicle in ms.
+    """
+
+    PANTEIAInterface.compiled_model = None
+    PANTEIAInterface.load_compiled_model(is_pruned)
+
+    start()
+    cell_map = loads(PANTEIAInterface.compiled_model).cell_map
+    memory = get_traced_memory()[0]
+    stop()
+
+    interface = PANTEIAInterface()
+    vehicles = FleetInterface("BENCHMARK", "./input/wagenpark.xlsx").fleet.values()
+
+    total_time = 0
+    for _ in range(repetitions):
+        for vehicle in vehicles:
+            start_time = perf_counter()
+            interface.reset_values()
+            interface.input_vehicle_data(vehicle)
+            results = interface.read_results()
+            interface.get_TCO_diesel(results=results)
+            interface.get_TCO_electric(results=results)
+            total_time += perf_counter() - start_time
+
+    return {
+        "cells": len(cell_map),
+        "formulas": sum(1 for cell in cell_map.values() if cell.formula is not None),
+        "size": len(PANTEIAInterface.compiled_model) / 1000,
+        "memory": memory / 1000,
+        "time": total_time / (repetitions * len(vehicles)) * 1000
+    }
+
+
+if __name__ == "__main__":
+
+    repetitions = 20
+    for is_pruned in (False, True):
+        measurement = measure_model(is_pruned, repetitions)
+        print(f"{'Pruned' if is_pruned else 'Full'} model: "
+              f"{measurement['cells']} cells, {measurement['formulas']} formulas, "
+              f"{measurement['size']:.0f} kB on disk, {measurement['memory']:.0f} kB in memory, "
+              f"{measurement['time']:.2f} ms per vehicle")
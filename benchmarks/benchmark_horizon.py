@@ -0,0 +1,74 @@
+"""
+Benchmarks the calculation of a fleet over horizons of 10, 20 and 30 years, the time per year should stay the same.
+The fleet is made from the vehicles in wagenpark.xlsx like in benchmark_processes.
+The scenarios are read from the database, run data/database_seeder.py first.
+Their last year is repeated for the years after it, so every horizon has scenario data.
+
+Run from the root of the project: python -m benchmarks.benchmark_horizon [vehicles]
+"""
+
+from benchmarks.benchmark_processes import create_fleet
+from database_interfaces.ScenarioDatabaseInterface import ScenarioDatabaseInterface
+from datetime import date
+from excel_interfaces.ScenariosInterface import ScenariosInterface
+from TCOModel import TCOModel
+from time import perf_counter
+import sys
+
+
+def extend_scenarios(scenarios: dict, final_year: int):
+    """
+    Repeats the last year of every scenario until the final year.
+
+    Parameters:
+        scenarios (dict): The scenario data, which is changed.
+        final_year (int): The last year that should have scenario data.
+    """
+
+    for vehicle_types in scenarios.values():
+        for scenario in vehicle_types.values():
+            last_year = max(scenario.years)
+            for year in range(last_year + 1, final_year + 1):
+                scenario.years[year] = scenario.years[last_year]
+
+
+def measure_horizon(fleet: dict, scenarios: dict, horizon: int, use_vectorized_model: bool):
+    """
+    Measures the time to calculate all strategies for a fleet in the first scenario.
+
+    Parameters:
+        fleet (dict): The vehicles organised by number plate.
+        scenarios (dict): The scenario data.
+        horizon (int): The amount of years to calculate.
+        use_vectorized_model (bool): Whether the vehicles are calculated with the vectorized model.
+
+    Returns:
+        float: The time in seconds.
+    """
+
+    current_year = date.today().year
+    model = TCOModel(fleet, scenarios, ScenariosInterface.valid_scenario_names, ("results",),
+                     current_year=current_year, final_year=current_year + horizon,
+                     use_vectorized_model=use_vectorized_model)
+
+    start_time = perf_counter()
+    fleet_TCO, _ = model.calculate_fleet_TCO({name: scenarios[name] for name in list(scenarios)[:1]},
+                                             model.valid_strategies)
+    fleet_TCO.calculate_fleet_sum()
+    fleet_TCO.calculate_transition_year(model.final_year)
+    fleet_TCO.to_dict()
+    return perf_counter() - start_time
+
+
+if __name__ == "__main__":
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    scenarios = ScenarioDatabaseInterface().read_all_scenario_data()
+    extend_scenarios(scenarios, date.today().year + 30)
+    fleet = create_fleet(size)
+
+    for use_vectorized_model in (False, True):
+        for horizon in (10, 20, 30):
+            elapsed_time = measure_horizon(fleet, scenarios, horizon, use_vectorized_model)
+            print(f"{size} vehicles {'vectorized' if use_vectorized_model else 'one at a time'}, {horizon} years: "
+                  f"{elapsed_time:.2f} s, {elapsed_time / horizon * 1000:.1f} ms per year")
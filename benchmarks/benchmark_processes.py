@@ -0,0 +1,76 @@
+"""
+Benchmarks calculating a fleet in the process of the request against the workers of the TCO process pool.
+The fleets are made from the vehicles in wagenpark.xlsx, with a different distance for every copy,
+so the vehicles aren't calculated once because they're equivalent.
+The scenarios are read from the database, run data/database_seeder.py first.
+
+Run from the root of the project: python -m benchmarks.benchmark_processes [workers]
+"""
+
+from copy import copy
+from database_interfaces.ScenarioDatabaseInterface import ScenarioDatabaseInterface
+from excel_interfaces.FleetInterface import FleetInterface
+from excel_interfaces.ScenariosInterface import ScenariosInterface
+from TCOModel import TCOModel
+from TCOProcessPool import TCOProcessPool
+from time import perf_counter
+import sys
+
+
+def create_fleet(size: int):
+    """
+    Creates a fleet by copying the vehicles of wagenpark.xlsx.
+
+    Parameters:
+        size (int): The amount of vehicles in the fleet.
+
+    Returns:
+        dict: The vehicles organised by number plate.
+    """
+
+    vehicles = list(FleetInterface("BENCHMARK", "./input/wagenpark.xlsx").fleet.values())
+    fleet = {}
+    for index in range(size):
+        vehicle = copy(vehicles[index % len(vehicles)])
+        vehicle.number_plate = f"BENCHMARK-{index}"
+        vehicle.expected_total_distance_traveled_in_km += index
+        fleet[vehicle.number_plate] = vehicle
+
+    return fleet
+
+
+def measure_fleet(fleet: dict, scenarios: dict, use_process_pool: bool):
+    """
+    Measures the time to calculate all strategies for a fleet in the first scenario.
+
+    Parameters:
+        fleet (dict): The vehicles organised by number plate.
+        scenarios (dict): The scenario data.
+        use_process_pool (bool): Whether the vehicles are calculated by the workers.
+
+    Returns:
+        float: The time in seconds.
+    """
+
+    model = TCOModel(fleet, scenarios, ScenariosInterface.valid_scenario_names, ("results",),
+                     use_process_pool=use_process_pool)
+
+    start_time = perf_counter()
+    model.calculate_fleet_TCO({name: scenarios[name] for name in list(scenarios)[:1]}, model.valid_strategies)
+    return perf_counter() - start_time
+
+
+if __name__ == "__main__":
+
+    workers = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    TCOProcessPool.initialize(workers)
+    scenarios = ScenarioDatabaseInterface().read_all_scenario_data()
+
+    for size in (100, 1000, 5000):
+        fleet = create_fleet(size)
+        serial_time = measure_fleet(fleet, scenarios, False)
+        parallel_time = measure_fleet(fleet, scenarios, True)
+        print(f"{size} vehicles: {serial_time:.1f} s in 1 process, {parallel_time:.1f} s in {workers} workers, "
+              f"{serial_time / parallel_time:.1f}x faster")
+
+    TCOProcessPool.shutdown()
@@ -0,0 +1,54 @@
+"""
+Benchmarks the cost of resetting the PANTEIA model before every vehicle, scenario and strategy combination.
+Compares resetting every cell with restoring the default snapshot, for both engines.
+
+Run from the root of the project: python -m benchmarks.benchmark_reset
+"""
+
+from data_objects.Vehicle import Vehicle
+from excel_interfaces.NativePANTEIAInterface import NativePANTEIAInterface
+from excel_interfaces.PANTEIAInterface import PANTEIAInterface
+from time import perf_counter
+
+
+def measure_reset(interface: PANTEIAInterface, use_snapshot: bool, repetitions: int):
+    """
+    Measures the average time of a reset after the vehicle data has been changed.
+
+    Parameters:
+        interface (PANTEIAInterface): The interface to reset.
+        use_snapshot (bool): Whether the default snapshot is restored, otherwise every cell is set.
+        repetitions (int): The amount of resets to measure.
+
+    Returns:
+        float: The average time of a reset in milliseconds.
+    """
+
+    snapshot = interface.default_snapshot
+    interface.default_snapshot = snapshot if use_snapshot else None
+    vehicle = Vehicle("BENCHMARK", "Trekker-oplegger", 6, "Diesel", 6, 2018, False, 0, 80000, 500, 220, False, 7,
+                      "Niet mogelijk", 0, 0, "Grijs")
+
+    total_time = 0
+    for _ in range(repetitions):
+        interface.input_vehicle_data(vehicle)
+        interface.get_TCO_electric()
+
+        start = perf_counter()
+        interface.reset_values()
+        interface.get_TCO_electric()
+        total_time += perf_counter() - start
+
+    interface.default_snapshot = snapshot
+    return total_time / repetitions * 1000
+
+
+if __name__ == "__main__":
+
+    repetitions = 50
+    for interface_class in (PANTEIAInterface, NativePANTEIAInterface):
+        interface = interface_class()
+        cell_by_cell = measure_reset(interface, False, repetitions)
+        snapshot = measure_reset(interface, True, repetitions)
+        print(f"{interface_class.__name__}: reset and read {cell_by_cell:.2f} ms cell by cell, "
+              f"{snapshot:.2f} ms with a snapshot")
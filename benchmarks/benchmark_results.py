@@ -0,0 +1,145 @@
+"""
+Benchmarks the results of a fleet as one array against the nested dictionaries that were used before.
+The results are random numbers with the shape of the results of the model, so no database is needed.
+The memory of both, and the time to calculate the fleet sums and transition years, are measured.
+The sums and transition years should be identical.
+
+Run from the root of the project: python -m benchmarks.benchmark_results [vehicles]
+"""
+
+from data_objects.FleetResults import FleetResults
+from numpy.random import default_rng
+from time import perf_counter
+import sys
+import tracemalloc
+
+
+def create_results(size: int):
+    """
+    Creates random results for a fleet in one scenario, like a comparison of the strategies over 10 years.
+
+    Parameters:
+        size (int): The amount of vehicles in the fleet.
+
+    Returns:
+        FleetResults: The results of the fleet.
+    """
+
+    metrics = ("tco", "fixed_vehicle_costs", "variable_vehicle_costs", "write_off_costs_vehicle",
+               "write_off_costs_charging_system", "driver_costs", "costs_public_charging", "CO2_emissions",
+               "particulate_matter_emissions", "nitrogen_oxide_emissions", "kWh_charged_on_depot",
+               "kWh_charged_in_public", "charging_time_depot", "charging_time_public", "transition_year")
+    integer_metrics = metrics[:7] + ("transition_year",)
+    results = FleetResults([f"BENCHMARK-{index}" for index in range(size)],
+                           ("midden",),
+                           tuple(f"strategy_{number}" for number in range(1, 6)),
+                           tuple(range(2024, 2034)),
+                           metrics,
+                           integer_metrics)
+
+    random = default_rng(0)
+    results.values[:] = random.uniform(0, 100000, results.values.shape)
+    for metric in integer_metrics:
+        results.values[..., results.metric_indices[metric]] //= 1
+    results.values[..., results.metric_indices["transition_year"]] = random.integers(0, 2, results.is_present.shape)
+    results.is_present[:] = True
+
+    return results
+
+
+def calculate_dictionary_sum(fleet_TCO: dict):
+    """
+    Calculates the fleet sums from the nested dictionaries, like it was done before.
+
+    Parameters:
+        fleet_TCO (dict): The results organised by number plate, scenario, strategy, year and metric.
+
+    Returns:
+        dict: The sums organised by scenario, strategy, year and metric.
+    """
+
+    sums = {}
+    for number_plate, scenarios in fleet_TCO.items():
+        for scenario, strategies in scenarios.items():
+            scenario_sums = sums.setdefault(scenario, {})
+            for strategy, years in strategies.items():
+                strategy_sums = scenario_sums.setdefault(strategy, {})
+                for year, year_data in years.items():
+                    year_sums = strategy_sums.setdefault(year, {})
+                    for prop, value in year_data.items():
+                        year_sums[prop] = year_sums[prop] + value if prop in year_sums else value
+
+    return sums
+
+
+def calculate_dictionary_transition_year(fleet_TCO: dict, final_year: int):
+    """
+    Calculates the transition years from the nested dictionaries, like it was done before.
+
+    Parameters:
+        fleet_TCO (dict): The results organised by number plate, scenario, strategy, year and metric.
+        final_year (int): The year after the last year of the results.
+
+    Returns:
+        dict: The transition years organised by number plate, scenario and strategy.
+    """
+
+    transition_year = {}
+    for number_plate, scenarios in fleet_TCO.items():
+        transition_year[number_plate] = {}
+        for scenario, strategies in scenarios.items():
+            transition_year[number_plate][scenario] = {}
+            for strategy, years in strategies.items():
+                transition_year[number_plate][scenario][strategy] = ">" + str(final_year - 1)
+                for year, year_data in years.items():
+                    if year_data["transition_year"] != 0:
+                        transition_year[number_plate][scenario][strategy] = year
+                        break
+
+    return transition_year
+
+
+def measure_memory(function: callable):
+    """
+    Measures the memory that is allocated by a function and still in use when it returns.
+
+    Parameters:
+        function (callable): The function that creates the object to measure.
+
+    Returns:
+        tuple: The object and its memory in MB.
+    """
+
+    tracemalloc.start()
+    created_object = function()
+    memory = tracemalloc.get_traced_memory()[0] / 1e6
+    tracemalloc.stop()
+
+    return created_object, memory
+
+
+if __name__ == "__main__":
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    results, array_memory = measure_memory(lambda: create_results(size))
+    fleet_TCO, dictionary_memory = measure_memory(results.to_dict)
+
+    start_time = perf_counter()
+    dictionary_sum = calculate_dictionary_sum(fleet_TCO)
+    dictionary_transition_year = calculate_dictionary_transition_year(fleet_TCO, 2034)
+    dictionary_time = perf_counter() - start_time
+
+    start_time = perf_counter()
+    array_sum = results.calculate_fleet_sum()
+    array_transition_year = results.calculate_transition_year(2034)
+    array_time = perf_counter() - start_time
+
+    print(f"{size} vehicles: {dictionary_memory:.0f} MB as dictionaries, {array_memory:.0f} MB as an array")
+    print(f"Sums and transition years: {dictionary_time:.2f} s from the dictionaries, "
+          f"{array_time:.2f} s from the array, {dictionary_time / array_time:.1f}x faster")
+
+    is_identical = dictionary_sum == array_sum and dictionary_transition_year == array_transition_year
+    print(f"Results {'identical' if is_identical else 'differ'}")
+
+    sys.exit(0 if is_identical else 1)
@@ -0,0 +1,86 @@
+"""
+Benchmarks streaming the results as ndjson against creating the json response after the whole fleet is calculated.
+The fleet is made from the vehicles in wagenpark.xlsx like in benchmark_processes.
+The scenarios are read from the database, run data/database_seeder.py first.
+The time to the first byte, the total time and the peak memory are measured for fleets of increasing size,
+the peak memory of the stream should stay about the same. Both are measured while memory is traced.
+
+Run from the root of the project: python -m benchmarks.benchmark_streaming [vehicles]
+"""
+
+from benchmarks.benchmark_processes import create_fleet
+from database_interfaces.ScenarioDatabaseInterface import ScenarioDatabaseInterface
+from excel_interfaces.ScenariosInterface import ScenariosInterface
+from json import dumps
+from TCOModel import TCOModel
+from time import perf_counter
+import sys
+import tracemalloc
+
+
+def measure_json(fleet: dict, scenarios: dict):
+    """
+    Measures the json response, which is created after all strategies are calculated in the first scenario.
+
+    Parameters:
+        fleet (dict): The vehicles organised by number plate.
+        scenarios (dict): The scenario data.
+
+    Returns:
+        tuple: The time to the first byte and the total time in seconds, and the peak memory in MB.
+    """
+
+    model = TCOModel(fleet, scenarios, ScenariosInterface.valid_scenario_names, ("results",),
+                     use_vectorized_model=True)
+
+    tracemalloc.start()
+    start_time = perf_counter()
+    response = dumps(model.compare_strategies(list(scenarios)[0]), separators=(",", ":"))
+    elapsed_time = perf_counter() - start_time
+    peak_memory = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+
+    del response
+    return elapsed_time, elapsed_time, peak_memory
+
+
+def measure_stream(fleet: dict, scenarios: dict):
+    """
+    Measures the ndjson response, of which every line is written as soon as it's calculated.
+
+    Parameters:
+        fleet (dict): The vehicles organised by number plate.
+        scenarios (dict): The scenario data.
+
+    Returns:
+        tuple: The time to the first byte and the total time in seconds, and the peak memory in MB.
+    """
+
+    model = TCOModel(fleet, scenarios, ScenariosInterface.valid_scenario_names, ("results",),
+                     use_vectorized_model=True)
+
+    tracemalloc.start()
+    start_time = perf_counter()
+    first_byte_time = None
+    for line in model.stream_fleet_TCO(*model.select_strategies(list(scenarios)[0])):
+        dumps(line, separators=(",", ":"))
+        if first_byte_time is None:
+            first_byte_time = perf_counter() - start_time
+    elapsed_time = perf_counter() - start_time
+    peak_memory = tracemalloc.get_traced_memory()[1] / 1e6
+    tracemalloc.stop()
+
+    return first_byte_time, elapsed_time, peak_memory
+
+
+if __name__ == "__main__":
+
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 8000
+    scenarios = ScenarioDatabaseInterface().read_all_scenario_data()
+
+    for fleet_size in (size // 4, size // 2, size):
+        fleet = create_fleet(fleet_size)
+        for name, measure in (("json", measure_json), ("ndjson", measure_stream)):
+            first_byte_time, elapsed_time, peak_memory = measure(fleet, scenarios)
+            print(f"{fleet_size} vehicles as {name}: first byte after {first_byte_time:.2f} s, "
+                  f"{elapsed_time:.2f} s in total, {peak_memory:.0f} MB peak memory")
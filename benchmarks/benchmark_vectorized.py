@@ -0,0 +1,104 @@
+"""
+Benchmarks calculating a fleet with the vectorized PANTEIA model against calculating the vehicles one at a time.
+The fleets are made from the vehicles in wagenpark.xlsx like in benchmark_processes, so every vehicle is different.
+The results of both ways are compared, they should be identical.
+Afterwards both ways are compared on a varied fleet, with old and new vehicles, long daily distances, short and long
+lifespans, cooled vehicles and vehicles in Zero Emission zones, for every scenario and strategy over 20 years.
+The scenarios are read from the database, run data/database_seeder.py first.
+
+Run from the root of the project: python -m benchmarks.benchmark_vectorized [sizes...]
+"""
+
+from benchmarks.benchmark_processes import create_fleet
+from copy import copy
+from database_interfaces.ScenarioDatabaseInterface import ScenarioDatabaseInterface
+from datetime import date
+from excel_interfaces.FleetInterface import FleetInterface
+from excel_interfaces.ScenariosInterface import ScenariosInterface
+from TCOModel import TCOModel
+from time import perf_counter
+import json
+import sys
+
+
+def create_varied_fleet(size: int):
+    """
+    Creates a fleet by copying the vehicles of wagenpark.xlsx, with a different combination of the fields that
+    change the course of the strategies for every copy.
+
+    Parameters:
+        size (int): The amount of vehicles in the fleet.
+
+    Returns:
+        dict: The vehicles organised by number plate.
+    """
+
+    vehicles = list(FleetInterface("BENCHMARK", "./input/wagenpark.xlsx").fleet.values())
+    fleet = {}
+    for index in range(size):
+        vehicle = copy(vehicles[index % len(vehicles)])
+        vehicle.number_plate = f"VARIED-{index}"
+        vehicle.year_of_purchase = 2005 + index * 7 % 21
+        vehicle.maximum_daily_distance_in_km = (100, 300, 500, 800, 1500)[index // 3 % 5]
+        vehicle.technological_lifespan = 5 + index % 8
+        vehicle.drives_in_future_ZE_zone = index % 4 == 1
+        vehicle.is_cooled = index % 6 == 5
+        vehicle.expected_total_distance_traveled_in_km += index
+        fleet[vehicle.number_plate] = vehicle
+
+    return fleet
+
+
+def measure_fleet(fleet: dict, scenarios: dict, use_vectorized_model: bool, scenario_count: int = 1,
+                  horizon: int = 10):
+    """
+    Measures the time to calculate all strategies for a fleet in the first scenarios.
+
+    Parameters:
+        fleet (dict): The vehicles organised by number plate.
+        scenarios (dict): The scenario data.
+        use_vectorized_model (bool): Whether the vehicles are calculated with the vectorized model.
+        scenario_count (int): The amount of scenarios to calculate.
+        horizon (int): The amount of years to calculate.
+
+    Returns:
+        tuple: The time in seconds and the results as JSON.
+    """
+
+    current_year = date.today().year
+    model = TCOModel(fleet, scenarios, ScenariosInterface.valid_scenario_names, ("results",),
+                     current_year=current_year, final_year=current_year + horizon,
+                     use_vectorized_model=use_vectorized_model)
+
+    start_time = perf_counter()
+    fleet_TCO, _ = model.calculate_fleet_TCO({name: scenarios[name] for name in list(scenarios)[:scenario_count]},
+                                             model.valid_strategies)
+    elapsed_time = perf_counter() - start_time
+
+    return elapsed_time, json.dumps(fleet_TCO.to_dict(), sort_keys=True, default=str)
+
+
+if __name__ == "__main__":
+
+    sizes = [int(size) for size in sys.argv[1:]] or [100, 1000]
+    scenarios = ScenarioDatabaseInterface().read_all_scenario_data()
+
+    mismatches = 0
+    for size in sizes:
+        fleet = create_fleet(size)
+        serial_time, serial_results = measure_fleet(fleet, scenarios, False)
+        vectorized_time, vectorized_results = measure_fleet(fleet, scenarios, True)
+        mismatches += serial_results != vectorized_results
+        print(f"{size} vehicles: {size / serial_time:.0f} vehicles/s one at a time, "
+              f"{size / vectorized_time:.0f} vehicles/s vectorized, {serial_time / vectorized_time:.1f}x faster, "
+              f"results {'identical' if serial_results == vectorized_results else 'differ'}")
+
+    # The results of the PANTEIA interface are the reference of the vectorized model
+    fleet = create_varied_fleet(100)
+    _, serial_results = measure_fleet(fleet, scenarios, False, len(scenarios), 20)
+    _, vectorized_results = measure_fleet(fleet, scenarios, True, len(scenarios), 20)
+    mismatches += serial_results != vectorized_results
+    print(f"Varied fleet of 100 vehicles, {len(scenarios)} scenarios and 20 years: "
+          f"results {'identical' if serial_results == vectorized_results else 'differ'}")
+
+    sys.exit(1 if mismatches else 0)
@@ -0,0 +1,88 @@
+"""
+Stress tests the request handling with parallel requests, like the threads of waitress handle them.
+Every request is processed once serially and then several times in parallel threads, in a shuffled order.
+The parallel responses should be identical to the serial ones, including the graphs.
+The scenarios are read from the database, run data/database_seeder.py first.
+
+Run from the root of the project: python -m benchmarks.stress_requests [threads] [repetitions]
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from excel_interfaces.FleetInterface import FleetInterface
+from excel_interfaces.PANTEIAInterfacePool import PANTEIAInterfacePool
+from excel_interfaces.ScenariosInterface import ScenariosInterface
+from random import Random
+from time import perf_counter
+import json
+import request_functions as helper
+import sys
+
+
+def create_requests():
+    """
+    Creates the parameters of the requests, every comparison mode is used.
+
+    Returns:
+        list: The comparison mode, selected scenarios and selected strategies of every request.
+    """
+
+    requests = [("strategies", (scenario,), ()) for scenario in ScenariosInterface.valid_scenario_names]
+    requests += [("scenarios", (), (strategy,)) for strategy in ("strategy_4",)]
+    return requests
+
+
+def process_request(parameters: tuple):
+    """
+    Processes a request like the server does, the fleet and scenarios are read for every request.
+
+    Parameters:
+        parameters (tuple): The comparison mode, selected scenarios and selected strategies.
+
+    Returns:
+        str: The response as JSON.
+    """
+
+    comparing, selected_scenarios, selected_strategies = parameters
+    fleet = FleetInterface("STRESS", "./input/wagenpark.xlsx").fleet
+    scenarios, valid_scenario_names = helper.get_scenarios()
+    data = helper.process_data(fleet,
+                               scenarios,
+                               valid_scenario_names,
+                               ("graphs", "results"),
+                               comparing,
+                               selected_scenarios,
+                               selected_strategies)
+
+    return json.dumps(data, sort_keys=True, default=str)
+
+
+if __name__ == "__main__":
+
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    repetitions = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+    PANTEIAInterfacePool.initialize(threads)
+
+    requests = create_requests()
+    start_time = perf_counter()
+    serial_responses = [process_request(parameters) for parameters in requests]
+    serial_time = perf_counter() - start_time
+
+    # Every request is repeated, in a shuffled order so different requests overlap
+    indices = [index for index in range(len(requests)) for _ in range(repetitions)]
+    Random(0).shuffle(indices)
+
+    start_time = perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        parallel_responses = list(executor.map(process_request, [requests[index] for index in indices]))
+    parallel_time = perf_counter() - start_time
+
+    mismatches = [requests[index] for index, response in zip(indices, parallel_responses)
+                  if response != serial_responses[index]]
+
+    print(f"{len(requests)} requests in {serial_time:.1f} s serially, "
+          f"{len(indices)} requests in {parallel_time:.1f} s in {threads} threads")
+    print(f"{len(mismatches)} parallel responses differ from the serial ones")
+    for parameters in mismatches:
+        print(f"Mismatch: {parameters}")
+
+    sys.exit(1 if mismatches else 0)
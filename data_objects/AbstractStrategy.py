@@ -1,25 +1,35 @@
 from abc import abstractmethod
+from data_objects.FleetColumns import FleetColumns
+from data_objects.PANTEIAResults import PANTEIAResults
 from data_objects.Scenario import Scenario
+from data_objects.StrategyRunner import StrategyRunner
 from data_objects.Vehicle import Vehicle
+from Deadline import Deadline
 from excel_interfaces.PANTEIAInterface import PANTEIAInterface
 from Logger import Logger
-import itertools
+from numpy import isin, isnan, ndarray, ones_like, where, zeros_like
 
 class AbstractStrategy:
 
     name: str = None
 
-    @abstractmethod
+    # Whether the strategy replaces the vehicle depending on the transition year
+    uses_transition_year: bool = False
+
     def calculate_TCO(self,
                       scenario: Scenario,
                       vehicle: Vehicle,
                       PANTEIA_interface: PANTEIAInterface,
                       extra_years_after_lifespan: int,
                       increase_factor_after_lifespan: float,
-                      transition_margin: float):
+                      transition_margin: float,
+                      tax_percentage: float,
+                      current_year: int,
+                      final_year: int,
+                      deadline: Deadline = None):
 
-        """Calculates the TCO values according to the following logic:
-        {Strategy description here}
+        """Calculates the TCO values of this strategy.
+        Use StrategyRunner to calculate multiple strategies at once, so the years they share are calculated once.
 
         :param scenario: The scenario that will be used in the calculations.
         :type scenario: Scenario
@@ -27,23 +37,123 @@ class AbstractStrategy:
         :type vehicle: Vehicle
         :param PANTEIA_interface: The interface to the PANTEIA model.
         :type PANTEIA_interface: PANTEIAInterface
-        :param charging_time_depot: The amount of hours to charge on the depot.
-        :type charging_time_depot: int
-        :param charging_time_public: The amount of hours to charge in public.
-        :type charging_time_public: int
         :param extra_years_after_lifespan: The extra years after the lifespan a vehicle should be kept.
         :type: int
         :param increase_factor_after_lifespan: The factor to increase maintenance costs after the vehicle's lifespan.
         :type increase_factor_after_lifespan: float
         :param transition_margin: The relative percentage to determine the transition threshold.
         :type transition_margin: float
+        :param tax_percentage: The tax percentage of a company.
+        :type tax_percentage: float
+        :param current_year: First year of calculation.
+        :type current_year: int
+        :param final_year: The year after the last year of calculation, the final year itself isn't calculated.
+        :type final_year: int
+        :param deadline: The deadline of the request, it's checked for every year.
+        :type deadline: Deadline
+
+        :raise DeadlineExceeded: Raised if the deadline passed.
+        :raise RequestCancelled: Raised if the request has been cancelled.
 
         :return: The calculated TCO values for the given vehicle and scenario.
         :rtype: dict
         """
 
+        runner = StrategyRunner(scenario,
+                                vehicle,
+                                PANTEIA_interface,
+                                extra_years_after_lifespan,
+                                increase_factor_after_lifespan,
+                                transition_margin,
+                                tax_percentage,
+                                current_year,
+                                final_year,
+                                deadline=deadline)
+
+        return runner.calculate_TCO({self.name: self})[self.name]
+
+    def plan_start(self):
+
+        """Plans the operations before the first year, see StrategyRunner for the operations.
+
+        :return: The names of the operations.
+        :rtype: tuple
+        """
+
+        return ()
+
+    @abstractmethod
+    def plan_replacement(self,
+                         state: dict,
+                         vehicle: Vehicle,
+                         year: int,
+                         is_optimal_mix_valid: bool,
+                         extra_years_after_lifespan: int):
+
+        """Plans the replacement of the vehicle in a year according to the following logic:
+        {Strategy description here}
+        The operations are executed by StrategyRunner, so strategies that plan the same operations share the year.
+
+        :param state: The state of the vehicle: its age, fuel type and lifespan, the lifespan of electric vehicles
+            and whether the transition year has been reached.
+        :type state: dict
+        :param vehicle: The vehicle that will be used in the calculations.
+        :type vehicle: Vehicle
+        :param year: The year to plan for.
+        :type year: int
+        :param is_optimal_mix_valid: Whether using an optimal mix of charging is possible.
+        :type is_optimal_mix_valid: bool
+        :param extra_years_after_lifespan: The extra years after the lifespan a vehicle should be kept.
+        :type: int
+
+        :return: The names of the operations.
+        :rtype: tuple
+        """
+
         pass
 
+    @abstractmethod
+    def plan_replacement_masks(self,
+                               state: dict,
+                               vehicles: FleetColumns,
+                               year: int,
+                               is_optimal_mix_valid: ndarray,
+                               extra_years_after_lifespan: int):
+
+        """Plans the replacement of many vehicles in a year at once, with the same logic as plan_replacement.
+        The operations are executed by FleetStrategyRunner for the vehicles of their mask.
+
+        :param state: The state of every vehicle, like the state of plan_replacement with an array per value.
+            The fuel types are capitalised.
+        :type state: dict
+        :param vehicles: The vehicles that will be used in the calculations.
+        :type vehicles: FleetColumns
+        :param year: The year to plan for.
+        :type year: int
+        :param is_optimal_mix_valid: Whether using an optimal mix of charging is possible for every vehicle.
+        :type is_optimal_mix_valid: ndarray
+        :param extra_years_after_lifespan: The extra years after the lifespan a vehicle should be kept.
+        :type: int
+
+        :return: The names of the operations and the mask of the vehicles that execute them, the masks don't overlap.
+        :rtype: list
+        """
+
+        pass
+
+    def is_fossil_fuel_type(self, fuel_types: ndarray):
+
+        """Determines for every vehicle whether its fuel type is a fossil fuel.
+
+        :param fuel_types: The capitalised fuel types.
+        :type fuel_types: ndarray
+
+        :return: Whether the fuel type is a fossil fuel, for every vehicle.
+        :rtype: ndarray
+        """
+
+        return isin(fuel_types, ["Diesel", "CNG", "Blauwe diesel", "Benzine", "LNG"])
+
     def is_allowed_in_ZE_zone(self, vehicle: Vehicle, current_age: int, year: int):
 
         """Determines whether the vehicle is allowed to be in a Zero Emission zone.
@@ -108,6 +218,49 @@ class AbstractStrategy:
 
         return is_allowed
 
+    def is_allowed_in_ZE_zone_masks(self, vehicles: FleetColumns, current_ages: ndarray, year: int):
+
+        """Determines for many vehicles at once whether they are allowed to be in a Zero Emission zone,
+        like is_allowed_in_ZE_zone.
+
+        :param vehicles: The vehicles.
+        :type vehicles: FleetColumns
+        :param current_ages: The current age of every vehicle in years.
+        :type current_ages: ndarray
+        :param year: The year to determine for.
+        :type year: int
+
+        :return: Whether the vehicle is allowed to be in a ZE zone, for every vehicle.
+        :rtype: ndarray
+        """
+
+        # No measures yet
+        if year < 2025:
+            return ones_like(current_ages, dtype=bool)
+
+        # Measures for all diesel vehicles
+        if year > 2029:
+            return zeros_like(current_ages, dtype=bool)
+
+        # Transitional period
+        age_in_2025 = current_ages - (year - 2025)
+
+        # For N1 types
+        is_allowed = isin(vehicles.type, ('Kleine bestelwagen', 'Middel bestelwagen', 'Middel bestelwagen luxe',
+                                          'Grote bestelwagen')) & \
+            (((year <= 2026) & (vehicles.euronorm > 4)) | ((year <= 2027) & (vehicles.euronorm > 5)))
+
+        # For N2 types
+        is_allowed = where(isin(vehicles.type, ("Kleine bakwagen (12t)", "Grote bakwagen (18t)")),
+                           age_in_2025 <= 5,
+                           is_allowed)
+
+        # For N3 types
+        is_allowed = where(isin(vehicles.type, ('Trekker-oplegger',)), age_in_2025 <= 8, is_allowed)
+
+        # If less than 1 year, then automatically banned
+        return is_allowed & (age_in_2025 >= 1)
+
     def increase_maintenance_costs(self,
                                    current_fuel_type: str,
                                    current_vehicle_age: int,
@@ -156,11 +309,13 @@ class AbstractStrategy:
         # Assume diesel is cheaper
         is_transition_year_reached = False
 
-        is_scenario_valid = PANTEIA_interface.is_optimal_mix_valid()
-        is_depot_loading_possible = PANTEIA_interface.is_exclusive_home_loading_valid()
-        total_TCO_cost_depot_charging = PANTEIA_interface.get_total_TCO_cost_depot_charging()
-        total_TCO_cost_optimal_mix = PANTEIA_interface.get_total_TCO_cost_optimal_mix()
-        total_TCO_cost_diesel = PANTEIA_interface.get_total_TCO_cost_diesel()
+        # Read all result cells at once
+        results = PANTEIA_interface.read_results()
+        is_scenario_valid = results.is_optimal_mix_valid
+        is_depot_loading_possible = results.is_exclusive_home_loading_valid
+        total_TCO_cost_depot_charging = results.total_TCO_cost_depot_charging
+        total_TCO_cost_optimal_mix = results.total_TCO_cost_optimal_mix
+        total_TCO_cost_diesel = results.total_TCO_cost_diesel
 
         # Calculations
         transition_threshold = margin * int(total_TCO_cost_diesel)
@@ -189,10 +344,48 @@ class AbstractStrategy:
 
         return is_transition_year_reached
 
+    def transition_year_reached_masks(self, margin: float, results: PANTEIAResults):
+
+        """Determine for many vehicles at once whether the transition year has been reached,
+        like transition_year_reached.
+
+        :param margin: The relative percentage to determine the transition threshold.
+        :type margin: float
+        :param results: The results of VectorizedPANTEIAModel, with an array per result cell.
+        :type results: PANTEIAResults
+
+        :return: Whether the transition year has been reached, for every vehicle.
+        :rtype: ndarray
+        """
+
+        total_TCO_cost_depot_charging = results.depot_charging.tco
+        total_TCO_cost_optimal_mix = results.optimal_mix.tco
+        total_TCO_cost_diesel = results.diesel.tco
+
+        # Values that can't be retrieved are NaN, these count as False like zero
+        is_depot_charging_known = ~isnan(total_TCO_cost_depot_charging) & (total_TCO_cost_depot_charging != 0)
+        is_optimal_mix_known = ~isnan(total_TCO_cost_optimal_mix) & (total_TCO_cost_optimal_mix != 0)
+        is_diesel_known = ~isnan(total_TCO_cost_diesel) & (total_TCO_cost_diesel != 0)
+
+        # Calculations
+        transition_threshold = margin * where(is_diesel_known, total_TCO_cost_diesel, 0).astype(int)
+
+        is_depot_charging_cheaper_than_diesel = is_depot_charging_known & is_diesel_known & \
+            ((total_TCO_cost_depot_charging - total_TCO_cost_diesel) < transition_threshold)
+        is_optimal_mix_cheaper_than_diesel = is_optimal_mix_known & is_diesel_known & \
+            ((total_TCO_cost_optimal_mix - total_TCO_cost_diesel) < transition_threshold)
+
+        # Check if charging at depot or the optimal mix is cheaper than diesel, if the scenario is valid
+        is_depot_loading_possible = results.depot_charging_validity
+        return results.optimal_mix_validity & \
+            ((is_depot_loading_possible & is_depot_charging_cheaper_than_diesel) |
+             (~is_depot_loading_possible & is_optimal_mix_cheaper_than_diesel))
+
     def get_results(self,
                     current_fuel_type: str,
                     is_exclusive_charging_at_depot_possible: bool,
-                    PANTEIA_interface: PANTEIAInterface):
+                    PANTEIA_interface: PANTEIAInterface,
+                    results: PANTEIAResults = None):
 
         """Get the TCO model results.
 
@@ -202,6 +395,8 @@ class AbstractStrategy:
         :type is_exclusive_charging_at_depot_possible: bool
         :param PANTEIA_interface: The PANTEIA interface to use.
         :type PANTEIA_interface: PANTEIAInterface
+        :param results: The results that were already read, they're read from the model if not provided.
+        :type results: PANTEIAResults
 
         :return: The TCO model results.
         :rtype: dict
@@ -210,8 +405,8 @@ class AbstractStrategy:
         list_of_fuel_types = ["Diesel", "CNG", "Blauwe diesel", "Benzine", "LNG"]
 
         if current_fuel_type.capitalize() in list_of_fuel_types:
-            result = PANTEIA_interface.get_TCO_diesel()
+            result = PANTEIA_interface.get_TCO_diesel(results=results)
         else:
-            result = PANTEIA_interface.get_TCO_electric(is_exclusive_charging_at_depot_possible)
+            result = PANTEIA_interface.get_TCO_electric(is_exclusive_charging_at_depot_possible, results=results)
 
         return result
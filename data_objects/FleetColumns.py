@@ -0,0 +1,110 @@
+from datetime import datetime
+from numpy import array, ndarray, nan
+from pytz import timezone, utc
+from typing import NamedTuple
+
+
+def to_float_or_nan(value: any):
+
+    """Converts a vehicle field into a float.
+
+    :param value: The value of the field.
+    :type value: any
+
+    :return: The value as a float, or NaN if the value isn't a number.
+    :rtype: float
+    """
+
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return nan
+
+
+class FleetColumns(NamedTuple):
+    """
+    The vehicles of a fleet as columns, with an array per field of Vehicle in the same order.
+    The numeric fields are float arrays in which missing or invalid values are NaN,
+    the flags are boolean arrays and the text fields are object arrays.
+    The category is an index, so it's NaN if it isn't an integer.
+    """
+
+    number_plate: ndarray
+    type: ndarray
+    category: ndarray
+    fuel_type: ndarray
+    euronorm: ndarray
+    year_of_purchase: ndarray
+    is_cooled: ndarray
+    PTO_fuel_consumption: ndarray
+    expected_total_distance_traveled_in_km: ndarray
+    maximum_daily_distance_in_km: ndarray
+    amount_of_operational_days: ndarray
+    drives_in_future_ZE_zone: ndarray
+    technological_lifespan: ndarray
+    loading_times: ndarray
+    charging_time_depot: ndarray
+    charging_time_public: ndarray
+    electricity_type: ndarray
+
+    def take(self, indices: ndarray):
+
+        """Selects vehicles by their index, a vehicle can be selected more than once.
+
+        :param indices: The indices of the vehicles.
+        :type indices: ndarray
+
+        :return: The selected vehicles as columns.
+        :rtype: FleetColumns
+        """
+
+        return FleetColumns(*(column[indices] for column in self))
+
+    def get_current_ages(self, tz: str = utc):
+
+        """Get the current age of the vehicles in years, like Vehicle.get_current_age.
+
+        :param tz: The timezone that should be used to evaluate the age.
+        :type tz: str
+
+        :return: The ages of the vehicles in years.
+        :rtype: ndarray
+        """
+
+        current_timestamp = datetime.now(timezone(tz))
+        current_year = int(current_timestamp.strftime("%Y"))
+
+        return current_year - self.year_of_purchase
+
+
+def from_vehicles(vehicles: list):
+
+    """Construct the columns of a list of vehicles.
+
+    :param vehicles: The vehicles.
+    :type vehicles: list
+
+    :return: The vehicles as columns, in the order of the list.
+    :rtype: FleetColumns
+    """
+
+    numeric_fields = ("euronorm", "year_of_purchase", "PTO_fuel_consumption",
+                      "expected_total_distance_traveled_in_km", "maximum_daily_distance_in_km",
+                      "amount_of_operational_days", "technological_lifespan",
+                      "charging_time_depot", "charging_time_public")
+    boolean_fields = ("is_cooled", "drives_in_future_ZE_zone")
+
+    columns = []
+    for field in FleetColumns._fields:
+        values = [getattr(vehicle, field) for vehicle in vehicles]
+        if field == "category":
+            columns.append(array([float(value) if type(value) == int else nan for value in values], dtype=float))
+        elif field in numeric_fields:
+            columns.append(array([to_float_or_nan(value) for value in values], dtype=float))
+        elif field in boolean_fields:
+            columns.append(array([bool(value) for value in values], dtype=bool))
+        else:
+            column = array([None] * len(values), dtype=object)
+            column[:] = values
+            columns.append(column)
+
+    return FleetColumns(*columns)
@@ -0,0 +1,312 @@
+from numpy import asarray, full, nan, ndarray, where, zeros
+
+
+def collect_labels(vehicles_results: list):
+
+    """Collect the labels of the results of vehicles, in the order in which they're found.
+    The values in the results can be numbers or arrays with a value per vehicle.
+
+    :param vehicles_results: The results of the vehicles organised by scenario, strategy, year and metric.
+    :type vehicles_results: list
+
+    :return: The scenarios, strategies, years and metrics, and the metrics that are integers.
+    :rtype: tuple
+    """
+
+    scenarios, strategies, years, metrics = {}, {}, {}, {}
+    for vehicle_results in vehicles_results:
+        for scenario, scenario_results in vehicle_results.items():
+            scenarios.setdefault(scenario, None)
+            for strategy, strategy_results in scenario_results.items():
+                strategies.setdefault(strategy, None)
+                for year, year_results in strategy_results.items():
+                    years.setdefault(year, None)
+                    for metric, value in year_results.items():
+                        if metric not in metrics:
+                            metrics[metric] = asarray(value).dtype.kind in "iu"
+
+    integer_metrics = tuple(metric for metric, is_integer in metrics.items() if is_integer)
+
+    return tuple(scenarios), tuple(strategies), tuple(years), tuple(metrics), integer_metrics
+
+
+def from_vehicle_results(number_plates: list, vehicles_results: list):
+
+    """Construct the fleet results from the results of every vehicle.
+
+    :param number_plates: The number plates of the vehicles.
+    :type number_plates: list
+    :param vehicles_results: The results of every vehicle organised by scenario, strategy, year and metric.
+    :type vehicles_results: list
+
+    :return: The constructed fleet results.
+    :rtype: FleetResults
+    """
+
+    fleet_results = FleetResults(number_plates, *collect_labels(vehicles_results))
+    for index, vehicle_results in enumerate(vehicles_results):
+        fleet_results.set_results(index, vehicle_results)
+
+    return fleet_results
+
+
+def add_results(total_results: dict, results: dict):
+
+    """Add results to a running total, the labels that the total doesn't have yet are added.
+
+    :param total_results: The running total organised by scenario, strategy, year and metric, it's changed in place.
+    :type total_results: dict
+    :param results: The results to add, organised by scenario, strategy, year and metric.
+    :type results: dict
+    """
+
+    for scenario, scenario_results in results.items():
+        total_scenario_results = total_results.setdefault(scenario, {})
+        for strategy, strategy_results in scenario_results.items():
+            total_strategy_results = total_scenario_results.setdefault(strategy, {})
+            for year, year_results in strategy_results.items():
+                total_year_results = total_strategy_results.setdefault(year, {})
+                for metric, value in year_results.items():
+                    total_year_results[metric] = total_year_results.get(metric, 0) + value
+
+
+class FleetResults:
+    """
+    The results of a fleet as one array indexed by vehicle, scenario, strategy, year and metric.
+    Every axis has its labels and an index from label to position. The results are stored as floats,
+    the integer metrics become integers again when the results are converted to dictionaries.
+    A strategy doesn't need to have a result for every year, is_present tells which results exist.
+    """
+
+    number_plates: tuple = None
+    scenarios: tuple = None
+    strategies: tuple = None
+    years: tuple = None
+    metrics: tuple = None
+    integer_metrics: tuple = None
+    is_integer_metric: tuple = None
+    values: ndarray = None
+    is_present: ndarray = None
+
+    def __init__(self,
+                 number_plates: list,
+                 scenarios: tuple,
+                 strategies: tuple,
+                 years: tuple,
+                 metrics: tuple,
+                 integer_metrics: tuple,
+                 values: ndarray = None,
+                 is_present: ndarray = None):
+
+        """Initialise the results, without values they're empty.
+
+        :param number_plates: The number plates of the vehicles.
+        :type number_plates: list
+        :param scenarios: The names of the scenarios.
+        :type scenarios: tuple
+        :param strategies: The names of the strategies.
+        :type strategies: tuple
+        :param years: The years.
+        :type years: tuple
+        :param metrics: The names of the metrics.
+        :type metrics: tuple
+        :param integer_metrics: The names of the metrics that are integers.
+        :type integer_metrics: tuple
+        :param values: The values indexed by vehicle, scenario, strategy, year and metric.
+        :type values: ndarray
+        :param is_present: Whether a result exists, indexed by vehicle, scenario, strategy and year.
+        :type is_present: ndarray
+        """
+
+        self.number_plates = tuple(number_plates)
+        self.scenarios = tuple(scenarios)
+        self.strategies = tuple(strategies)
+        self.years = tuple(years)
+        self.metrics = tuple(metrics)
+        self.integer_metrics = tuple(integer_metrics)
+        self.is_integer_metric = tuple(metric in self.integer_metrics for metric in self.metrics)
+
+        shape = (len(self.number_plates), len(self.scenarios), len(self.strategies), len(self.years))
+        self.values = full(shape + (len(self.metrics),), nan) if values is None else values
+        self.is_present = zeros(shape, dtype=bool) if is_present is None else is_present
+
+        # Indexes from label to position
+        self.vehicle_indices = {number_plate: index for index, number_plate in enumerate(self.number_plates)}
+        self.scenario_indices = {scenario: index for index, scenario in enumerate(self.scenarios)}
+        self.strategy_indices = {strategy: index for index, strategy in enumerate(self.strategies)}
+        self.year_indices = {year: index for index, year in enumerate(self.years)}
+        self.metric_indices = {metric: index for index, metric in enumerate(self.metrics)}
+
+    def __len__(self):
+
+        """Get the amount of vehicles.
+
+        :return: The amount of vehicles.
+        :rtype: int
+        """
+
+        return len(self.number_plates)
+
+    def set_results(self, vehicle_indices: any, results: dict):
+
+        """Replace the results of one or more vehicles.
+
+        :param vehicle_indices: The index of a vehicle, or the indices of the vehicles.
+        :type vehicle_indices: any
+        :param results: The results organised by scenario, strategy, year and metric.
+            The values are numbers, or arrays with a value per vehicle.
+        :type results: dict
+        """
+
+        self.values[vehicle_indices] = nan
+        self.is_present[vehicle_indices] = False
+
+        for scenario, scenario_results in results.items():
+            scenario_index = self.scenario_indices[scenario]
+            for strategy, strategy_results in scenario_results.items():
+                strategy_index = self.strategy_indices[strategy]
+                for year, year_results in strategy_results.items():
+                    year_index = self.year_indices[year]
+                    self.is_present[vehicle_indices, scenario_index, strategy_index, year_index] = True
+                    for metric, value in year_results.items():
+                        metric_index = self.metric_indices[metric]
+                        self.values[vehicle_indices, scenario_index, strategy_index, year_index, metric_index] = value
+
+    def take(self, indices: ndarray, number_plates: list):
+
+        """Selects vehicles by their index, a vehicle can be selected more than once.
+
+        :param indices: The indices of the vehicles.
+        :type indices: ndarray
+        :param number_plates: The number plates of the selected vehicles.
+        :type number_plates: list
+
+        :return: The results of the selected vehicles.
+        :rtype: FleetResults
+        """
+
+        return FleetResults(number_plates, self.scenarios, self.strategies, self.years, self.metrics,
+                            self.integer_metrics, self.values[indices], self.is_present[indices])
+
+    def convert_row(self, values: list):
+
+        """Convert the values of a year into a dictionary of metrics.
+
+        :param values: The values of the metrics.
+        :type values: list
+
+        :return: The values organised by metric.
+        :rtype: dict
+        """
+
+        return {metric: int(value) if is_integer else value
+                for metric, is_integer, value in zip(self.metrics, self.is_integer_metric, values)}
+
+    def convert_results(self, values: list, is_present: list):
+
+        """Convert the values of a vehicle, or the sums, into dictionaries.
+
+        :param values: The values indexed by scenario, strategy, year and metric.
+        :type values: list
+        :param is_present: Whether a result exists, indexed by scenario, strategy and year.
+        :type is_present: list
+
+        :return: The values organised by scenario, strategy, year and metric.
+        :rtype: dict
+        """
+
+        return {scenario: {strategy: {year: self.convert_row(year_values)
+                                      for year, year_values, year_is_present
+                                      in zip(self.years, strategy_values, strategy_is_present)
+                                      if year_is_present}
+                           for strategy, strategy_values, strategy_is_present
+                           in zip(self.strategies, scenario_values, scenario_is_present)}
+                for scenario, scenario_values, scenario_is_present in zip(self.scenarios, values, is_present)}
+
+    def get_vehicle_results(self, number_plate: str):
+
+        """Get the results of a vehicle as dictionaries.
+
+        :param number_plate: The number plate of the vehicle.
+        :type number_plate: str
+
+        :return: The results organised by scenario, strategy, year and metric.
+        :rtype: dict
+        """
+
+        index = self.vehicle_indices[number_plate]
+        return self.convert_results(self.values[index].tolist(), self.is_present[index].tolist())
+
+    def to_dict(self):
+
+        """Convert the results of every vehicle into dictionaries.
+
+        :return: The results organised by number plate, scenario, strategy, year and metric.
+        :rtype: dict
+        """
+
+        return dict(self.items())
+
+    def items(self):
+
+        """Iterate over the results of the vehicles, a vehicle is only converted into dictionaries when it's reached.
+
+        :return: The number plate and the results of every vehicle, organised by scenario, strategy, year and metric.
+        :rtype: Iterator[tuple]
+        """
+
+        for index, number_plate in enumerate(self.number_plates):
+            yield number_plate, self.convert_results(self.values[index].tolist(), self.is_present[index].tolist())
+
+    def calculate_fleet_sum(self, excluded_number_plates: tuple = ("voorbeeld",)):
+
+        """Calculates the total values of the fleet by summing over the vehicles.
+
+        :param excluded_number_plates: The number plates of the vehicles that aren't part of the fleet.
+        :type excluded_number_plates: tuple
+
+        :return: The summed values organised by scenario, strategy, year and metric.
+        :rtype: dict
+        """
+
+        is_included = asarray([number_plate not in excluded_number_plates for number_plate in self.number_plates],
+                              dtype=bool)
+        if not is_included.any():
+            return {}
+
+        is_present = self.is_present[is_included]
+        values = where(is_present[..., None], self.values[is_included], 0).sum(0)
+
+        return self.convert_results(values.tolist(), is_present.any(0).tolist())
+
+    def calculate_transition_year(self, final_year: int, excluded_number_plates: tuple = ("sum", "voorbeeld")):
+
+        """Calculates the first year in which every vehicle reaches its transition year.
+
+        :param final_year: The year after the last year of the results.
+        :type final_year: int
+        :param excluded_number_plates: The number plates of the vehicles that aren't part of the fleet.
+        :type excluded_number_plates: tuple
+
+        :return: The transition year organised by number plate, scenario and strategy.
+        :rtype: dict
+        """
+
+        not_reached = ">" + str(final_year - 1)
+        is_reached = (self.values[..., self.metric_indices["transition_year"]] != 0) & self.is_present
+        first_years = is_reached.argmax(-1).tolist()
+        has_reached = is_reached.any(-1).tolist()
+        has_years = self.is_present.any(-1).tolist()
+
+        transition_year = {}
+        for vehicle_index, number_plate in enumerate(self.number_plates):
+            if number_plate in excluded_number_plates:
+                continue
+            transition_year[number_plate] = {
+                scenario: {strategy: self.years[first_years[vehicle_index][scenario_index][strategy_index]]
+                           if has_reached[vehicle_index][scenario_index][strategy_index] else not_reached
+                           for strategy_index, strategy in enumerate(self.strategies)
+                           if has_years[vehicle_index][scenario_index][strategy_index]}
+                for scenario_index, scenario in enumerate(self.scenarios)}
+
+        return transition_year
@@ -0,0 +1,490 @@
+from data_objects.FleetColumns import FleetColumns
+from Deadline import Deadline
+from excel_interfaces.VectorizedPANTEIAModel import VectorizedPANTEIAModel, to_float
+import numpy as np
+
+
+def to_scenario_value(value: any):
+    """
+    Converts a value of the scenario data into a float. Missing values are NaN,
+    because StrategyRunner can't calculate with them.
+
+    Parameters:
+        value (any): The value of the scenario data.
+
+    Returns:
+        float: The value as a float, or NaN if it's missing or isn't a number.
+    """
+
+    return np.nan if value is None else to_float(value)
+
+
+def get_residual_year_data(years: dict, future_year: int):
+    """
+    Gets the scenario data of the year in which a lifespan ends. The last year of the scenario is used
+    for lifespans that end after it, like StrategyRunner does.
+
+    Parameters:
+        years (dict): The scenario data organised by year.
+        future_year (int): The year in which the lifespan ends.
+
+    Returns:
+        ScenarioYear: The scenario data, or None if the scenario has no years.
+    """
+
+    return years.get(min(future_year, max(years))) if years else None
+
+
+class FleetStrategyRunner:
+    """
+    Calculates the TCO values of multiple strategies for all vehicles of a fleet and a scenario at once.
+    Every row of the vectorized PANTEIA model is a vehicle in a strategy, so the strategies are calculated in the
+    same way as StrategyRunner calculates them for a single vehicle. The replacement of the vehicles is planned
+    with masks, every group of rows that plans the same operations executes them at once.
+
+    Rows that would raise an exception in StrategyRunner are marked as failed instead, so their vehicles
+    can be calculated by StrategyRunner to get the exception or results that can't be calculated with arrays.
+
+    Attributes:
+        scenarios (dict): The scenario of every vehicle type, organised by the category of the vehicle plus one.
+        vehicles (FleetColumns): The vehicles that will be used in the calculations.
+        extra_years_after_lifespan (int): The extra years after the lifespan a vehicle should be kept.
+        increase_factor_after_lifespan (float): The factor to increase maintenance costs after the vehicle's lifespan.
+        transition_margin (float): The relative percentage to determine the transition threshold.
+        tax_percentage (float): The tax percentage of a company.
+        current_year (int): First year of calculation.
+        final_year (int): The year after the last year of calculation, the final year itself isn't calculated.
+        only_transition_year (bool): Whether only the transition year is calculated. The other results aren't read
+            and the years stop when every vehicle that didn't fail has stopped using a fossil fuel type.
+        deadline (Deadline): The deadline of the request, it's checked for every year.
+        results (dict): The calculated TCO values organised by strategy, year and field, with a value per vehicle.
+        failed_vehicles (ndarray): Whether a vehicle couldn't be calculated for one of the strategies.
+    """
+
+    list_of_fossil_fuel_types: tuple = ("Diesel", "CNG", "Blauwe diesel", "Benzine", "LNG")
+
+    # The fields of ScenarioYear that are put in the model
+    scenario_fields: tuple = ("electric_price_in_euro", "diesel_price_in_euro", "capacity_in_kWh",
+                              "efficiency_electricity_in_kWh_per_km", "efficiency_diesel_in_liter_per_km",
+                              "subsidies_EV_in_euro", "MIA_in_euro_per_lifespan", "VAMIL_in_euro_per_lifespan",
+                              "gross_purchase_cost_charging_system_in_euro",
+                              "gross_installation_cost_charging_system_in_euro",
+                              "charging_capacity_charging_pole_on_depot", "standstil_EV_in_days",
+                              "repair_costs_EV_euro_per_year", "CO2_price_in_euro_per_ton",
+                              "fuel_price_diesel_excluding_tax_in_euro_per_liter",
+                              "electricity_price_private_excluding_tax_in_euro_per_kWh",
+                              "electricity_price_public_excluding_tax_in_euro_per_kWh",
+                              "change_in_excise_duty_diesel_in_percentage", "vehicle_tax_electric_in_euro_per_year",
+                              "charging_capacity_external_charging_pole", "fixed_ZE_vehicle_tax_in_euro_per_year")
+
+    def __init__(self,
+                 scenarios: dict,
+                 vehicles: FleetColumns,
+                 extra_years_after_lifespan: int,
+                 increase_factor_after_lifespan: float,
+                 transition_margin: float,
+                 tax_percentage: float,
+                 current_year: int,
+                 final_year: int,
+                 only_transition_year: bool = False,
+                 deadline: Deadline = None):
+        """
+        Initialises a runner for the vehicles of a fleet and a scenario.
+
+        Parameters:
+            scenarios (dict): The scenario of every vehicle type, organised by the category of the vehicle plus one.
+            vehicles (FleetColumns): The vehicles that will be used in the calculations.
+            extra_years_after_lifespan (int): The extra years after the lifespan a vehicle should be kept.
+            increase_factor_after_lifespan (float): The factor to increase maintenance costs after the lifespan.
+            transition_margin (float): The relative percentage to determine the transition threshold.
+            tax_percentage (float): The tax percentage of a company.
+            current_year (int): First year of calculation.
+            final_year (int): The year after the last year of calculation, the final year itself isn't calculated.
+            only_transition_year (bool): Whether only the transition year is calculated.
+            deadline (Deadline): The deadline of the request, defaults to no limit.
+        """
+
+        self.scenarios = scenarios
+        self.vehicles = vehicles
+        self.extra_years_after_lifespan = extra_years_after_lifespan
+        self.increase_factor_after_lifespan = increase_factor_after_lifespan
+        self.transition_margin = transition_margin
+        self.tax_percentage = tax_percentage
+        self.current_year = current_year
+        self.final_year = final_year
+        self.only_transition_year = only_transition_year
+        self.deadline = deadline or Deadline()
+        self.results = {}
+        self.failed_vehicles = np.zeros(len(vehicles.category), dtype=bool)
+
+    def calculate_TCO(self, strategies: dict):
+        """
+        Calculates the TCO values of the strategies for all vehicles.
+
+        Parameters:
+            strategies (dict): The strategies organised by name.
+
+        Returns:
+            dict: The calculated TCO values organised by strategy name, year and field, with a value per vehicle.
+
+        Raises:
+            DeadlineExceeded: Raised if the deadline passed.
+            RequestCancelled: Raised if the request has been cancelled.
+        """
+
+        amount_of_vehicles = len(self.vehicles.category)
+        names = list(strategies)
+        self.results = {name: {} for name in names}
+        self.strategies = strategies
+
+        # Every strategy gets a row per vehicle, the rows of a strategy are consecutive
+        self.strategy_rows = {name: slice(index * amount_of_vehicles, (index + 1) * amount_of_vehicles)
+                              for index, name in enumerate(names)}
+        self.rows = self.vehicles.take(np.tile(np.arange(amount_of_vehicles), len(names)))
+        self.model = VectorizedPANTEIAModel(len(self.rows.category))
+        self.load_scenario_tables()
+
+        # Input vehicle information
+        self.model.input_vehicle_data(self.rows)
+
+        # The state of every row, like the state of StrategyRunner
+        lifespans = np.trunc(self.rows.technological_lifespan)
+        fuel_types = np.array([fuel_type.capitalize() if isinstance(fuel_type, str) else ""
+                               for fuel_type in self.rows.fuel_type], dtype=object)
+        state = {
+            "vehicle_age": self.rows.get_current_ages("Europe/Amsterdam"),
+            "fuel_type": fuel_types,
+            "lifespan": lifespans,
+            "electric_lifespan": lifespans.copy(),
+            "transition_year_reached": np.zeros(len(fuel_types), dtype=bool)
+        }
+        self.mark_unsupported_rows()
+
+        # Update fixed parameters
+        self.update_fixed_parameters(state, self.current_year, None)
+
+        # Some strategies update the model again before the first year
+        operations = {}
+        for name, strategy in strategies.items():
+            operations.setdefault(strategy.plan_start(), []).append(self.strategy_rows[name])
+        for strategy_operations, strategy_rows in operations.items():
+            mask = self.get_strategy_mask(strategy_rows)
+            for operation in strategy_operations:
+                self.execute_operation(operation, state, None, mask)
+
+        self.calculate_years(state)
+
+        failed = self.model.failed.reshape(len(names), amount_of_vehicles)
+        self.failed_vehicles = failed.any(axis=0)
+
+        return self.results
+
+    def get_years(self):
+        """
+        Gets the years to calculate, which are the same for every vehicle type.
+
+        Returns:
+            list: The years to calculate.
+        """
+
+        return self.years
+
+    def load_scenario_tables(self):
+        """
+        Organises the scenario data by vehicle type, so the data of every row can be selected at once.
+        Rows of which the vehicle type has no scenario, or a scenario with other years, are marked as failed.
+        """
+
+        categories = self.rows.category
+        scenario_keys = [key for key in self.scenarios
+                         if any(str(index + 1) == key for index in range(7))]
+
+        # The index of the scenario of every row, rows without a scenario get the index of an empty scenario
+        positions = np.full(len(categories), len(scenario_keys))
+        for position, key in enumerate(scenario_keys):
+            positions[np.equal(categories, int(key) - 1)] = position
+        self.scenario_positions = positions
+
+        # Use the years of the first vehicle with a scenario, like StrategyRunner.get_years
+        self.years = []
+        self.scenario_years = [self.scenarios[key].years for key in scenario_keys]
+        horizon_years = [[year for year in years if self.current_year <= year < self.final_year]
+                         for years in self.scenario_years]
+        for position in positions:
+            if position < len(scenario_keys):
+                self.years = horizon_years[position]
+                break
+
+        has_other_years = np.array([years != self.years for years in horizon_years] + [True])
+        self.model.mark_failed(None, np.where(has_other_years[positions], np.nan, 0))
+
+        self.year_data = {}
+        self.residual_percentages = {}
+
+    def get_year_data(self, year: int, mask: np.ndarray):
+        """
+        Gets the scenario data of a year for every row. Rows of the mask without data for the year are marked as failed.
+
+        Parameters:
+            year (int): The year of the data.
+            mask (ndarray): The rows that use the data, all rows if not provided.
+
+        Returns:
+            dict: The scenario data organised by field of ScenarioYear, with a value per row.
+        """
+
+        if year not in self.year_data:
+            scenario_years = [years.get(year) for years in self.scenario_years] + [None]
+            self.year_data[year] = {
+                field: np.array([np.nan if scenario_year is None else to_scenario_value(getattr(scenario_year, field))
+                                 for scenario_year in scenario_years])[self.scenario_positions]
+                for field in self.scenario_fields
+            }
+            self.year_data[year]["is_available"] = np.array([scenario_year is not None
+                                                             for scenario_year in scenario_years])[
+                self.scenario_positions]
+
+        year_data = self.year_data[year]
+        self.model.mark_failed(mask, np.where(year_data["is_available"], 0, np.nan))
+        return year_data
+
+    def get_residual_percentages(self, year: int, lifespans: np.ndarray, mask: np.ndarray):
+        """
+        Gets the residual value percentages at the end of the lifespan of every row, for vehicles bought in a year.
+        Rows of the mask without a percentage are marked as failed.
+
+        Parameters:
+            year (int): The year in which the vehicles are bought.
+            lifespans (ndarray): The lifespan of every row.
+            mask (ndarray): The rows that use the percentages, all rows if not provided.
+
+        Returns:
+            tuple: The percentages of the electric and the diesel vehicles, with a value per row.
+        """
+
+        residual_percentage_electric = np.full(len(lifespans), np.nan)
+        residual_percentage_diesel = np.full(len(lifespans), np.nan)
+        selected = np.ones(len(lifespans), dtype=bool) if mask is None else mask
+
+        for lifespan in np.unique(lifespans[selected & (lifespans >= 0) & (lifespans <= 15)]):
+            future_year = year + int(lifespan)
+            if future_year not in self.residual_percentages:
+                scenario_years = [get_residual_year_data(years, future_year)
+                                  for years in self.scenario_years] + [None]
+                self.residual_percentages[future_year] = tuple(
+                    np.array([[np.nan] * 16 if scenario_year is None else
+                              [to_scenario_value(value) for value in getattr(scenario_year, field)]
+                              for scenario_year in scenario_years])
+                    for field in ("residual_values_EV_in_percentage", "residual_values_diesel_in_percentage"))
+
+            electric, diesel = self.residual_percentages[future_year]
+            rows = selected & np.equal(lifespans, lifespan)
+            residual_percentage_electric[rows] = electric[self.scenario_positions[rows], int(lifespan)]
+            residual_percentage_diesel[rows] = diesel[self.scenario_positions[rows], int(lifespan)]
+
+        self.model.mark_failed(mask, residual_percentage_electric, residual_percentage_diesel)
+        return residual_percentage_electric, residual_percentage_diesel
+
+    def mark_unsupported_rows(self):
+        """
+        Marks the rows of vehicles that StrategyRunner can't calculate, or only with values that aren't numbers.
+        """
+
+        rows = self.rows
+        is_unsupported = np.array([not isinstance(fuel_type, str) for fuel_type in rows.fuel_type])
+
+        # The euronorm is only compared for vans
+        is_van = np.isin(rows.type, ('Kleine bestelwagen', 'Middel bestelwagen', 'Middel bestelwagen luxe',
+                                     'Grote bestelwagen'))
+        is_unsupported |= is_van & np.isnan(rows.euronorm)
+
+        for values in (rows.year_of_purchase, rows.technological_lifespan, rows.charging_time_depot,
+                       rows.charging_time_public, rows.category):
+            is_unsupported |= np.isnan(values)
+
+        self.model.mark_failed(None, np.where(is_unsupported, np.nan, 0))
+
+    def get_strategy_mask(self, strategy_rows: list):
+        """
+        Gets a mask of the rows of strategies.
+
+        Parameters:
+            strategy_rows (list): The rows of every strategy.
+
+        Returns:
+            ndarray: The mask.
+        """
+
+        mask = np.zeros(len(self.rows.category), dtype=bool)
+        for rows in strategy_rows:
+            mask[rows] = True
+        return mask
+
+    def calculate_years(self, state: dict):
+        """
+        Calculates the years, for all rows at once.
+
+        Parameters:
+            state (dict): The state of every row.
+        """
+
+        uses_transition_year = self.get_strategy_mask([self.strategy_rows[name]
+                                                       for name, strategy in self.strategies.items()
+                                                       if strategy.uses_transition_year])
+        first_strategy = next(iter(self.strategies.values()))
+
+        for year_index, year in enumerate(self.get_years()):
+            self.deadline.check()
+
+            # Every vehicle has reached its transition year, they don't switch back to a fossil fuel type
+            if self.only_transition_year and year_index > 0 and \
+                    not (np.isin(state["fuel_type"], self.list_of_fossil_fuel_types) & ~self.model.failed).any():
+                break
+
+            # Update variable parameters with the scenario data of the current year
+            self.model.update_variable_parameters(self.get_year_data(year, None))
+
+            # Check if optimal mix is valid
+            results = self.model.read_results()
+            is_optimal_mix_valid = results.optimal_mix_validity
+
+            # Check if transition year has been reached, for the strategies that depend on it
+            is_checked = uses_transition_year & ~state["transition_year_reached"]
+            if is_checked.any():
+                is_reached = first_strategy.transition_year_reached_masks(self.transition_margin, results)
+                state["transition_year_reached"] = state["transition_year_reached"] | (is_checked & is_reached)
+
+            # Determine which vehicles need to be changed, the rows that plan the same operations are grouped
+            operations = {}
+            for name, strategy in self.strategies.items():
+                rows = self.strategy_rows[name]
+                strategy_state = {key: values[rows] for key, values in state.items()}
+                for strategy_operations, mask in strategy.plan_replacement_masks(strategy_state,
+                                                                                 self.vehicles,
+                                                                                 int(year),
+                                                                                 is_optimal_mix_valid[rows],
+                                                                                 self.extra_years_after_lifespan):
+                    if mask.any():
+                        operations.setdefault(strategy_operations, np.zeros(len(self.rows.category), dtype=bool))
+                        operations[strategy_operations][rows] |= mask
+
+            for strategy_operations, mask in operations.items():
+                for operation in strategy_operations:
+                    self.execute_operation(operation, state, year, mask)
+
+            self.finish_year(state, year)
+
+    def execute_operation(self, operation: str, state: dict, year: int, mask: np.ndarray):
+        """
+        Executes an operation that was planned by a strategy, for the rows of a mask.
+
+        Parameters:
+            operation (str): The name of the operation, see StrategyRunner for the operations.
+            state (dict): The state of every row, which is updated.
+            year (int): The year of the operation, or None before the first year.
+            mask (ndarray): The rows that execute the operation.
+        """
+
+        if operation == "update_current_year":
+            self.model.update_variable_parameters(self.get_year_data(self.current_year, mask), mask)
+
+        elif operation == "input_vehicle_data":
+            self.model.input_vehicle_data(self.rows, mask)
+
+        elif operation in ("switch_to_electric", "switch_to_electric_with_residual_debt"):
+            residual_debt = 0
+            if operation == "switch_to_electric_with_residual_debt":
+                # Calculate residual debt
+                residual_debt = self.model.calculate_residual_debt(state["lifespan"], state["vehicle_age"], mask)
+
+            # update parameters
+            state["fuel_type"] = np.where(mask, "Elektrisch", state["fuel_type"])
+            state["lifespan"] = np.where(mask, state["electric_lifespan"], state["lifespan"])
+            state["vehicle_age"] = np.where(mask, 0, state["vehicle_age"])
+
+            # Update fixed parameters
+            self.update_fixed_parameters(state, year, mask)
+
+            # add residual debt to vehicle price
+            if operation == "switch_to_electric_with_residual_debt":
+                self.model.update_price_electric_vehicle(residual_debt, mask)
+
+        elif operation == "renew_vehicle":
+            # Reset vehicle age
+            state["vehicle_age"] = np.where(mask, 0, state["vehicle_age"])
+
+            # Update fixed parameters
+            self.update_fixed_parameters(state, year, mask)
+
+        else:
+            raise ValueError(f"Unknown operation: {operation}")
+
+    def update_fixed_parameters(self, state: dict, year: int, mask: np.ndarray):
+        """
+        Updates the fixed parameters for new vehicles.
+
+        Parameters:
+            state (dict): The state of every row.
+            year (int): The year in which the vehicles are bought.
+            mask (ndarray): The rows with a new vehicle, all rows if not provided.
+        """
+
+        residual_percentage_electric, residual_percentage_diesel = self.get_residual_percentages(year,
+                                                                                                 state["lifespan"],
+                                                                                                 mask)
+        self.model.update_fixed_parameters(self.rows.category,
+                                           self.rows.charging_time_depot,
+                                           self.rows.charging_time_public,
+                                           self.tax_percentage,
+                                           self.get_year_data(year, mask),
+                                           residual_percentage_electric,
+                                           residual_percentage_diesel,
+                                           mask)
+
+    def finish_year(self, state: dict, year: int):
+        """
+        Calculates the costs of a year after the vehicles have been replaced.
+
+        Parameters:
+            state (dict): The state of every row, the vehicle age is incremented.
+            year (int): The year to calculate.
+        """
+
+        strategy = next(iter(self.strategies.values()))
+        current_fuel_type = state["fuel_type"]
+        current_vehicle_age = state["vehicle_age"]
+        current_lifespan = state["lifespan"]
+        is_diesel = current_fuel_type == "Diesel"
+        is_fossil = np.isin(current_fuel_type, self.list_of_fossil_fuel_types)
+
+        # Check if vehicle is past lifespan
+        is_past_lifespan = current_vehicle_age > current_lifespan
+        if is_past_lifespan.any():
+            years_past_lifespan = current_vehicle_age - current_lifespan
+            increased_maintenance_factor = np.power(float(self.increase_factor_after_lifespan), years_past_lifespan)
+            self.model.increase_maintenance_factor(is_diesel, increased_maintenance_factor, is_past_lifespan)
+
+            # decrease yearly depreciation costs, because vehicle is already paid off
+            self.model.decrease_yearly_depreciation_costs(is_diesel, current_vehicle_age, is_past_lifespan)
+        self.model.reset_yearly_depreciation_costs(~is_past_lifespan)
+
+        # Check costs for Zero Emission zones
+        has_ZE_costs = is_fossil & self.rows.drives_in_future_ZE_zone & \
+            ~strategy.is_allowed_in_ZE_zone_masks(self.rows, current_vehicle_age, int(year))
+        self.model.set_ZE_costs(self.get_year_data(year, None)["fixed_ZE_vehicle_tax_in_euro_per_year"], has_ZE_costs)
+
+        if self.only_transition_year:
+            # The transition year is the first year in which the vehicle isn't fossil, like in the TCO results
+            result = {"transition_year": np.where(is_fossil, 0, 1)}
+        else:
+            # Read all result cells at once, exclusive charging at depot isn't used until a bug is solved
+            year_results = self.model.read_results()
+            is_exclusive_charging_at_depot_possible = np.zeros(len(is_diesel), dtype=bool)
+
+            # Calculate TCO
+            result = self.model.get_TCO(is_fossil, is_exclusive_charging_at_depot_possible, year_results)
+        for name, rows in self.strategy_rows.items():
+            self.results[name][year] = {field: values[rows] for field, values in result.items()}
+
+        # Increment age
+        state["vehicle_age"] = current_vehicle_age + 1
@@ -0,0 +1,118 @@
+from typing import NamedTuple
+
+
+def to_float_or_false(value: any):
+
+    """Converts the value of a cell into a float.
+
+    :param value: The value of the cell.
+    :type value: any
+
+    :return: The value as a float, or False if the value can't be converted.
+    :rtype: float or False
+    """
+
+    try:
+        return float(value)
+    except ValueError:
+        return False
+
+
+class TCOCellValues(NamedTuple):
+    """
+    The values of the TCO cells of a single column in the "TCO module ondernemers" worksheet.
+    The cells are ordered by row: 44, 49, 50, 51, 62, 75, 80, 85 and 95.
+    """
+
+    tco: any
+    CO2_emissions: any
+    particulate_matter_emissions: any
+    nitrogen_oxide_emissions: any
+    fixed_vehicle_costs: any
+    variable_vehicle_costs: any
+    write_off_costs_vehicle: any
+    write_off_costs_charging_system: any
+    driver_costs: any
+
+
+class PANTEIAResults(NamedTuple):
+    """
+    The values of all result cells of the PANTEIA model, which are read at once.
+    The values are kept as they are in the model, so errors like #N/A only raise when they're converted.
+    """
+
+    depot_charging_validity: any
+    optimal_mix_validity: any
+    depot_charging: TCOCellValues
+    optimal_mix: TCOCellValues
+    diesel: TCOCellValues
+    kWh_charged_on_depot_exclusively: any
+    charging_time_depot_exclusively: any
+    kWh_charged_on_depot: any
+    kWh_charged_in_public: any
+    charging_time_depot: any
+    charging_time_public: any
+
+    @property
+    def is_exclusive_home_loading_valid(self):
+        return self.depot_charging_validity.lower() == "scenario valid"
+
+    @property
+    def is_optimal_mix_valid(self):
+        return self.optimal_mix_validity.lower() == "scenario valid"
+
+    @property
+    def total_TCO_cost_depot_charging(self):
+        return to_float_or_false(self.depot_charging.tco)
+
+    @property
+    def total_TCO_cost_optimal_mix(self):
+        return to_float_or_false(self.optimal_mix.tco)
+
+    @property
+    def total_TCO_cost_diesel(self):
+        return to_float_or_false(self.diesel.tco)
+
+
+def get_result_addresses(module_sheet_name: str, calc_sheet_name: str):
+
+    """Gets the addresses of the result cells, in the order of the fields of PANTEIAResults.
+
+    :param module_sheet_name: The name of the "TCO module ondernemers" worksheet.
+    :type module_sheet_name: str
+    :param calc_sheet_name: The name of the "ondernemers_calc" worksheet.
+    :type calc_sheet_name: str
+
+    :return: The addresses of the result cells, including the sheet.
+    :rtype: tuple
+    """
+
+    validity_addresses = (f"{module_sheet_name}!C35", f"{module_sheet_name}!D35")
+    TCO_addresses = tuple(f"{module_sheet_name}!{column}{row}"
+                          for column in ("C", "D", "E")
+                          for row in (44, 49, 50, 51, 62, 75, 80, 85, 95))
+    charging_addresses = tuple(f"{calc_sheet_name}!{cell_address}"
+                               for cell_address in ("B35", "B32", "C35", "C47", "C32", "C48"))
+
+    return validity_addresses + TCO_addresses + charging_addresses
+
+
+def from_values(values: tuple):
+
+    """Creates the results from the values of the result addresses, in the order of PANTEIAInterface.result_addresses.
+
+    :param values: The values of the result cells.
+    :type values: tuple
+
+    :return: The results.
+    :rtype: PANTEIAResults
+    """
+
+    return PANTEIAResults(
+        values[0],
+        values[1],
+        TCOCellValues(*values[2:11]),
+        TCOCellValues(*values[11:20]),
+        TCOCellValues(*values[20:29]),
+        *values[29:35]
+    )
@@ -1,3 +1,6 @@
+from numpy import array, ndarray
+
+
 def from_dict(data: dict):
 
     """Construct a scenario year from a dictionary.
@@ -141,6 +144,8 @@ class ScenarioYear:
     residual_value_diesel_year_13_in_percentage: float = None
     residual_value_diesel_year_14_in_percentage: float = None
     residual_value_diesel_year_15_in_percentage: float = None
+    residual_values_EV_in_percentage: ndarray = None
+    residual_values_diesel_in_percentage: ndarray = None
     charging_capacity_external_charging_pole: float = None
     charging_capacity_charging_pole_on_depot: float = None
     needed_charging_capacity_depot: float = None
@@ -437,6 +442,46 @@ class ScenarioYear:
         self.residual_value_diesel_year_13_in_percentage = residual_value_diesel_year_13_in_percentage
         self.residual_value_diesel_year_14_in_percentage = residual_value_diesel_year_14_in_percentage
         self.residual_value_diesel_year_15_in_percentage = residual_value_diesel_year_15_in_percentage
+
+        # The residual values organised by the age of the vehicle in years, so they can be looked up by index.
+        # A vehicle of age 0 has no residual value in the scenario
+        self.residual_values_EV_in_percentage = array((
+            None,
+            residual_value_EV_year_1_in_percentage,
+            residual_value_EV_year_2_in_percentage,
+            residual_value_EV_year_3_in_percentage,
+            residual_value_EV_year_4_in_percentage,
+            residual_value_EV_year_5_in_percentage,
+            residual_value_EV_year_6_in_percentage,
+            residual_value_EV_year_7_in_percentage,
+            residual_value_EV_year_8_in_percentage,
+            residual_value_EV_year_9_in_percentage,
+            residual_value_EV_year_10_in_percentage,
+            residual_value_EV_year_11_in_percentage,
+            residual_value_EV_year_12_in_percentage,
+            residual_value_EV_year_13_in_percentage,
+            residual_value_EV_year_14_in_percentage,
+            residual_value_EV_year_15_in_percentage,
+        ), dtype=object)
+        self.residual_values_diesel_in_percentage = array((
+            None,
+            residual_value_diesel_year_1_in_percentage,
+            residual_value_diesel_year_2_in_percentage,
+            residual_value_diesel_year_3_in_percentage,
+            residual_value_diesel_year_4_in_percentage,
+            residual_value_diesel_year_5_in_percentage,
+            residual_value_diesel_year_6_in_percentage,
+            residual_value_diesel_year_7_in_percentage,
+            residual_value_diesel_year_8_in_percentage,
+            residual_value_diesel_year_9_in_percentage,
+            residual_value_diesel_year_10_in_percentage,
+            residual_value_diesel_year_11_in_percentage,
+            residual_value_diesel_year_12_in_percentage,
+            residual_value_diesel_year_13_in_percentage,
+            residual_value_diesel_year_14_in_percentage,
+            residual_value_diesel_year_15_in_percentage,
+        ), dtype=object)
+
         self.charging_capacity_external_charging_pole = charging_capacity_external_charging_pole
         self.charging_capacity_charging_pole_on_depot = charging_capacity_charging_pole_on_depot
         self.needed_charging_capacity_depot = needed_charging_capacity_depot
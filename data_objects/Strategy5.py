@@ -1,9 +1,8 @@
 from data_objects.AbstractStrategy import AbstractStrategy
-from data_objects.Scenario import Scenario
+from data_objects.FleetColumns import FleetColumns
 from data_objects.Vehicle import Vehicle
-from excel_interfaces.PANTEIAInterface import PANTEIAInterface
 from Logger import Logger
-import itertools
+from numpy import ndarray
 
 class Strategy5(AbstractStrategy):
 
@@ -11,169 +10,95 @@ class Strategy5(AbstractStrategy):
 
         self.name = "Strategy 5"
 
-    def calculate_TCO(self,
-                      scenario: Scenario,
-                      vehicle: Vehicle,
-                      PANTEIA_interface: PANTEIAInterface,
-                      extra_years_after_lifespan: int,
-                      increase_factor_after_lifespan: float,
-                      transition_margin: float,
-                      tax_percentage: float,
-                      current_year: int,
-                      final_year: int):
-
-        """Calculates the TCO values according to the following logic:
+    def plan_replacement(self,
+                         state: dict,
+                         vehicle: Vehicle,
+                         year: int,
+                         is_optimal_mix_valid: bool,
+                         extra_years_after_lifespan: int):
+
+        """Plans the replacement of the vehicle in a year according to the following logic:
         When a diesel vehicle is no longer allowed in a ZE zone and if technologically possible,
         replace it with an electric vehicle.
         Don't buy new diesel vehicles.
 
-        :param scenario: The scenario that will be used in the calculations.
-        :type scenario: Scenario
+        :param state: The state of the vehicle: its age, fuel type and lifespan, the lifespan of electric vehicles
+            and whether the transition year has been reached.
+        :type state: dict
         :param vehicle: The vehicle that will be used in the calculations.
         :type vehicle: Vehicle
-        :param PANTEIA_interface: The interface to the PANTEIA model.
-        :type PANTEIA_interface: PANTEIAInterface
-        :param charging_time_depot: The amount of hours to charge on the depot.
-        :type charging_time_depot: int
-        :param charging_time_public: The amount of hours to charge in public.
-        :type charging_time_public: int
+        :param year: The year to plan for.
+        :type year: int
+        :param is_optimal_mix_valid: Whether using an optimal mix of charging is possible.
+        :type is_optimal_mix_valid: bool
         :param extra_years_after_lifespan: The extra years after the lifespan a vehicle should be kept.
         :type: int
-        :param increase_factor_after_lifespan: The factor to increase maintenance costs after the vehicle's lifespan.
-        :type increase_factor_after_lifespan: float
-        :param transition_margin: The relative percentage to determine the transition threshold.
-        :type transition_margin: float
-        :param tax_percentage: The tax percentage of a company.
-        :type tax_percentage: float
-        :param current_year: First year of calculation.
-        :type current_year: int
-        :param final_year: Final year of calculation.
-        :type final_year: int
-
-        :return: The calculated TCO values for the given vehicle and scenario.
-        :rtype: dict
+
+        :return: The names of the operations, which are executed by StrategyRunner.
+        :rtype: tuple
         """
 
-        # Get vehicle age
-        original_vehicle_age = vehicle.get_current_age("Europe/Amsterdam")
-
-        # Get technological lifespan
-        lifespans = PANTEIA_interface.get_technological_lifespan()
-        electric_lifespan = lifespans.get("electric")
-        diesel_lifespan = lifespans.get("diesel")
-
-        # Get scenario year data
-        years = scenario.years
-
-        # set the number of years to compute
-        years_slice = dict(itertools.islice(years.items(), 10))
-
-        results = {}
-        current_vehicle_age = original_vehicle_age
-        current_fuel_type = vehicle.fuel_type
-        current_vehicle_index = vehicle.category
-        charging_time_depot = vehicle.charging_time_depot
-        charging_time_public = vehicle.charging_time_public
-        current_lifespan = diesel_lifespan if current_fuel_type.lower() == "diesel" else electric_lifespan #TODO change to list of fuel types, also for other strategies
-        list_of_fossil_fuel_types = ["Diesel","CNG","Blauwe diesel","Benzine","LNG"]
-
-        # Update fixed parameters
-        PANTEIA_interface.update_fixed_parameters(current_lifespan,
-                                                  current_vehicle_index,
-                                                  charging_time_depot,
-                                                  charging_time_public,
-                                                  tax_percentage,
-                                                  years[current_year],
-                                                  years[current_year + current_lifespan])
-
-        # iterate over years
-        for year in years_slice:
-
-            # Get scenario data for current year
-            year_data = years[year]
-
-            # Update variable parameters
-            PANTEIA_interface.update_variable_parameters(year_data)
-
-            # Check if optimal mix is valid
-            is_optimal_mix_valid = PANTEIA_interface.is_optimal_mix_valid()
-
-            # Determine if diesel vehicle needs to be changed for electric vehicle
-            if current_fuel_type.capitalize() in list_of_fossil_fuel_types and is_optimal_mix_valid and vehicle.drives_in_future_ZE_zone and \
-                    not self.is_allowed_in_ZE_zone(vehicle, current_vehicle_age, int(year)):
-
-                # Calculate residual debt
-                residual_debt = PANTEIA_interface.calculate_residual_debt(current_lifespan, current_vehicle_age)
-
-                # update parameters
-                current_fuel_type = "Elektrisch"
-                current_lifespan = electric_lifespan
-                current_vehicle_age = 0
-
-                # Update fixed parameters
-                PANTEIA_interface.update_fixed_parameters(current_lifespan,
-                                                          current_vehicle_index,
-                                                          charging_time_depot,
-                                                          charging_time_public,
-                                                          tax_percentage,
-                                                          year_data,
-                                                          years[year + current_lifespan])
-
-                # add residual debt to vehicle price
-                PANTEIA_interface.update_price_electric_vehicle(current_vehicle_index, residual_debt)
-
-            # Determine if vehicle needs to be changed to same type
-            if current_vehicle_age >= current_lifespan:
-                # Reset vehicle age
-                current_vehicle_age = 0
-
-                # Update fixed parameters
-                PANTEIA_interface.update_fixed_parameters(current_lifespan,
-                                                          current_vehicle_index,
-                                                          charging_time_depot,
-                                                          charging_time_public,
-                                                          tax_percentage,
-                                                          year_data,
-                                                          years[year + current_lifespan])
-
-            # Check if vehicle is past lifespan
-            if current_vehicle_age > current_lifespan:
-                self.increase_maintenance_costs(current_fuel_type,
-                                                current_vehicle_age,
-                                                current_lifespan,
-                                                increase_factor_after_lifespan,
-                                                PANTEIA_interface)
-
-                # decrease yearly depreciation costs, because vehicle is already paid off
-                PANTEIA_interface.decrease_yearly_depreciation_costs(current_fuel_type, current_vehicle_age)
-            else:
-                PANTEIA_interface.reset_yearly_depreciation_costs()
-
-            # Check costs for Zero Emission zones
-            if current_fuel_type.capitalize() in list_of_fossil_fuel_types and \
-                    vehicle.drives_in_future_ZE_zone and \
-                    not self.is_allowed_in_ZE_zone(vehicle, current_vehicle_age, int(year)):
-                PANTEIA_interface.set_ZE_costs(year_data)
-                pass
-            else:
-                PANTEIA_interface.reset_ZE_costs()
-                pass
-
-            # Check if exclusive charging at depot is possible
-            is_exclusive_charging_at_depot_possible = PANTEIA_interface.is_exclusive_home_loading_valid()
-
-            # workaround until bug solved
-            is_exclusive_charging_at_depot_possible = False
-
-            # Calculate TCO
-            result = self.get_results(current_fuel_type,
-                                      is_exclusive_charging_at_depot_possible,
-                                      PANTEIA_interface)
-
-            # Append year results
-            results[year] = result
-
-            # Increment age
-            current_vehicle_age += 1
-
-        return results
+        operations = []
+        current_vehicle_age = state["vehicle_age"]
+        current_fuel_type = state["fuel_type"]
+        current_lifespan = state["lifespan"]
+        list_of_fossil_fuel_types = ["Diesel", "CNG", "Blauwe diesel", "Benzine", "LNG"]
+
+        # Determine if diesel vehicle needs to be changed for electric vehicle
+        if current_fuel_type.capitalize() in list_of_fossil_fuel_types and is_optimal_mix_valid and vehicle.drives_in_future_ZE_zone and \
+                not self.is_allowed_in_ZE_zone(vehicle, current_vehicle_age, year):
+            # The residual debt is added to the price of the electric vehicle
+            operations.append("switch_to_electric_with_residual_debt")
+            current_lifespan = state["electric_lifespan"]
+            current_vehicle_age = 0
+
+        # Determine if vehicle needs to be changed to same type
+        if current_vehicle_age >= current_lifespan:
+            operations.append("renew_vehicle")
+
+        return tuple(operations)
+
+    def plan_replacement_masks(self,
+                               state: dict,
+                               vehicles: FleetColumns,
+                               year: int,
+                               is_optimal_mix_valid: ndarray,
+                               extra_years_after_lifespan: int):
+
+        """Plans the replacement of many vehicles in a year at once, with the same logic as plan_replacement.
+
+        :param state: The state of every vehicle, like the state of plan_replacement with an array per value.
+            The fuel types are capitalised.
+        :type state: dict
+        :param vehicles: The vehicles that will be used in the calculations.
+        :type vehicles: FleetColumns
+        :param year: The year to plan for.
+        :type year: int
+        :param is_optimal_mix_valid: Whether using an optimal mix of charging is possible for every vehicle.
+        :type is_optimal_mix_valid: ndarray
+        :param extra_years_after_lifespan: The extra years after the lifespan a vehicle should be kept.
+        :type: int
+
+        :return: The names of the operations and the mask of the vehicles that execute them,
+            the operations are executed by FleetStrategyRunner.
+        :rtype: list
+        """
+
+        current_vehicle_age = state["vehicle_age"]
+        current_fuel_type = state["fuel_type"]
+        current_lifespan = state["lifespan"]
+
+        # Determine if diesel vehicle needs to be changed for electric vehicle
+        is_switching = self.is_fossil_fuel_type(current_fuel_type) & is_optimal_mix_valid & \
+            vehicles.drives_in_future_ZE_zone & \
+            ~self.is_allowed_in_ZE_zone_masks(vehicles, current_vehicle_age, year)
+
+        # A new electric vehicle is only written off if its lifespan isn't positive
+        is_new_vehicle_written_off = 0 >= state["electric_lifespan"]
+
+        # Determine if vehicle needs to be changed to same type
+        is_renewing = ~is_switching & (current_vehicle_age >= current_lifespan)
+
+        return [(("switch_to_electric_with_residual_debt", "renew_vehicle"), is_switching & is_new_vehicle_written_off),
+                (("switch_to_electric_with_residual_debt",), is_switching & ~is_new_vehicle_written_off),
+                (("renew_vehicle",), is_renewing)]
@@ -0,0 +1,364 @@
+from data_objects.Scenario import Scenario
+from Deadline import Deadline
+from data_objects.Vehicle import Vehicle
+from excel_interfaces.PANTEIAInterface import PANTEIAInterface
+
+
+class StrategyRunner:
+    """
+    Calculates the TCO values of multiple strategies for a single vehicle and scenario at once.
+    The strategies make the same changes to the PANTEIA model until their replacement of the vehicle differs,
+    so the years they share are calculated once. When the strategies diverge, the state of the model is forked:
+    every group of strategies that replaces the vehicle in the same way continues from a snapshot of the model.
+
+    The strategies plan the operations that replace the vehicle, these are executed by the runner:
+        update_current_year: Update the variable parameters for the first year.
+        input_vehicle_data: Input the vehicle information again.
+        switch_to_electric: Switch to a new electric vehicle.
+        switch_to_electric_with_residual_debt: Switch to a new electric vehicle and add the residual debt to its price.
+        renew_vehicle: Buy a new vehicle of the same type.
+
+    Attributes:
+        scenario (Scenario): The scenario that will be used in the calculations.
+        vehicle (Vehicle): The vehicle that will be used in the calculations.
+        PANTEIA_interface (PANTEIAInterface): The interface to the PANTEIA model.
+        extra_years_after_lifespan (int): The extra years after the lifespan a vehicle should be kept.
+        increase_factor_after_lifespan (float): The factor to increase maintenance costs after the vehicle's lifespan.
+        transition_margin (float): The relative percentage to determine the transition threshold.
+        tax_percentage (float): The tax percentage of a company.
+        current_year (int): First year of calculation.
+        final_year (int): The year after the last year of calculation, the final year itself isn't calculated.
+        only_transition_year (bool): Whether only the transition year is calculated. The other results aren't read
+            and a branch stops in the first year in which its vehicle isn't fossil, which is its transition year.
+        deadline (Deadline): The deadline of the request, it's checked for every branch and year.
+        results (dict): The calculated TCO values organised by strategy and year.
+        calculated_years (int): The amount of years that were calculated, shared years are counted once.
+    """
+
+    list_of_fossil_fuel_types: tuple = ("Diesel", "CNG", "Blauwe diesel", "Benzine", "LNG")
+
+    def __init__(self,
+                 scenario: Scenario,
+                 vehicle: Vehicle,
+                 PANTEIA_interface: PANTEIAInterface,
+                 extra_years_after_lifespan: int,
+                 increase_factor_after_lifespan: float,
+                 transition_margin: float,
+                 tax_percentage: float,
+                 current_year: int,
+                 final_year: int,
+                 only_transition_year: bool = False,
+                 deadline: Deadline = None):
+        """
+        Initialises a runner for a vehicle and scenario. The PANTEIA model should contain the vehicle information.
+
+        Parameters:
+            scenario (Scenario): The scenario that will be used in the calculations.
+            vehicle (Vehicle): The vehicle that will be used in the calculations.
+            PANTEIA_interface (PANTEIAInterface): The interface to the PANTEIA model.
+            extra_years_after_lifespan (int): The extra years after the lifespan a vehicle should be kept.
+            increase_factor_after_lifespan (float): The factor to increase maintenance costs after the lifespan.
+            transition_margin (float): The relative percentage to determine the transition threshold.
+            tax_percentage (float): The tax percentage of a company.
+            current_year (int): First year of calculation.
+            final_year (int): The year after the last year of calculation, the final year itself isn't calculated.
+            only_transition_year (bool): Whether only the transition year is calculated.
+            deadline (Deadline): The deadline of the request, defaults to no limit.
+        """
+
+        self.scenario = scenario
+        self.vehicle = vehicle
+        self.PANTEIA_interface = PANTEIA_interface
+        self.extra_years_after_lifespan = extra_years_after_lifespan
+        self.increase_factor_after_lifespan = increase_factor_after_lifespan
+        self.transition_margin = transition_margin
+        self.tax_percentage = tax_percentage
+        self.current_year = current_year
+        self.final_year = final_year
+        self.only_transition_year = only_transition_year
+        self.deadline = deadline or Deadline()
+        self.results = {}
+        self.calculated_years = 0
+
+    def calculate_TCO(self, strategies: dict):
+        """
+        Calculates the TCO values of the strategies.
+
+        Parameters:
+            strategies (dict): The strategies organised by name.
+
+        Returns:
+            dict: The calculated TCO values organised by strategy name and year.
+
+        Raises:
+            DeadlineExceeded: Raised if the deadline passed.
+            RequestCancelled: Raised if the request has been cancelled.
+        """
+
+        self.results = {name: {} for name in strategies}
+        self.calculated_years = 0
+
+        # Get vehicle age
+        original_vehicle_age = self.vehicle.get_current_age("Europe/Amsterdam")
+
+        # Get technological lifespan
+        lifespans = self.PANTEIA_interface.get_technological_lifespan()
+        electric_lifespan = lifespans.get("electric")
+        diesel_lifespan = lifespans.get("diesel")
+
+        # The state of the vehicle, which is shared by the strategies of a branch
+        current_fuel_type = self.vehicle.fuel_type
+        state = {
+            "vehicle_age": original_vehicle_age,
+            "fuel_type": current_fuel_type,
+            "lifespan": diesel_lifespan if current_fuel_type.lower() == "diesel" else electric_lifespan,  # TODO change to list of fuel types
+            "electric_lifespan": electric_lifespan,
+            "transition_year_reached": False
+        }
+
+        # Update fixed parameters
+        self.update_fixed_parameters(state, self.current_year)
+
+        # Some strategies update the model again before the first year
+        operations = {name: strategy.plan_start() for name, strategy in strategies.items()}
+        self.calculate_branches(strategies, state, operations, None, 0)
+
+        return self.results
+
+    def get_years(self):
+        """
+        Gets the years to calculate, from the current year up to but excluding the final year,
+        as far as the scenario has data.
+
+        Returns:
+            list: The years to calculate.
+        """
+
+        return [year for year in self.scenario.years if self.current_year <= year < self.final_year]
+
+    def is_fossil_fuel_type(self, fuel_type: str):
+        """
+        Checks if a fuel type is fossil, in the same way as the strategies check it.
+
+        Parameters:
+            fuel_type (str): The fuel type.
+
+        Returns:
+            bool: Whether the fuel type is fossil.
+        """
+
+        return fuel_type.capitalize() in self.list_of_fossil_fuel_types
+
+    def calculate_branches(self, strategies: dict, state: dict, operations: dict, year: int, year_index: int):
+        """
+        Executes the planned operations and continues with the next years.
+        The strategies are grouped by their operations, every group continues from the same state of the model.
+
+        Parameters:
+            strategies (dict): The strategies that share the state, organised by name.
+            state (dict): The state of the vehicle.
+            operations (dict): The planned operations organised by strategy name.
+            year (int): The year of the operations, or None before the first year.
+            year_index (int): The index of the year to continue with after the operations.
+        """
+
+        branches = {}
+        for name, strategy_operations in operations.items():
+            branches.setdefault(strategy_operations, {})[name] = strategies[name]
+
+        # Only fork the model if the strategies diverge
+        snapshot = self.PANTEIA_interface.take_snapshot() if len(branches) > 1 else None
+        for index, (branch_operations, branch_strategies) in enumerate(branches.items()):
+            self.deadline.check()
+            if index > 0:
+                self.PANTEIA_interface.restore_snapshot(snapshot)
+
+            branch_state = dict(state)
+            for operation in branch_operations:
+                self.execute_operation(operation, branch_state, year)
+
+            if year is not None:
+                self.finish_year(branch_strategies, branch_state, year)
+
+            self.calculate_years(branch_strategies, branch_state, year_index)
+
+    def calculate_years(self, strategies: dict, state: dict, year_index: int):
+        """
+        Calculates the years from a year index, until the strategies diverge.
+
+        Parameters:
+            strategies (dict): The strategies that share the state, organised by name.
+            state (dict): The state of the vehicle.
+            year_index (int): The index of the first year to calculate.
+        """
+
+        years = self.get_years()
+        for index in range(year_index, len(years)):
+            year = years[index]
+            self.deadline.check()
+
+            # The previous year was the transition year if the vehicle isn't fossil anymore, it doesn't switch back
+            if self.only_transition_year and index > 0 and not self.is_fossil_fuel_type(state["fuel_type"]):
+                return
+
+            # Get scenario data for current year
+            year_data = self.scenario.years[year]
+
+            # Update variable parameters
+            self.PANTEIA_interface.update_variable_parameters(year_data)
+
+            # Check if optimal mix is valid
+            is_optimal_mix_valid = self.PANTEIA_interface.is_optimal_mix_valid()
+
+            # Check if transition year has been reached, if one of the strategies depends on it
+            if not state["transition_year_reached"] and \
+               any(strategy.uses_transition_year for strategy in strategies.values()):
+                strategy = next(iter(strategies.values()))
+                state["transition_year_reached"] = strategy.transition_year_reached(self.transition_margin,
+                                                                                    self.PANTEIA_interface)
+
+            # Determine if vehicle needs to be changed
+            operations = {name: strategy.plan_replacement(state,
+                                                          self.vehicle,
+                                                          int(year),
+                                                          is_optimal_mix_valid,
+                                                          self.extra_years_after_lifespan)
+                          for name, strategy in strategies.items()}
+
+            if len(set(operations.values())) > 1:
+                self.calculate_branches(strategies, state, operations, year, index + 1)
+                return
+
+            for operation in next(iter(operations.values())):
+                self.execute_operation(operation, state, year)
+
+            self.finish_year(strategies, state, year)
+
+    def execute_operation(self, operation: str, state: dict, year: int):
+        """
+        Executes an operation that was planned by a strategy.
+
+        Parameters:
+            operation (str): The name of the operation.
+            state (dict): The state of the vehicle, which is updated.
+            year (int): The year of the operation, or None before the first year.
+        """
+
+        years = self.scenario.years
+
+        if operation == "update_current_year":
+            self.PANTEIA_interface.update_variable_parameters(years[self.current_year])
+
+        elif operation == "input_vehicle_data":
+            self.PANTEIA_interface.input_vehicle_data(self.vehicle)
+
+        elif operation in ("switch_to_electric", "switch_to_electric_with_residual_debt"):
+            residual_debt = 0
+            if operation == "switch_to_electric_with_residual_debt":
+                # Calculate residual debt
+                residual_debt = self.PANTEIA_interface.calculate_residual_debt(state["lifespan"], state["vehicle_age"])
+
+            # update parameters
+            state["fuel_type"] = "Elektrisch"
+            state["lifespan"] = state["electric_lifespan"]
+            state["vehicle_age"] = 0
+
+            # Update fixed parameters
+            self.update_fixed_parameters(state, year)
+
+            # add residual debt to vehicle price
+            if operation == "switch_to_electric_with_residual_debt":
+                self.PANTEIA_interface.update_price_electric_vehicle(self.vehicle.category, residual_debt)
+
+        elif operation == "renew_vehicle":
+            # Reset vehicle age
+            state["vehicle_age"] = 0
+
+            # Update fixed parameters
+            self.update_fixed_parameters(state, year)
+
+        else:
+            raise ValueError(f"Unknown operation: {operation}")
+
+    def update_fixed_parameters(self, state: dict, year: int):
+        """
+        Updates the fixed parameters for a new vehicle.
+        The residual values at the end of the lifespan are taken from the last year of the scenario
+        if the lifespan ends after it, which happens for vehicles that are bought late in a long horizon.
+
+        Parameters:
+            state (dict): The state of the vehicle.
+            year (int): The year in which the vehicle is bought.
+        """
+
+        years = self.scenario.years
+        residual_year = min(year + state["lifespan"], max(years))
+        self.PANTEIA_interface.update_fixed_parameters(state["lifespan"],
+                                                       self.vehicle.category,
+                                                       self.vehicle.charging_time_depot,
+                                                       self.vehicle.charging_time_public,
+                                                       self.tax_percentage,
+                                                       years[year],
+                                                       years[residual_year])
+
+    def finish_year(self, strategies: dict, state: dict, year: int):
+        """
+        Calculates the costs of a year after the vehicle has been replaced, these are the same for every strategy.
+
+        Parameters:
+            strategies (dict): The strategies that share the state, organised by name.
+            state (dict): The state of the vehicle, the vehicle age is incremented.
+            year (int): The year to calculate.
+        """
+
+        year_data = self.scenario.years[year]
+        strategy = next(iter(strategies.values()))
+        current_fuel_type = state["fuel_type"]
+        current_vehicle_age = state["vehicle_age"]
+        current_lifespan = state["lifespan"]
+
+        # Check if vehicle is past lifespan
+        if current_vehicle_age > current_lifespan:
+            strategy.increase_maintenance_costs(current_fuel_type,
+                                                current_vehicle_age,
+                                                current_lifespan,
+                                                self.increase_factor_after_lifespan,
+                                                self.PANTEIA_interface)
+
+            # decrease yearly depreciation costs, because vehicle is already paid off
+            self.PANTEIA_interface.decrease_yearly_depreciation_costs(current_fuel_type, current_vehicle_age)
+        else:
+            self.PANTEIA_interface.reset_yearly_depreciation_costs()
+
+        # Check costs for Zero Emission zones
+        if self.is_fossil_fuel_type(current_fuel_type) and \
+                self.vehicle.drives_in_future_ZE_zone and \
+                not strategy.is_allowed_in_ZE_zone(self.vehicle, current_vehicle_age, int(year)):
+            self.PANTEIA_interface.set_ZE_costs(year_data)
+        else:
+            self.PANTEIA_interface.reset_ZE_costs()
+
+        if self.only_transition_year:
+            # The transition year is the first year in which the vehicle isn't fossil, like in the TCO results
+            result = {"transition_year": 0 if self.is_fossil_fuel_type(current_fuel_type) else 1}
+        else:
+            # Read all result cells at once and check if exclusive charging at depot is possible
+            year_results = self.PANTEIA_interface.read_results()
+            is_exclusive_charging_at_depot_possible = year_results.is_exclusive_home_loading_valid
+
+            # workaround until bug solved
+            is_exclusive_charging_at_depot_possible = False
+
+            # Calculate TCO
+            result = strategy.get_results(current_fuel_type,
+                                          is_exclusive_charging_at_depot_possible,
+                                          self.PANTEIA_interface,
+                                          year_results)
+
+        # Append year results, every strategy gets its own copy
+        for name in strategies:
+            self.results[name][year] = dict(result)
+
+        # Increment age
+        state["vehicle_age"] += 1
+        self.calculated_years += 1
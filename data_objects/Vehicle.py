@@ -150,6 +150,33 @@ class Vehicle:
 
         return current_year - self.year_of_purchase
 
+    def get_model_inputs(self):
+
+        """Get the vehicle information that is used to calculate the TCO.
+        The number plate, PTO fuel consumption and loading times aren't used, so vehicles that only differ in
+        these have the same TCO.
+
+        :return: The vehicle information that is used to calculate the TCO.
+        :rtype: tuple
+        """
+
+        return (
+            self.type,
+            self.category,
+            self.fuel_type,
+            self.euronorm,
+            self.year_of_purchase,
+            self.is_cooled,
+            self.expected_total_distance_traveled_in_km,
+            self.maximum_daily_distance_in_km,
+            self.amount_of_operational_days,
+            self.drives_in_future_ZE_zone,
+            self.technological_lifespan,
+            self.charging_time_depot,
+            self.charging_time_public,
+            self.electricity_type
+        )
+
     def to_dict(self):
 
         """Get the vehicle information as a dictionary.
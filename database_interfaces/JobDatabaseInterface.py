@@ -0,0 +1,243 @@
+from contextlib import contextmanager
+from database_interfaces.AbstractDatabaseInterface import AbstractDatabaseInterface
+from time import time
+import os, pickle, sqlite3
+
+class JobDatabaseInterface(AbstractDatabaseInterface):
+    """
+    An interface for the SQLite database of the job queue.
+    The database and its table are created when they don't exist yet.
+    Every method uses its own connection, so the interface can be shared by the threads of the server.
+    The parameters and results of a job are pickled, so they're read back exactly as they were written.
+
+    Statuses:
+        queued: The job is waiting for a worker.
+        running: A worker is calculating the job.
+        finished: The result of the job can be read.
+        failed: The job raised an exception, its error can be read.
+    """
+
+    # The amount of seconds a connection waits for another connection to release the database
+    timeout: float = 30
+
+    def __init__(self, filename='./data/jobs.sqlite'):
+        """
+        Initialises the database interface, the database is created if it doesn't exist.
+
+        Raises:
+            NoDatabaseFileFound: Raised if the database file can't be found or initialised.
+        """
+
+        # Create the database and the table of the jobs
+        directory = os.path.dirname(filename)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with closing_connection(filename, self.timeout) as connection:
+            connection.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    parameters BLOB NOT NULL,
+                    progress_done INTEGER NOT NULL DEFAULT 0,
+                    progress_total INTEGER NOT NULL DEFAULT 0,
+                    result BLOB,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL
+                )""")
+            connection.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at)")
+
+        super().__init__(filename)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Opens a connection for the duration of a with-block, the database is locked for writing immediately.
+        The changes are committed at the end of the block, or rolled back if it raises an exception.
+
+        Yields:
+            sqlite3.Connection: The connection of the transaction.
+        """
+
+        with closing_connection(self.filename, self.timeout) as connection:
+            connection.execute("BEGIN IMMEDIATE")
+            try:
+                yield connection
+            except BaseException:
+                connection.execute("ROLLBACK")
+                raise
+            connection.execute("COMMIT")
+
+    def insert_job(self, job_id: str, parameters: any, progress_total: int = 0):
+        """
+        Inserts a queued job.
+
+        Parameters:
+            job_id (str): The id of the job.
+            parameters (any): The parameters of the job, which are given to the worker.
+            progress_total (int): The amount of vehicles of the job.
+        """
+
+        with self.transaction() as connection:
+            connection.execute("INSERT INTO jobs (id, status, parameters, progress_total, created_at) "
+                               "VALUES (?, 'queued', ?, ?, ?)",
+                               (job_id, pickle.dumps(parameters), progress_total, time()))
+
+    def claim_next_job(self):
+        """
+        Claims the oldest queued job, its status becomes running.
+
+        Returns:
+            tuple: The id and parameters of the job.
+            None: There is no queued job.
+        """
+
+        with self.transaction() as connection:
+            row = connection.execute("SELECT id, parameters FROM jobs WHERE status = 'queued' "
+                                     "ORDER BY created_at LIMIT 1").fetchone()
+            if row is None:
+                return None
+
+            connection.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?", (time(), row[0]))
+
+        return row[0], pickle.loads(row[1])
+
+    def update_progress(self, job_id: str, progress_done: int, progress_total: int):
+        """
+        Updates the progress of a running job.
+
+        Parameters:
+            job_id (str): The id of the job.
+            progress_done (int): The amount of calculated vehicles.
+            progress_total (int): The amount of vehicles of the job.
+        """
+
+        with self.transaction() as connection:
+            connection.execute("UPDATE jobs SET progress_done = ?, progress_total = ? WHERE id = ?",
+                               (progress_done, progress_total, job_id))
+
+    def finish_job(self, job_id: str, result: any):
+        """
+        Stores the result of a job, its status becomes finished.
+
+        Parameters:
+            job_id (str): The id of the job.
+            result (any): The result of the job.
+        """
+
+        with self.transaction() as connection:
+            connection.execute("UPDATE jobs SET status = 'finished', result = ?, progress_done = progress_total, "
+                               "finished_at = ? WHERE id = ?",
+                               (pickle.dumps(result), time(), job_id))
+
+    def fail_job(self, job_id: str, error: str):
+        """
+        Stores the error of a job, its status becomes failed.
+
+        Parameters:
+            job_id (str): The id of the job.
+            error (str): The error that was raised by the job.
+        """
+
+        with self.transaction() as connection:
+            connection.execute("UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE id = ?",
+                               (error, time(), job_id))
+
+    def read_job(self, job_id: str):
+        """
+        Reads the status and progress of a job, without its parameters and result.
+
+        Parameters:
+            job_id (str): The id of the job.
+
+        Returns:
+            dict: The status, progress, error and timestamps of the job.
+            None: The job doesn't exist.
+        """
+
+        with closing_connection(self.filename, self.timeout) as connection:
+            row = connection.execute("SELECT id, status, progress_done, progress_total, error, "
+                                     "created_at, started_at, finished_at FROM jobs WHERE id = ?",
+                                     (job_id,)).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            "id": row[0],
+            "status": row[1],
+            "progress": {
+                "vehicles_done": row[2],
+                "vehicles_total": row[3]
+            },
+            "error": row[4],
+            "created_at": row[5],
+            "started_at": row[6],
+            "finished_at": row[7]
+        }
+
+    def read_job_result(self, job_id: str):
+        """
+        Reads the result of a finished job.
+
+        Parameters:
+            job_id (str): The id of the job.
+
+        Returns:
+            any: The result of the job.
+            None: The job doesn't exist or hasn't finished.
+        """
+
+        with closing_connection(self.filename, self.timeout) as connection:
+            row = connection.execute("SELECT result FROM jobs WHERE id = ? AND status = 'finished'",
+                                     (job_id,)).fetchone()
+
+        return None if row is None else pickle.loads(row[0])
+
+    def requeue_running_jobs(self):
+        """
+        Queues the running jobs again, for example because the server stopped while they were calculated.
+
+        Returns:
+            int: The amount of jobs that have been queued again.
+        """
+
+        with self.transaction() as connection:
+            return connection.execute("UPDATE jobs SET status = 'queued', progress_done = 0, started_at = NULL "
+                                      "WHERE status = 'running'").rowcount
+
+    def delete_jobs_finished_before(self, timestamp: float):
+        """
+        Deletes the finished and failed jobs that finished before a moment.
+
+        Parameters:
+            timestamp (float): The moment as seconds since the epoch.
+
+        Returns:
+            int: The amount of deleted jobs.
+        """
+
+        with self.transaction() as connection:
+            return connection.execute("DELETE FROM jobs WHERE status IN ('finished', 'failed') AND finished_at < ?",
+                                      (timestamp,)).rowcount
+
+
+@contextmanager
+def closing_connection(filename: str, timeout: float):
+    """
+    Opens a connection for the duration of a with-block, transactions are controlled by the queries.
+
+    Parameters:
+        filename (str): The filename of the database.
+        timeout (float): The amount of seconds to wait for another connection to release the database.
+
+    Yields:
+        sqlite3.Connection: The connection.
+    """
+
+    connection = sqlite3.connect(filename, timeout=timeout, isolation_level=None)
+    try:
+        yield connection
+    finally:
+        connection.close()
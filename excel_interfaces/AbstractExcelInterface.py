@@ -8,6 +8,9 @@ class AbstractExcelInterface:
     file_name: str = None
     excel_model: ExcelCompiler = None
 
+    # The addresses of the cells that can be changed, these are validated once when the model is compiled
+    input_cell_addresses: frozenset = None
+
     def __init__(self, path_to_excel, error: Exception=NoExcelFileFound):
 
         """Initialises an interface for an Excel file.
@@ -62,6 +65,23 @@ class AbstractExcelInterface:
             # When it fails, return nothing
             raise LinkedSheetError
 
+    def get_cell_values(self, addresses: tuple):
+
+        """Gets the values of multiple cells at once.
+        The cells are evaluated in a single pass, so the cells they share are only calculated once.
+
+        :param addresses: The addresses of the cells, including the sheet. Example: ("Model parameters!E4",).
+        :type addresses: tuple
+
+        :return: The values of the cells, in the same order as the addresses.
+        :rtype: tuple
+        """
+
+        try:
+            return tuple(self.excel_model.evaluate(list(addresses)))
+        except NotImplementedError:
+            raise LinkedSheetError
+
     def set_cell_value(self, sheet_name: str, cell_address: str, value: any):
 
         """Sets the value of the specified cell in memory.
@@ -78,8 +98,75 @@ class AbstractExcelInterface:
         :rtype: None
         """
 
+        self.set_cell_values({f"{sheet_name}!{cell_address}": value})
+
+    def set_cell_values(self, values: dict):
+
+        """Sets the values of multiple cells in memory at once.
+        Values that didn't change are skipped and the dependent cells are invalidated once for the whole batch.
+        NOTE: This doesn't actually change the values in the file.
+
+        :param values: The values organised by address, including the sheet. Example: {"Model parameters!E4": 30000}.
+        :type values: dict
+
+        :raise PANTEIAModelError: Raised if one of the cells can't be changed.
+
+        :return: Nothing
+        :rtype: None
+        """
+
+        changed_cells = []
         try:
-            self.get_cell_value(sheet_name, cell_address)
-            self.excel_model.set_value(f"{sheet_name}!{cell_address}", value)
+            for address, value in values.items():
+                # Cells are only evaluated to check whether they exist if the addresses weren't validated before
+                if self.input_cell_addresses is None:
+                    self.excel_model.evaluate(address)
+                elif address not in self.input_cell_addresses:
+                    raise PANTEIAModelError
+
+                cell = self.excel_model.cell_map[address]
+                if cell.value != value:
+                    cell.value = value
+                    changed_cells.append(cell)
         except:
             raise PANTEIAModelError
+
+        # Invalidate every cell that depends on the changed cells. Unlike pycel's own reset,
+        # this also happens when a cell is emptied, pycel would keep the dependent values in that case
+        dependency_graph = self.excel_model.dep_graph
+        cells_to_check = [child_cell for cell in changed_cells if cell in dependency_graph
+                          for child_cell in dependency_graph.successors(cell)]
+        while cells_to_check:
+            cell = cells_to_check.pop()
+            if cell.value is not None:
+                cell.value = None
+                cells_to_check.extend(dependency_graph.successors(cell))
+
+    def take_snapshot(self):
+
+        """Captures the values of all cells in the model, including the calculated values.
+        The snapshot can be restored in one operation, which is faster than setting every cell again.
+
+        :return: The values of the cells, organised by address.
+        :rtype: dict
+        """
+
+        return {address: cell.value for address, cell in self.excel_model.cell_map.items()}
+
+    def restore_snapshot(self, snapshot: dict):
+
+        """Restores the values of all cells to a snapshot, without recalculating anything.
+        Formulas and ranges that were added to the model after the snapshot are calculated again when they're read.
+
+        :param snapshot: The snapshot that was taken with take_snapshot.
+        :type snapshot: dict
+
+        :return: Nothing
+        :rtype: None
+        """
+
+        for address, cell in self.excel_model.cell_map.items():
+            if address in snapshot:
+                cell.value = snapshot[address]
+            elif cell.formula is not None or cell.address.is_range:
+                cell.value = None
@@ -0,0 +1,563 @@
+from excel_interfaces.PANTEIAInterface import PANTEIAInterface
+from exceptions import NoPANTEIAModelFound, PANTEIAModelError
+from importlib.util import module_from_spec, spec_from_file_location
+from Logger import Logger
+from os import getpid, makedirs, replace
+from os.path import isfile
+from pickle import loads
+from pycel.excelutil import AddressRange
+from re import sub
+
+import ast
+
+
+# The header of every generated module, the formulas use the Excel functions of pycel
+GENERATED_MODULE_HEADER = '''"""
+Generated from {model_path} (sha256 {model_hash}) by excel_interfaces/GeneratedPANTEIAInterface.py.
+Every function calculates a group of cells in topological order, the comments show the formula of every cell.
+Do not edit this file, it's generated again when the PANTEIA model changes.
+"""
+
+from importlib import import_module
+from pycel.excelformula import ExcelFormula
+from pycel.excelutil import build_operator_operand_fixup, EMPTY, list_like
+from pycel.lib.function_helpers import load_functions
+
+MODEL_HASH = "{model_hash}"
+
+# Load the Excel functions the same way pycel does, including the conversion of their parameters
+load_functions({function_names}, globals(), tuple(import_module(module) for module in ExcelFormula.default_modules))
+excel_operator_operand_fixup = build_operator_operand_fixup(lambda is_exception, message: None)
+
+
+def to_cell_value(value):
+    # Empty results become zero and arrays are reduced to their first element, like pycel does
+    if value in (None, EMPTY):
+        return 0
+    if list_like(value):
+        return value[0][0] if list_like(value[0]) else value[0]
+    return value
+
+'''
+
+
+def get_variable_name(address: str):
+
+    """Gets the name of the variable of a cell in the generated module.
+
+    :param address: The address of the cell, including the sheet. Example: Model parameters!B25.
+    :type address: str
+
+    :return: The name of the variable. Example: Model_parameters_B25.
+    :rtype: str
+    """
+
+    return sub(r"\W", "_", address)
+
+
+class ModelCodeGenerator:
+
+    def __init__(self, cell_map: dict, input_addresses: tuple):
+
+        """Generates a Python module that calculates the cells of a compiled PANTEIA model.
+        The Python code of every formula is taken from pycel, the references to other cells are replaced by
+        variables, parameters or constants.
+
+        :param cell_map: The cells of the compiled model, organised by address.
+        :type cell_map: dict
+        :param input_addresses: The addresses of the input cells, these become the parameters of every function.
+        :type input_addresses: tuple
+
+        :return: An instance of ModelCodeGenerator.
+        :rtype: ModelCodeGenerator
+        """
+
+        self.cell_map = cell_map
+        self.input_addresses = input_addresses
+        self.function_names = set()
+
+    def is_formula(self, address: str):
+
+        """Gets whether a cell is calculated by a formula.
+
+        :param address: The address of the cell, including the sheet.
+        :type address: str
+
+        :return: Whether the cell is calculated.
+        :rtype: bool
+        """
+
+        cell = self.cell_map.get(address)
+        return address not in self.input_addresses and cell is not None and cell.formula is not None
+
+    def get_tree(self, address: str):
+
+        """Parses the Python code of a formula that pycel generated.
+
+        :param address: The address of the cell, including the sheet.
+        :type address: str
+
+        :return: The parsed expression.
+        :rtype: ast.expr
+        """
+
+        return ast.parse(self.cell_map[address].formula.python_code, mode="eval").body
+
+    def get_precedents(self, address: str):
+
+        """Gets the addresses of the cells that a formula refers to, ranges are expanded into their cells.
+
+        :param address: The address of the cell, including the sheet.
+        :type address: str
+
+        :return: The addresses of the cells.
+        :rtype: list
+        """
+
+        precedents = []
+        for node in ast.walk(self.get_tree(address)):
+            if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "_C_":
+                precedents.append(node.args[0].value)
+            elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == "_R_":
+                precedents.extend(cell_address.address
+                                  for row in AddressRange(node.args[0].value).resolve_range
+                                  for cell_address in row)
+
+        return precedents
+
+    def get_calculation_order(self, addresses: tuple, calculated_addresses: tuple = ()):
+
+        """Gets the formulas that are needed to calculate cells, in topological order.
+
+        :param addresses: The addresses of the cells to calculate.
+        :type addresses: tuple
+        :param calculated_addresses: The addresses of the formulas that are already calculated.
+        :type calculated_addresses: tuple
+
+        :return: The addresses of the formulas, every formula comes after the formulas it refers to.
+        :rtype: list
+        """
+
+        order = []
+        visited = set(calculated_addresses)
+
+        def visit(address: str):
+            if address in visited or not self.is_formula(address):
+                return
+            visited.add(address)
+            for precedent in self.get_precedents(address):
+                visit(precedent)
+            order.append(address)
+
+        for address in addresses:
+            visit(address)
+
+        return order
+
+    def get_parameter_formula_addresses(self, addresses: tuple, sheet_name: str):
+
+        """Gets the formulas that only depend on the input cells of a single sheet, in topological order.
+
+        :param addresses: The addresses of the cells to calculate.
+        :type addresses: tuple
+        :param sheet_name: The name of the sheet.
+        :type sheet_name: str
+
+        :return: The addresses of the formulas.
+        :rtype: list
+        """
+
+        parameter_addresses = []
+        for address in self.get_calculation_order(addresses):
+            if all(not self.is_formula(precedent) and
+                   (precedent not in self.input_addresses or precedent.startswith(f"{sheet_name}!")) or
+                   precedent in parameter_addresses
+                   for precedent in self.get_precedents(address)):
+                parameter_addresses.append(address)
+
+        return parameter_addresses
+
+    def get_reference_code(self, address: str):
+
+        """Gets the code that refers to a cell: a variable, a parameter or a constant.
+
+        :param address: The address of the cell, including the sheet.
+        :type address: str
+
+        :return: The code of the reference.
+        :rtype: str
+        """
+
+        if address in self.input_addresses or self.is_formula(address):
+            return get_variable_name(address)
+
+        cell = self.cell_map.get(address)
+        return repr(None if cell is None else cell.value)
+
+    def get_code(self, node: ast.expr):
+
+        """Converts an expression of pycel into plain Python code.
+        Operators are replaced by the operator function of pycel, which converts the operands like Excel does.
+
+        :param node: The expression.
+        :type node: ast.expr
+
+        :return: The code of the expression.
+        :rtype: str
+        """
+
+        if isinstance(node, ast.Constant):
+            return repr(node.value)
+
+        if isinstance(node, ast.BinOp):
+            return f"excel_operator_operand_fixup({self.get_code(node.left)}, " \
+                   f"'{type(node.op).__name__}', {self.get_code(node.right)})"
+
+        if isinstance(node, ast.Compare):
+            return f"excel_operator_operand_fixup({self.get_code(node.left)}, " \
+                   f"'{type(node.ops[0]).__name__}', {self.get_code(node.comparators[0])})"
+
+        if isinstance(node, ast.UnaryOp):
+            return f"excel_operator_operand_fixup(EMPTY, '{type(node.op).__name__}', {self.get_code(node.operand)})"
+
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+            if node.func.id == "_C_":
+                return self.get_reference_code(node.args[0].value)
+
+            if node.func.id == "_R_":
+                rows = (", ".join(self.get_reference_code(cell_address.address) for cell_address in row)
+                        for row in AddressRange(node.args[0].value).resolve_range)
+                return "(" + "".join(f"({row},), " for row in rows) + ")"
+
+            self.function_names.add(node.func.id)
+            return f"{node.func.id}({', '.join(self.get_code(argument) for argument in node.args)})"
+
+        raise PANTEIAModelError
+
+    def get_function_code(self, name: str, addresses: tuple, parameter_addresses: tuple, calculated_addresses: tuple):
+
+        """Generates a function that calculates a group of cells.
+
+        :param name: The name of the group, the function is named calculate_{name}.
+        :type name: str
+        :param addresses: The addresses of the cells in the group.
+        :type addresses: tuple
+        :param parameter_addresses: The addresses of the cells that become the parameters of the function.
+        :type parameter_addresses: tuple
+        :param calculated_addresses: The addresses of the formulas that are calculated by another function.
+        :type calculated_addresses: tuple
+
+        :return: The code of the function, which returns the values of the cells in the same order.
+        :rtype: str
+        """
+
+        parameters = "".join(f"\n        {get_variable_name(address)}," for address in parameter_addresses)
+        lines = [f"def calculate_{name}({parameters}\n):"]
+
+        for address in self.get_calculation_order(addresses, calculated_addresses):
+            lines.append(f"    # {address}: {self.cell_map[address].formula.python_code}")
+            lines.append(f"    {get_variable_name(address)} = to_cell_value({self.get_code(self.get_tree(address))})")
+
+        results = "".join(f"\n        {self.get_reference_code(address)}," for address in addresses)
+        lines.append(f"    return ({results}\n    )")
+        return "\n".join(lines) + "\n"
+
+    def get_module_code(self, model_path: str, model_hash: str, cell_groups: dict, parameter_sheet_name: str):
+
+        """Generates the code of the module that calculates the groups of cells.
+        The formulas that only depend on the parameter sheet are calculated by a separate function,
+        so they're only calculated again when a parameter changes.
+
+        :param model_path: The path to the PANTEIA model.
+        :type model_path: str
+        :param model_hash: The hash of the PANTEIA model.
+        :type model_hash: str
+        :param cell_groups: The addresses of the cells to calculate, organised by the name of the group.
+        :type cell_groups: dict
+        :param parameter_sheet_name: The name of the sheet with the parameters.
+        :type parameter_sheet_name: str
+
+        :return: The code of the module.
+        :rtype: str
+        """
+
+        group_addresses = tuple(address for addresses in cell_groups.values() for address in addresses)
+        parameter_input_addresses = tuple(address for address in self.input_addresses
+                                          if address.startswith(f"{parameter_sheet_name}!"))
+        parameter_addresses = tuple(self.get_parameter_formula_addresses(group_addresses, parameter_sheet_name))
+
+        functions = [self.get_function_code("parameters", parameter_addresses, parameter_input_addresses, ())]
+        functions.extend(self.get_function_code(name, addresses,
+                                                self.input_addresses + parameter_addresses,
+                                                parameter_addresses)
+                         for name, addresses in cell_groups.items())
+
+        input_values = "".join(f"\n    {address!r}: {self.cell_map[address].value!r},"
+                               for address in self.input_addresses)
+        header = GENERATED_MODULE_HEADER.format(model_path=model_path,
+                                                model_hash=model_hash,
+                                                function_names=tuple(sorted(self.function_names)))
+
+        return header + \
+            f"# The values of the input cells in the PANTEIA model, in the order of the parameters\n" \
+            f"INPUT_VALUES = {{{input_values}\n}}\n\n" \
+            f"# The input cells and the results of calculate_parameters, in the order of the parameters\n" \
+            f"PARAMETER_INPUT_ADDRESSES = {parameter_input_addresses!r}\n" \
+            f"PARAMETER_ADDRESSES = {parameter_addresses!r}\n\n\n" + \
+            "\n\n".join(functions)
+
+
+class GeneratedPANTEIAInterface(PANTEIAInterface):
+
+    # The module that is generated from the compiled PANTEIA model
+    generated_model = None
+
+    # The cells that are calculated together, organised by the name of their group.
+    # The validity of the scenarios is part of the results, as the results are usually read right after it
+    cell_groups: dict = {
+        "results": PANTEIAInterface.result_addresses,
+        "vehicle": (f"{PANTEIAInterface.ondernemers_calc_tab_name}!B6",
+                    f"{PANTEIAInterface.ondernemers_calc_tab_name}!I39")
+    }
+
+    # The constants of the compiled model and the group of every calculated cell
+    constant_values: dict = None
+    cell_group_names: dict = None
+
+    def __init__(self):
+
+        """Initialises an interface for a PANTEIA model that calculates the formulas with a generated module.
+        The module is generated from the compiled PANTEIA model, so the results are identical to those of pycel.
+        "Changing" a value only edits memory.
+
+        :raise NoPANTEIAModelFound: Raised if the PANTEIA model can't be found or initialised.
+
+        :return: An instance of GeneratedPANTEIAInterface.
+        :rtype: GeneratedPANTEIAInterface
+        """
+
+        self.PANTEIA_model_path = "./PANTEIA_TCO_model.xlsm"
+
+        # Check if template model exists
+        PANTEIA_model_found = isfile(self.PANTEIA_model_path)
+        if not PANTEIA_model_found:
+            raise NoPANTEIAModelFound
+
+        # Import the generated module, it's only generated when the PANTEIA model has changed
+        try:
+            if self.generated_model is None:
+                self.load_generated_model()
+        except Exception:
+            raise NoPANTEIAModelFound
+
+        self.cell_values = dict(self.generated_model.INPUT_VALUES)
+        self.parameter_values = None
+        self.group_values = {}
+
+        # Reset values before starting
+        self.reset_values()
+        self.save_default_snapshot()
+
+    @classmethod
+    def load_generated_model(cls):
+
+        """Imports the module that is generated from the compiled PANTEIA model.
+        The module is saved per hash of the compiled PANTEIA model, so it's only generated again when it changes.
+
+        :raise NoPANTEIAModelFound: Raised if the PANTEIA model can't be found.
+
+        :return: The path to the generated module.
+        :rtype: str
+        """
+
+        if PANTEIAInterface.compiled_model is None:
+            PANTEIAInterface.load_compiled_model()
+
+        model_hash = PANTEIAInterface.compiled_model_hash
+        module_name = f"PANTEIA_TCO_model_{model_hash}_{PANTEIAInterface.compiled_model_configuration_hash}"
+        generated_model_path = f"{cls.compiled_model_directory}/{module_name}.py"
+
+        if isfile(generated_model_path):
+            Logger.warning(f"Loading generated PANTEIA model from {generated_model_path}")
+        else:
+            Logger.warning(f"No generated PANTEIA model found for hash {model_hash}, "
+                           f"generating the PANTEIA model to {generated_model_path}")
+            cell_map = loads(PANTEIAInterface.compiled_model).cell_map
+            generator = ModelCodeGenerator(cell_map, tuple(cls.get_input_cell_addresses()))
+            module_code = generator.get_module_code(cls.PANTEIA_model_path, model_hash, cls.cell_groups,
+                                                    cls.model_parameters_tab_name)
+
+            # Write to a temporary file first, so other processes never read a partial module
+            makedirs(cls.compiled_model_directory, exist_ok=True)
+            temporary_path = f"{generated_model_path}.{getpid()}.tmp"
+            with open(temporary_path, "w") as file:
+                file.write(module_code)
+            replace(temporary_path, generated_model_path)
+
+        specification = spec_from_file_location(module_name, generated_model_path)
+        generated_model = module_from_spec(specification)
+        specification.loader.exec_module(generated_model)
+
+        cls.generated_model = generated_model
+        cls.constant_values = {address: cell.value for address, cell in loads(PANTEIAInterface.compiled_model).cell_map.items()
+                               if cell.formula is None and not cell.address.is_range}
+        cls.cell_group_names = {address: name for name, addresses in reversed(cls.cell_groups.items())
+                                for address in addresses}
+
+        return generated_model_path
+
+    def check_sheet_names(self, names: list):
+
+        """Gets the first sheet name of which the PANTEIA model has values.
+
+        :param names: The sheet names to check.
+        :type names: list
+
+        :return: The first sheet name that exists, or None.
+        :rtype: str or None
+        """
+
+        for name in names:
+            if any(address.startswith(f"{name}!") for address in self.constant_values):
+                return name
+
+        return None
+
+    def calculate_group(self, name: str):
+
+        """Calculates a group of cells with the generated module, unless they're already calculated.
+        The formulas of the parameters are only calculated again when a parameter has changed.
+
+        :param name: The name of the group.
+        :type name: str
+
+        :return: The values of the cells in the group.
+        :rtype: tuple
+        """
+
+        values = self.group_values.get(name)
+        if values is None:
+            if self.parameter_values is None:
+                self.parameter_values = self.generated_model.calculate_parameters(
+                    *(self.cell_values[address] for address in self.generated_model.PARAMETER_INPUT_ADDRESSES))
+
+            values = getattr(self.generated_model, f"calculate_{name}")(*self.cell_values.values(),
+                                                                        *self.parameter_values)
+            self.group_values[name] = values
+
+        return values
+
+    def get_cell_value(self, sheet_name: str, cell_address: str, backup_sheet_name: str = None):
+
+        """Gets the value of the specified cell. Formulas are calculated when an input has changed.
+
+        :param sheet_name: The name of the Excel Worksheet.
+        :type: str
+        :param cell_address: The address of the cell. Consists of a column and row number. Example: A14.
+        :type: str
+
+        :raise PANTEIAModelError: Raised if the cell isn't in the generated module.
+
+        :return: The value of the cell.
+        :rtype: any
+        """
+
+        address = f"{sheet_name}!{cell_address}"
+
+        if address in self.cell_values:
+            return self.cell_values[address]
+
+        name = self.cell_group_names.get(address)
+        if name is not None:
+            return self.calculate_group(name)[self.cell_groups[name].index(address)]
+
+        if address in self.constant_values:
+            return self.constant_values[address]
+
+        raise PANTEIAModelError
+
+    def get_cell_values(self, addresses: tuple):
+
+        """Gets the values of multiple cells at once. Every group of cells is calculated at most once.
+
+        :param addresses: The addresses of the cells, including the sheet. Example: ("Model parameters!E4",).
+        :type addresses: tuple
+
+        :raise PANTEIAModelError: Raised if one of the cells isn't in the generated module.
+
+        :return: The values of the cells, in the same order as the addresses.
+        :rtype: tuple
+        """
+
+        for name, group_addresses in self.cell_groups.items():
+            if addresses == group_addresses:
+                return self.calculate_group(name)
+
+        return tuple(self.get_cell_value(*address.split("!")) for address in addresses)
+
+    def set_cell_values(self, values: dict):
+
+        """Sets the values of multiple cells in memory at once.
+        Values that didn't change are skipped, the calculated groups are only discarded when a value changed.
+
+        :param values: The values organised by address, including the sheet. Example: {"Model parameters!E4": 30000}.
+        :type values: dict
+
+        :raise PANTEIAModelError: Raised if one of the cells isn't an input cell.
+
+        :return: Nothing
+        :rtype: None
+        """
+
+        for address, value in values.items():
+            if address not in self.cell_values:
+                raise PANTEIAModelError
+
+            if self.cell_values[address] != value:
+                self.cell_values[address] = value
+                self.group_values = {}
+                if address.startswith(f"{self.model_parameters_tab_name}!"):
+                    self.parameter_values = None
+
+    def get_input_values(self):
+
+        """Gets the current values of the input cells, which identify the results in the cache.
+        The types are included, because Excel doesn't treat 1 and TRUE the same while Python does.
+
+        :return: The values of the input cells followed by their types, in the order of input_addresses.
+        :rtype: tuple
+        """
+
+        values = tuple(self.cell_values.get(address) for address in self.input_addresses)
+        return values + tuple(map(type, values))
+
+    def take_snapshot(self):
+
+        """Captures the values of the input cells, the parameters and the calculated groups.
+
+        :return: The values of the cells and the calculated groups.
+        :rtype: dict
+        """
+
+        return {
+            "cell_values": dict(self.cell_values),
+            "parameter_values": self.parameter_values,
+            "group_values": dict(self.group_values)
+        }
+
+    def restore_snapshot(self, snapshot: dict):
+
+        """Restores the values of all cells to a snapshot, without recalculating anything.
+        The price of the vehicle is read again, because the snapshot can have other fixed parameters.
+
+        :param snapshot: The snapshot that was taken with take_snapshot.
+        :type snapshot: dict
+
+        :return: Nothing
+        :rtype: None
+        """
+
+        self.diesel_vehicle_price = None
+        self.cell_values = dict(snapshot["cell_values"])
+        self.parameter_values = snapshot["parameter_values"]
+        self.group_values = dict(snapshot["group_values"])
@@ -0,0 +1,1171 @@
+from excel_interfaces.PANTEIAInterface import PANTEIAInterface
+from exceptions import NoPANTEIAModelFound, PANTEIAModelError
+from functools import lru_cache
+from openpyxl import load_workbook
+from openpyxl.utils.cell import get_column_letter, range_boundaries
+from os.path import isfile
+
+
+# Prefixes of the cell addresses, formatted like the addresses used by pycel
+ONDERNEMERS = "TCO module ondernemers!"
+BELEIDSMAKERS = "TCO module beleidsmakers!"
+ONDERNEMERS_CALC = "ondernemers_calc!"
+BELEIDSMAKERS_CALC = "beleidsmakers_calc!"
+MODEL_PARAMETERS = "Model parameters!"
+
+# Excel error codes, these are returned as the value of a cell just like pycel does
+NA_ERROR = "#N/A"
+DIV0_ERROR = "#DIV/0!"
+VALUE_ERROR = "#VALUE!"
+REF_ERROR = "#REF!"
+ERROR_CODES = (NA_ERROR, DIV0_ERROR, VALUE_ERROR, REF_ERROR, "#NUM!", "#NAME?", "#NULL!")
+
+SCENARIO_VALID = "Scenario valid"
+NOT_ENOUGH_POWER = "No, please increase the power"
+
+
+class CellError(Exception):
+
+    def __init__(self, error_code: str):
+
+        """An Excel error that occurred while calculating a formula.
+        It propagates through the formulas that use the cell, like Excel does.
+
+        :param error_code: The Excel error code, for example #N/A.
+        :type error_code: str
+        """
+
+        super().__init__(error_code)
+        self.error_code = error_code
+
+
+@lru_cache(maxsize=None)
+def get_range_addresses(reference: str):
+
+    """Gets the addresses of all cells in a range, organised by row.
+
+    :param reference: The range, including the sheet. Example: Model parameters!B25:H27.
+    :type reference: str
+
+    :return: The addresses of the cells in the range.
+    :rtype: tuple
+    """
+
+    sheet_name, cell_range = reference.split("!")
+    first_column, first_row, last_column, last_row = range_boundaries(cell_range)
+    return tuple(
+        tuple(f"{sheet_name}!{get_column_letter(column)}{row}" for column in range(first_column, last_column + 1))
+        for row in range(first_row, last_row + 1)
+    )
+
+
+def to_number(value: any):
+
+    """Converts a cell value into a number, like Excel does when calculating.
+
+    :param value: The value of a cell.
+    :type value: any
+
+    :raise CellError: Raised if the value can't be used as a number.
+
+    :return: The value as a number.
+    :rtype: int or float
+    """
+
+    if value is None:
+        return 0
+    if isinstance(value, bool):
+        return int(value)
+    if isinstance(value, (int, float)):
+        return value
+    if value in ERROR_CODES:
+        raise CellError(value)
+    try:
+        return float(value)
+    except ValueError:
+        raise CellError(VALUE_ERROR)
+
+
+def is_equal(value: any, other_value: any):
+
+    """Compares two cell values, like the = operator in Excel. Text is compared case insensitive.
+
+    :return: Whether the values are equal.
+    :rtype: bool
+    """
+
+    if isinstance(value, str) and isinstance(other_value, str):
+        return value.lower() == other_value.lower()
+    if value is None:
+        value = "" if isinstance(other_value, str) else 0
+    if other_value is None:
+        other_value = "" if isinstance(value, str) else 0
+    return value == other_value
+
+
+def calculate_sum(*values: any):
+
+    """Sums the values like the SUM function in Excel. Empty cells and text are skipped, errors propagate.
+
+    :return: The sum of the values.
+    :rtype: int or float
+    """
+
+    total = 0
+    for value in values:
+        if value in ERROR_CODES:
+            raise CellError(value)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            total += value
+    return total
+
+
+def calculate_sum_if(sum_values: tuple, *criteria: tuple):
+
+    """Sums the values of which all criteria match, like the SUMIFS function in Excel.
+
+    :param sum_values: The values to sum.
+    :type sum_values: tuple
+    :param criteria: Tuples of the values to check and the value they should be equal to.
+    :type criteria: tuple
+
+    :return: The sum of the matching values.
+    :rtype: int or float
+    """
+
+    matching_values = [
+        value for index, value in enumerate(sum_values)
+        if all(criterion_values[index] is not None and is_equal(criterion_values[index], criterion)
+               for criterion_values, criterion in criteria)
+    ]
+    return sum(value for value in matching_values if isinstance(value, (int, float)))
+
+
+def find_index(values: tuple, row_number: any, column_number: any = None):
+
+    """Gets a value from a range by its position, like the INDEX function in Excel.
+
+    :param values: The values of the range, organised by row.
+    :type values: tuple
+    :param row_number: The position of the row, starting at 1.
+    :type row_number: int
+    :param column_number: The position of the column, starting at 1.
+    :type column_number: int
+
+    :raise CellError: Raised if the position is outside of the range.
+
+    :return: The value at the position.
+    :rtype: any
+    """
+
+    # A single row or column can be indexed with one position
+    if column_number is None:
+        if len(values) == 1:
+            row_number, column_number = 1, row_number
+        else:
+            column_number = 1
+
+    row_number = int(to_number(row_number))
+    column_number = int(to_number(column_number))
+    if row_number < 0 or column_number < 0:
+        raise CellError(VALUE_ERROR)
+    if row_number > len(values) or column_number > len(values[0]):
+        raise CellError(REF_ERROR)
+
+    # Position zero selects the entire row or column, the formulas only use the first cell of it
+    row_number = max(row_number, 1)
+    column_number = max(column_number, 1)
+
+    value = values[row_number - 1][column_number - 1]
+    if value in ERROR_CODES:
+        raise CellError(value)
+    return value
+
+
+def find_column_values(values: tuple, row_number: any):
+
+    """Gets the values of a column by their position, like the INDEX function in Excel.
+    Position zero selects all values of the column instead of a single one.
+
+    :param values: The values of the column, organised by row.
+    :type values: tuple
+    :param row_number: The position of the row, starting at 1.
+    :type row_number: int
+
+    :raise CellError: Raised if the position is outside of the column.
+
+    :return: The selected values.
+    :rtype: tuple
+    """
+
+    if to_number(row_number) == 0:
+        return tuple(find_index(values, position) for position in range(1, len(values) + 1))
+    return find_index(values, row_number),
+
+
+def get_single_value(values: tuple):
+
+    """Gets the value of a selection that should contain a single value.
+
+    :raise CellError: Raised if the selection contains multiple values.
+
+    :return: The value.
+    :rtype: any
+    """
+
+    if len(values) != 1:
+        raise CellError(VALUE_ERROR)
+    return values[0]
+
+
+def find_exact_match(lookup_value: any, values: tuple):
+
+    """Gets the position of the first equal value, like the MATCH function in Excel with match type 0.
+
+    :raise CellError: Raised if no value matches.
+
+    :return: The position of the value, starting at 1.
+    :rtype: int
+    """
+
+    for position, row in enumerate(values, 1):
+        value = row[0]
+        if value is not None and type(value) != bool and is_equal(value, lookup_value):
+            return position
+    raise CellError(NA_ERROR)
+
+
+def find_descending_match(lookup_value: any, values: tuple):
+
+    """Gets the position of the smallest value that is greater than or equal to the lookup value,
+    like the MATCH function in Excel with match type -1. The values should be in descending order.
+
+    :raise CellError: Raised if no value matches.
+
+    :return: The position of the value, starting at 1.
+    :rtype: int
+    """
+
+    lookup_value = to_number(lookup_value)
+    result = None
+    for position, row in enumerate(values, 1):
+        value = row[0]
+        if not isinstance(value, (int, float)) or isinstance(value, bool):
+            continue
+        if value < lookup_value:
+            break
+        result = position
+        if value == lookup_value:
+            break
+
+    if result is None:
+        raise CellError(NA_ERROR)
+    return result
+
+
+def if_error(calculation, value_on_error: any):
+
+    """Calculates a value and uses a fallback on errors, like the IFERROR function in Excel.
+
+    :param calculation: The function that calculates the value.
+    :type calculation: function
+    :param value_on_error: The value used when the calculation fails.
+    :type value_on_error: any
+
+    :return: The calculated value or the fallback.
+    :rtype: any
+    """
+
+    try:
+        return calculation()
+    except (CellError, ZeroDivisionError):
+        return value_on_error
+
+
+def not_available():
+
+    """Raises the #N/A error, like the NA function in Excel.
+
+    :raise CellError: Always raised.
+    """
+
+    raise CellError(NA_ERROR)
+
+
+def get_model_parameters_formulas():
+
+    """Gets the formulas of the model parameters worksheet.
+
+    :return: The addresses and functions of the formulas.
+    :rtype: list
+    """
+
+    formulas = [(MODEL_PARAMETERS + "G36", lambda model: 0.858)]
+
+    # Battery capacity per vehicle type and model
+    for column in "BCDEFGH":
+        for row in (25, 26, 27):
+            formulas.append((f"{MODEL_PARAMETERS}{column}{row}", lambda model, column=column, row=row: calculate_sum_if(
+                model.get_values(MODEL_PARAMETERS + "D4:D10"),
+                (model.get_values(MODEL_PARAMETERS + "B4:B10"), model.get_value(f"{MODEL_PARAMETERS}{column}24")),
+                (model.get_values(MODEL_PARAMETERS + "C4:C10"), model.get_value(f"{MODEL_PARAMETERS}I{row}")))))
+
+    return formulas
+
+
+def get_beleidsmakers_formulas():
+
+    """Gets the formulas of the beleidsmakers worksheets.
+
+    :return: The addresses and functions of the formulas.
+    :rtype: list
+    """
+
+    return [
+        (BELEIDSMAKERS + "E25", lambda model: 0.536 * (1 + model.get_number(BELEIDSMAKERS + "E24"))),
+        (BELEIDSMAKERS + "E23", lambda model: (
+            model.get_number(MODEL_PARAMETERS + "B92") if model.get_value(ONDERNEMERS + "B21") is None
+            else model.get_number(ONDERNEMERS + "B21")) + model.get_number(BELEIDSMAKERS + "E25")),
+        (BELEIDSMAKERS + "D78", lambda model: model.get_number(BELEIDSMAKERS + "E29")
+            * model.get_number(BELEIDSMAKERS + "B14") * model.get_number(BELEIDSMAKERS + "E30")),
+        (BELEIDSMAKERS_CALC + "H37", lambda model: model.get_value(ONDERNEMERS + "B29")),
+        (BELEIDSMAKERS_CALC + "H38", lambda model: model.get_value(ONDERNEMERS + "C29"))
+    ]
+
+
+def get_ondernemers_calc_input_formulas():
+
+    """Gets the formulas of the ondernemers_calc worksheet that calculate the vehicle usage and charging.
+
+    :return: The addresses and functions of the formulas.
+    :rtype: list
+    """
+
+    references = {
+        "D3": ONDERNEMERS + "B12", "D8": ONDERNEMERS + "B13", "H3": ONDERNEMERS + "E12", "H4": ONDERNEMERS + "E13",
+        "H5": ONDERNEMERS + "E14", "H8": ONDERNEMERS + "B22", "H9": ONDERNEMERS + "B23", "H11": ONDERNEMERS + "C26",
+        "H12": ONDERNEMERS + "C27", "H18": ONDERNEMERS + "B26", "H19": ONDERNEMERS + "B27",
+        "H24": ONDERNEMERS + "E21", "H25": ONDERNEMERS + "E23", "H27": ONDERNEMERS + "E27",
+        "H28": ONDERNEMERS + "E28", "H40": ONDERNEMERS + "C31", "I31": ONDERNEMERS + "B14"
+    }
+    formulas = [(ONDERNEMERS_CALC + address, lambda model, reference=reference: model.get_value(reference))
+                for address, reference in references.items()]
+
+    def add(address: str, formula):
+        formulas.append((ONDERNEMERS_CALC + address, formula))
+
+    def value(address: str):
+        return lambda model: model.get_value(ONDERNEMERS_CALC + address)
+
+    # Days in operation and distance per day
+    add("H34", lambda model: model.get_number(ONDERNEMERS + "C28") / 10)
+    add("I34", lambda model: 260 if model.get_calc_number("H34") <= 0 else model.get_calc_value("H34"))
+    add("B6", lambda model: model.get_calc_number("I34") - model.get_number(ONDERNEMERS + "B30"))
+    add("C6", lambda model: model.get_calc_number("I34") - model.get_number(ONDERNEMERS + "B30"))
+    add("D6", lambda model: model.get_calc_number("I34") - model.get_number(ONDERNEMERS + "C30"))
+    for column in "BCD":
+        add(f"{column}4", lambda model, column=column:
+            model.get_number(ONDERNEMERS + "B14") / model.get_calc_number(f"{column}6"))
+
+    # Vehicle type
+    add("D20", lambda model: find_exact_match(model.get_calc_value("D3"),
+                                              model.get_range(MODEL_PARAMETERS + "A14:A20")))
+    add("B3", value("D3"))
+    add("C3", value("D3"))
+    add("B17", value("B3"))
+    add("C17", value("C3"))
+    add("B18", lambda model: find_exact_match(model.get_calc_value("B17"),
+                                              model.get_range(MODEL_PARAMETERS + "A4:A10")))
+    add("C18", lambda model: find_exact_match(model.get_calc_value("C17"),
+                                              model.get_range(MODEL_PARAMETERS + "A4:A10")))
+    add("B20", value("D20"))
+    add("C20", value("D20"))
+
+    # Driving and charging hours
+    add("D9", lambda model: find_index(model.get_range(MODEL_PARAMETERS + "D14:D20"), model.get_calc_value("D20")))
+    add("D10", lambda model: find_index(model.get_range(MODEL_PARAMETERS + "C14:C20"), model.get_calc_value("D20")))
+    add("D12", lambda model: model.get_calc_number("B4") / model.get_calc_number("D9"))
+    add("D14", lambda model: 3 if model.get_number(ONDERNEMERS + "E16") <= 0
+        else model.get_value(ONDERNEMERS + "E16"))
+    add("D15", lambda model: 8 if model.get_number(ONDERNEMERS + "E15") <= 0
+        else model.get_value(ONDERNEMERS + "E15"))
+    add("D13", lambda model: min(model.get_calc_number("D12") / (1 - model.get_calc_number("D10")),
+                                 model.get_calc_number("D11") - model.get_calc_number("D15")))
+    add("B13", value("D13"))
+    add("C13", value("D13"))
+
+    # Energy consumption per day
+    for column in "BCD":
+        add(f"{column}22", lambda model, column=column: find_index(
+            model.get_range(MODEL_PARAMETERS + "G14:G20"), model.get_calc_value(f"{column}20")))
+        add(f"{column}23", lambda model, column=column: find_index(
+            model.get_range(MODEL_PARAMETERS + "H14:H20"), model.get_calc_value(f"{column}20"))
+            if is_equal(model.get_calc_value("D8"), "gekoeld") else 0)
+        add(f"{column}7", lambda model, column=column:
+            model.get_calc_number(f"{column}4") * model.get_calc_number(f"{column}22")
+            + model.get_calc_number(f"{column}23") * model.get_calc_number(f"{column}13"))
+
+    # Battery capacity
+    for row, address in enumerate(("E21", "E22", "E23"), 1):
+        add(address, lambda model, row=row: find_index(model.get_range(MODEL_PARAMETERS + "B25:H27"),
+                                                       row, model.get_calc_value("D20")))
+    add("E24", value("E21"))
+    add("D21", lambda model: model.get_calc_value("E24")
+        if model.get_calc_number("D7") / 0.8 > model.get_calc_number("E24")
+        else find_index(model.get_range(ONDERNEMERS_CALC + "E21:E23"), find_descending_match(
+            model.get_calc_number("D7") / 0.8, model.get_range(ONDERNEMERS_CALC + "E21:E23"))))
+    add("I3", lambda model: model.get_calc_value("D21") if is_equal(model.get_calc_value("H3"), 0)
+        else model.get_calc_value("H3"))
+    add("B21", value("I3"))
+    add("C21", value("I3"))
+    add("B27", lambda model: model.get_calc_number("B21") * 0.8)
+    add("C27", lambda model: model.get_calc_number("C21") * 0.8)
+    add("D27", lambda model: model.get_calc_number("D21") * 0.8)
+
+    # Charging power on the depot
+    add("D26", value("D15"))
+    add("C15", value("D15"))
+    add("C26", value("C15"))
+    add("D28", lambda model: model.get_calc_number("D27") / model.get_calc_number("D26"))
+    add("D29", lambda model: model.get_value(MODEL_PARAMETERS + "B49")
+        if model.get_calc_number("D28") > model.get_number(MODEL_PARAMETERS + "B49")
+        else find_index(model.get_range(MODEL_PARAMETERS + "B49:B53"), find_descending_match(
+            model.get_calc_number("D28"), model.get_range(MODEL_PARAMETERS + "B49:B53"))))
+    add("I4", lambda model: model.get_calc_value("D29") if is_equal(model.get_calc_value("H4"), 0)
+        else model.get_calc_value("H4"))
+    add("B29", value("I4"))
+    add("C29", value("I4"))
+    for column in "BC":
+        add(f"{column}30", lambda model, column=column: calculate_sum_if(
+            model.get_values(MODEL_PARAMETERS + "A36:A45"),
+            (model.get_values(MODEL_PARAMETERS + "D36:D45"), "Privaat"),
+            (model.get_values(MODEL_PARAMETERS + "E36:E45"), model.get_calc_value(f"{column}29"))))
+        add(f"{column}31", value(f"{column}30"))
+        add(f"{column}32", lambda model, column=column:
+            model.get_calc_number(f"{column}27") / model.get_calc_number(f"{column}29"))
+
+    # Energy charged on the depot
+    add("B34", lambda model: min(model.get_calc_number("B27"), *(model.get_calc_number("B21") * to_number(value)
+        for value in find_column_values(model.get_range(MODEL_PARAMETERS + "F36:F45"), model.get_calc_value("B31")))))
+    add("C34", lambda model: min(model.get_calc_number("C27"), *(model.get_calc_number("C21") * to_number(value)
+        for value in find_column_values(model.get_range(MODEL_PARAMETERS + "F36:F45"), model.get_calc_value("C31"))),
+        model.get_calc_number("C29") * model.get_calc_number("C26")))
+    for column in "BC":
+        add(f"{column}35", lambda model, column=column:
+            min(model.get_calc_number(f"{column}34"), model.get_calc_number(f"{column}7")))
+        add(f"{column}38", lambda model, column=column: max(
+            model.get_calc_number(f"{column}7") - calculate_sum(model.get_calc_value(f"{column}35")), 0))
+        add(f"{column}39", value("D14"))
+
+    # Energy charged in public
+    add("D42", lambda model: 350 if model.get_calc_number("D41") > 350
+        else find_index(model.get_range(MODEL_PARAMETERS + "C49:C53"), find_descending_match(
+            model.get_calc_value("D41"), model.get_range(MODEL_PARAMETERS + "C49:C53"))))
+    add("I5", lambda model: model.get_calc_value("D42") if is_equal(model.get_calc_value("H5"), 0)
+        else model.get_calc_value("H5"))
+    add("C42", value("I5"))
+    add("C43", lambda model: calculate_sum_if(
+        model.get_values(MODEL_PARAMETERS + "A36:A45"),
+        (model.get_values(MODEL_PARAMETERS + "D36:D45"), "Publiek"),
+        (model.get_values(MODEL_PARAMETERS + "E36:E45"), model.get_calc_value("C42"))))
+    add("C44", value("C43"))
+    add("B46", lambda model: min(model.get_calc_number("B21") * 0.7,
+                                 model.get_calc_number("B42") * model.get_calc_number("B39")))
+    add("B47", lambda model: min(model.get_calc_number("B38"),
+                                 model.get_calc_number("B46") * model.get_calc_number("B40")))
+    add("C47", lambda model: min(model.get_calc_number("C38"),
+                                 model.get_calc_number("C42") * model.get_calc_number("C39")))
+    add("C48", lambda model: model.get_calc_number("C47") / model.get_calc_number("C42"))
+    add("B49", lambda model: NOT_ENOUGH_POWER
+        if model.get_calc_number("B34") < model.get_calc_number("B7") else "Yes")
+    add("C49", lambda model: NOT_ENOUGH_POWER
+        if model.get_calc_number("C47") < model.get_calc_number("C38") else "Yes")
+
+    # Energy prices and costs
+    add("I8", lambda model: to_number(
+        find_index(model.get_range(MODEL_PARAMETERS + "L36:L45"), model.get_calc_value("B30"))
+        if is_equal(model.get_calc_value("H8"), 0) else model.get_calc_value("H8"))
+        - model.get_number(BELEIDSMAKERS + "B35"))
+    add("I9", lambda model: find_index(model.get_range(MODEL_PARAMETERS + "M36:M45"), model.get_calc_value("C44"))
+        if is_equal(model.get_calc_value("H9"), 0) else model.get_calc_value("H9"))
+    add("I32", lambda model: model.get_calc_number("D4") * model.get_calc_number("C6"))
+    add("I35", lambda model: model.get_calc_number("D13") * model.get_calc_number("D6"))
+    for column in "BC":
+        add(f"{column}53", lambda model, column=column: to_number(find_index(
+            model.get_range(MODEL_PARAMETERS + "K14:K20"), model.get_calc_value(f"{column}20")))
+            * model.get_calc_number("D4") * model.get_calc_number(f"{column}6"))
+        add(f"{column}54", lambda model, column=column: if_error(lambda: model.get_calc_number(f"{column}35")
+            * model.get_calc_number(f"{column}6") * model.get_calc_number("I8"), 0))
+    add("C55", lambda model: if_error(lambda: model.get_calc_number("C47") * model.get_calc_number("I9")
+        * model.get_calc_number("C6") if is_equal(model.get_calc_value("C49"), "Yes")
+        else "Inadequate external charging", 0))
+
+    return formulas
+
+
+def get_scenario_validity_formulas():
+
+    """Gets the formulas that check whether the charging scenarios are valid.
+
+    :return: The addresses and functions of the formulas.
+    :rtype: list
+    """
+
+    return [
+        (ONDERNEMERS + "C35", lambda model: if_error(lambda: SCENARIO_VALID if is_equal(
+            model.get_calc_value("B49"), "Yes") else "Vehicle technology insufficient", SCENARIO_VALID)),
+        (ONDERNEMERS + "D35", lambda model: if_error(lambda: SCENARIO_VALID if is_equal(
+            model.get_calc_value("C49"), "Yes") else "Vehicle technology insufficient", SCENARIO_VALID)),
+        (ONDERNEMERS_CALC + "B58", lambda model: model.get_value(ONDERNEMERS + "C35")),
+        (ONDERNEMERS_CALC + "C58", lambda model: model.get_value(ONDERNEMERS + "D35")),
+        (ONDERNEMERS_CALC + "D58", lambda model: model.get_value(ONDERNEMERS + "E35"))
+    ]
+
+
+def get_ondernemers_calc_emission_formulas():
+
+    """Gets the formulas of the ondernemers_calc worksheet that calculate the emissions.
+
+    :return: The addresses and functions of the formulas.
+    :rtype: list
+    """
+
+    formulas = []
+
+    def add(address: str, formula):
+        formulas.append((ONDERNEMERS_CALC + address, formula))
+
+    def if_valid(column: str, calculation):
+        return lambda model: calculation(model) if is_equal(
+            model.get_calc_value(f"{column}58"), SCENARIO_VALID) else not_available()
+
+    # Energy used and emissions of the electric vehicles
+    for column in "BC":
+        add(f"{column}69", if_valid(column, lambda model, column=column: (
+            if_error(lambda: model.get_calc_number(f"{column}35") / to_number(get_single_value(find_column_values(
+                model.get_range(MODEL_PARAMETERS + "G36:G45"), model.get_calc_value(f"{column}31")))), 0)
+            + if_error(lambda: model.get_calc_number(f"{column}47") / to_number(get_single_value(find_column_values(
+                model.get_range(MODEL_PARAMETERS + "G36:G45"), model.get_calc_value(f"{column}44")))), 0))
+            * model.get_calc_number(f"{column}6") / model.get_number(MODEL_PARAMETERS + "B94")))
+        for row, factor_row in ((70, 87), (71, 88), (72, 89)):
+            add(f"{column}{row}", if_valid(column, lambda model, column=column, factor_row=factor_row:
+                model.get_number(f"{MODEL_PARAMETERS}B{factor_row}") * model.get_calc_number(f"{column}69")))
+        add(f"{column}74", lambda model: model.get_calc_value("I32"))
+    add("D74", lambda model: model.get_calc_value("I31"))
+    for column in "BCD":
+        add(f"{column}75", if_valid(column, lambda model, column=column: to_number(find_index(
+            model.get_range(MODEL_PARAMETERS + "E77:E83"), model.get_calc_value("D20")))
+            * model.get_calc_number(f"{column}74")))
+
+    # Fuel used and emissions of the diesel vehicle
+    formulas.extend([
+        (ONDERNEMERS + "B65", lambda model: to_number(find_index(
+            model.get_range(MODEL_PARAMETERS + "I14:I20"), model.get_calc_value("D20")))
+            * model.get_number(BELEIDSMAKERS + "E23")),
+        (ONDERNEMERS + "B66", lambda model: to_number(find_index(
+            model.get_range(MODEL_PARAMETERS + "J14:J20"), model.get_calc_value("D20")))
+            * model.get_number(BELEIDSMAKERS + "E23") if is_equal(model.get_value(ONDERNEMERS + "B13"), "gekoeld")
+            else 0),
+        (ONDERNEMERS + "E65", lambda model: model.get_number(ONDERNEMERS + "B14")
+            * model.get_number(ONDERNEMERS + "B65")),
+        (ONDERNEMERS + "E66", lambda model: model.get_number(ONDERNEMERS + "B66") * model.get_calc_number("I35"))
+    ])
+    add("D64", lambda model: calculate_sum(model.get_value(ONDERNEMERS + "E65"), model.get_value(ONDERNEMERS + "E66"))
+        / model.get_number(BELEIDSMAKERS + "E23"))
+    add("D65", lambda model: to_number(find_index(model.get_range(MODEL_PARAMETERS + "B77:E83"),
+                                                  model.get_calc_value("D20"), 1)) / 1000 * model.get_calc_number("D64"))
+    add("D66", lambda model: to_number(find_index(model.get_range(MODEL_PARAMETERS + "B77:E83"),
+                                                  model.get_calc_value("D20"), 2)) * model.get_calc_number("D64"))
+    add("D67", lambda model: to_number(find_index(model.get_range(MODEL_PARAMETERS + "B77:E83"),
+                                                  model.get_calc_value("D20"), 3)) * model.get_calc_number("D64"))
+
+    # Emissions in tonnes
+    for column in "BC":
+        add(f"{column}79", lambda model, column=column: model.get_calc_number(f"{column}70") / 1000)
+        add(f"{column}80", lambda model, column=column: (model.get_calc_number(f"{column}71")
+                                                        + model.get_calc_number(f"{column}75")) / 10 ** 3)
+        add(f"{column}81", lambda model, column=column: model.get_calc_number(f"{column}72") / 10 ** 3)
+        add(f"{column}84", lambda model: 0)
+        add(f"{column}85", lambda model, column=column: model.get_calc_number(f"{column}75") / 10 ** 3)
+    add("D79", lambda model: model.get_calc_number("D65") / 1000)
+    add("D80", lambda model: (model.get_calc_number("D66") + model.get_calc_number("D75")) / 10 ** 3)
+    add("D81", lambda model: model.get_calc_number("D67") / 10 ** 3)
+    add("D84", lambda model: model.get_calc_value("D79"))
+    add("D85", lambda model: (model.get_calc_number("D66") + model.get_calc_number("D75")) / 10 ** 3)
+    add("D86", lambda model: model.get_calc_value("D81"))
+
+    return formulas
+
+
+def get_ondernemers_calc_cost_formulas():
+
+    """Gets the formulas of the ondernemers_calc worksheet that calculate the vehicle and charging system costs.
+
+    :return: The addresses and functions of the formulas.
+    :rtype: list
+    """
+
+    formulas = []
+
+    def add(address: str, formula):
+        formulas.append((ONDERNEMERS_CALC + address, formula))
+
+    def value_or_default(address: str, default):
+        return lambda model: default(model) if model.get_calc_number(address) <= 0 else model.get_calc_value(address)
+
+    # Depreciation of the vehicles
+    add("I11", lambda model: model.get_calc_value("H11"))
+    add("I18", lambda model: model.get_calc_value("H18"))
+    add("I12", lambda model: to_number(find_index(
+        model.get_range(MODEL_PARAMETERS + "B59:B73"), model.get_calc_value("I11"))) * to_number(find_index(
+        model.get_range(MODEL_PARAMETERS + "E14:E20"), model.get_calc_value("D20")))
+        if is_equal(model.get_calc_value("H12"), 0) else model.get_calc_value("H12"))
+    add("I19", value_or_default("H19", lambda model: to_number(find_index(
+        model.get_range(MODEL_PARAMETERS + "B59:B73"), model.get_calc_value("I18"))) * to_number(find_index(
+        model.get_range(MODEL_PARAMETERS + "E4:E10"), model.get_calc_value("C18")))))
+    add("I24", value_or_default("H24", lambda model: find_index(
+        model.get_range(MODEL_PARAMETERS + "E4:E10"), model.get_calc_value("C18"))))
+    add("I25", lambda model: model.get_calc_value("H25"))
+    add("I27", value_or_default("H27", lambda model: find_index(
+        model.get_range(MODEL_PARAMETERS + "I36:I45"), model.get_calc_value("C30"))))
+    add("I28", value_or_default("H28", lambda model: find_index(
+        model.get_range(MODEL_PARAMETERS + "J36:J45"), model.get_calc_value("C30"))))
+    add("I39", value_or_default("H40", lambda model: find_index(
+        model.get_range(MODEL_PARAMETERS + "E14:E20"), model.get_calc_value("D20"))))
+    add("I40", value_or_default("H40", lambda model: (model.get_calc_number("I39") - model.get_calc_number("I12"))
+                                / model.get_calc_number("I11")))
+    add("I41", lambda model: (model.get_calc_number("I24") - model.get_calc_number("I25")
+                              - model.get_calc_number("I19")) / model.get_calc_number("I18"))
+    add("H42", lambda model: model.get_calc_value("E23"))
+    add("I42", lambda model: model.get_calc_number("H42") / model.get_calc_number("I18"))
+    add("I43", lambda model: 0)
+
+    return formulas
+
+
+def get_ondernemers_formulas():
+
+    """Gets the formulas of the ondernemers worksheet that calculate the TCO.
+
+    :return: The addresses and functions of the formulas.
+    :rtype: list
+    """
+
+    formulas = []
+
+    def add(address: str, formula):
+        formulas.append((ONDERNEMERS + address, formula))
+
+    def value(address: str):
+        return lambda model: model.get_value(ONDERNEMERS + address)
+
+    def number(address: str):
+        return model_number(ONDERNEMERS + address)
+
+    def model_number(address: str):
+        return lambda model: model.get_number(address)
+
+    def if_valid(column: str, calculation):
+        return lambda model: calculation(model) if is_equal(
+            model.get_value(f"{ONDERNEMERS}{column}35"), SCENARIO_VALID) else not_available()
+
+    def parameter(parameter_range: str):
+        return lambda model: find_index(model.get_range(MODEL_PARAMETERS + parameter_range),
+                                        model.get_calc_value("D20"))
+
+    # Vehicle parameters
+    add("B28", lambda model: model.get_number(ONDERNEMERS + "C28") * (1 - (
+        model.get_number(ONDERNEMERS + "B30") - model.get_number(ONDERNEMERS + "C30"))
+        / (260 - model.get_number(ONDERNEMERS + "C30"))))
+    add("B56", parameter("O14:O20"))
+    add("B57", parameter("P14:P20"))
+    add("B61", parameter("Q14:Q20"))
+    add("B68", parameter("M14:M20"))
+    add("B69", parameter("L14:L20"))
+    add("B71", lambda model: parameter("N14:N20")(model)
+        if is_equal(model.get_value(ONDERNEMERS + "B13"), "gekoeld") else 0)
+    add("B74", parameter("R14:R20"))
+    add("E30", lambda model: to_number(model.get_calc_value("I27") if model.get_value(ONDERNEMERS + "E27") is None
+                                       else model.get_value(ONDERNEMERS + "E27"))
+        + to_number(model.get_calc_value("I28") if model.get_value(ONDERNEMERS + "E28") is None
+                    else model.get_value(ONDERNEMERS + "E28"))
+        - model.get_number(ONDERNEMERS + "E29"))
+
+    # Emissions
+    for row in (49, 50, 51):
+        for column in "CDE":
+            add(f"{column}{row}", lambda model, row=row, column=column: find_index(
+                model.get_range(ONDERNEMERS_CALC + "B79:D86"),
+                model.get_number(f"{ONDERNEMERS}B{row}") + (0 if is_equal(
+                    model.get_value(ONDERNEMERS + "B15"), model.get_value(MODEL_PARAMETERS + "B31")) else 5),
+                model.get_number(f"{ONDERNEMERS}{column}48")))
+
+    # Fixed vehicle costs
+    add("E56", value("B56"))
+    for column in "CDE":
+        add(f"{column}57", value("B57"))
+    add("C58", lambda model: (to_number(find_index(model.get_range(MODEL_PARAMETERS + "E4:E10"),
+                                                   model.get_calc_value("B18")))
+                              + model.get_number(ONDERNEMERS + "B27")) / 2 * model.get_number(ONDERNEMERS + "B58"))
+    add("D58", lambda model: (to_number(find_index(model.get_range(MODEL_PARAMETERS + "E4:E10"),
+                                                   model.get_calc_value("C18")))
+                              + model.get_number(ONDERNEMERS + "B27")) / 2 * model.get_number(ONDERNEMERS + "B58"))
+    add("E58", lambda model: (model.get_calc_number("I39") + model.get_number(ONDERNEMERS + "C27")) / 2
+        * model.get_number(ONDERNEMERS + "B58"))
+    add("C59", lambda model: to_number(find_index(model.get_range(MODEL_PARAMETERS + "E4:E10"),
+                                                  model.get_calc_value("B18"))) * model.get_number(ONDERNEMERS + "B59"))
+    add("D59", lambda model: to_number(find_index(model.get_range(MODEL_PARAMETERS + "E4:E10"),
+                                                  model.get_calc_value("C18"))) * model.get_number(ONDERNEMERS + "B59"))
+    add("E59", lambda model: to_number(parameter("E14:E20")(model)) * model.get_number(ONDERNEMERS + "B59"))
+    add("E60", lambda model: model.get_value(BELEIDSMAKERS + "E32"))
+    for column in "CDE":
+        add(f"{column}61", value("B61"))
+        add(f"{column}62", lambda model, column=column: calculate_sum(
+            *model.get_values(f"{ONDERNEMERS}{column}56:{column}61")))
+
+    # Variable vehicle costs
+    add("C67", if_valid("C", lambda model: calculate_sum(*model.get_values(ONDERNEMERS_CALC + "B54:B55"))))
+    add("D67", if_valid("D", lambda model: calculate_sum(*model.get_values(ONDERNEMERS_CALC + "C54:C55"))))
+    add("C68", if_valid("C", lambda model: model.get_number(ONDERNEMERS + "B68") * model.get_calc_number("I32")))
+    add("D68", if_valid("D", lambda model: model.get_number(ONDERNEMERS + "B68") * model.get_calc_number("I32")))
+    add("E68", if_valid("E", lambda model: model.get_number(ONDERNEMERS + "B68")
+                        * model.get_number(ONDERNEMERS + "B14")))
+    add("C69", if_valid("C", lambda model: model.get_calc_value("B53")))
+    add("D69", if_valid("D", lambda model: model.get_calc_value("C53")))
+    add("E69", lambda model: model.get_number(ONDERNEMERS + "B69") * model.get_number(ONDERNEMERS + "B14"))
+    add("C70", lambda model: model.get_value(BELEIDSMAKERS_CALC + "H37"))
+    add("D70", lambda model: model.get_value(BELEIDSMAKERS_CALC + "H37"))
+    add("E70", lambda model: model.get_value(BELEIDSMAKERS_CALC + "H38"))
+    add("C71", lambda model: model.get_number(ONDERNEMERS + "B71") * model.get_number(ONDERNEMERS + "B28"))
+    add("D71", lambda model: model.get_number(ONDERNEMERS + "B71") * model.get_number(ONDERNEMERS + "B28"))
+    add("E71", lambda model: model.get_number(ONDERNEMERS + "B71") * model.get_number(ONDERNEMERS + "C28"))
+    add("E72", lambda model: model.get_value(BELEIDSMAKERS + "D78"))
+    for column in "CDE":
+        add(f"{column}73", lambda model, column=column: model.get_number(BELEIDSMAKERS + "E34")
+            * model.get_number(f"{ONDERNEMERS}{column}49"))
+        add(f"{column}74", value("B74"))
+        add(f"{column}75", lambda model, column=column: calculate_sum(
+            *model.get_values(f"{ONDERNEMERS}{column}65:{column}74")))
+
+    # Write-off costs of the vehicle
+    add("C78", lambda model: model.get_calc_value("I41"))
+    add("D78", lambda model: model.get_calc_value("I41"))
+    add("E78", lambda model: model.get_calc_value("I40"))
+    add("C79", lambda model: -model.get_calc_number("I42"))
+    add("D79", lambda model: -model.get_calc_number("I42"))
+    add("E79", lambda model: -model.get_calc_number("I43"))
+    for column in "CDE":
+        add(f"{column}80", lambda model, column=column: calculate_sum(
+            model.get_value(f"{ONDERNEMERS}{column}78"), model.get_value(f"{ONDERNEMERS}{column}79")))
+
+    # Write-off costs of the charging system
+    for column, calc_column in (("C", "B"), ("D", "C")):
+        add(f"{column}83", lambda model: model.get_number(ONDERNEMERS + "E30") / model.get_number(ONDERNEMERS + "B26"))
+        add(f"{column}84", lambda model, calc_column=calc_column: calculate_sum_if(
+            model.get_values(MODEL_PARAMETERS + "K36:K45"),
+            (model.get_values(MODEL_PARAMETERS + "A36:A45"), model.get_calc_value(f"{calc_column}30"))))
+    for column in "CDE":
+        add(f"{column}85", if_valid(column, lambda model, column=column: calculate_sum(
+            *model.get_values(f"{ONDERNEMERS}{column}83:{column}84"))))
+        add(f"{column}87", lambda model, column=column: calculate_sum(
+            *(model.get_value(f"{ONDERNEMERS}{column}{row}") for row in (62, 75, 80, 85))))
+
+    # Driver costs
+    for row in (92, 93, 94):
+        add(f"C{row}", lambda model, row=row: model.get_number(f"{ONDERNEMERS}B{row}") * (
+            model.get_number(ONDERNEMERS + "C28") + model.get_calc_number("D6") * model.get_calc_number("B48")))
+        add(f"D{row}", lambda model, row=row: model.get_number(f"{ONDERNEMERS}B{row}") * (
+            model.get_number(ONDERNEMERS + "C28") + model.get_calc_number("D6") * model.get_calc_number("C48")))
+        add(f"E{row}", lambda model, row=row: model.get_number(f"{ONDERNEMERS}B{row}")
+            * model.get_number(ONDERNEMERS + "C28"))
+
+    # Total costs of ownership
+    for column in "CDE":
+        add(f"{column}95", lambda model, column=column: calculate_sum(
+            *model.get_values(f"{ONDERNEMERS}{column}92:{column}94")))
+        add(f"{column}97", lambda model, column=column: calculate_sum(
+            model.get_value(f"{ONDERNEMERS}{column}87"), model.get_value(f"{ONDERNEMERS}{column}95"), None))
+        add(f"{column}44", value(f"{column}97"))
+
+    return formulas
+
+
+# The formulas in the order they have to be calculated,
+# the formulas of the model parameters only depend on the model parameters worksheet
+PARAMETER_FORMULAS = get_model_parameters_formulas()
+MODULE_FORMULAS = get_beleidsmakers_formulas() \
+    + get_ondernemers_calc_input_formulas() \
+    + get_scenario_validity_formulas() \
+    + get_ondernemers_calc_emission_formulas() \
+    + get_ondernemers_calc_cost_formulas() \
+    + get_ondernemers_formulas()
+FORMULAS = PARAMETER_FORMULAS + MODULE_FORMULAS
+FORMULA_ADDRESSES = frozenset(address for address, formula in FORMULAS)
+
+
+@lru_cache(maxsize=None)
+def has_formulas(reference: str):
+
+    """Checks whether a range contains cells with a formula.
+
+    :param reference: The range, including the sheet. Example: Model parameters!B25:H27.
+    :type reference: str
+
+    :return: Whether the range contains a formula.
+    :rtype: bool
+    """
+
+    return any(address in FORMULA_ADDRESSES for row in get_range_addresses(reference) for address in row)
+
+
+class NativePANTEIAInterface(PANTEIAInterface):
+
+    # The constants of the PANTEIA model, these are read once per model file
+    workbooks: dict = {}
+
+    # Only the input cells can be changed, like in the pruned compiled model
+    input_cell_addresses: frozenset = frozenset(PANTEIAInterface.input_addresses)
+
+    def __init__(self):
+
+        """Initialises an interface for a PANTEIA model that calculates the formulas in Python.
+        Only the formulas that the TCO results depend on are implemented; they mirror the formulas in the
+        PANTEIA model, so the results are identical to those calculated with pycel.
+        The constants are read from the PANTEIA model, "changing" a value only edits memory.
+
+        :raise NoPANTEIAModelFound: Raised if the PANTEIA model can't be found or initialised.
+
+        :return: An instance of NativePANTEIAInterface.
+        :rtype: NativePANTEIAInterface
+        """
+
+        self.PANTEIA_model_path = "./PANTEIA_TCO_model.xlsm"
+
+        # Check if template model exists
+        PANTEIA_model_found = isfile(self.PANTEIA_model_path)
+        if not PANTEIA_model_found:
+            raise NoPANTEIAModelFound
+
+        # Read the constants of the model
+        try:
+            constant_values, self.workbook_formula_addresses = self.read_workbook(self.PANTEIA_model_path)
+        except Exception:
+            raise NoPANTEIAModelFound
+
+        self.cell_values = dict(constant_values)
+        self.calculated_values = {}
+        self.is_calculated = False
+        self.are_parameters_calculated = False
+
+        # The values of the ranges are kept until a cell of their sheet changes
+        self.range_values = {}
+
+        # Reset values before starting
+        self.reset_values()
+        self.save_default_snapshot()
+
+    @classmethod
+    def read_workbook(cls, path_to_excel: str):
+
+        """Reads the constants and the addresses of the formulas from the PANTEIA model.
+        The workbook is only read the first time, afterwards the values are reused.
+
+        :param path_to_excel: The path to the PANTEIA model.
+        :type path_to_excel: str
+
+        :return: The values of the constants and the addresses of the formulas.
+        :rtype: tuple
+        """
+
+        if path_to_excel not in cls.workbooks:
+            workbook = load_workbook(path_to_excel, keep_vba=False)
+            constant_values = {}
+            formula_addresses = set()
+
+            for sheet_name in (cls.ondernemers_module_tab_name,
+                               cls.beleidsmakers_module_tab_name,
+                               cls.ondernemers_calc_tab_name,
+                               cls.beleidsmakers_calc_tab_name,
+                               cls.model_parameters_tab_name):
+                for row in workbook[sheet_name].iter_rows():
+                    for cell in row:
+                        if isinstance(cell.value, str) and cell.value.startswith("="):
+                            formula_addresses.add(f"{sheet_name}!{cell.coordinate}")
+                        elif cell.value is not None:
+                            constant_values[f"{sheet_name}!{cell.coordinate}"] = cell.value
+
+            cls.workbooks[path_to_excel] = (constant_values, frozenset(formula_addresses))
+
+        return cls.workbooks[path_to_excel]
+
+    def check_sheet_names(self, names: list):
+
+        """Gets the first sheet name of which the PANTEIA model has values.
+
+        :param names: The sheet names to check.
+        :type names: list
+
+        :return: The first sheet name that exists, or None.
+        :rtype: str or None
+        """
+
+        for name in names:
+            if any(address.startswith(f"{name}!") for address in self.cell_values):
+                return name
+
+        return None
+
+    def get_cell_value(self, sheet_name: str, cell_address: str, backup_sheet_name: str = None):
+
+        """Gets the value of the specified cell. Formulas are calculated when an input has changed.
+
+        :param sheet_name: The name of the Excel Worksheet.
+        :type: str
+        :param cell_address: The address of the cell. Consists of a column and row number. Example: A14.
+        :type: str
+
+        :raise PANTEIAModelError: Raised if the cell contains a formula that isn't calculated natively.
+
+        :return: The value of the cell.
+        :rtype: any
+        """
+
+        address = f"{sheet_name}!{cell_address}"
+
+        if address in FORMULA_ADDRESSES:
+            if not self.is_calculated:
+                self.calculate()
+            return self.calculated_values[address]
+
+        if address in self.workbook_formula_addresses:
+            raise PANTEIAModelError
+
+        return self.cell_values.get(address)
+
+    def get_cell_values(self, addresses: tuple):
+
+        """Gets the values of multiple cells at once. The formulas are calculated at most once for all cells.
+
+        :param addresses: The addresses of the cells, including the sheet. Example: ("Model parameters!E4",).
+        :type addresses: tuple
+
+        :raise PANTEIAModelError: Raised if one of the cells contains a formula that isn't calculated natively.
+
+        :return: The values of the cells, in the same order as the addresses.
+        :rtype: tuple
+        """
+
+        if not self.is_calculated:
+            self.calculate()
+
+        values = []
+        for address in addresses:
+            if address in FORMULA_ADDRESSES:
+                values.append(self.calculated_values[address])
+            elif address in self.workbook_formula_addresses:
+                raise PANTEIAModelError
+            else:
+                values.append(self.cell_values.get(address))
+
+        return tuple(values)
+
+    def set_cell_values(self, values: dict):
+
+        """Sets the values of multiple cells in memory at once. Values that didn't change are skipped.
+        NOTE: This doesn't actually change the values in the file.
+
+        :param values: The values organised by address, including the sheet. Example: {"Model parameters!E4": 30000}.
+        :type values: dict
+
+        :raise PANTEIAModelError: Raised if one of the cells isn't an input cell.
+
+        :return: Nothing
+        :rtype: None
+        """
+
+        changed_sheet_names = set()
+        for address, value in values.items():
+            if address not in self.input_cell_addresses:
+                raise PANTEIAModelError
+
+            if self.cell_values.get(address) != value or address not in self.cell_values:
+                self.cell_values[address] = value
+                changed_sheet_names.add(address.split("!")[0])
+
+        if not changed_sheet_names:
+            return
+
+        self.is_calculated = False
+        if self.model_parameters_tab_name in changed_sheet_names:
+            self.are_parameters_calculated = False
+        self.range_values = {reference: values for reference, values in self.range_values.items()
+                             if reference.split("!")[0] not in changed_sheet_names}
+
+    def get_input_values(self):
+
+        """Gets the current values of the input cells, which identify the results in the cache.
+        The types are included, because Excel doesn't treat 1 and TRUE the same while Python does.
+
+        :return: The values of the input cells followed by their types, in the order of input_addresses.
+        :rtype: tuple
+        """
+
+        values = tuple(self.cell_values.get(address) for address in self.input_addresses)
+        return values + tuple(map(type, values))
+
+    def take_snapshot(self):
+
+        """Captures the values of all cells in the model, including the calculated values.
+
+        :return: The values of the cells and the state of the calculation.
+        :rtype: dict
+        """
+
+        return {
+            "cell_values": dict(self.cell_values),
+            "calculated_values": dict(self.calculated_values),
+            "range_values": dict(self.range_values),
+            "is_calculated": self.is_calculated,
+            "are_parameters_calculated": self.are_parameters_calculated
+        }
+
+    def restore_snapshot(self, snapshot: dict):
+
+        """Restores the values of all cells to a snapshot, without recalculating anything.
+        The price of the vehicle is read again, because the snapshot can have other fixed parameters.
+
+        :param snapshot: The snapshot that was taken with take_snapshot.
+        :type snapshot: dict
+
+        :return: Nothing
+        :rtype: None
+        """
+
+        self.diesel_vehicle_price = None
+        self.cell_values = dict(snapshot["cell_values"])
+        self.calculated_values = dict(snapshot["calculated_values"])
+        self.range_values = dict(snapshot["range_values"])
+        self.is_calculated = snapshot["is_calculated"]
+        self.are_parameters_calculated = snapshot["are_parameters_calculated"]
+
+    def calculate(self):
+
+        """Calculates the formulas in order. Excel errors are saved as the value of the cell.
+        The formulas of the model parameters are only calculated when a model parameter has changed.
+
+        :return: Nothing
+        :rtype: None
+        """
+
+        self.range_values = {reference: values for reference, values in self.range_values.items()
+                             if not has_formulas(reference)}
+
+        for address, formula in MODULE_FORMULAS if self.are_parameters_calculated else FORMULAS:
+            try:
+                value = formula(self)
+            except CellError as error:
+                value = error.error_code
+            except ZeroDivisionError:
+                value = DIV0_ERROR
+
+            # References to empty cells result in zero
+            self.calculated_values[address] = 0 if value is None else value
+
+        self.is_calculated = True
+        self.are_parameters_calculated = True
+
+    def get_value(self, address: str):
+
+        """Gets the value of a cell while calculating, errors are raised so they propagate.
+
+        :param address: The address of the cell, including the sheet.
+        :type address: str
+
+        :raise CellError: Raised if the cell contains an error.
+
+        :return: The value of the cell.
+        :rtype: any
+        """
+
+        if address in FORMULA_ADDRESSES:
+            value = self.calculated_values[address]
+        else:
+            value = self.cell_values.get(address)
+
+        if value in ERROR_CODES:
+            raise CellError(value)
+        return value
+
+    def get_number(self, address: str):
+
+        """Gets the value of a cell as a number while calculating.
+
+        :param address: The address of the cell, including the sheet.
+        :type address: str
+
+        :return: The value of the cell as a number.
+        :rtype: int or float
+        """
+
+        return to_number(self.get_value(address))
+
+    def get_calc_value(self, cell_address: str):
+
+        """Gets the value of a cell in the ondernemers_calc worksheet while calculating.
+
+        :param cell_address: The address of the cell. Example: D20.
+        :type cell_address: str
+
+        :return: The value of the cell.
+        :rtype: any
+        """
+
+        return self.get_value(ONDERNEMERS_CALC + cell_address)
+
+    def get_calc_number(self, cell_address: str):
+
+        """Gets the value of a cell in the ondernemers_calc worksheet as a number while calculating.
+
+        :param cell_address: The address of the cell. Example: D20.
+        :type cell_address: str
+
+        :return: The value of the cell as a number.
+        :rtype: int or float
+        """
+
+        return to_number(self.get_value(ONDERNEMERS_CALC + cell_address))
+
+    def get_range(self, reference: str):
+
+        """Gets the values of a range while calculating, organised by row. Errors are not raised.
+
+        :param reference: The range, including the sheet. Example: Model parameters!B25:H27.
+        :type reference: str
+
+        :return: The values of the range.
+        :rtype: tuple
+        """
+
+        values = self.range_values.get(reference)
+        if values is None:
+            values = tuple(
+                tuple(self.calculated_values[address] if address in FORMULA_ADDRESSES else self.cell_values.get(address)
+                      for address in row)
+                for row in get_range_addresses(reference)
+            )
+            self.range_values[reference] = values
+
+        return values
+
+    def get_values(self, reference: str):
+
+        """Gets the values of a range while calculating as a flat list. Errors are not raised.
+
+        :param reference: The range, including the sheet. Example: Model parameters!D4:D10.
+        :type reference: str
+
+        :return: The values of the range.
+        :rtype: tuple
+        """
+
+        return tuple(value for row in self.get_range(reference) for value in row)
@@ -1,14 +1,26 @@
+from data_objects.PANTEIAResults import PANTEIAResults, from_values as results_from_values, get_result_addresses
 from data_objects.ScenarioYear import ScenarioYear
 from data_objects.Vehicle import Vehicle
 from excel_interfaces.AbstractExcelInterface import AbstractExcelInterface
-from exceptions import NoExcelFileFound, NoPANTEIAModelFound
+from excel_interfaces.PANTEIAResultsCache import PANTEIAResultsCache
+from exceptions import NoPANTEIAModelFound
+from hashlib import sha256
+from json import dumps
+from Logger import Logger
+from numpy import array, ndarray
+from os import getpid, makedirs, remove, replace
 from os.path import isfile
-from utility_functions import convert_cooled_boolean
+from pickle import loads
+from pycel import ExcelCompiler
+import pycel
+from pycel.excelutil import AddressRange
+from utility_functions import convert_cooled_boolean, get_file_hash
 
 
 class PANTEIAInterface(AbstractExcelInterface):
 
-    PANTEIA_model_path: str = None
+    PANTEIA_model_path: str = "./PANTEIA_TCO_model.xlsm"
+    compiled_model_directory: str = "./compiled_models"
     ondernemers_module_tab_name: str = "TCO module ondernemers"
     beleidsmakers_module_tab_name: str = "TCO module beleidsmakers"
     ondernemers_calc_tab_name: str = "ondernemers_calc"
@@ -17,6 +29,64 @@ class PANTEIAInterface(AbstractExcelInterface):
     default_electric_lifespan: int = 7
     default_diesel_lifespan: int = 7
 
+    # The cells that are read to get the results, organised by worksheet
+    result_cell_addresses: dict = {
+        ondernemers_module_tab_name: ("C35", "D35",
+                                      "C44", "D44", "E44",
+                                      "C49", "D49", "E49",
+                                      "C50", "D50", "E50",
+                                      "C51", "D51", "E51",
+                                      "C62", "D62", "E62",
+                                      "C75", "D75", "E75",
+                                      "C80", "D80", "E80",
+                                      "C85", "D85", "E85",
+                                      "C95", "D95", "E95"),
+        ondernemers_calc_tab_name: ("B6", "B32", "B35", "C32", "C35", "C47", "C48", "I39"),
+        model_parameters_tab_name: tuple(f"B{row}" for row in range(57, 74))
+    }
+
+    # The cells that are changed by the interface, organised by worksheet.
+    # Only these cells stay variable in a pruned model, the other cells become constants
+    input_cell_references: dict = {
+        ondernemers_module_tab_name: ("B12:B16", "B21:B23", "B26:C27", "B29:C31", "C28",
+                                      "E12:E16", "E21:E23", "E27:E29", "C56:D56"),
+        beleidsmakers_module_tab_name: ("B13:B15", "B24:B25", "B29:B30", "B34:B35",
+                                        "E13:F14", "E16", "F17", "E24", "E29:E30", "E32", "E34"),
+        model_parameters_tab_name: ("D4:E10", "E14:E20", "G14:G20", "I14:I20", "P14:P20")
+    }
+
+    # The addresses of the input cells in a fixed order, together their values determine the results
+    input_addresses: tuple = tuple(cell_address.address
+                                   for sheet_name, references in input_cell_references.items()
+                                   for reference in references
+                                   for row in AddressRange(f"{sheet_name}!{reference}").resolve_range
+                                   for cell_address in row)
+
+    # The cells that are read at once to get the results, in the order of the fields of PANTEIAResults
+    result_addresses: tuple = get_result_addresses(ondernemers_module_tab_name, ondernemers_calc_tab_name)
+
+    # The compiled PANTEIA model, it's loaded once and copied for every instance
+    compiled_model: bytes = None
+    compiled_model_hash: str = None
+    compiled_model_configuration_hash: str = None
+
+    # The state of the model after resetting the values, it's restored instead of resetting every cell
+    default_snapshot: dict = None
+
+    # The price of the diesel vehicle (ondernemers_calc!I39 without depreciation costs), so the depreciation and the
+    # residual debt are calculated without evaluating the model. It's cleared whenever the cells it depends on change
+    diesel_vehicle_price: float = None
+
+    # The residual value of a vehicle in percentage of the price, indexed by the age of the vehicle in years.
+    # These cells don't depend on any input, so they're read from the model once
+    residual_value_percentages: ndarray = None
+
+    # The results of recently calculated input values, organised by interface class so engines don't share results.
+    # Results are only cached if the input cells are the only cells that can change
+    results_caches: dict = {}
+    results_cache_size: int = 4096
+    is_memoized: bool = True
+
     def __init__(self):
 
         """Initialises an interface for a PANTEIA model.
@@ -36,23 +106,206 @@ class PANTEIAInterface(AbstractExcelInterface):
         if not PANTEIA_model_found:
             raise NoPANTEIAModelFound
 
-        # Initiate the Excel model
+        # Copy the compiled Excel model, it's only compiled when the PANTEIA model has changed
         try:
-            super().__init__(self.PANTEIA_model_path)
-        except NoExcelFileFound:
+            if self.compiled_model is None:
+                self.load_compiled_model()
+            self.excel_model = loads(self.compiled_model)
+        except Exception:
             raise NoPANTEIAModelFound
 
+        # Results can only be cached by their input values if no other cell can change
+        self.is_memoized = self.input_cell_addresses == frozenset(self.input_addresses)
+
         # Reset values before starting
         self.reset_values()
+        self.save_default_snapshot()
+
+    def save_default_snapshot(self):
+
+        """Calculates the results with the default values and saves the state of the model.
+        Afterwards, reset_values restores this snapshot instead of setting every cell.
+
+        :return: Nothing
+        :rtype: None
+        """
+
+        for sheet_name, cell_addresses in self.result_cell_addresses.items():
+            for cell_address in cell_addresses:
+                self.get_cell_value(sheet_name, cell_address)
+
+        self.default_snapshot = self.take_snapshot()
+        self.load_lookup_tables()
+
+    def load_lookup_tables(self):
+
+        """Reads the static lookup tables from the "Model parameters" worksheet, if they weren't read before.
+        The tables are shared by all interfaces, so every year only indexes them instead of evaluating cells.
+
+        :return: Nothing
+        :rtype: None
+        """
+
+        if PANTEIAInterface.residual_value_percentages is None:
+            residual_value_addresses = tuple(f"{self.model_parameters_tab_name}!B{row}" for row in range(58, 74))
+            PANTEIAInterface.residual_value_percentages = array(self.get_cell_values(residual_value_addresses), dtype=float)
+
+    @classmethod
+    def load_compiled_model(cls, is_pruned: bool = True):
+
+        """Loads the compiled PANTEIA model into memory.
+        The compiled model is saved per hash of the PANTEIA model and of the compile configuration,
+        so it's only compiled again when the model, the compiled cells or the version of pycel change.
+
+        :param is_pruned: Whether only the cells that are needed for the results and the input cells are compiled.
+        :type is_pruned: bool
+
+        :raise NoPANTEIAModelFound: Raised if the PANTEIA model can't be found.
+
+        :return: The path to the compiled model.
+        :rtype: str
+        """
+
+        if not isfile(cls.PANTEIA_model_path):
+            raise NoPANTEIAModelFound
+
+        model_hash = get_file_hash(cls.PANTEIA_model_path)
+        configuration_hash = cls.get_compile_configuration_hash()
+        model_name = f"PANTEIA_TCO_model_{model_hash}_{configuration_hash}" + ("_pruned" if is_pruned else "")
+        compiled_model_path = f"{cls.compiled_model_directory}/{model_name}.pkl"
+
+        if isfile(compiled_model_path):
+            Logger.warning(f"Loading compiled PANTEIA model from {compiled_model_path}")
+        else:
+            Logger.warning(f"No compiled PANTEIA model found for hash {model_hash} "
+                           f"and configuration {configuration_hash}, compiling the PANTEIA model to {compiled_model_path}")
+            excel_model = cls.compile_model(is_pruned)
+
+            # Write to a temporary file first, so other processes never read a partial model
+            makedirs(cls.compiled_model_directory, exist_ok=True)
+            temporary_path = f"{compiled_model_path}.{getpid()}.pkl"
+            excel_model.to_file(temporary_path)
+            replace(temporary_path, compiled_model_path)
+            if isfile(f"{temporary_path}.yml"):
+                remove(f"{temporary_path}.yml")
+
+        with open(compiled_model_path, "rb") as file:
+            cls.compiled_model = file.read()
+        cls.compiled_model_hash = model_hash
+        cls.compiled_model_configuration_hash = configuration_hash
+
+        if is_pruned:
+            # Only the input cells are variable in a pruned model
+            cls.input_cell_addresses = frozenset(cls.get_input_cell_addresses())
+        else:
+            # Every cell without a formula in the compiled model can be changed
+            cls.input_cell_addresses = frozenset(address for address, cell in loads(cls.compiled_model).cell_map.items()
+                                                 if cell.formula is None and not cell.address.is_range)
+
+        return compiled_model_path
+
+    @classmethod
+    def get_compile_configuration_hash(cls):
+
+        """Gets the hash of everything besides the PANTEIA model that determines the compiled model:
+        the result cells, the input cells and the version of pycel.
+
+        :return: The first 16 characters of the hexadecimal SHA-256 hash of the configuration.
+        :rtype: str
+        """
+
+        configuration = {
+            "result_cell_addresses": cls.result_cell_addresses,
+            "input_cell_references": cls.input_cell_references,
+            "pycel_version": pycel.__version__
+        }
+
+        return sha256(dumps(configuration, sort_keys=True).encode()).hexdigest()[:16]
+
+    @classmethod
+    def compile_model(cls, is_pruned: bool = True):
+
+        """Compiles the PANTEIA model from the Excel file.
+        A pruned model only contains the precedents of the result cells and the input cells,
+        the precedents that don't depend on an input cell are replaced by their value.
+
+        :param is_pruned: Whether only the cells that are needed for the results and the input cells are compiled.
+        :type is_pruned: bool
+
+        :return: The compiled model, which can still read the Excel file.
+        :rtype: ExcelCompiler
+        """
+
+        excel_model = ExcelCompiler(filename=cls.PANTEIA_model_path)
+        result_addresses = [f"{sheet_name}!{cell_address}"
+                            for sheet_name, cell_addresses in cls.result_cell_addresses.items()
+                            for cell_address in cell_addresses]
+
+        # Build the dependency graph of the results before changing any values.
+        # pycel only recalculates cells that are in the graph when a value changes,
+        # cells that are added later would keep the value that was saved in the Excel file.
+        excel_model.evaluate(result_addresses)
+
+        if is_pruned:
+            # Trim every cell that the results don't need, the input cells that the results depend on are kept
+            input_addresses = cls.get_input_cell_addresses()
+            excel_model.trim_graph([address for address in input_addresses if address in excel_model.cell_map],
+                                   result_addresses)
+
+            # The compiled model can't read the Excel file, so the other input cells are added as well
+            excel_model.evaluate(input_addresses)
+        else:
+            # The compiled model can't read the Excel file, so every cell that can be changed is added as well
+            excel_model.evaluate([f"{sheet_name}!{cell.coordinate}"
+                                  for sheet_name in (cls.ondernemers_module_tab_name,
+                                                     cls.beleidsmakers_module_tab_name,
+                                                     cls.model_parameters_tab_name)
+                                  for row in excel_model.excel.workbook[sheet_name].iter_rows()
+                                  for cell in row if cell.data_type != "f"])
+
+        return excel_model
+
+    @classmethod
+    def get_input_cell_addresses(cls):
+
+        """Gets the addresses of all input cells, including the sheet.
+
+        :return: The addresses of the input cells.
+        :rtype: list
+        """
+
+        return list(cls.input_addresses)
+
+    def restore_snapshot(self, snapshot: dict):
+
+        """Restores the values of all cells to a snapshot, without recalculating anything.
+        The price of the vehicle is read again, because the snapshot can have other fixed parameters.
+
+        :param snapshot: The snapshot that was taken with take_snapshot.
+        :type snapshot: dict
+
+        :return: Nothing
+        :rtype: None
+        """
+
+        self.diesel_vehicle_price = None
+        super().restore_snapshot(snapshot)
 
     def reset_values(self):
 
         """Resets the cell values to the default.
+        The default snapshot is restored if it has been saved, otherwise every cell is set again.
 
         :return: Nothing
         :rtype: None
         """
 
+        self.diesel_vehicle_price = None
+
+        if self.default_snapshot is not None:
+            self.restore_snapshot(self.default_snapshot)
+            return
+
         self.reset_ondernemers_worksheet()
         self.reset_beleidsmakers_worksheet()
         self.reset_model_parameters_worksheet()
@@ -253,14 +506,18 @@ class PANTEIAInterface(AbstractExcelInterface):
         :rtype: None
         """
 
-        self.set_cell_value(self.ondernemers_module_tab_name, "B12", vehicle.type)
-        self.set_cell_value(self.ondernemers_module_tab_name, "B13", convert_cooled_boolean(vehicle.is_cooled))
-        self.set_cell_value(self.ondernemers_module_tab_name, "B14", vehicle.expected_total_distance_traveled_in_km)
-        # Assume 10 hours per operational day
-        self.set_cell_value(self.ondernemers_module_tab_name, "C28", vehicle.amount_of_operational_days * 10)
-        self.set_cell_value(self.ondernemers_module_tab_name, "B26", vehicle.technological_lifespan)
-        self.set_cell_value(self.ondernemers_module_tab_name, "C26", vehicle.technological_lifespan)
-        self.set_cell_value(self.ondernemers_module_tab_name, "B15", vehicle.electricity_type)
+        ondernemers = f"{self.ondernemers_module_tab_name}!"
+        self.diesel_vehicle_price = None
+        self.set_cell_values({
+            ondernemers + "B12": vehicle.type,
+            ondernemers + "B13": convert_cooled_boolean(vehicle.is_cooled),
+            ondernemers + "B14": vehicle.expected_total_distance_traveled_in_km,
+            # Assume 10 hours per operational day
+            ondernemers + "C28": vehicle.amount_of_operational_days * 10,
+            ondernemers + "B26": vehicle.technological_lifespan,
+            ondernemers + "C26": vehicle.technological_lifespan,
+            ondernemers + "B15": vehicle.electricity_type
+        })
 
         # Calculate driving range per day
         days_in_operation = int(self.get_cell_value(self.ondernemers_calc_tab_name, "B6"))
@@ -351,49 +608,59 @@ class PANTEIAInterface(AbstractExcelInterface):
         :rtype: None
         """
 
-        # TODO Add capacity diesel (increases too)
-        # Change prices and efficiency in model parameters
-        self.set_cell_value(self.model_parameters_tab_name, "E" + str(4 + vehicle_index), scenario_data.electric_price_in_euro)
-        self.set_cell_value(self.model_parameters_tab_name, "E" + str(14 + vehicle_index), scenario_data.diesel_price_in_euro)
-        self.set_cell_value(self.model_parameters_tab_name, "D" + str(4 + vehicle_index), scenario_data.capacity_in_kWh)
-        self.set_cell_value(self.model_parameters_tab_name, "G" + str(14 + vehicle_index), scenario_data.efficiency_electricity_in_kWh_per_km)
-        self.set_cell_value(self.model_parameters_tab_name, "I" + str(14 + vehicle_index), scenario_data.efficiency_diesel_in_liter_per_km)
+        ondernemers = f"{self.ondernemers_module_tab_name}!"
+        model_parameters = f"{self.model_parameters_tab_name}!"
 
-        # Subsidies and investment deduction
-        self.set_cell_value(self.ondernemers_module_tab_name, "E23", scenario_data.subsidies_EV_in_euro)
         investment_deduction = tax_percentage * (scenario_data.MIA_in_euro_per_lifespan + scenario_data.VAMIL_in_euro_per_lifespan)
-        self.set_cell_value(self.ondernemers_module_tab_name, "E22", investment_deduction)
-
-        # Reset Residual debt
-        self.set_cell_value(self.ondernemers_module_tab_name, "B31", 0)
-        self.set_cell_value(self.ondernemers_module_tab_name, "C31", 0)
 
         # Residual value (original price * residual percentage)
         original_electric_price = scenario_data.electric_price_in_euro
         original_diesel_price = scenario_data.diesel_price_in_euro
-        residual_percentage_electric = getattr(future_scenario_data, f"residual_value_EV_year_{vehicle_lifespan}_in_percentage")
-        residual_percentage_diesel = getattr(future_scenario_data, f"residual_value_diesel_year_{vehicle_lifespan}_in_percentage")
+        residual_percentage_electric = future_scenario_data.residual_values_EV_in_percentage.item(vehicle_lifespan)
+        residual_percentage_diesel = future_scenario_data.residual_values_diesel_in_percentage.item(vehicle_lifespan)
         residual_value_electric = original_electric_price * residual_percentage_electric
         residual_value_diesel = original_diesel_price * residual_percentage_diesel
 
-        self.set_cell_value(self.ondernemers_module_tab_name, "B27", residual_value_electric)
-        self.set_cell_value(self.ondernemers_module_tab_name, "C27", residual_value_diesel)
+        # The price of the vehicle changes
+        self.diesel_vehicle_price = None
 
-        # TODO Check Excel for calculation charging system per year (now based on life time vehicle)
-        # Charging system
-        self.set_cell_value(self.ondernemers_module_tab_name, "E27", scenario_data.gross_purchase_cost_charging_system_in_euro)
-        self.set_cell_value(self.ondernemers_module_tab_name, "E28", scenario_data.gross_installation_cost_charging_system_in_euro)
+        self.set_cell_values({
+            # TODO Add capacity diesel (increases too)
+            # Change prices and efficiency in model parameters
+            model_parameters + "E" + str(4 + vehicle_index): scenario_data.electric_price_in_euro,
+            model_parameters + "E" + str(14 + vehicle_index): scenario_data.diesel_price_in_euro,
+            model_parameters + "D" + str(4 + vehicle_index): scenario_data.capacity_in_kWh,
+            model_parameters + "G" + str(14 + vehicle_index): scenario_data.efficiency_electricity_in_kWh_per_km,
+            model_parameters + "I" + str(14 + vehicle_index): scenario_data.efficiency_diesel_in_liter_per_km,
 
-        # Charging capacity depot
-        self.set_cell_value(self.ondernemers_module_tab_name, "E13", scenario_data.charging_capacity_charging_pole_on_depot)
+            # Subsidies and investment deduction
+            ondernemers + "E23": scenario_data.subsidies_EV_in_euro,
+            ondernemers + "E22": investment_deduction,
 
-        # Charging time
-        self.set_cell_value(self.ondernemers_module_tab_name, "E15", charging_time_depot)
-        self.set_cell_value(self.ondernemers_module_tab_name, "E16", charging_time_public)
+            # Reset Residual debt
+            ondernemers + "B31": 0,
+            ondernemers + "C31": 0,
 
-        # Days standing still
-        self.set_cell_value(self.ondernemers_module_tab_name, "B30", scenario_data.standstil_EV_in_days)
-        self.set_cell_value(self.ondernemers_module_tab_name, "C30", 1)
+            # Residual value
+            ondernemers + "B27": residual_value_electric,
+            ondernemers + "C27": residual_value_diesel,
+
+            # TODO Check Excel for calculation charging system per year (now based on life time vehicle)
+            # Charging system
+            ondernemers + "E27": scenario_data.gross_purchase_cost_charging_system_in_euro,
+            ondernemers + "E28": scenario_data.gross_installation_cost_charging_system_in_euro,
+
+            # Charging capacity depot
+            ondernemers + "E13": scenario_data.charging_capacity_charging_pole_on_depot,
+
+            # Charging time
+            ondernemers + "E15": charging_time_depot,
+            ondernemers + "E16": charging_time_public,
+
+            # Days standing still
+            ondernemers + "B30": scenario_data.standstil_EV_in_days,
+            ondernemers + "C30": 1
+        })
 
     def update_variable_parameters(self, scenario_data: ScenarioYear):
 
@@ -406,28 +673,33 @@ class PANTEIAInterface(AbstractExcelInterface):
         :rtype: None
         """
 
-        # Repair costs
-        self.set_cell_value(self.ondernemers_module_tab_name, "B29", scenario_data.repair_costs_EV_euro_per_year)
-        self.set_cell_value(self.ondernemers_module_tab_name, "C29", 1500)
+        ondernemers = f"{self.ondernemers_module_tab_name}!"
+        beleidsmakers = f"{self.beleidsmakers_module_tab_name}!"
+
+        self.set_cell_values({
+            # Repair costs
+            ondernemers + "B29": scenario_data.repair_costs_EV_euro_per_year,
+            ondernemers + "C29": 1500,
 
-        # TODO Add Maintenance costs
+            # TODO Add Maintenance costs
 
-        # CO2 price
-        self.set_cell_value(self.beleidsmakers_module_tab_name, "E34", scenario_data.CO2_price_in_euro_per_ton)
+            # CO2 price
+            beleidsmakers + "E34": scenario_data.CO2_price_in_euro_per_ton,
 
-        # Fuel prices
-        self.set_cell_value(self.ondernemers_module_tab_name, "B21", scenario_data.fuel_price_diesel_excluding_tax_in_euro_per_liter)
-        self.set_cell_value(self.ondernemers_module_tab_name, "B22", scenario_data.electricity_price_private_excluding_tax_in_euro_per_kWh)
-        self.set_cell_value(self.ondernemers_module_tab_name, "B23", scenario_data.electricity_price_public_excluding_tax_in_euro_per_kWh)
-        self.set_cell_value(self.beleidsmakers_module_tab_name, "E24", scenario_data.change_in_excise_duty_diesel_in_percentage)
+            # Fuel prices
+            ondernemers + "B21": scenario_data.fuel_price_diesel_excluding_tax_in_euro_per_liter,
+            ondernemers + "B22": scenario_data.electricity_price_private_excluding_tax_in_euro_per_kWh,
+            ondernemers + "B23": scenario_data.electricity_price_public_excluding_tax_in_euro_per_kWh,
+            beleidsmakers + "E24": scenario_data.change_in_excise_duty_diesel_in_percentage,
 
-        # Vehicle tax (Diesel stays constant)
-        self.set_cell_value(self.ondernemers_module_tab_name, "C56", scenario_data.vehicle_tax_electric_in_euro_per_year)
-        self.set_cell_value(self.ondernemers_module_tab_name, "D56", scenario_data.vehicle_tax_electric_in_euro_per_year)
-        # self.set_cell_value(self.ondernemers_module_tab_name,. "E56", scenario_datavehicle_tax_diesel_in_euro_per_year)
+            # Vehicle tax (Diesel stays constant)
+            ondernemers + "C56": scenario_data.vehicle_tax_electric_in_euro_per_year,
+            ondernemers + "D56": scenario_data.vehicle_tax_electric_in_euro_per_year,
+            # ondernemers + "E56": scenario_data.vehicle_tax_diesel_in_euro_per_year,
 
-        # Charging capacity
-        self.set_cell_value(self.ondernemers_module_tab_name, "E14", scenario_data.charging_capacity_external_charging_pole)
+            # Charging capacity
+            ondernemers + "E14": scenario_data.charging_capacity_external_charging_pole
+        })
 
     # TODO Find a way to add this, without being in fixed parameters (so that it will be smeared over the lifespan)
     def update_price_electric_vehicle(self,
@@ -490,9 +762,9 @@ class PANTEIAInterface(AbstractExcelInterface):
         # TODO Make new function to compute residual values
         # Calculate yearly depreciation costs
         if 0 < vehicle_age < 16:
-            vehicle_price = self.get_cell_value(self.ondernemers_calc_tab_name, "I39")
-            old_percentage_vehicle = self.get_cell_value(self.model_parameters_tab_name, "B" + str(57 + int(vehicle_age)))
-            new_percentage_vehicle = self.get_cell_value(self.model_parameters_tab_name,"B" + str(58 + int(vehicle_age)))
+            vehicle_price = self.get_vehicle_price()
+            old_percentage_vehicle = self.residual_value_percentages.item(int(vehicle_age) - 1)
+            new_percentage_vehicle = self.residual_value_percentages.item(int(vehicle_age))
             difference = vehicle_price * (old_percentage_vehicle - new_percentage_vehicle)
         else:
             return ValueError
@@ -515,6 +787,24 @@ class PANTEIAInterface(AbstractExcelInterface):
         self.set_cell_value(self.ondernemers_module_tab_name,"B31",0)
         self.set_cell_value(self.ondernemers_module_tab_name,"C31",0)
 
+    def get_vehicle_price(self):
+
+        """Gets the price of the diesel vehicle, like ondernemers_calc!I39.
+        The cell is the yearly depreciation costs (C31) if they're set, otherwise the price of the vehicle type.
+        That price only changes with the vehicle, the fixed parameters and snapshots, so it's read once per vehicle.
+
+        :return: The price of the vehicle.
+        :rtype: float
+        """
+
+        yearly_depreciation_costs = self.get_cell_value(self.ondernemers_module_tab_name, "C31") or 0
+        if yearly_depreciation_costs > 0:
+            return yearly_depreciation_costs
+
+        if self.diesel_vehicle_price is None:
+            self.diesel_vehicle_price = self.get_cell_value(self.ondernemers_calc_tab_name, "I39")
+        return self.diesel_vehicle_price
+
     def set_ZE_costs(self, scenario_data: ScenarioYear):
 
         """Adds extra costs for driving in a ZE-zone with a Diesel vehicle
@@ -558,9 +848,9 @@ class PANTEIAInterface(AbstractExcelInterface):
         # calculate residual debt
         residual_debt = 0
         if 0 <= vehicle_age <= 15 and 0 <= lifespan <= 15:
-            vehicle_price = self.get_cell_value(self.ondernemers_calc_tab_name, "I39")
-            old_percentage_vehicle = self.get_cell_value(self.model_parameters_tab_name, "B" + str(58 + int(lifespan)))
-            new_percentage_vehicle = self.get_cell_value(self.model_parameters_tab_name, "B" + str(58 + int(vehicle_age)))
+            vehicle_price = self.get_vehicle_price()
+            old_percentage_vehicle = self.residual_value_percentages.item(int(lifespan))
+            new_percentage_vehicle = self.residual_value_percentages.item(int(vehicle_age))
             old_residual_value = vehicle_price * old_percentage_vehicle
             new_residual_value = vehicle_price * new_percentage_vehicle     # TODO Does not change in time here
             residual_debt = vehicle_price - new_residual_value - (vehicle_price - old_residual_value) / lifespan * vehicle_age  # positive if residual debt open
@@ -628,27 +918,80 @@ class PANTEIAInterface(AbstractExcelInterface):
         except ValueError:
             return False
 
-    def get_TCO_diesel(self, transition_year: int = 0):
+    def read_results(self):
+
+        """Reads all result cells at once, so the cells they depend on are only calculated once.
+
+        :return: The values of the result cells.
+        :rtype: PANTEIAResults
+        """
+
+        if not self.is_memoized:
+            return results_from_values(self.get_cell_values(self.result_addresses))
+
+        # Vehicles with the same inputs have the same results, so these are only calculated once
+        input_values = self.get_input_values()
+        results_cache = self.get_results_cache()
+        results = results_cache.get(input_values)
+        if results is None:
+            results = results_from_values(self.get_cell_values(self.result_addresses))
+            results_cache.put(input_values, results)
+
+        return results
+
+    def get_input_values(self):
+
+        """Gets the current values of the input cells, which identify the results in the cache.
+        The types are included, because Excel doesn't treat 1 and TRUE the same while Python does.
+
+        :return: The values of the input cells followed by their types, in the order of input_addresses.
+        :rtype: tuple
+        """
+
+        cell_map = self.excel_model.cell_map
+        values = tuple(cell_map[address].value if address in cell_map else None for address in self.input_addresses)
+        return values + tuple(map(type, values))
+
+    @classmethod
+    def get_results_cache(cls):
+
+        """Gets the results cache of the interface class, the cache is created if it doesn't exist yet.
+
+        :return: The results cache.
+        :rtype: PANTEIAResultsCache
+        """
+
+        if cls not in cls.results_caches:
+            cls.results_caches.setdefault(cls, PANTEIAResultsCache(cls.results_cache_size))
+        return cls.results_caches[cls]
+
+    def get_TCO_diesel(self, transition_year: int = 0, results: PANTEIAResults = None):
 
         """Gets the TCO values for a diesel vehicle.
 
         :param transition_year: The transition year.
         :type transition_year: int
+        :param results: The results that were already read, they're read from the model if not provided.
+        :type results: PANTEIAResults
 
         :return: The TCO values.
         :rtype: dict
         """
 
-        tco = int(self.get_cell_value(self.ondernemers_module_tab_name, 'E44'))
-        fixed_vehicle_costs = int(self.get_cell_value(self.ondernemers_module_tab_name, 'E62'))
-        variable_vehicle_costs = int(self.get_cell_value(self.ondernemers_module_tab_name, 'E75'))
-        write_off_costs_vehicle = int(self.get_cell_value(self.ondernemers_module_tab_name, 'E80'))
-        write_off_costs_charging_system = int(self.get_cell_value(self.ondernemers_module_tab_name, 'E85'))
-        driver_costs = int(self.get_cell_value(self.ondernemers_module_tab_name, 'E95'))
+        if results is None:
+            results = self.read_results()
+        diesel = results.diesel
+
+        tco = int(diesel.tco)
+        fixed_vehicle_costs = int(diesel.fixed_vehicle_costs)
+        variable_vehicle_costs = int(diesel.variable_vehicle_costs)
+        write_off_costs_vehicle = int(diesel.write_off_costs_vehicle)
+        write_off_costs_charging_system = int(diesel.write_off_costs_charging_system)
+        driver_costs = int(diesel.driver_costs)
         costs_public_charging = 0
-        CO2_emissions = float(self.get_cell_value(self.ondernemers_module_tab_name, 'E49'))
-        particulate_matter_emissions = float(self.get_cell_value(self.ondernemers_module_tab_name, 'E50'))
-        nitrogen_oxide_emissions = float(self.get_cell_value(self.ondernemers_module_tab_name, 'E51'))
+        CO2_emissions = float(diesel.CO2_emissions)
+        particulate_matter_emissions = float(diesel.particulate_matter_emissions)
+        nitrogen_oxide_emissions = float(diesel.nitrogen_oxide_emissions)
         kWh_charged_on_depot = 0.0
         kWh_charged_in_public = 0.0
         charging_time_depot = 0.0
@@ -672,7 +1015,8 @@ class PANTEIAInterface(AbstractExcelInterface):
 
     def get_TCO_electric(self,
                          is_exclusive_charging_at_depot_possible: bool = False,
-                         transition_year: int = 1):
+                         transition_year: int = 1,
+                         results: PANTEIAResults = None):
 
         """Gets the TCO values for an electric vehicle.
 
@@ -680,41 +1024,48 @@ class PANTEIAInterface(AbstractExcelInterface):
         :type is_exclusive_charging_at_depot_possible: bool
         :param transition_year: The transition year.
         :type transition_year: int
+        :param results: The results that were already read, they're read from the model if not provided.
+        :type results: PANTEIAResults
 
         :return: The TCO values.
         :rtype: dict
         """
 
+        if results is None:
+            results = self.read_results()
+
         if is_exclusive_charging_at_depot_possible:
-            tco = int(self.get_cell_value(self.ondernemers_module_tab_name, 'C44'))
-            fixed_vehicle_costs = int(self.get_cell_value(self.ondernemers_module_tab_name, 'C62'))
-            variable_vehicle_costs = int(self.get_cell_value(self.ondernemers_module_tab_name, 'C75'))
-            write_off_costs_vehicle = int(self.get_cell_value(self.ondernemers_module_tab_name, 'C80'))
-            write_off_costs_charging_system = int(self.get_cell_value(self.ondernemers_module_tab_name, 'C85'))
-            driver_costs = int(self.get_cell_value(self.ondernemers_module_tab_name, 'C95'))
+            depot_charging = results.depot_charging
+            tco = int(depot_charging.tco)
+            fixed_vehicle_costs = int(depot_charging.fixed_vehicle_costs)
+            variable_vehicle_costs = int(depot_charging.variable_vehicle_costs)
+            write_off_costs_vehicle = int(depot_charging.write_off_costs_vehicle)
+            write_off_costs_charging_system = int(depot_charging.write_off_costs_charging_system)
+            driver_costs = int(depot_charging.driver_costs)
             costs_public_charging = 0
-            CO2_emissions = float(self.get_cell_value(self.ondernemers_module_tab_name, 'C49'))
-            particulate_matter_emissions = float(self.get_cell_value(self.ondernemers_module_tab_name, 'C50'))
-            nitrogen_oxide_emissions = float(self.get_cell_value(self.ondernemers_module_tab_name, 'C51'))
-            kWh_charged_on_depot = float(self.get_cell_value(self.ondernemers_calc_tab_name, "B35"))
+            CO2_emissions = float(depot_charging.CO2_emissions)
+            particulate_matter_emissions = float(depot_charging.particulate_matter_emissions)
+            nitrogen_oxide_emissions = float(depot_charging.nitrogen_oxide_emissions)
+            kWh_charged_on_depot = float(results.kWh_charged_on_depot_exclusively)
             kWh_charged_in_public = 0.0
-            charging_time_depot = float(self.get_cell_value(self.ondernemers_calc_tab_name, "B32"))
+            charging_time_depot = float(results.charging_time_depot_exclusively)
             charging_time_public = 0.0
         else:
-            tco = int(self.get_cell_value(self.ondernemers_module_tab_name, 'D44'))
-            fixed_vehicle_costs = int(self.get_cell_value(self.ondernemers_module_tab_name, 'D62'))
-            variable_vehicle_costs = int(self.get_cell_value(self.ondernemers_module_tab_name, 'D75'))
-            write_off_costs_vehicle = int(self.get_cell_value(self.ondernemers_module_tab_name, 'D80'))
-            write_off_costs_charging_system = int(self.get_cell_value(self.ondernemers_module_tab_name, 'D85'))
-            driver_costs = int(self.get_cell_value(self.ondernemers_module_tab_name, 'D95'))
-            costs_public_charging = max(0,driver_costs - int(self.get_cell_value(self.ondernemers_module_tab_name, 'C95'))) + 144 # TODO 144 euro are costs for abonnement fastned, change this in scenarios
-            CO2_emissions = float(self.get_cell_value(self.ondernemers_module_tab_name, 'D49'))
-            particulate_matter_emissions = float(self.get_cell_value(self.ondernemers_module_tab_name, 'D50'))
-            nitrogen_oxide_emissions = float(self.get_cell_value(self.ondernemers_module_tab_name, 'D51'))
-            kWh_charged_on_depot = float(self.get_cell_value(self.ondernemers_calc_tab_name, "C35"))
-            kWh_charged_in_public = float(self.get_cell_value(self.ondernemers_calc_tab_name, "C47"))
-            charging_time_depot = float(self.get_cell_value(self.ondernemers_calc_tab_name, "C32"))
-            charging_time_public = float(self.get_cell_value(self.ondernemers_calc_tab_name, "C48"))
+            optimal_mix = results.optimal_mix
+            tco = int(optimal_mix.tco)
+            fixed_vehicle_costs = int(optimal_mix.fixed_vehicle_costs)
+            variable_vehicle_costs = int(optimal_mix.variable_vehicle_costs)
+            write_off_costs_vehicle = int(optimal_mix.write_off_costs_vehicle)
+            write_off_costs_charging_system = int(optimal_mix.write_off_costs_charging_system)
+            driver_costs = int(optimal_mix.driver_costs)
+            costs_public_charging = max(0,driver_costs - int(results.depot_charging.driver_costs)) + 144 # TODO 144 euro are costs for abonnement fastned, change this in scenarios
+            CO2_emissions = float(optimal_mix.CO2_emissions)
+            particulate_matter_emissions = float(optimal_mix.particulate_matter_emissions)
+            nitrogen_oxide_emissions = float(optimal_mix.nitrogen_oxide_emissions)
+            kWh_charged_on_depot = float(results.kWh_charged_on_depot)
+            kWh_charged_in_public = float(results.kWh_charged_in_public)
+            charging_time_depot = float(results.charging_time_depot)
+            charging_time_public = float(results.charging_time_public)
 
         return self.create_TCO_result_dictionary(tco,
                                                  fixed_vehicle_costs,
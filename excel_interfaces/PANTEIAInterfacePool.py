@@ -0,0 +1,102 @@
+from contextlib import contextmanager
+from excel_interfaces.NativePANTEIAInterface import NativePANTEIAInterface
+from excel_interfaces.PANTEIAInterface import PANTEIAInterface
+from Logger import Logger
+from queue import Empty, Queue
+from threading import Lock
+
+
+class PANTEIAInterfacePool:
+    """
+    A process-wide pool of warm PANTEIA interfaces that is shared by the requests.
+    Constructing an interface costs more than most calculations, so interfaces are reused.
+    Every interface in the pool has been reset and is ready to use.
+
+    Attributes:
+        size (int): The maximum amount of idle interfaces per engine, this should match the amount of threads.
+        pools (dict): The queues of idle interfaces, organised by interface class.
+    """
+
+    size: int = 4
+    pools: dict = {}
+    lock: Lock = Lock()
+
+    @classmethod
+    def initialize(cls, size: int, interface_classes: tuple = (NativePANTEIAInterface,)):
+        """
+        Sets the size of the pool and fills it with warm interfaces.
+
+        Parameters:
+            size (int): The maximum amount of idle interfaces per engine, this should match the amount of threads.
+            interface_classes (tuple): The interface classes of which instances are created up-front.
+        """
+
+        cls.size = size
+        for interface_class in interface_classes:
+            pool = cls.get_pool(interface_class)
+            while pool.qsize() < cls.size:
+                pool.put(interface_class())
+
+            Logger.warning(f"PANTEIA interface pool filled with {cls.size} {interface_class.__name__} instances")
+
+    @classmethod
+    def get_pool(cls, interface_class: type):
+        """
+        Gets the queue of idle interfaces of an interface class, the queue is created if it doesn't exist yet.
+
+        Parameters:
+            interface_class (type): The class of the interfaces.
+
+        Returns:
+            Queue: The queue of idle interfaces.
+        """
+
+        with cls.lock:
+            if interface_class not in cls.pools:
+                cls.pools[interface_class] = Queue()
+            return cls.pools[interface_class]
+
+    @classmethod
+    @contextmanager
+    def checkout(cls, interface_class: type = NativePANTEIAInterface):
+        """
+        Checks out an interface for the duration of a with-block.
+        A new interface is created when the pool is empty.
+        The interface is always reset before it's returned, interfaces that fail to reset are discarded.
+
+        Parameters:
+            interface_class (type): The class of the interface, either NativePANTEIAInterface or PANTEIAInterface.
+
+        Yields:
+            PANTEIAInterface: A reset interface.
+        """
+
+        pool = cls.get_pool(interface_class)
+        try:
+            interface = pool.get_nowait()
+        except Empty:
+            interface = interface_class()
+
+        try:
+            yield interface
+        finally:
+            cls.return_interface(pool, interface)
+
+    @classmethod
+    def return_interface(cls, pool: Queue, interface: PANTEIAInterface):
+        """
+        Resets an interface and returns it to the pool, unless the pool is already full.
+
+        Parameters:
+            pool (Queue): The queue of idle interfaces.
+            interface (PANTEIAInterface): The interface to return.
+        """
+
+        try:
+            interface.reset_values()
+        except Exception as exception:
+            Logger.error(f"Discarding PANTEIA interface that couldn't be reset: {exception}")
+            return
+
+        if pool.qsize() < cls.size:
+            pool.put(interface)
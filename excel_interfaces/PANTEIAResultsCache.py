@@ -0,0 +1,88 @@
+from collections import OrderedDict
+from data_objects.PANTEIAResults import PANTEIAResults
+from threading import Lock
+
+
+class PANTEIAResultsCache:
+    """
+    A bounded cache of PANTEIA results, organised by the values of the input cells they were calculated with.
+    The least recently used results are discarded when the cache is full.
+    The results are immutable, so they can be shared by all interfaces and threads.
+
+    Attributes:
+        size (int): The maximum amount of results in the cache.
+        results (OrderedDict): The results organised by input values, the least recently used first.
+        hits (int): The amount of times results were found in the cache.
+        misses (int): The amount of times results had to be calculated.
+    """
+
+    def __init__(self, size: int):
+        """
+        Initialises an empty cache.
+
+        Parameters:
+            size (int): The maximum amount of results in the cache.
+        """
+
+        self.size = size
+        self.results = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+
+    def get(self, input_values: tuple):
+        """
+        Gets the results that were calculated with the input values and counts the hit or miss.
+
+        Parameters:
+            input_values (tuple): The values of the input cells.
+
+        Returns:
+            PANTEIAResults: The results, or None if they aren't in the cache.
+        """
+
+        with self.lock:
+            results = self.results.get(input_values)
+            if results is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.results.move_to_end(input_values)
+
+            return results
+
+    def put(self, input_values: tuple, results: PANTEIAResults):
+        """
+        Adds the results that were calculated with the input values, discarding the least recently used results.
+
+        Parameters:
+            input_values (tuple): The values of the input cells.
+            results (PANTEIAResults): The calculated results.
+        """
+
+        with self.lock:
+            self.results[input_values] = results
+            self.results.move_to_end(input_values)
+            while len(self.results) > self.size:
+                self.results.popitem(last=False)
+
+    def clear(self):
+        """
+        Discards all results and resets the counters.
+        """
+
+        with self.lock:
+            self.results.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def get_statistics(self):
+        """
+        Gets the counters of the cache.
+
+        Returns:
+            dict: The amount of hits, misses and cached results.
+        """
+
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "size": len(self.results)}
@@ -35,7 +35,7 @@ class ScenariosInterface(AbstractExcelInterface):
         "hoog 6",
         "hoog 7",
     )
-    scenarios: dict = {}
+    scenarios: dict = None
 
     def __init__(self, path_to_scenario_data):
 
@@ -57,6 +57,9 @@ class ScenariosInterface(AbstractExcelInterface):
         except NoExcelFileFound:
             raise NoScenarioDataFound
 
+        # Every interface reads its own scenario data, so the scenarios aren't shared between requests
+        self.scenarios = {}
+
         # Read scenario data
         for scenario_sheet_name in self.valid_scenario_sheet_names:
 
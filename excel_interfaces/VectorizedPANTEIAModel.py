@@ -0,0 +1,1306 @@
+from data_objects.FleetColumns import FleetColumns
+from data_objects.PANTEIAResults import PANTEIAResults, TCOCellValues
+from excel_interfaces.NativePANTEIAInterface import (BELEIDSMAKERS, CellError, MODEL_PARAMETERS, ONDERNEMERS,
+                                                     ONDERNEMERS_CALC, SCENARIO_VALID, NativePANTEIAInterface,
+                                                     find_exact_match, get_range_addresses, is_equal, to_number)
+from excel_interfaces.PANTEIAInterface import PANTEIAInterface
+from excel_interfaces.PANTEIAInterfacePool import PANTEIAInterfacePool
+from exceptions import PANTEIAModelError
+from threading import Lock
+import numpy as np
+
+
+def to_float(value: any):
+
+    """Converts a cell value into a float, like Excel does when calculating. Errors become NaN.
+
+    :param value: The value of a cell.
+    :type value: any
+
+    :return: The value as a float, or NaN if it can't be used as a number.
+    :rtype: float
+    """
+
+    try:
+        return float(to_number(value))
+    except CellError:
+        return np.nan
+
+
+def divide(numerator: any, denominator: any):
+
+    """Divides the values per row, dividing by zero results in an error like in Excel.
+
+    :return: The quotients, or NaN for the rows that divide by zero.
+    :rtype: ndarray
+    """
+
+    return np.where(np.equal(denominator, 0), np.nan, np.true_divide(numerator, denominator))
+
+
+def choose(condition: any, value_if_true: any, value_if_false: any, *condition_values: any):
+
+    """Chooses a value per row, like the IF function in Excel.
+    Rows of which a value in the condition is an error get the error, instead of the value if false.
+
+    :param condition: The condition per row.
+    :type condition: ndarray
+    :param value_if_true: The values of the rows that meet the condition.
+    :type value_if_true: any
+    :param value_if_false: The values of the other rows.
+    :type value_if_false: any
+    :param condition_values: The values that the condition is calculated with.
+    :type condition_values: any
+
+    :return: The chosen values.
+    :rtype: ndarray
+    """
+
+    result = np.where(condition, value_if_true, value_if_false)
+    for value in condition_values:
+        result = np.where(np.isnan(value), np.nan, result)
+    return result
+
+
+def if_error(value: any, value_on_error: any):
+
+    """Uses a fallback for the rows with an error, like the IFERROR function in Excel.
+
+    :return: The values with the fallback for errors.
+    :rtype: ndarray
+    """
+
+    return np.where(np.isnan(value), value_on_error, value)
+
+
+def minimum(*values: any):
+
+    """Gets the smallest value per row, like the MIN function. Errors propagate.
+
+    :return: The smallest values.
+    :rtype: ndarray
+    """
+
+    result = values[0]
+    for value in values[1:]:
+        result = np.minimum(result, value)
+    return result
+
+
+def calculate_sum(*values: any):
+
+    """Sums the values per row in order, like the SUM function. Errors propagate.
+
+    :return: The sums.
+    :rtype: ndarray
+    """
+
+    total = 0
+    for value in values:
+        total = total + value
+    return total
+
+
+def find_index(values: list, positions: any):
+
+    """Gets a value from a column by its position per row, like the INDEX function in Excel.
+    Position zero selects the first value, positions outside of the column result in an error.
+
+    :param values: The values of the column, either a number or an array with a value per row.
+    :type values: list
+    :param positions: The position per row, starting at 1.
+    :type positions: any
+
+    :return: The values at the positions.
+    :rtype: ndarray
+    """
+
+    positions = np.trunc(positions)
+    is_inside = (positions >= 0) & (positions <= len(values))
+    indices = np.where(is_inside, np.maximum(positions, 1) - 1, 0).astype(np.intp)
+
+    if any(np.ndim(value) for value in values):
+        table = np.stack(np.broadcast_arrays(*values))
+        indices = np.broadcast_to(indices, table.shape[1:])
+        selected = np.take_along_axis(table, indices[np.newaxis], 0)[0]
+    else:
+        selected = np.asarray(values, dtype=float)[indices]
+
+    return np.where(is_inside, selected, np.nan)
+
+
+def find_single_value(values: list, positions: any):
+
+    """Gets a single value from a column by its position per row, like INDEX in a formula that expects one value.
+    Position zero selects the entire column, which results in an error.
+
+    :param values: The values of the column.
+    :type values: list
+    :param positions: The position per row, starting at 1.
+    :type positions: any
+
+    :return: The values at the positions.
+    :rtype: ndarray
+    """
+
+    return np.where(np.equal(positions, 0), np.nan, find_index(values, positions))
+
+
+def find_column_minimum(values: list, positions: any, factor: any):
+
+    """Gets the smallest product of a factor and the values of a column selected by position per row.
+    Position zero selects all values of the column, like the INDEX function in Excel.
+
+    :param values: The values of the column.
+    :type values: list
+    :param positions: The position per row, starting at 1.
+    :type positions: any
+    :param factor: The factor per row.
+    :type factor: any
+
+    :return: The smallest products.
+    :rtype: ndarray
+    """
+
+    all_values = minimum(*(factor * value for value in values))
+    return choose(np.equal(positions, 0), all_values, factor * find_index(values, positions), positions)
+
+
+def find_descending_match(lookup_values: any, values: list):
+
+    """Gets the position of the smallest value that is greater than or equal to the lookup value per row,
+    like the MATCH function in Excel with match type -1. The values should be in descending order.
+
+    :param lookup_values: The value to look up per row.
+    :type lookup_values: any
+    :param values: The values to search, either a number or an array with a value per row. Errors are skipped.
+    :type values: list
+
+    :return: The positions, starting at 1, or NaN for the rows without a match.
+    :rtype: ndarray
+    """
+
+    result = np.full(np.broadcast(lookup_values, *values).shape, np.nan)
+    is_done = np.isnan(lookup_values) | np.zeros(result.shape, dtype=bool)
+
+    for position, value in enumerate(values, 1):
+        is_number = ~np.isnan(value) & ~is_done
+        is_smaller = is_number & (value < lookup_values)
+        is_match = is_number & ~is_smaller
+        result = np.where(is_match, position, result)
+        is_done = is_done | is_smaller | (is_match & np.equal(value, lookup_values))
+
+    return result
+
+
+def calculate_sum_if(sum_values: list, *criteria: tuple):
+
+    """Sums the values of which all criteria match per row, like the SUMIFS function in Excel.
+
+    :param sum_values: The values to sum, either a value of a cell or an array with a number per row.
+    :type sum_values: list
+    :param criteria: Tuples of the values of the cells to check and the value they should be equal to.
+        The value can be an array with a number per row, rows with an error get the error.
+    :type criteria: tuple
+
+    :return: The sums of the matching values.
+    :rtype: ndarray
+    """
+
+    total = 0
+    for index, value in enumerate(sum_values):
+        if np.ndim(value) == 0 and (not isinstance(value, (int, float)) or isinstance(value, bool)):
+            continue
+
+        is_matching = True
+        for criterion_values, criterion in criteria:
+            criterion_value = criterion_values[index]
+            if criterion_value is None:
+                is_matching = False
+            elif np.ndim(criterion) == 0:
+                is_matching = is_matching & is_equal(criterion_value, criterion)
+            elif isinstance(criterion_value, (int, float)):
+                is_matching = is_matching & np.equal(criterion, criterion_value)
+            else:
+                is_matching = False
+
+        total = total + np.where(is_matching, value, 0)
+
+    for criterion_values, criterion in criteria:
+        if np.ndim(criterion) > 0:
+            total = np.where(np.isnan(criterion), np.nan, total)
+    return total
+
+
+class VectorizedPANTEIAModel:
+    """
+    Calculates the formulas of the PANTEIA model for many rows at once with NumPy, a row is a vehicle in a state.
+    The formulas mirror those of NativePANTEIAInterface, so every row gets the same results as a native interface
+    with the same input cells. Excel errors are NaN, text results like the scenario validity are 1 or 0.
+    The input cells contain a number for all rows or an array with a value per row,
+    the other cells keep the values of a reset PANTEIA model.
+
+    The methods that change the input cells mirror those of PANTEIAInterface and take a mask of the rows to change.
+    Rows for which PANTEIAInterface would raise an exception are marked as failed,
+    these should be calculated by an interface instead.
+
+    Attributes:
+        rows (int): The amount of rows.
+        values (dict): The values of the input cells that were changed, organised by address.
+        calculated_values (dict): The calculated values of the formulas, organised by address.
+        is_calculated (bool): Whether the calculated values are up to date.
+        vehicle_type_positions (ndarray): The position of the vehicle type in the diesel vehicle parameters.
+        electric_vehicle_type_positions (ndarray): The position of the vehicle type in the electric vehicle parameters.
+        is_cooled (ndarray): Whether the vehicle is cooled.
+        is_grey_electricity (ndarray): Whether the vehicle uses the default type of electricity.
+        failed (ndarray): Whether an interface would have raised an exception for the row.
+    """
+
+    # The values of the cells of a reset PANTEIA model, read once from a native interface
+    default_values: dict = None
+    residual_value_percentages: np.ndarray = None
+    lock: Lock = Lock()
+
+    input_cell_addresses: frozenset = frozenset(PANTEIAInterface.input_addresses)
+
+    def __init__(self, rows: int):
+        """
+        Initialises a model with the values of a reset PANTEIA model for every row.
+
+        Parameters:
+            rows (int): The amount of rows.
+        """
+
+        self.load_default_values()
+        self.rows = rows
+        self.reset_values()
+
+    @classmethod
+    def load_default_values(cls):
+        """
+        Reads the values of a reset PANTEIA model from a native interface of the pool, if they weren't read before.
+        """
+
+        with cls.lock:
+            if cls.default_values is not None:
+                return
+
+            with PANTEIAInterfacePool.checkout(NativePANTEIAInterface) as PANTEIA_interface:
+                cls.default_values = dict(PANTEIA_interface.default_snapshot["cell_values"])
+                cls.residual_value_percentages = PANTEIA_interface.residual_value_percentages
+
+    def reset_values(self):
+        """
+        Resets the cell values of all rows to the default.
+        """
+
+        self.values = {}
+        self.calculated_values = {}
+        self.is_calculated = False
+        self.failed = np.zeros(self.rows, dtype=bool)
+
+        vehicle_type = self.default_values.get(ONDERNEMERS + "B12")
+        self.vehicle_type_positions = np.full(self.rows, self.get_vehicle_type_position(vehicle_type))
+        self.electric_vehicle_type_positions = np.full(self.rows, self.get_electric_vehicle_type_position(vehicle_type))
+        self.is_cooled = np.full(self.rows, is_equal(self.default_values.get(ONDERNEMERS + "B13"), "gekoeld"))
+        self.is_grey_electricity = np.full(self.rows,
+                                           self.get_is_grey_electricity(self.default_values.get(ONDERNEMERS + "B15")))
+
+    def get_vehicle_type_position(self, vehicle_type: any):
+        """
+        Gets the position of a vehicle type in the diesel vehicle parameters, like ondernemers_calc!D20.
+
+        Parameters:
+            vehicle_type (any): The vehicle type.
+
+        Returns:
+            float: The position, starting at 1, or NaN if the vehicle type doesn't exist.
+        """
+
+        return self.match_vehicle_type(vehicle_type, MODEL_PARAMETERS + "A14:A20")
+
+    def get_electric_vehicle_type_position(self, vehicle_type: any):
+        """
+        Gets the position of a vehicle type in the electric vehicle parameters, like ondernemers_calc!B18.
+
+        Parameters:
+            vehicle_type (any): The vehicle type.
+
+        Returns:
+            float: The position, starting at 1, or NaN if the vehicle type doesn't exist.
+        """
+
+        return self.match_vehicle_type(vehicle_type, MODEL_PARAMETERS + "A4:A10")
+
+    def match_vehicle_type(self, vehicle_type: any, reference: str):
+        """
+        Gets the position of a vehicle type in a range of vehicle types.
+
+        Parameters:
+            vehicle_type (any): The vehicle type.
+            reference (str): The range of vehicle types.
+
+        Returns:
+            float: The position, starting at 1, or NaN if the vehicle type doesn't exist.
+        """
+
+        vehicle_types = tuple((self.default_values.get(address),) for address, in get_range_addresses(reference))
+        try:
+            return float(find_exact_match(0 if vehicle_type is None else vehicle_type, vehicle_types))
+        except CellError:
+            return np.nan
+
+    def get_is_grey_electricity(self, electricity_type: any):
+        """
+        Gets whether an electricity type is the default one in the model parameters.
+
+        Parameters:
+            electricity_type (any): The electricity type.
+
+        Returns:
+            bool: Whether the electricity type is the default one.
+        """
+
+        return is_equal(electricity_type, self.default_values.get(MODEL_PARAMETERS + "B31"))
+
+    def get_value(self, address: str):
+        """
+        Gets the value of a cell, which is a single value or an array with a value per row.
+
+        Parameters:
+            address (str): The address of the cell, including the sheet.
+
+        Returns:
+            any: The value of the cell.
+        """
+
+        if address in self.calculated_values:
+            return self.calculated_values[address]
+        if address in self.values:
+            return self.values[address]
+        return self.default_values.get(address)
+
+    def get_number(self, address: str):
+        """
+        Gets the value of a cell as a number, empty cells are zero and errors are NaN.
+
+        Parameters:
+            address (str): The address of the cell, including the sheet.
+
+        Returns:
+            any: The number, or an array with a number per row.
+        """
+
+        value = self.get_value(address)
+        return value if isinstance(value, np.ndarray) else to_float(value)
+
+    def get_calc_number(self, cell_address: str):
+        """
+        Gets the value of a cell in the ondernemers_calc worksheet as a number.
+
+        Parameters:
+            cell_address (str): The address of the cell. Example: D20.
+
+        Returns:
+            any: The number, or an array with a number per row.
+        """
+
+        return self.get_number(ONDERNEMERS_CALC + cell_address)
+
+    def get_numbers(self, reference: str):
+        """
+        Gets the values of a range as numbers, as a flat list.
+
+        Parameters:
+            reference (str): The range, including the sheet. Example: Model parameters!D4:D10.
+
+        Returns:
+            list: The numbers, or arrays with a number per row.
+        """
+
+        return [self.get_number(address) for row in get_range_addresses(reference) for address in row]
+
+    def get_raw_values(self, reference: str):
+        """
+        Gets the values of a range as they are in the model, as a flat list.
+
+        Parameters:
+            reference (str): The range, including the sheet.
+
+        Returns:
+            list: The values.
+        """
+
+        return [self.get_value(address) for row in get_range_addresses(reference) for address in row]
+
+    def is_empty(self, address: str):
+        """
+        Checks whether an input cell is empty. A cell that has been set for some rows isn't empty for any row.
+
+        Parameters:
+            address (str): The address of the cell, including the sheet.
+
+        Returns:
+            bool: Whether the cell is empty.
+        """
+
+        return self.get_value(address) is None
+
+    def set_values(self, values: dict, mask: np.ndarray = None):
+        """
+        Sets the values of input cells for the rows of a mask.
+        Rows of the mask that get an invalid value are marked as failed. An empty cell becomes zero for the rows
+        outside of the mask, so cells of which formulas check whether they're empty should be set for all rows first.
+
+        Parameters:
+            values (dict): The values organised by address, either a single value or an array with a value per row.
+            mask (ndarray): The rows to change, all rows if not provided.
+
+        Raises:
+            PANTEIAModelError: Raised if one of the cells isn't an input cell.
+        """
+
+        for address, value in values.items():
+            if address not in self.input_cell_addresses:
+                raise PANTEIAModelError
+
+            number = value if isinstance(value, np.ndarray) else to_float(value)
+            self.mark_failed(mask, number)
+
+            if mask is None:
+                self.values[address] = value if isinstance(value, np.ndarray) or value is None else number
+            else:
+                self.values[address] = np.where(mask, number, self.get_number(address))
+
+        self.is_calculated = False
+        self.calculated_values = {}
+
+    def mark_failed(self, mask: np.ndarray, *values: any):
+        """
+        Marks the rows of a mask as failed if one of the values is invalid for the row.
+
+        Parameters:
+            mask (ndarray): The rows to check, all rows if not provided.
+            values (any): The numbers to check, NaN is invalid.
+        """
+
+        for value in values:
+            is_invalid = np.isnan(value)
+            self.failed = self.failed | (is_invalid if mask is None else is_invalid & mask)
+
+    def input_vehicle_data(self, vehicles: FleetColumns, mask: np.ndarray = None):
+        """
+        Input the vehicle data of every row into the model, like PANTEIAInterface.input_vehicle_data.
+
+        Parameters:
+            vehicles (FleetColumns): The vehicle of every row.
+            mask (ndarray): The rows to change, all rows if not provided.
+        """
+
+        positions = {vehicle_type: (self.get_vehicle_type_position(vehicle_type),
+                                    self.get_electric_vehicle_type_position(vehicle_type))
+                     for vehicle_type in set(vehicles.type)}
+        vehicle_type_positions = np.array([positions[vehicle_type][0] for vehicle_type in vehicles.type], dtype=float)
+        electric_vehicle_type_positions = np.array([positions[vehicle_type][1] for vehicle_type in vehicles.type],
+                                                   dtype=float)
+        electricity_types = {electricity_type: self.get_is_grey_electricity(electricity_type)
+                             for electricity_type in set(vehicles.electricity_type)}
+        is_grey_electricity = np.array([electricity_types[electricity_type]
+                                        for electricity_type in vehicles.electricity_type], dtype=bool)
+
+        selected = np.ones(self.rows, dtype=bool) if mask is None else mask
+        self.vehicle_type_positions = np.where(selected, vehicle_type_positions, self.vehicle_type_positions)
+        self.electric_vehicle_type_positions = np.where(selected, electric_vehicle_type_positions,
+                                                        self.electric_vehicle_type_positions)
+        self.is_cooled = np.where(selected, vehicles.is_cooled, self.is_cooled)
+        self.is_grey_electricity = np.where(selected, is_grey_electricity, self.is_grey_electricity)
+
+        self.set_values({
+            ONDERNEMERS + "B14": vehicles.expected_total_distance_traveled_in_km,
+            # Assume 10 hours per operational day
+            ONDERNEMERS + "C28": vehicles.amount_of_operational_days * 10,
+            ONDERNEMERS + "B26": vehicles.technological_lifespan,
+            ONDERNEMERS + "C26": vehicles.technological_lifespan
+        }, mask)
+
+        # Calculate driving range per day, the interface raises an exception if there are no days in operation
+        days_in_operation = np.trunc(self.calculate_days_in_operation())
+        self.mark_failed(mask, divide(1, days_in_operation), vehicles.maximum_daily_distance_in_km)
+        expected_daily_distance = divide(vehicles.expected_total_distance_traveled_in_km, days_in_operation)
+        driving_range_per_day = np.maximum(expected_daily_distance, vehicles.maximum_daily_distance_in_km)
+        self.set_values({ONDERNEMERS + "B16": driving_range_per_day}, mask)
+
+    def calculate_days_in_operation(self):
+        """
+        Calculates the days in operation per row, like ondernemers_calc!B6.
+
+        Returns:
+            ndarray: The days in operation.
+        """
+
+        distance_per_day = self.get_number(ONDERNEMERS + "C28") / 10
+        days = choose(distance_per_day <= 0, 260, distance_per_day, distance_per_day)
+        return days - self.get_number(ONDERNEMERS + "B30")
+
+    def update_fixed_parameters(self,
+                                vehicle_indices: np.ndarray,
+                                charging_time_depot: np.ndarray,
+                                charging_time_public: np.ndarray,
+                                tax_percentage: float,
+                                scenario_data: dict,
+                                residual_percentage_electric: np.ndarray,
+                                residual_percentage_diesel: np.ndarray,
+                                mask: np.ndarray = None):
+        """
+        Update the fixed parameters in the model, like PANTEIAInterface.update_fixed_parameters.
+
+        Parameters:
+            vehicle_indices (ndarray): The index of the vehicle type per row.
+            charging_time_depot (ndarray): The time charging on the depot.
+            charging_time_public (ndarray): The time charging in public.
+            tax_percentage (float): The tax percentage of a company.
+            scenario_data (dict): The scenario data per row of the year of purchase, organised by field of ScenarioYear.
+            residual_percentage_electric (ndarray): The residual value of an electric vehicle at the end of its
+                lifespan, in percentage of the price.
+            residual_percentage_diesel (ndarray): The residual value of a diesel vehicle at the end of its lifespan.
+            mask (ndarray): The rows to change, all rows if not provided.
+        """
+
+        selected = np.ones(self.rows, dtype=bool) if mask is None else mask
+        self.mark_failed(selected, vehicle_indices)
+
+        investment_deduction = tax_percentage * (scenario_data["MIA_in_euro_per_lifespan"]
+                                                 + scenario_data["VAMIL_in_euro_per_lifespan"])
+
+        # Residual value (original price * residual percentage)
+        residual_value_electric = scenario_data["electric_price_in_euro"] * residual_percentage_electric
+        residual_value_diesel = scenario_data["diesel_price_in_euro"] * residual_percentage_diesel
+
+        # Change prices and efficiency in the model parameters of the vehicle type of every row
+        for vehicle_index in range(7):
+            vehicle_type_mask = selected & np.equal(vehicle_indices, vehicle_index)
+            if not vehicle_type_mask.any():
+                continue
+
+            self.set_values({
+                MODEL_PARAMETERS + "E" + str(4 + vehicle_index): scenario_data["electric_price_in_euro"],
+                MODEL_PARAMETERS + "E" + str(14 + vehicle_index): scenario_data["diesel_price_in_euro"],
+                MODEL_PARAMETERS + "D" + str(4 + vehicle_index): scenario_data["capacity_in_kWh"],
+                MODEL_PARAMETERS + "G" + str(14 + vehicle_index): scenario_data["efficiency_electricity_in_kWh_per_km"],
+                MODEL_PARAMETERS + "I" + str(14 + vehicle_index): scenario_data["efficiency_diesel_in_liter_per_km"]
+            }, vehicle_type_mask)
+
+        self.set_values({
+            # Subsidies and investment deduction
+            ONDERNEMERS + "E23": scenario_data["subsidies_EV_in_euro"],
+            ONDERNEMERS + "E22": investment_deduction,
+
+            # Reset Residual debt
+            ONDERNEMERS + "B31": 0,
+            ONDERNEMERS + "C31": 0,
+
+            # Residual value
+            ONDERNEMERS + "B27": residual_value_electric,
+            ONDERNEMERS + "C27": residual_value_diesel,
+
+            # Charging system
+            ONDERNEMERS + "E27": scenario_data["gross_purchase_cost_charging_system_in_euro"],
+            ONDERNEMERS + "E28": scenario_data["gross_installation_cost_charging_system_in_euro"],
+
+            # Charging capacity depot
+            ONDERNEMERS + "E13": scenario_data["charging_capacity_charging_pole_on_depot"],
+
+            # Charging time
+            ONDERNEMERS + "E15": charging_time_depot,
+            ONDERNEMERS + "E16": charging_time_public,
+
+            # Days standing still
+            ONDERNEMERS + "B30": scenario_data["standstil_EV_in_days"],
+            ONDERNEMERS + "C30": 1
+        }, mask)
+
+    def update_variable_parameters(self, scenario_data: dict, mask: np.ndarray = None):
+        """
+        Update the variable parameters in the model, like PANTEIAInterface.update_variable_parameters.
+
+        Parameters:
+            scenario_data (dict): The scenario data per row of the current year, organised by field of ScenarioYear.
+            mask (ndarray): The rows to change, all rows if not provided.
+        """
+
+        self.set_values({
+            # Repair costs
+            ONDERNEMERS + "B29": scenario_data["repair_costs_EV_euro_per_year"],
+            ONDERNEMERS + "C29": 1500,
+
+            # CO2 price
+            BELEIDSMAKERS + "E34": scenario_data["CO2_price_in_euro_per_ton"],
+
+            # Fuel prices
+            ONDERNEMERS + "B21": scenario_data["fuel_price_diesel_excluding_tax_in_euro_per_liter"],
+            ONDERNEMERS + "B22": scenario_data["electricity_price_private_excluding_tax_in_euro_per_kWh"],
+            ONDERNEMERS + "B23": scenario_data["electricity_price_public_excluding_tax_in_euro_per_kWh"],
+            BELEIDSMAKERS + "E24": scenario_data["change_in_excise_duty_diesel_in_percentage"],
+
+            # Vehicle tax (Diesel stays constant)
+            ONDERNEMERS + "C56": scenario_data["vehicle_tax_electric_in_euro_per_year"],
+            ONDERNEMERS + "D56": scenario_data["vehicle_tax_electric_in_euro_per_year"],
+
+            # Charging capacity
+            ONDERNEMERS + "E14": scenario_data["charging_capacity_external_charging_pole"]
+        }, mask)
+
+    def update_price_electric_vehicle(self, additional_price: np.ndarray, mask: np.ndarray):
+        """
+        As a workaround, add residual debt to vehicle price, like PANTEIAInterface.update_price_electric_vehicle.
+
+        Parameters:
+            additional_price (ndarray): The residual debt from the last vehicle per row.
+            mask (ndarray): The rows to change.
+        """
+
+        repair_costs = self.get_number(ONDERNEMERS + "B29")
+        self.set_values({ONDERNEMERS + "B29": repair_costs + additional_price}, mask)
+
+    def increase_maintenance_factor(self, is_diesel: np.ndarray, yearly_increase_factor: np.ndarray, mask: np.ndarray):
+        """
+        Increases the maintenance cost by a factor, like PANTEIAInterface.increase_maintenance_factor.
+
+        Parameters:
+            is_diesel (ndarray): Whether the fuel type of the row is diesel.
+            yearly_increase_factor (ndarray): The factor by which the costs should increase.
+            mask (ndarray): The rows to change.
+        """
+
+        for is_diesel_mask, costs_address, days_address in ((is_diesel, "C29", "C30"), (~is_diesel, "B29", "B30")):
+            rows = mask & is_diesel_mask
+            cost_of_repairs = np.trunc(self.get_number(ONDERNEMERS + costs_address))
+            days_standing_still = self.get_number(ONDERNEMERS + days_address)
+            self.set_values({
+                ONDERNEMERS + costs_address: cost_of_repairs * yearly_increase_factor,
+                ONDERNEMERS + days_address: days_standing_still * yearly_increase_factor
+            }, rows)
+
+    def decrease_yearly_depreciation_costs(self, is_diesel: np.ndarray, vehicle_age: np.ndarray, mask: np.ndarray):
+        """
+        Decreases the yearly depreciation cost because the vehicle is already paid off,
+        like PANTEIAInterface.decrease_yearly_depreciation_costs.
+
+        Parameters:
+            is_diesel (ndarray): Whether the fuel type of the row is diesel.
+            vehicle_age (ndarray): The current age of the vehicle.
+            mask (ndarray): The rows to change.
+        """
+
+        is_within_table = mask & (vehicle_age > 0) & (vehicle_age < 16)
+        vehicle_price = self.calculate_vehicle_price()
+        self.mark_failed(is_within_table, vehicle_price)
+
+        indices = np.where(is_within_table, vehicle_age, 1).astype(np.intp)
+        old_percentage_vehicle = self.residual_value_percentages[indices - 1]
+        new_percentage_vehicle = self.residual_value_percentages[indices]
+        difference = vehicle_price * (old_percentage_vehicle - new_percentage_vehicle)
+
+        self.set_values({
+            ONDERNEMERS + "B31": 1,
+            ONDERNEMERS + "C31": difference
+        }, is_within_table & is_diesel)
+
+    def reset_yearly_depreciation_costs(self, mask: np.ndarray):
+        """
+        Resets the yearly depreciation cost, like PANTEIAInterface.reset_yearly_depreciation_costs.
+
+        Parameters:
+            mask (ndarray): The rows to change.
+        """
+
+        self.set_values({
+            ONDERNEMERS + "B31": 0,
+            ONDERNEMERS + "C31": 0
+        }, mask)
+
+    def set_ZE_costs(self, fixed_ZE_vehicle_tax: np.ndarray, mask: np.ndarray):
+        """
+        Sets the tax for driving a diesel vehicle in a Zero Emission zone, zero for the other rows.
+
+        Parameters:
+            fixed_ZE_vehicle_tax (ndarray): The tax per row of the current year.
+            mask (ndarray): The rows that drive a diesel vehicle in a Zero Emission zone.
+        """
+
+        self.set_values({BELEIDSMAKERS + "E32": np.where(mask, fixed_ZE_vehicle_tax, 0)})
+
+    def calculate_vehicle_price(self):
+        """
+        Calculates the price of the diesel vehicle per row, like ondernemers_calc!I39.
+
+        Returns:
+            ndarray: The vehicle prices.
+        """
+
+        residual_debt = self.get_number(ONDERNEMERS + "C31")
+        vehicle_price = find_index(self.get_numbers(MODEL_PARAMETERS + "E14:E20"), self.vehicle_type_positions)
+        return choose(residual_debt <= 0, vehicle_price, residual_debt, residual_debt)
+
+    def calculate_residual_debt(self, lifespan: np.ndarray, vehicle_age: np.ndarray, mask: np.ndarray):
+        """
+        Calculates the residual debt per row, like PANTEIAInterface.calculate_residual_debt.
+
+        Parameters:
+            lifespan (ndarray): The current lifespan of the vehicle.
+            vehicle_age (ndarray): The current age of the vehicle.
+            mask (ndarray): The rows to calculate.
+
+        Returns:
+            ndarray: The residual debt, which is zero outside of the mask.
+        """
+
+        is_within_table = mask & (vehicle_age >= 0) & (vehicle_age <= 15) & (lifespan >= 0) & (lifespan <= 15)
+        vehicle_price = self.calculate_vehicle_price()
+        self.mark_failed(is_within_table, vehicle_price, divide(1, lifespan))
+
+        old_percentage_vehicle = self.residual_value_percentages[np.where(is_within_table, lifespan, 0).astype(int)]
+        new_percentage_vehicle = self.residual_value_percentages[np.where(is_within_table, vehicle_age, 0).astype(int)]
+        old_residual_value = vehicle_price * old_percentage_vehicle
+        new_residual_value = vehicle_price * new_percentage_vehicle
+        residual_debt = vehicle_price - new_residual_value - divide(vehicle_price - old_residual_value, lifespan) \
+            * vehicle_age
+
+        return np.where(is_within_table, np.maximum(0, np.trunc(if_error(residual_debt, 0))), 0)
+
+    def calculate(self):
+        """
+        Calculates the formulas in the same order as NativePANTEIAInterface, for all rows at once.
+        """
+
+        self.calculated_values = {}
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            self.calculate_model_parameters()
+            self.calculate_beleidsmakers()
+            self.calculate_ondernemers_calc_input()
+            self.calculate_scenario_validity()
+            self.calculate_ondernemers_calc_emissions()
+            self.calculate_ondernemers_calc_costs()
+            self.calculate_ondernemers()
+
+        self.is_calculated = True
+
+    def set_calculated_values(self, sheet_name: str, values: dict):
+        """
+        Saves the calculated values of formulas.
+
+        Parameters:
+            sheet_name (str): The prefix of the addresses of the worksheet. Example: ondernemers_calc!.
+            values (dict): The values organised by cell address.
+        """
+
+        for cell_address, value in values.items():
+            self.calculated_values[sheet_name + cell_address] = value
+
+    def calculate_model_parameters(self):
+        """
+        Calculates the battery capacity per vehicle type and model.
+        """
+
+        capacities = self.get_numbers(MODEL_PARAMETERS + "D4:D10")
+        models = self.get_raw_values(MODEL_PARAMETERS + "C4:C10")
+        vehicle_types = self.get_raw_values(MODEL_PARAMETERS + "B4:B10")
+
+        self.set_calculated_values(MODEL_PARAMETERS, {"G36": 0.858})
+        for column in "BCDEFGH":
+            for row in (25, 26, 27):
+                self.set_calculated_values(MODEL_PARAMETERS, {f"{column}{row}": calculate_sum_if(
+                    capacities,
+                    (vehicle_types, self.get_value(f"{MODEL_PARAMETERS}{column}24")),
+                    (models, self.get_value(f"{MODEL_PARAMETERS}I{row}")))})
+
+    def calculate_beleidsmakers(self):
+        """
+        Calculates the fuel price including excise duty and the distance tax.
+        """
+
+        E25 = 0.536 * (1 + self.get_number(BELEIDSMAKERS + "E24"))
+        fuel_price = self.get_number(MODEL_PARAMETERS + "B92") if self.is_empty(ONDERNEMERS + "B21") \
+            else self.get_number(ONDERNEMERS + "B21")
+        self.set_calculated_values(BELEIDSMAKERS, {
+            "E25": E25,
+            "E23": fuel_price + E25,
+            "D78": self.get_number(BELEIDSMAKERS + "E29") * self.get_number(BELEIDSMAKERS + "B14")
+            * self.get_number(BELEIDSMAKERS + "E30")
+        })
+
+    def calculate_ondernemers_calc_input(self):
+        """
+        Calculates the vehicle usage and charging.
+        """
+
+        number = self.get_number
+        calc = self.get_calc_number
+        D20 = self.vehicle_type_positions
+        B18 = self.electric_vehicle_type_positions
+
+        # References to the input cells, empty cells result in zero
+        references = {
+            "H3": "E12", "H4": "E13", "H5": "E14", "H8": "B22", "H9": "B23", "H11": "C26", "H12": "C27",
+            "H18": "B26", "H19": "B27", "H24": "E21", "H25": "E23", "H27": "E27", "H28": "E28", "H40": "C31",
+            "I31": "B14"
+        }
+        self.set_calculated_values(ONDERNEMERS_CALC, {address: number(ONDERNEMERS + reference)
+                                                      for address, reference in references.items()})
+
+        # Days in operation and distance per day
+        H34 = number(ONDERNEMERS + "C28") / 10
+        I34 = choose(H34 <= 0, 260, H34, H34)
+        B6 = I34 - number(ONDERNEMERS + "B30")
+        D6 = I34 - number(ONDERNEMERS + "C30")
+        B4 = divide(number(ONDERNEMERS + "B14"), B6)
+        D4 = divide(number(ONDERNEMERS + "B14"), D6)
+        self.set_calculated_values(ONDERNEMERS_CALC, {"B6": B6, "C6": B6, "D6": D6, "B4": B4, "C4": B4, "D4": D4,
+                                                      "D20": D20, "B18": B18, "C18": B18})
+
+        # Driving and charging hours
+        D9 = find_index(self.get_numbers(MODEL_PARAMETERS + "D14:D20"), D20)
+        D10 = find_index(self.get_numbers(MODEL_PARAMETERS + "C14:C20"), D20)
+        D12 = divide(B4, D9)
+        E16 = number(ONDERNEMERS + "E16")
+        E15 = number(ONDERNEMERS + "E15")
+        D14 = choose(E16 <= 0, 3, E16, E16)
+        D15 = choose(E15 <= 0, 8, E15, E15)
+        D13 = minimum(divide(D12, 1 - D10), calc("D11") - D15)
+
+        # Energy consumption per day
+        X22 = find_index(self.get_numbers(MODEL_PARAMETERS + "G14:G20"), D20)
+        X23 = np.where(self.is_cooled, find_index(self.get_numbers(MODEL_PARAMETERS + "H14:H20"), D20), 0)
+        B7 = B4 * X22 + X23 * D13
+        D7 = D4 * X22 + X23 * D13
+
+        # Battery capacity
+        battery_capacities = [find_index(self.get_numbers(f"{MODEL_PARAMETERS}B{row}:H{row}"), D20)
+                              for row in (25, 26, 27)]
+        E21, E22, E23 = battery_capacities
+        D21_ratio = D7 / 0.8
+        D21 = choose(D21_ratio > E21, E21,
+                     find_index(battery_capacities, find_descending_match(D21_ratio, battery_capacities)),
+                     D21_ratio, E21)
+        H3 = calc("H3")
+        I3 = choose(np.equal(H3, 0), D21, H3, H3)
+        B27 = I3 * 0.8
+        D27 = D21 * 0.8
+
+        # Charging power on the depot
+        D28 = divide(D27, D15)
+        B49_power = number(MODEL_PARAMETERS + "B49")
+        powers = self.get_numbers(MODEL_PARAMETERS + "B49:B53")
+        D29 = choose(D28 > B49_power, B49_power, find_index(powers, find_descending_match(D28, powers)),
+                     D28, B49_power)
+        H4 = calc("H4")
+        I4 = choose(np.equal(H4, 0), D29, H4, H4)
+        chargers = self.get_raw_values(MODEL_PARAMETERS + "A36:A45")
+        charger_types = self.get_raw_values(MODEL_PARAMETERS + "D36:D45")
+        charger_powers = self.get_raw_values(MODEL_PARAMETERS + "E36:E45")
+        B30 = calculate_sum_if(chargers, (charger_types, "Privaat"), (charger_powers, I4))
+        B32 = divide(B27, I4)
+
+        # Energy charged on the depot
+        efficiencies = self.get_numbers(MODEL_PARAMETERS + "F36:F45")
+        B34 = minimum(B27, find_column_minimum(efficiencies, B30, I3))
+        C34 = minimum(B27, find_column_minimum(efficiencies, B30, I3), I4 * D15)
+        B35 = minimum(B34, B7)
+        C35 = minimum(C34, B7)
+        B38 = np.maximum(B7 - calculate_sum(B35), 0)
+        C38 = np.maximum(B7 - calculate_sum(C35), 0)
+
+        # Energy charged in public
+        D41 = calc("D41")
+        public_powers = self.get_numbers(MODEL_PARAMETERS + "C49:C53")
+        D42 = choose(D41 > 350, 350, find_index(public_powers, find_descending_match(D41, public_powers)), D41)
+        H5 = calc("H5")
+        C42 = choose(np.equal(H5, 0), D42, H5, H5)
+        C43 = calculate_sum_if(chargers, (charger_types, "Publiek"), (charger_powers, C42))
+        B46 = minimum(I3 * 0.7, calc("B42") * D14)
+        B47 = minimum(B38, B46 * calc("B40"))
+        C47 = minimum(C38, C42 * D14)
+        C48 = divide(C47, C42)
+        B49 = choose(B34 < B7, 0, 1, B34, B7)
+        C49 = choose(C47 < C38, 0, 1, C47, C38)
+
+        # Energy prices and costs
+        H8 = calc("H8")
+        H9 = calc("H9")
+        I8 = choose(np.equal(H8, 0), find_index(self.get_numbers(MODEL_PARAMETERS + "L36:L45"), B30), H8, H8) \
+            - number(BELEIDSMAKERS + "B35")
+        I9 = choose(np.equal(H9, 0), find_index(self.get_numbers(MODEL_PARAMETERS + "M36:M45"), C43), H9, H9)
+        I32 = D4 * B6
+        I35 = D13 * D6
+        B53 = find_index(self.get_numbers(MODEL_PARAMETERS + "K14:K20"), D20) * D4 * B6
+        B54 = if_error(B35 * B6 * I8, 0)
+        C54 = if_error(C35 * B6 * I8, 0)
+
+        # The text "Inadequate external charging" is skipped when it's summed, like zero
+        C55 = np.where(np.equal(C49, 1), if_error(C47 * I9 * B6, 0), 0)
+
+        self.set_calculated_values(ONDERNEMERS_CALC, {
+            "D9": D9, "D10": D10, "D12": D12, "D13": D13, "B13": D13, "C13": D13, "D14": D14, "D15": D15,
+            "B22": X22, "C22": X22, "D22": X22, "B23": X23, "C23": X23, "D23": X23, "B7": B7, "C7": B7, "D7": D7,
+            "E21": E21, "E22": E22, "E23": E23, "E24": E21, "D21": D21, "I3": I3, "B21": I3, "C21": I3,
+            "B27": B27, "C27": B27, "D27": D27, "D26": D15, "C15": D15, "C26": D15, "D28": D28, "D29": D29,
+            "I4": I4, "B29": I4, "C29": I4, "B30": B30, "C30": B30, "B31": B30, "C31": B30, "B32": B32, "C32": B32,
+            "B34": B34, "C34": C34, "B35": B35, "C35": C35, "B38": B38, "C38": C38, "B39": D14, "C39": D14,
+            "D42": D42, "I5": C42, "C42": C42, "C43": C43, "C44": C43, "B46": B46, "B47": B47, "C47": C47,
+            "C48": C48, "B49": B49, "C49": C49, "I8": I8, "I9": I9, "I32": I32, "I35": I35, "B53": B53, "C53": B53,
+            "B54": B54, "C54": C54, "C55": C55
+        })
+
+    def calculate_scenario_validity(self):
+        """
+        Checks whether the charging scenarios are valid, a valid scenario is 1.
+        """
+
+        B49 = self.get_calc_number("B49")
+        C49 = self.get_calc_number("C49")
+        C35 = np.where(np.isnan(B49), 1, B49)
+        D35 = np.where(np.isnan(C49), 1, C49)
+        E35 = float(is_equal(self.get_value(ONDERNEMERS + "E35"), SCENARIO_VALID))
+
+        self.set_calculated_values(ONDERNEMERS, {"C35": C35, "D35": D35})
+        self.set_calculated_values(ONDERNEMERS_CALC, {"B58": C35, "C58": D35, "D58": E35})
+
+    def calculate_ondernemers_calc_emissions(self):
+        """
+        Calculates the energy used and the emissions.
+        """
+
+        number = self.get_number
+        calc = self.get_calc_number
+        D20 = self.vehicle_type_positions
+
+        # Energy used and emissions of the electric vehicles
+        charger_efficiencies = self.get_numbers(MODEL_PARAMETERS + "G36:G45")
+        values = {}
+        for column in "BC":
+            is_valid = np.equal(calc(f"{column}58"), 1)
+            X69 = np.where(is_valid, divide((
+                if_error(divide(calc(f"{column}35"), find_single_value(charger_efficiencies, calc(f"{column}31"))), 0)
+                + if_error(divide(calc(f"{column}47"), find_single_value(charger_efficiencies, calc(f"{column}44"))),
+                           0)) * calc(f"{column}6"), number(MODEL_PARAMETERS + "B94")), np.nan)
+            values[f"{column}69"] = X69
+            for row, factor_row in ((70, 87), (71, 88), (72, 89)):
+                values[f"{column}{row}"] = np.where(is_valid, number(f"{MODEL_PARAMETERS}B{factor_row}") * X69, np.nan)
+            values[f"{column}74"] = calc("I32")
+        values["D74"] = calc("I31")
+
+        emission_factors = self.get_numbers(MODEL_PARAMETERS + "E77:E83")
+        for column in "BCD":
+            values[f"{column}75"] = np.where(np.equal(calc(f"{column}58"), 1),
+                                             find_index(emission_factors, D20) * values[f"{column}74"], np.nan)
+
+        # Fuel used and emissions of the diesel vehicle
+        fuel_price = number(BELEIDSMAKERS + "E23")
+        B65 = find_index(self.get_numbers(MODEL_PARAMETERS + "I14:I20"), D20) * fuel_price
+        B66 = np.where(self.is_cooled, find_index(self.get_numbers(MODEL_PARAMETERS + "J14:J20"), D20) * fuel_price, 0)
+        E65 = number(ONDERNEMERS + "B14") * B65
+        E66 = B66 * calc("I35")
+        self.set_calculated_values(ONDERNEMERS, {"B65": B65, "B66": B66, "E65": E65, "E66": E66})
+
+        D64 = divide(calculate_sum(E65, E66), fuel_price)
+        values["D64"] = D64
+        values["D65"] = find_index(self.get_numbers(MODEL_PARAMETERS + "B77:B83"), D20) / 1000 * D64
+        values["D66"] = find_index(self.get_numbers(MODEL_PARAMETERS + "C77:C83"), D20) * D64
+        values["D67"] = find_index(self.get_numbers(MODEL_PARAMETERS + "D77:D83"), D20) * D64
+
+        # Emissions in tonnes
+        for column in "BC":
+            values[f"{column}79"] = values[f"{column}70"] / 1000
+            values[f"{column}80"] = (values[f"{column}71"] + values[f"{column}75"]) / 10 ** 3
+            values[f"{column}81"] = values[f"{column}72"] / 10 ** 3
+            values[f"{column}84"] = 0
+            values[f"{column}85"] = values[f"{column}75"] / 10 ** 3
+        values["D79"] = values["D65"] / 1000
+        values["D80"] = (values["D66"] + values["D75"]) / 10 ** 3
+        values["D81"] = values["D67"] / 10 ** 3
+        values["D84"] = values["D79"]
+        values["D85"] = (values["D66"] + values["D75"]) / 10 ** 3
+        values["D86"] = values["D81"]
+
+        self.set_calculated_values(ONDERNEMERS_CALC, values)
+
+    def calculate_ondernemers_calc_costs(self):
+        """
+        Calculates the vehicle and charging system costs.
+        """
+
+        calc = self.get_calc_number
+        D20 = self.vehicle_type_positions
+        C18 = self.electric_vehicle_type_positions
+
+        def value_or_default(address: str, default: any):
+            value = calc(address)
+            return choose(value <= 0, default, value, value)
+
+        residual_values = self.get_numbers(MODEL_PARAMETERS + "B59:B73")
+        electric_prices = self.get_numbers(MODEL_PARAMETERS + "E4:E10")
+        diesel_prices = self.get_numbers(MODEL_PARAMETERS + "E14:E20")
+        C30 = calc("C30")
+
+        # Depreciation of the vehicles
+        I11 = calc("H11")
+        I18 = calc("H18")
+        H12 = calc("H12")
+        I12 = choose(np.equal(H12, 0), find_index(residual_values, I11) * find_index(diesel_prices, D20), H12, H12)
+        I19 = value_or_default("H19", find_index(residual_values, I18) * find_index(electric_prices, C18))
+        I24 = value_or_default("H24", find_index(electric_prices, C18))
+        I25 = calc("H25")
+        I27 = value_or_default("H27", find_index(self.get_numbers(MODEL_PARAMETERS + "I36:I45"), C30))
+        I28 = value_or_default("H28", find_index(self.get_numbers(MODEL_PARAMETERS + "J36:J45"), C30))
+        I39 = value_or_default("H40", find_index(diesel_prices, D20))
+        I40 = value_or_default("H40", divide(I39 - I12, I11))
+        I41 = divide(I24 - I25 - I19, I18)
+        H42 = calc("E23")
+        I42 = divide(H42, I18)
+
+        self.set_calculated_values(ONDERNEMERS_CALC, {
+            "I11": I11, "I18": I18, "I12": I12, "I19": I19, "I24": I24, "I25": I25, "I27": I27, "I28": I28,
+            "I39": I39, "I40": I40, "I41": I41, "H42": H42, "I42": I42, "I43": 0
+        })
+
+    def calculate_ondernemers(self):
+        """
+        Calculates the TCO.
+        """
+
+        number = self.get_number
+        calc = self.get_calc_number
+        D20 = self.vehicle_type_positions
+
+        def parameter(parameter_range: str):
+            return find_index(self.get_numbers(MODEL_PARAMETERS + parameter_range), D20)
+
+        def is_valid(column: str):
+            return np.equal(number(f"{ONDERNEMERS}{column}35"), 1) if column != "E" \
+                else is_equal(self.get_value(ONDERNEMERS + "E35"), SCENARIO_VALID)
+
+        def if_valid(column: str, value: any):
+            return np.where(is_valid(column), value, np.nan)
+
+        def set_values(values: dict):
+            self.set_calculated_values(ONDERNEMERS, values)
+
+        C28 = number(ONDERNEMERS + "C28")
+        B30 = number(ONDERNEMERS + "B30")
+        C30 = number(ONDERNEMERS + "C30")
+        B14 = number(ONDERNEMERS + "B14")
+
+        # Vehicle parameters
+        set_values({
+            "B28": C28 * (1 - divide(B30 - C30, 260 - C30)),
+            "B56": parameter("O14:O20"),
+            "B57": parameter("P14:P20"),
+            "B61": parameter("Q14:Q20"),
+            "B68": parameter("M14:M20"),
+            "B69": parameter("L14:L20"),
+            "B71": np.where(self.is_cooled, parameter("N14:N20"), 0),
+            "B74": parameter("R14:R20"),
+            "E30": (calc("I27") if self.is_empty(ONDERNEMERS + "E27") else number(ONDERNEMERS + "E27"))
+            + (calc("I28") if self.is_empty(ONDERNEMERS + "E28") else number(ONDERNEMERS + "E28"))
+            - number(ONDERNEMERS + "E29")
+        })
+
+        # Emissions
+        emissions = [[calc(f"{column}{row}") for row in range(79, 87)] for column in "BCD"]
+        for row in (49, 50, 51):
+            emission_rows = number(f"{ONDERNEMERS}B{row}") + np.where(self.is_grey_electricity, 0, 5)
+            for column in "CDE":
+                emission_column = find_index(list(range(len(emissions))), number(f"{ONDERNEMERS}{column}48"))
+                set_values({f"{column}{row}": np.where(
+                    np.isnan(emission_column), np.nan,
+                    find_index([find_index(column_emissions, emission_rows) for column_emissions in emissions],
+                               emission_column + 1))})
+
+        # Fixed vehicle costs
+        electric_prices = self.get_numbers(MODEL_PARAMETERS + "E4:E10")
+        B27 = number(ONDERNEMERS + "B27")
+        B58 = number(ONDERNEMERS + "B58")
+        B59 = number(ONDERNEMERS + "B59")
+        set_values({
+            "E56": number(ONDERNEMERS + "B56"),
+            "C57": number(ONDERNEMERS + "B57"),
+            "D57": number(ONDERNEMERS + "B57"),
+            "E57": number(ONDERNEMERS + "B57"),
+            "C58": (find_index(electric_prices, calc("B18")) + B27) / 2 * B58,
+            "D58": (find_index(electric_prices, calc("C18")) + B27) / 2 * B58,
+            "E58": (calc("I39") + number(ONDERNEMERS + "C27")) / 2 * B58,
+            "C59": find_index(electric_prices, calc("B18")) * B59,
+            "D59": find_index(electric_prices, calc("C18")) * B59,
+            "E59": parameter("E14:E20") * B59,
+            "E60": number(BELEIDSMAKERS + "E32")
+        })
+        for column in "CDE":
+            set_values({f"{column}61": number(ONDERNEMERS + "B61")})
+            set_values({f"{column}62": calculate_sum(*(number(f"{ONDERNEMERS}{column}{row}")
+                                                       for row in range(56, 62)))})
+
+        # Variable vehicle costs
+        B68 = number(ONDERNEMERS + "B68")
+        B71 = number(ONDERNEMERS + "B71")
+        set_values({
+            "C67": if_valid("C", calculate_sum(calc("B54"), calc("B55"))),
+            "D67": if_valid("D", calculate_sum(calc("C54"), calc("C55"))),
+            "C68": if_valid("C", B68 * calc("I32")),
+            "D68": if_valid("D", B68 * calc("I32")),
+            "E68": if_valid("E", B68 * B14),
+            "C69": if_valid("C", calc("B53")),
+            "D69": if_valid("D", calc("C53")),
+            "E69": number(ONDERNEMERS + "B69") * B14,
+            "C70": number(ONDERNEMERS + "B29"),
+            "D70": number(ONDERNEMERS + "B29"),
+            "E70": number(ONDERNEMERS + "C29"),
+            "C71": B71 * number(ONDERNEMERS + "B28"),
+            "D71": B71 * number(ONDERNEMERS + "B28"),
+            "E71": B71 * C28,
+            "E72": number(BELEIDSMAKERS + "D78")
+        })
+        for column in "CDE":
+            set_values({
+                f"{column}73": number(BELEIDSMAKERS + "E34") * number(f"{ONDERNEMERS}{column}49"),
+                f"{column}74": number(ONDERNEMERS + "B74")
+            })
+            set_values({f"{column}75": calculate_sum(*(number(f"{ONDERNEMERS}{column}{row}")
+                                                       for row in range(65, 75)))})
+
+        # Write-off costs of the vehicle
+        set_values({
+            "C78": calc("I41"),
+            "D78": calc("I41"),
+            "E78": calc("I40"),
+            "C79": -calc("I42"),
+            "D79": -calc("I42"),
+            "E79": -calc("I43")
+        })
+        for column in "CDE":
+            set_values({f"{column}80": calculate_sum(number(f"{ONDERNEMERS}{column}78"),
+                                                     number(f"{ONDERNEMERS}{column}79"))})
+
+        # Write-off costs of the charging system
+        charger_costs = self.get_raw_values(MODEL_PARAMETERS + "K36:K45")
+        chargers = self.get_raw_values(MODEL_PARAMETERS + "A36:A45")
+        for column, calc_column in (("C", "B"), ("D", "C")):
+            set_values({
+                f"{column}83": divide(number(ONDERNEMERS + "E30"), number(ONDERNEMERS + "B26")),
+                f"{column}84": calculate_sum_if(charger_costs, (chargers, calc(f"{calc_column}30")))
+            })
+        for column in "CDE":
+            set_values({f"{column}85": if_valid(column, calculate_sum(number(f"{ONDERNEMERS}{column}83"),
+                                                                      number(f"{ONDERNEMERS}{column}84")))})
+            set_values({f"{column}87": calculate_sum(*(number(f"{ONDERNEMERS}{column}{row}")
+                                                       for row in (62, 75, 80, 85)))})
+
+        # Driver costs
+        for row in (92, 93, 94):
+            driver_costs = number(f"{ONDERNEMERS}B{row}")
+            set_values({
+                f"C{row}": driver_costs * (C28 + calc("D6") * calc("B48")),
+                f"D{row}": driver_costs * (C28 + calc("D6") * calc("C48")),
+                f"E{row}": driver_costs * C28
+            })
+
+        # Total costs of ownership
+        for column in "CDE":
+            set_values({f"{column}95": calculate_sum(*(number(f"{ONDERNEMERS}{column}{row}")
+                                                       for row in (92, 93, 94)))})
+            total_costs = calculate_sum(number(f"{ONDERNEMERS}{column}87"), number(f"{ONDERNEMERS}{column}95"))
+            set_values({f"{column}97": total_costs, f"{column}44": total_costs})
+
+    def get_row_values(self, address: str):
+        """
+        Gets the value of a cell for every row.
+
+        Parameters:
+            address (str): The address of the cell, including the sheet.
+
+        Returns:
+            ndarray: The numbers per row.
+        """
+
+        return np.broadcast_to(np.asarray(self.get_number(address), dtype=float), (self.rows,))
+
+    def read_results(self):
+        """
+        Reads all result cells at once, like PANTEIAInterface.read_results.
+        The validity of the scenarios are booleans, the other results are numbers in which errors are NaN.
+
+        Returns:
+            PANTEIAResults: The results, with an array per result cell.
+        """
+
+        if not self.is_calculated:
+            self.calculate()
+
+        def get_TCO_cell_values(column: str):
+            return TCOCellValues(*(self.get_row_values(f"{ONDERNEMERS}{column}{row}")
+                                   for row in (44, 49, 50, 51, 62, 75, 80, 85, 95)))
+
+        return PANTEIAResults(
+            np.equal(self.get_row_values(ONDERNEMERS + "C35"), 1),
+            np.equal(self.get_row_values(ONDERNEMERS + "D35"), 1),
+            get_TCO_cell_values("C"),
+            get_TCO_cell_values("D"),
+            get_TCO_cell_values("E"),
+            *(self.get_row_values(ONDERNEMERS_CALC + cell_address)
+              for cell_address in ("B35", "B32", "C35", "C47", "C32", "C48"))
+        )
+
+    def get_TCO(self, is_fossil_fuel: np.ndarray, is_exclusive_charging_at_depot_possible: np.ndarray,
+                results: PANTEIAResults):
+        """
+        Gets the TCO values per row, like PANTEIAInterface.get_TCO_diesel for the rows with a fossil fuel
+        and PANTEIAInterface.get_TCO_electric for the other rows.
+        Rows with a value that the interface can't convert into a number are marked as failed.
+
+        Parameters:
+            is_fossil_fuel (ndarray): Whether the vehicle of the row uses a fossil fuel.
+            is_exclusive_charging_at_depot_possible (ndarray): Whether exclusively charging at the depot is possible.
+            results (PANTEIAResults): The results that were read.
+
+        Returns:
+            dict: The TCO values, with an array per value.
+        """
+
+        is_depot = ~is_fossil_fuel & is_exclusive_charging_at_depot_possible
+        is_optimal_mix = ~is_fossil_fuel & ~is_exclusive_charging_at_depot_possible
+
+        def select(diesel: any, depot: any, optimal_mix: any):
+            values = np.where(is_fossil_fuel, diesel, np.where(is_depot, depot, optimal_mix))
+            self.mark_failed(None, values)
+            return values
+
+        def select_cell_values(field: str):
+            return select(getattr(results.diesel, field),
+                          getattr(results.depot_charging, field),
+                          getattr(results.optimal_mix, field))
+
+        def to_integers(values: np.ndarray):
+            self.mark_failed(None, np.where(np.isinf(values), np.nan, values))
+            return np.trunc(np.where(np.isnan(values), 0, values)).astype(np.int64)
+
+        driver_costs = to_integers(select_cell_values("driver_costs"))
+        depot_driver_costs = to_integers(select(0, 0, results.depot_charging.driver_costs))
+        costs_public_charging = np.where(is_optimal_mix, np.maximum(0, driver_costs - depot_driver_costs) + 144, 0)
+
+        return {
+            "tco": to_integers(select_cell_values("tco")),
+            "fixed_vehicle_costs": to_integers(select_cell_values("fixed_vehicle_costs")),
+            "variable_vehicle_costs": to_integers(select_cell_values("variable_vehicle_costs")),
+            "write_off_costs_vehicle": to_integers(select_cell_values("write_off_costs_vehicle")),
+            "write_off_costs_charging_system": to_integers(select_cell_values("write_off_costs_charging_system")),
+            "driver_costs": driver_costs,
+            "costs_public_charging": costs_public_charging.astype(np.int64),
+            "CO2_emissions": select_cell_values("CO2_emissions"),
+            "particulate_matter_emissions": select_cell_values("particulate_matter_emissions"),
+            "nitrogen_oxide_emissions": select_cell_values("nitrogen_oxide_emissions"),
+            "kWh_charged_on_depot": select(0.0, results.kWh_charged_on_depot_exclusively,
+                                           results.kWh_charged_on_depot),
+            "kWh_charged_in_public": select(0.0, 0.0, results.kWh_charged_in_public),
+            "charging_time_depot": select(0.0, results.charging_time_depot_exclusively, results.charging_time_depot),
+            "charging_time_public": select(0.0, 0.0, results.charging_time_public),
+            "transition_year": np.where(is_fossil_fuel, 0, 1).astype(np.int64)
+        }
@@ -99,6 +99,13 @@ class InvalidStrategySpecified(Exception):
         super().__init__("The specified strategy isn't valid. Please check the documentation.")
 
 
+class InvalidEngineSpecified(Exception):
+
+    def __init__(self):
+
+        super().__init__("The specified engine isn't valid. Please use \"native\", \"generated\" or \"pycel\".")
+
+
 class RequestBodyInvalid(Exception):
 
     def __init__(self):
@@ -119,3 +126,36 @@ class NoDatabaseFileFound(Exception):
     def __init__(self):
 
         super().__init__("The database file couldn't be found. Please check the path to the database file.")
+
+
+class JobQueueNotStarted(Exception):
+
+    def __init__(self):
+
+        super().__init__("The job queue hasn't been started. Please start the server with its job workers.")
+
+
+# Overloaded
+class ServerOverloaded(Exception):
+
+    def __init__(self, retry_after: int):
+
+        self.retry_after = retry_after
+        super().__init__("The server is calculating too many analyses at the moment. "
+                         f"Please try again in {retry_after} seconds.")
+
+
+# Cancelled
+class DeadlineExceeded(Exception):
+
+    def __init__(self):
+
+        super().__init__("The analysis took longer than its timeout and has been stopped. "
+                         "Please select fewer vehicles, scenarios or strategies, or use a job instead.")
+
+
+class RequestCancelled(Exception):
+
+    def __init__(self):
+
+        super().__init__("The analysis has been cancelled, because the client disconnected.")
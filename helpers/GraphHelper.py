@@ -2,21 +2,30 @@ from base64 import b64encode
 from datetime import datetime
 from io import BytesIO
 import warnings
-from matplotlib.pyplot import Figure, close, subplots
+from matplotlib.figure import Figure
 from matplotlib import ticker
 
+# Warnings of matplotlib are ignored for every graph. This is set once, because changing the filters
+# while rendering isn't thread-safe
+warnings.filterwarnings("ignore", module="matplotlib")
+
 
 class GraphHelper:
 
-    def __init__(self):
+    def __init__(self, current_year: int = None):
+
+        """A helper class responsible for creating graphs using matplotlib.
+        Every graph is its own Figure that isn't registered with pyplot, so threads can render graphs at once.
 
-        """A helper class responsible for creating graphs using pyplot.
+        :param current_year: The first year of the results, the emission goals are relative to it.
+            Defaults to the current year.
+        :type current_year: int
 
         :return: An instance of GraphHelper
         :rtype: GraphHelper
         """
 
-        pass
+        self.current_year = datetime.now().year if current_year is None else current_year
 
     def plot_vehicle_TCO(self, number_plate: str, vehicle_data: dict):
 
@@ -33,47 +42,43 @@ class GraphHelper:
 
         graphs = {}
         for scenario in vehicle_data:
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                strategies = vehicle_data[scenario]
-
-                graph, axes = subplots(figsize=(15, 5), nrows=1, ncols=2, tight_layout=True)
+            strategies = vehicle_data[scenario]
 
-                # Plot strategies
+            graph = Figure(figsize=(15, 5), tight_layout=True)
+            axes = graph.subplots(nrows=1, ncols=2)
 
-                line_index = 0
-                for strategy in strategies:
+            # Plot strategies
 
-                    strategy_data = strategies[strategy]
-                    year_labels = strategy_data.keys()
-                    ls = ['-', '--', '-.', ':', '--'][line_index % 5]
-                    TCO_costs = [year_data.get("tco", 0) for year, year_data in strategy_data.items()]
-                    TCO_emissions = [year_data.get("CO2_emissions", 0) for year, year_data in strategy_data.items()]
-                    line_index += 1
+            line_index = 0
+            for strategy in strategies:
 
-                    axes[0].plot(year_labels, TCO_costs, alpha=0.8, linestyle=ls)
-                    axes[1].plot(year_labels, TCO_emissions, alpha=0.8, linestyle=ls, label=f"Strategie {strategy.split('_')[1]}")
+                strategy_data = strategies[strategy]
+                year_labels = strategy_data.keys()
+                ls = ['-', '--', '-.', ':', '--'][line_index % 5]
+                TCO_costs = [year_data.get("tco", 0) for year, year_data in strategy_data.items()]
+                TCO_emissions = [year_data.get("CO2_emissions", 0) for year, year_data in strategy_data.items()]
+                line_index += 1
 
-                # Set labels cost graph
-                axes[0].set_title(f"Jaarlijkse kosten {number_plate}")
-                axes[0].set_xlabel("jaar")
-                axes[0].set_ylabel("TCO per jaar (euro)")
+                axes[0].plot(year_labels, TCO_costs, alpha=0.8, linestyle=ls)
+                axes[1].plot(year_labels, TCO_emissions, alpha=0.8, linestyle=ls, label=f"Strategie {strategy.split('_')[1]}")
 
-                # Set labels emissions graph
-                axes[1].set_title(f"Jaarlijkse uitstoot {number_plate}")
-                axes[1].set_xlabel("jaar")
-                axes[1].set_ylabel("CO2 per jaar (ton)")
+            # Set labels cost graph
+            axes[0].set_title(f"Jaarlijkse kosten {number_plate}")
+            axes[0].set_xlabel("jaar")
+            axes[0].set_ylabel("TCO per jaar (euro)")
 
-                # Set legend
-                axes[0].legend(loc="best")
-                axes[1].legend(loc="best")
-                #axes[1].legend(loc="upper left", bbox_to_anchor=(1.05, 1))
+            # Set labels emissions graph
+            axes[1].set_title(f"Jaarlijkse uitstoot {number_plate}")
+            axes[1].set_xlabel("jaar")
+            axes[1].set_ylabel("CO2 per jaar (ton)")
 
-                # Encode graph
-                graphs[scenario] = self.encode_graph_to_base64(graph)
+            # Set legend
+            axes[0].legend(loc="best")
+            axes[1].legend(loc="best")
+            #axes[1].legend(loc="upper left", bbox_to_anchor=(1.05, 1))
 
-                # Close figure
-                close()
+            # Encode graph
+            graphs[scenario] = self.encode_graph_to_base64(graph)
 
         return graphs
 
@@ -90,57 +95,52 @@ class GraphHelper:
         :rtype: dict
         """
 
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-
-            scenarios = {}
-            graphs = {}
-            strategy = 'strategy_4'     # TODO change this to current strategy
-            for scenario in vehicle_data:
-                strategies = vehicle_data[scenario]
-                scenarios[scenario] = strategies[strategy]
-                graphs[scenario] = {}
-
-            graphs = {}
-            graph, axes = subplots(figsize=(15, 5), nrows=1, ncols=2, tight_layout=True)
+        scenarios = {}
+        graphs = {}
+        strategy = 'strategy_4'     # TODO change this to current strategy
+        for scenario in vehicle_data:
+            strategies = vehicle_data[scenario]
+            scenarios[scenario] = strategies[strategy]
+            graphs[scenario] = {}
 
-            # Plot scenarios
+        graphs = {}
+        graph = Figure(figsize=(15, 5), tight_layout=True)
+        axes = graph.subplots(nrows=1, ncols=2)
 
-            line_index = 0
-            for scenario in scenarios:
+        # Plot scenarios
 
-                scenario_data = scenarios[scenario]
-                year_labels = scenario_data.keys()
-                ls = ['--', '-.', ':'][line_index % 3]
-                TCO_costs = [year_data.get("tco", 0) for year, year_data in scenario_data.items()]
-                TCO_emissions = [year_data.get("CO2_emissions", 0) for year, year_data in scenario_data.items()]
-                line_index += 1
+        line_index = 0
+        for scenario in scenarios:
 
-                axes[0].plot(year_labels, TCO_costs, alpha=0.8, linestyle=ls)
-                axes[1].plot(year_labels, TCO_emissions, alpha=0.8, linestyle=ls, label=f"Scenario {scenario}")
+            scenario_data = scenarios[scenario]
+            year_labels = scenario_data.keys()
+            ls = ['--', '-.', ':'][line_index % 3]
+            TCO_costs = [year_data.get("tco", 0) for year, year_data in scenario_data.items()]
+            TCO_emissions = [year_data.get("CO2_emissions", 0) for year, year_data in scenario_data.items()]
+            line_index += 1
 
-            # Set labels cost graph
-            axes[0].set_title(f"Jaarlijkse kosten {number_plate}")
-            axes[0].set_xlabel("jaar")
-            axes[0].set_ylabel("TCO per jaar (euro)")
-            axes[0].get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
+            axes[0].plot(year_labels, TCO_costs, alpha=0.8, linestyle=ls)
+            axes[1].plot(year_labels, TCO_emissions, alpha=0.8, linestyle=ls, label=f"Scenario {scenario}")
 
-            # Set labels emissions graph
-            axes[1].set_title(f"Jaarlijkse uitstoot {number_plate}")
-            axes[1].set_xlabel("jaar")
-            axes[1].set_ylabel("CO2 per jaar (ton)")
-            axes[1].get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
+        # Set labels cost graph
+        axes[0].set_title(f"Jaarlijkse kosten {number_plate}")
+        axes[0].set_xlabel("jaar")
+        axes[0].set_ylabel("TCO per jaar (euro)")
+        axes[0].get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
 
-            # Set legend
-            axes[0].legend(loc="best")
-            axes[1].legend(loc="best")
-            #axes[1].legend(loc="upper left", bbox_to_anchor=(1.05, 1))
+        # Set labels emissions graph
+        axes[1].set_title(f"Jaarlijkse uitstoot {number_plate}")
+        axes[1].set_xlabel("jaar")
+        axes[1].set_ylabel("CO2 per jaar (ton)")
+        axes[1].get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
 
-            # Encode graph
-            graphs[strategy] = self.encode_graph_to_base64(graph)
+        # Set legend
+        axes[0].legend(loc="best")
+        axes[1].legend(loc="best")
+        #axes[1].legend(loc="upper left", bbox_to_anchor=(1.05, 1))
 
-            # Close figure
-            close()
+        # Encode graph
+        graphs[strategy] = self.encode_graph_to_base64(graph)
 
         return graphs
 
@@ -165,40 +165,36 @@ class GraphHelper:
 
             # Plot strategies
             for strategy in strategies:
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore")
-
-                    graph, ax = subplots(figsize=(6, 6), nrows=1, ncols=1, tight_layout=True)
 
-                    strategy_data = strategies[strategy]
-                    year_labels = strategy_data.keys()
-                    charging_capacity_depot = [year_data.get("kWh_charged_on_depot", 0)
-                                               for year, year_data in strategy_data.items()]
-                    charging_capacity_public = [year_data.get("kWh_charged_in_public", 0)
-                                                for year, year_data in strategy_data.items()]
+                graph = Figure(figsize=(6, 6), tight_layout=True)
+                ax = graph.subplots(nrows=1, ncols=1)
 
-                    ax.bar(year_labels, charging_capacity_depot, label="Op depot")
-                    ax.bar(year_labels, charging_capacity_public, label="Onderweg", bottom=charging_capacity_depot)
+                strategy_data = strategies[strategy]
+                year_labels = strategy_data.keys()
+                charging_capacity_depot = [year_data.get("kWh_charged_on_depot", 0)
+                                           for year, year_data in strategy_data.items()]
+                charging_capacity_public = [year_data.get("kWh_charged_in_public", 0)
+                                            for year, year_data in strategy_data.items()]
 
-                    # Set labels
-                    ax.set_title(f"Laadbehoefte {number_plate} strategie {strategy.split('_')[1]}")
-                    ax.set_xlabel("jaar")
-                    ax.set_ylabel("Energievraag per dag (kWh)")
-                    ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
+                ax.bar(year_labels, charging_capacity_depot, label="Op depot")
+                ax.bar(year_labels, charging_capacity_public, label="Onderweg", bottom=charging_capacity_depot)
 
-                    # change axes limits
-                    ymax = max(charging_capacity_public) + max(charging_capacity_depot)
-                    ax.set_ylim(bottom=0, top=ymax + 20)
+                # Set labels
+                ax.set_title(f"Laadbehoefte {number_plate} strategie {strategy.split('_')[1]}")
+                ax.set_xlabel("jaar")
+                ax.set_ylabel("Energievraag per dag (kWh)")
+                ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
 
-                    # Set legend
-                    ax.legend(loc="best")
-                    #ax.legend(loc="lower center", bbox_to_anchor=(0.5, -0.3))
+                # change axes limits
+                ymax = max(charging_capacity_public) + max(charging_capacity_depot)
+                ax.set_ylim(bottom=0, top=ymax + 20)
 
-                    # Encode graph
-                    graphs[scenario][strategy] = self.encode_graph_to_base64(graph)
+                # Set legend
+                ax.legend(loc="best")
+                #ax.legend(loc="lower center", bbox_to_anchor=(0.5, -0.3))
 
-                    # Close figure
-                    close()
+                # Encode graph
+                graphs[scenario][strategy] = self.encode_graph_to_base64(graph)
 
         return graphs
 
@@ -216,7 +212,6 @@ class GraphHelper:
         :rtype: dict
         """
 
-
         scenarios = {}
         graphs = {}
         strategy = 'strategy_4'
@@ -227,39 +222,35 @@ class GraphHelper:
 
         # Plot strategies
         for scenario in scenarios:
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                graph, ax = subplots(figsize=(6, 6), nrows=1, ncols=1, tight_layout=True)
+            graph = Figure(figsize=(6, 6), tight_layout=True)
+            ax = graph.subplots(nrows=1, ncols=1)
 
-                scenario_data = scenarios[scenario]
-                year_labels = scenario_data.keys()
-                charging_capacity_depot = [year_data.get("kWh_charged_on_depot", 0)
-                                            for year, year_data in scenario_data.items()]
-                charging_capacity_public = [year_data.get("kWh_charged_in_public", 0)
-                                            for year, year_data in scenario_data.items()]
+            scenario_data = scenarios[scenario]
+            year_labels = scenario_data.keys()
+            charging_capacity_depot = [year_data.get("kWh_charged_on_depot", 0)
+                                        for year, year_data in scenario_data.items()]
+            charging_capacity_public = [year_data.get("kWh_charged_in_public", 0)
+                                        for year, year_data in scenario_data.items()]
 
-                ax.bar(year_labels, charging_capacity_depot, label="Op depot")
-                ax.bar(year_labels, charging_capacity_public, label="Onderweg", bottom=charging_capacity_depot)
-
-                # Set labels
-                ax.set_title(f"Laadbehoefte {number_plate} scenario {scenario}")
-                ax.set_xlabel("jaar")
-                ax.set_ylabel("Energievraag per dag (kWh)")
-                ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
+            ax.bar(year_labels, charging_capacity_depot, label="Op depot")
+            ax.bar(year_labels, charging_capacity_public, label="Onderweg", bottom=charging_capacity_depot)
 
-                # change axes limits
-                ymax = max(charging_capacity_public) + max(charging_capacity_depot)
-                ax.set_ylim(bottom=0, top=ymax + 20)
+            # Set labels
+            ax.set_title(f"Laadbehoefte {number_plate} scenario {scenario}")
+            ax.set_xlabel("jaar")
+            ax.set_ylabel("Energievraag per dag (kWh)")
+            ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
 
-                # Set legend
-                ax.legend(loc="best")
-                #ax.legend(loc="lower center", bbox_to_anchor=(0.5, -0.3))
+            # change axes limits
+            ymax = max(charging_capacity_public) + max(charging_capacity_depot)
+            ax.set_ylim(bottom=0, top=ymax + 20)
 
-                # Encode graph
-                graphs[scenario][strategy] = self.encode_graph_to_base64(graph)
+            # Set legend
+            ax.legend(loc="best")
+            #ax.legend(loc="lower center", bbox_to_anchor=(0.5, -0.3))
 
-                # Close figure
-                close()
+            # Encode graph
+            graphs[scenario][strategy] = self.encode_graph_to_base64(graph)
 
         return graphs
 
@@ -284,39 +275,35 @@ class GraphHelper:
 
             # Plot strategies
             for strategy in strategies:
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore")
-                    graph, ax = subplots(figsize=(6, 6), nrows=1, ncols=1, tight_layout=True)
-
-                    strategy_data = strategies[strategy]
-                    year_labels = strategy_data.keys()
-                    charging_time_depot = [year_data.get("charging_time_depot", 0)
-                                            for year, year_data in strategy_data.items()]
-                    charging_time_public = [year_data.get("charging_time_public", 0)
-                                            for year, year_data in strategy_data.items()]
+                graph = Figure(figsize=(6, 6), tight_layout=True)
+                ax = graph.subplots(nrows=1, ncols=1)
 
-                    ax.bar(year_labels, charging_time_depot, label="Op depot")
-                    ax.bar(year_labels, charging_time_public, label="Onderweg", bottom=charging_time_depot)
+                strategy_data = strategies[strategy]
+                year_labels = strategy_data.keys()
+                charging_time_depot = [year_data.get("charging_time_depot", 0)
+                                        for year, year_data in strategy_data.items()]
+                charging_time_public = [year_data.get("charging_time_public", 0)
+                                        for year, year_data in strategy_data.items()]
 
-                    # Set labels
-                    ax.set_title(f"Laadtijd {number_plate} strategie {strategy.split('_')[1]}")
-                    ax.set_xlabel("jaar")
-                    ax.set_ylabel("Laadtijd per dag (uur)")
-                    ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
+                ax.bar(year_labels, charging_time_depot, label="Op depot")
+                ax.bar(year_labels, charging_time_public, label="Onderweg", bottom=charging_time_depot)
 
-                    # change axes limits
-                    ymax = max(charging_time_public) + max(charging_time_depot)
-                    ax.set_ylim(bottom=0, top=ymax + 2)
+                # Set labels
+                ax.set_title(f"Laadtijd {number_plate} strategie {strategy.split('_')[1]}")
+                ax.set_xlabel("jaar")
+                ax.set_ylabel("Laadtijd per dag (uur)")
+                ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
 
-                    # Set legend
-                    ax.legend(loc="best")
-                    #ax.legend(loc="lower center", bbox_to_anchor=(0.5, -0.3))
+                # change axes limits
+                ymax = max(charging_time_public) + max(charging_time_depot)
+                ax.set_ylim(bottom=0, top=ymax + 2)
 
-                    # Encode graph
-                    graphs[scenario][strategy] = self.encode_graph_to_base64(graph)
+                # Set legend
+                ax.legend(loc="best")
+                #ax.legend(loc="lower center", bbox_to_anchor=(0.5, -0.3))
 
-                    # Close figure
-                    close()
+                # Encode graph
+                graphs[scenario][strategy] = self.encode_graph_to_base64(graph)
 
         return graphs
 
@@ -342,39 +329,35 @@ class GraphHelper:
 
             # Plot strategies
             for strategy in strategies:
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore")
-                    graph, ax = subplots(figsize=(6, 6), nrows=1, ncols=1, tight_layout=True)
-
-                    strategy_data = strategies[strategy]
-                    year_labels = strategy_data.keys()
-                    charging_time_depot = [year_data.get("charging_time_depot", 0)
-                                            for year, year_data in strategy_data.items()]
-                    charging_time_public = [year_data.get("charging_time_public", 0)
-                                            for year, year_data in strategy_data.items()]
+                graph = Figure(figsize=(6, 6), tight_layout=True)
+                ax = graph.subplots(nrows=1, ncols=1)
 
-                    ax.bar(year_labels, charging_time_depot, label="Op depot")
-                    ax.bar(year_labels, charging_time_public, label="Onderweg", bottom=charging_time_depot)
+                strategy_data = strategies[strategy]
+                year_labels = strategy_data.keys()
+                charging_time_depot = [year_data.get("charging_time_depot", 0)
+                                        for year, year_data in strategy_data.items()]
+                charging_time_public = [year_data.get("charging_time_public", 0)
+                                        for year, year_data in strategy_data.items()]
 
-                    # Set labels
-                    ax.set_title(f"Laadtijd {number_plate} strategie {strategy.split('_')[1]}")
-                    ax.set_xlabel("jaar")
-                    ax.set_ylabel("Laadtijd per dag (uur)")
-                    ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
+                ax.bar(year_labels, charging_time_depot, label="Op depot")
+                ax.bar(year_labels, charging_time_public, label="Onderweg", bottom=charging_time_depot)
 
-                    # change axes limits
-                    ymax = max(charging_time_public) + max(charging_time_depot)
-                    ax.set_ylim(bottom=0, top=ymax + 2)
+                # Set labels
+                ax.set_title(f"Laadtijd {number_plate} strategie {strategy.split('_')[1]}")
+                ax.set_xlabel("jaar")
+                ax.set_ylabel("Laadtijd per dag (uur)")
+                ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
 
-                    # Set legend
-                    ax.legend(loc="best")
-                    #ax.legend(loc="lower center", bbox_to_anchor=(0.5, -0.3))
+                # change axes limits
+                ymax = max(charging_time_public) + max(charging_time_depot)
+                ax.set_ylim(bottom=0, top=ymax + 2)
 
-                    # Encode graph
-                    graphs[scenario][strategy] = self.encode_graph_to_base64(graph)
+                # Set legend
+                ax.legend(loc="best")
+                #ax.legend(loc="lower center", bbox_to_anchor=(0.5, -0.3))
 
-                    # Close figure
-                    close()
+                # Encode graph
+                graphs[scenario][strategy] = self.encode_graph_to_base64(graph)
 
         return graphs
 
@@ -391,44 +374,40 @@ class GraphHelper:
 
         graphs = {}
         for scenario, strategies in averages.items():
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                graph, ax = subplots(figsize=(8, 8), nrows=1, ncols=1, tight_layout=True)
-                strategy_labels = [f"Strategie {strategy.split('_')[1]}" for strategy in strategies.keys()]
-                TCO_cost_averages = []
+            graph = Figure(figsize=(8, 8), tight_layout=True)
+            ax = graph.subplots(nrows=1, ncols=1)
+            strategy_labels = [f"Strategie {strategy.split('_')[1]}" for strategy in strategies.keys()]
+            TCO_cost_averages = []
 
-                # Plot strategies
-                for strategy, years in strategies.items():
-
-                    strategy_TCO_cost_average = 0
+            # Plot strategies
+            for strategy, years in strategies.items():
 
-                    for year in years:
+                strategy_TCO_cost_average = 0
 
-                        strategy_TCO_cost_average += years[year].get("tco", 0)
+                for year in years:
 
-                    # Calculate average
-                    strategy_TCO_cost_average /= len(years)
-                    TCO_cost_averages.append(strategy_TCO_cost_average)
+                    strategy_TCO_cost_average += years[year].get("tco", 0)
 
-                # Plot bar graph
-                ax.bar(strategy_labels, TCO_cost_averages, color="red")
+                # Calculate average
+                strategy_TCO_cost_average /= len(years)
+                TCO_cost_averages.append(strategy_TCO_cost_average)
 
-                # change axes limits
-                ymin = min(TCO_cost_averages)
-                ymax = max(TCO_cost_averages)
-                ax.set_ylim(bottom=ymin - 2000, top=ymax + 2000)
+            # Plot bar graph
+            ax.bar(strategy_labels, TCO_cost_averages, color="red")
 
-                # Set labels cost graph
-                ax.set_title(f"Totale jaarlijkse kosten wagenpark")
-                ax.set_xlabel("jaar")
-                ax.set_ylabel("TCO per jaar (euro)")
-                ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
+            # change axes limits
+            ymin = min(TCO_cost_averages)
+            ymax = max(TCO_cost_averages)
+            ax.set_ylim(bottom=ymin - 2000, top=ymax + 2000)
 
-                # Encode graph
-                graphs[scenario] = self.encode_graph_to_base64(graph)
+            # Set labels cost graph
+            ax.set_title(f"Totale jaarlijkse kosten wagenpark")
+            ax.set_xlabel("jaar")
+            ax.set_ylabel("TCO per jaar (euro)")
+            ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
 
-                # Close figure
-                close()
+            # Encode graph
+            graphs[scenario] = self.encode_graph_to_base64(graph)
 
         return graphs
 
@@ -445,39 +424,35 @@ class GraphHelper:
 
         graphs = {}
         for scenario, strategies in averages.items():
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                graph, ax = subplots(figsize=(8, 8), nrows=1, ncols=1, tight_layout=True)
-                strategy_labels = [f"Strategie {strategy.split('_')[1]}" for strategy in strategies.keys()]
-                TCO_emissions_averages = []
-
-                # Plot strategies
-                for strategy, years in strategies.items():
+            graph = Figure(figsize=(8, 8), tight_layout=True)
+            ax = graph.subplots(nrows=1, ncols=1)
+            strategy_labels = [f"Strategie {strategy.split('_')[1]}" for strategy in strategies.keys()]
+            TCO_emissions_averages = []
 
-                    strategy_TCO_emissions_average = 0
+            # Plot strategies
+            for strategy, years in strategies.items():
 
-                    for year in years:
+                strategy_TCO_emissions_average = 0
 
-                        strategy_TCO_emissions_average += years[year].get("CO2_emissions", 0)
+                for year in years:
 
-                    # Calculate average
-                    strategy_TCO_emissions_average /= len(years)
-                    TCO_emissions_averages.append(strategy_TCO_emissions_average)
+                    strategy_TCO_emissions_average += years[year].get("CO2_emissions", 0)
 
-                # Plot bar graph
-                ax.bar(strategy_labels, TCO_emissions_averages, color="blue")
+                # Calculate average
+                strategy_TCO_emissions_average /= len(years)
+                TCO_emissions_averages.append(strategy_TCO_emissions_average)
 
-                # Set labels emissions graph
-                ax.set_title(f"Totale jaarlijkse uitstoot wagenpark")
-                ax.set_xlabel("jaar")
-                ax.set_ylabel("CO2 per jaar (ton)")
-                ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
+            # Plot bar graph
+            ax.bar(strategy_labels, TCO_emissions_averages, color="blue")
 
-                # Encode graph
-                graphs[scenario] = self.encode_graph_to_base64(graph)
+            # Set labels emissions graph
+            ax.set_title(f"Totale jaarlijkse uitstoot wagenpark")
+            ax.set_xlabel("jaar")
+            ax.set_ylabel("CO2 per jaar (ton)")
+            ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
 
-                # Close figure
-                close()
+            # Encode graph
+            graphs[scenario] = self.encode_graph_to_base64(graph)
 
         return graphs
 
@@ -495,44 +470,40 @@ class GraphHelper:
 
         graphs = {}
         for scenario, strategies in averages.items():
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                graph, ax = subplots(figsize=(8, 8), nrows=1, ncols=1, tight_layout=True)
-                strategy_labels = [f"Strategie {strategy.split('_')[1]}" for strategy in strategies.keys()]
-                TCO_cost_averages = []
+            graph = Figure(figsize=(8, 8), tight_layout=True)
+            ax = graph.subplots(nrows=1, ncols=1)
+            strategy_labels = [f"Strategie {strategy.split('_')[1]}" for strategy in strategies.keys()]
+            TCO_cost_averages = []
 
-                # Plot strategies
-                for strategy, years in strategies.items():
-
-                    strategy_TCO_cost_average = 0
+            # Plot strategies
+            for strategy, years in strategies.items():
 
-                    for year in years:
+                strategy_TCO_cost_average = 0
 
-                        strategy_TCO_cost_average += years[year].get("tco", 0)
+                for year in years:
 
-                    # Calculate average
-                    strategy_TCO_cost_average /= len(years)
-                    TCO_cost_averages.append(strategy_TCO_cost_average)
+                    strategy_TCO_cost_average += years[year].get("tco", 0)
 
-                # Plot bar graph
-                ax.bar(strategy_labels, TCO_cost_averages, color="red")
+                # Calculate average
+                strategy_TCO_cost_average /= len(years)
+                TCO_cost_averages.append(strategy_TCO_cost_average)
 
-                # change axes limits
-                ymin = min(TCO_cost_averages)
-                ymax = max(TCO_cost_averages)
-                ax.set_ylim(bottom=ymin - 2000, top=ymax + 2000)
+            # Plot bar graph
+            ax.bar(strategy_labels, TCO_cost_averages, color="red")
 
-                # Set labels cost graph
-                ax.set_title(f"Totale jaarlijkse kosten wagenpark")
-                ax.set_xlabel("jaar")
-                ax.set_ylabel("TCO per jaar (euro)")
-                ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
+            # change axes limits
+            ymin = min(TCO_cost_averages)
+            ymax = max(TCO_cost_averages)
+            ax.set_ylim(bottom=ymin - 2000, top=ymax + 2000)
 
-                # Encode graph
-                graphs[scenario] = self.encode_graph_to_base64(graph)
+            # Set labels cost graph
+            ax.set_title(f"Totale jaarlijkse kosten wagenpark")
+            ax.set_xlabel("jaar")
+            ax.set_ylabel("TCO per jaar (euro)")
+            ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
 
-                # Close figure
-                close()
+            # Encode graph
+            graphs[scenario] = self.encode_graph_to_base64(graph)
 
         return graphs
 
@@ -550,39 +521,35 @@ class GraphHelper:
 
         graphs = {}
         for scenario, strategies in averages.items():
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                graph, ax = subplots(figsize=(8, 8), nrows=1, ncols=1, tight_layout=True)
-                strategy_labels = [f"Strategie {strategy.split('_')[1]}" for strategy in strategies.keys()]
-                TCO_emissions_averages = []
+            graph = Figure(figsize=(8, 8), tight_layout=True)
+            ax = graph.subplots(nrows=1, ncols=1)
+            strategy_labels = [f"Strategie {strategy.split('_')[1]}" for strategy in strategies.keys()]
+            TCO_emissions_averages = []
 
-                # Plot strategies
-                for strategy, years in strategies.items():
-
-                    strategy_TCO_emissions_average = 0
+            # Plot strategies
+            for strategy, years in strategies.items():
 
-                    for year in years:
+                strategy_TCO_emissions_average = 0
 
-                        strategy_TCO_emissions_average += years[year].get("CO2_emissions", 0)
+                for year in years:
 
-                    # Calculate average
-                    strategy_TCO_emissions_average /= len(years)
-                    TCO_emissions_averages.append(strategy_TCO_emissions_average)
+                    strategy_TCO_emissions_average += years[year].get("CO2_emissions", 0)
 
-                # Plot bar graph
-                ax.bar(strategy_labels, TCO_emissions_averages, color="blue")
+                # Calculate average
+                strategy_TCO_emissions_average /= len(years)
+                TCO_emissions_averages.append(strategy_TCO_emissions_average)
 
-                # Set labels emissions graph
-                ax.set_title(f"Totale jaarlijkse uitstoot wagenpark")
-                ax.set_xlabel("jaar")
-                ax.set_ylabel("CO2 per jaar (ton)")
-                ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
+            # Plot bar graph
+            ax.bar(strategy_labels, TCO_emissions_averages, color="blue")
 
-                # Encode graph
-                graphs[scenario] = self.encode_graph_to_base64(graph)
+            # Set labels emissions graph
+            ax.set_title(f"Totale jaarlijkse uitstoot wagenpark")
+            ax.set_xlabel("jaar")
+            ax.set_ylabel("CO2 per jaar (ton)")
+            ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
 
-                # Close figure
-                close()
+            # Encode graph
+            graphs[scenario] = self.encode_graph_to_base64(graph)
 
         return graphs
 
@@ -603,50 +570,44 @@ class GraphHelper:
         for scenario, strategies in averages.items():
             for strategy, years in strategies.items():  # [len(strategies)-2]:
                 # Get current emissions
-                current_timestamp = datetime.now()
-                current_year = int(current_timestamp.strftime("%Y"))
-                current_emissions = years[current_year].get("CO2_emissions", 0)
+                current_emissions = years[self.current_year].get("CO2_emissions", 0)
 
         # get emission goal for this company
         emissions_goal = (1 - reduction_by_2030) * current_emissions
 
         graphs = {}
         for scenario, strategies in averages.items():
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                graph, ax = subplots(figsize=(8, 8), nrows=1, ncols=1, tight_layout=True)
+            graph = Figure(figsize=(8, 8), tight_layout=True)
+            ax = graph.subplots(nrows=1, ncols=1)
 
-                # Plot strategies
-                for strategy, years in strategies.items():
-
-                    # Get emissions in 2030
-                    emissions_in_2030 = years[2030].get("CO2_emissions", 0)
+            # Plot strategies
+            for strategy, years in strategies.items():
 
-                    year_labels = years.keys()
-                    TCO_costs = [year_data.get("tco", 0) for year, year_data in years.items()]
+                # Get emissions in 2030
+                emissions_in_2030 = years[2030].get("CO2_emissions", 0)
 
-                    if emissions_in_2030 < emissions_goal:
-                        ax.plot(year_labels, TCO_costs, linestyle="-",
-                                label=f"TCO kosten strategie {strategy.split('_')[1]}")
-                    else:
-                        ax.plot(year_labels, TCO_costs, linestyle="--",
-                                label=f"TCO kosten strategie {strategy.split('_')[1]}")
+                year_labels = years.keys()
+                TCO_costs = [year_data.get("tco", 0) for year, year_data in years.items()]
 
-                # Set labels
-                ax.set_title(f"Jaarlijkse voertuigkosten wagenpark")
-                ax.set_xlabel("jaar")
-                ax.set_ylabel("TCO per jaar (euro)")
-                ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
+                if emissions_in_2030 < emissions_goal:
+                    ax.plot(year_labels, TCO_costs, linestyle="-",
+                            label=f"TCO kosten strategie {strategy.split('_')[1]}")
+                else:
+                    ax.plot(year_labels, TCO_costs, linestyle="--",
+                            label=f"TCO kosten strategie {strategy.split('_')[1]}")
 
-                # Set legend
-                #ax.legend(loc="best")
-                ax.legend(loc="upper center", bbox_to_anchor=(0, -0.2, 1, 0.1))
+            # Set labels
+            ax.set_title(f"Jaarlijkse voertuigkosten wagenpark")
+            ax.set_xlabel("jaar")
+            ax.set_ylabel("TCO per jaar (euro)")
+            ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
 
-                # Encode graph
-                graphs[scenario] = self.encode_graph_to_base64(graph)
+            # Set legend
+            #ax.legend(loc="best")
+            ax.legend(loc="upper center", bbox_to_anchor=(0, -0.2, 1, 0.1))
 
-                # Close figure
-                close()
+            # Encode graph
+            graphs[scenario] = self.encode_graph_to_base64(graph)
 
         return graphs
 
@@ -668,49 +629,43 @@ class GraphHelper:
         for scenario, strategies in averages.items():
             for strategy, years in strategies.items():  # [len(strategies)-2]:
                 # Get current emissions
-                current_timestamp = datetime.now()
-                current_year = int(current_timestamp.strftime("%Y"))
-                current_emissions = years[current_year].get("CO2_emissions", 0)
+                current_emissions = years[self.current_year].get("CO2_emissions", 0)
         # get emission goal for this company
         emissions_goal = (1 - reduction_by_2030) * current_emissions
 
         graphs = {}
         for scenario, strategies in averages.items():
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                graph, ax = subplots(figsize=(8, 8), nrows=1, ncols=1, tight_layout=True)
+            graph = Figure(figsize=(8, 8), tight_layout=True)
+            ax = graph.subplots(nrows=1, ncols=1)
 
-                # Plot strategies
-                for strategy, years in strategies.items():
-
-                    # Get emissions in 2030
-                    emissions_in_2030 = years[2030].get("CO2_emissions", 0)
+            # Plot strategies
+            for strategy, years in strategies.items():
 
-                    year_labels = years.keys()
-                    TCO_costs = [year_data.get("tco", 0) for year, year_data in years.items()]
+                # Get emissions in 2030
+                emissions_in_2030 = years[2030].get("CO2_emissions", 0)
 
-                    if emissions_in_2030 > emissions_goal:
-                        ax.plot(year_labels, TCO_costs, linestyle="--",
-                                label=f"TCO kosten strategie {strategy.split('_')[1]}")
-                    else:
-                        ax.plot(year_labels, TCO_costs, linestyle="-",
-                                label=f"TCO kosten strategie {strategy.split('_')[1]}")
+                year_labels = years.keys()
+                TCO_costs = [year_data.get("tco", 0) for year, year_data in years.items()]
 
-                # Set labels
-                ax.set_title(f"Jaarlijkse voertuigkosten wagenpark")
-                ax.set_xlabel("jaar")
-                ax.set_ylabel("TCO per jaar (euro)")
-                ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
+                if emissions_in_2030 > emissions_goal:
+                    ax.plot(year_labels, TCO_costs, linestyle="--",
+                            label=f"TCO kosten strategie {strategy.split('_')[1]}")
+                else:
+                    ax.plot(year_labels, TCO_costs, linestyle="-",
+                            label=f"TCO kosten strategie {strategy.split('_')[1]}")
 
-                # Set legend
-                #ax.legend(loc="best")
-                ax.legend(loc="upper center", bbox_to_anchor=(0, -0.2, 1, 0.1))
+            # Set labels
+            ax.set_title(f"Jaarlijkse voertuigkosten wagenpark")
+            ax.set_xlabel("jaar")
+            ax.set_ylabel("TCO per jaar (euro)")
+            ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
 
-                # Encode graph
-                graphs[scenario] = self.encode_graph_to_base64(graph)
+            # Set legend
+            #ax.legend(loc="best")
+            ax.legend(loc="upper center", bbox_to_anchor=(0, -0.2, 1, 0.1))
 
-                # Close figure
-                close()
+            # Encode graph
+            graphs[scenario] = self.encode_graph_to_base64(graph)
 
         return graphs
 
@@ -732,18 +687,15 @@ class GraphHelper:
         for scenario, strategies in averages.items():
             for strategy, years in strategies.items(): #[len(strategies)-2]:
                 # Get current emissions
-                current_timestamp = datetime.now()
-                current_year = int(current_timestamp.strftime("%Y"))
-                current_emissions = years[current_year].get("CO2_emissions", 0)
+                current_emissions = years[self.current_year].get("CO2_emissions", 0)
         # get emission goal for this company
         emissions_goal = (1 - reduction_by_2030) * current_emissions
 
 
         graphs = {}
         for scenario, strategies in averages.items():
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                graph, ax = subplots(figsize=(8, 8), nrows=1, ncols=1, tight_layout=True)
+            graph = Figure(figsize=(8, 8), tight_layout=True)
+            ax = graph.subplots(nrows=1, ncols=1)
 
             # Plot strategies
             year_labels = []
@@ -781,9 +733,6 @@ class GraphHelper:
                 # Encode graph
                 graphs[scenario] = self.encode_graph_to_base64(graph)
 
-                # Close figure
-                close()
-
         return graphs
 
     # TODO adapt function for scenarios comparison
@@ -804,17 +753,14 @@ class GraphHelper:
         for scenario, strategies in averages.items():
             for strategy, years in strategies.items():  # [len(strategies)-2]:
                 # Get current emissions
-                current_timestamp = datetime.now()
-                current_year = int(current_timestamp.strftime("%Y"))
-                current_emissions = years[current_year].get("CO2_emissions", 0)
+                current_emissions = years[self.current_year].get("CO2_emissions", 0)
         # get emission goal for this company
         emissions_goal = (1 - reduction_by_2030) * current_emissions
 
         graphs = {}
         for scenario, strategies in averages.items():
-            with warnings.catch_warnings():
-                warnings.simplefilter("ignore")
-                graph, ax = subplots(figsize=(8, 8), nrows=1, ncols=1, tight_layout=True)
+            graph = Figure(figsize=(8, 8), tight_layout=True)
+            ax = graph.subplots(nrows=1, ncols=1)
 
             # Plot strategies
             year_labels = []
@@ -852,9 +798,6 @@ class GraphHelper:
                 # Encode graph
                 graphs[scenario] = self.encode_graph_to_base64(graph)
 
-                # Close figure
-                close()
-
         return graphs
 
     def plot_TCO_costs_breakdown(self, averages: dict):
@@ -874,64 +817,60 @@ class GraphHelper:
             graphs[scenario] = {}
 
             for strategy, years in strategies.items():
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore")
-                    graph, ax = subplots(figsize=(8, 8), nrows=1, ncols=1, tight_layout=True)
-
-                    year_labels = years.keys()
-                    fixed_vehicle_costs = [year_data.get("fixed_vehicle_costs", 0) for year, year_data in years.items()]
-                    variable_vehicle_costs = [year_data.get("variable_vehicle_costs", 0)
-                                              for year, year_data in years.items()]
-                    write_off_costs_vehicle = [year_data.get("write_off_costs_vehicle", 0)
-                                               for year, year_data in years.items()]
-                    write_off_costs_charging_system = [year_data.get("write_off_costs_charging_system", 0)
-                                                       for year, year_data in years.items()]
-                    driver_costs = [year_data.get("driver_costs", 0) for year, year_data in years.items()]
-                    costs_public_charging = [year_data.get("costs_public_charging", 0)
-                                             for year, year_data in years.items()]
-                    current_y_positions = fixed_vehicle_costs
-
-                    # Plot bars
-                    ax.bar(year_labels, fixed_vehicle_costs,
-                           width=0.4, label="a: Vaste voertuigkosten")
-
-                    ax.bar(year_labels, variable_vehicle_costs, bottom=current_y_positions,
-                           width=0.4, label="b: Variabele voertuigkosten")
-                    current_y_positions = [current_y_positions[index] + value
-                                           for index, value in enumerate(variable_vehicle_costs)]
-
-                    ax.bar(year_labels, write_off_costs_vehicle, bottom=current_y_positions,
-                           width=0.4, label="c: Afschrijvingskosten")
-                    current_y_positions = [current_y_positions[index] + value
-                                           for index, value in enumerate(write_off_costs_vehicle)]
-
-                    ax.bar(year_labels, write_off_costs_charging_system, bottom=current_y_positions,
-                           width=0.4, label="d: Afschrijvingskosten oplaadsysteem")
-                    current_y_positions = [current_y_positions[index] + value
-                                           for index, value in enumerate(write_off_costs_charging_system)]
-
-                    ax.bar(year_labels, driver_costs, bottom=current_y_positions,
-                           width=0.4, label="e: Chauffeurskosten")
-                    current_y_positions = [current_y_positions[index] + value
-                                           for index, value in enumerate(driver_costs)]
-
-                    ax.bar(year_labels, costs_public_charging, bottom=current_y_positions,
-                           width=0.4, label="f: Kosten laadtijd onderweg")
-
-                    # Set labels
-                    ax.set_title(f"TCO totale kostenverdeling wagenpark strategie {strategy.split('_')[1]}")
-                    ax.set_xlabel("jaar")
-                    ax.set_ylabel("TCO per jaar (euro)")
-                    ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
-
-                    # Set legend
-                    ax.legend(loc="upper center", bbox_to_anchor=(0, -0.2, 1, 0.1))
-
-                    # Encode graph
-                    graphs[scenario][strategy] = self.encode_graph_to_base64(graph)
-
-                    # Close figure
-                    close()
+                graph = Figure(figsize=(8, 8), tight_layout=True)
+                ax = graph.subplots(nrows=1, ncols=1)
+
+                year_labels = years.keys()
+                fixed_vehicle_costs = [year_data.get("fixed_vehicle_costs", 0) for year, year_data in years.items()]
+                variable_vehicle_costs = [year_data.get("variable_vehicle_costs", 0)
+                                          for year, year_data in years.items()]
+                write_off_costs_vehicle = [year_data.get("write_off_costs_vehicle", 0)
+                                           for year, year_data in years.items()]
+                write_off_costs_charging_system = [year_data.get("write_off_costs_charging_system", 0)
+                                                   for year, year_data in years.items()]
+                driver_costs = [year_data.get("driver_costs", 0) for year, year_data in years.items()]
+                costs_public_charging = [year_data.get("costs_public_charging", 0)
+                                         for year, year_data in years.items()]
+                current_y_positions = fixed_vehicle_costs
+
+                # Plot bars
+                ax.bar(year_labels, fixed_vehicle_costs,
+                       width=0.4, label="a: Vaste voertuigkosten")
+
+                ax.bar(year_labels, variable_vehicle_costs, bottom=current_y_positions,
+                       width=0.4, label="b: Variabele voertuigkosten")
+                current_y_positions = [current_y_positions[index] + value
+                                       for index, value in enumerate(variable_vehicle_costs)]
+
+                ax.bar(year_labels, write_off_costs_vehicle, bottom=current_y_positions,
+                       width=0.4, label="c: Afschrijvingskosten")
+                current_y_positions = [current_y_positions[index] + value
+                                       for index, value in enumerate(write_off_costs_vehicle)]
+
+                ax.bar(year_labels, write_off_costs_charging_system, bottom=current_y_positions,
+                       width=0.4, label="d: Afschrijvingskosten oplaadsysteem")
+                current_y_positions = [current_y_positions[index] + value
+                                       for index, value in enumerate(write_off_costs_charging_system)]
+
+                ax.bar(year_labels, driver_costs, bottom=current_y_positions,
+                       width=0.4, label="e: Chauffeurskosten")
+                current_y_positions = [current_y_positions[index] + value
+                                       for index, value in enumerate(driver_costs)]
+
+                ax.bar(year_labels, costs_public_charging, bottom=current_y_positions,
+                       width=0.4, label="f: Kosten laadtijd onderweg")
+
+                # Set labels
+                ax.set_title(f"TCO totale kostenverdeling wagenpark strategie {strategy.split('_')[1]}")
+                ax.set_xlabel("jaar")
+                ax.set_ylabel("TCO per jaar (euro)")
+                ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
+
+                # Set legend
+                ax.legend(loc="upper center", bbox_to_anchor=(0, -0.2, 1, 0.1))
+
+                # Encode graph
+                graphs[scenario][strategy] = self.encode_graph_to_base64(graph)
 
         return graphs
 
@@ -952,18 +891,17 @@ class GraphHelper:
             graphs[scenario] = {}
 
             for strategy, years in strategies.items():
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore")
-                    graph, ax = subplots(figsize=(8, 8), nrows=1, ncols=1, tight_layout=True)
+                graph = Figure(figsize=(8, 8), tight_layout=True)
+                ax = graph.subplots(nrows=1, ncols=1)
 
-                    year_labels = years.keys()
-                    charging_capacity_depot = [year_data.get("kWh_charged_on_depot", 0) for year, year_data in
-                                               years.items()]
-                    charging_capacity_public = [year_data.get("kWh_charged_in_public", 0) for year, year_data in
-                                                years.items()]
+                year_labels = years.keys()
+                charging_capacity_depot = [year_data.get("kWh_charged_on_depot", 0) for year, year_data in
+                                           years.items()]
+                charging_capacity_public = [year_data.get("kWh_charged_in_public", 0) for year, year_data in
+                                            years.items()]
 
-                    ax.bar(year_labels, charging_capacity_depot, label="Op depot")
-                    ax.bar(year_labels, charging_capacity_public, label="Onderweg", bottom=charging_capacity_depot)
+                ax.bar(year_labels, charging_capacity_depot, label="Op depot")
+                ax.bar(year_labels, charging_capacity_public, label="Onderweg", bottom=charging_capacity_depot)
 
                 # Set labels
                 ax.set_title(f"Laadbehoefte wagenpark strategie {strategy.split('_')[1]}")
@@ -982,9 +920,6 @@ class GraphHelper:
                 # Encode graph
                 graphs[scenario][strategy] = self.encode_graph_to_base64(graph)
 
-                # Close figure
-                close()
-
         return graphs
 
     def plot_TCO_fleet_average_charging_time(self, averages: dict):
@@ -1005,7 +940,8 @@ class GraphHelper:
 
             for strategy, years in strategies.items():
 
-                graph, ax = subplots(figsize=(8, 8), nrows=1, ncols=1, tight_layout=True)
+                graph = Figure(figsize=(8, 8), tight_layout=True)
+                ax = graph.subplots(nrows=1, ncols=1)
 
                 year_labels = years.keys()
                 charging_time_depot = [year_data.get("charging_time_depot", 0) for year, year_data in
@@ -1033,9 +969,6 @@ class GraphHelper:
                 # Encode graph
                 graphs[scenario][strategy] = self.encode_graph_to_base64(graph)
 
-                # Close figure
-                close()
-
         return graphs
 
     # TODO adapt function for scenarios comparison
@@ -1056,36 +989,32 @@ class GraphHelper:
             graphs[scenario] = {}
 
             for strategy, years in strategies.items():
-                with warnings.catch_warnings():
-                    warnings.simplefilter("ignore")
-                    graph, ax = subplots(figsize=(8, 8), nrows=1, ncols=1, tight_layout=True)
+                graph = Figure(figsize=(8, 8), tight_layout=True)
+                ax = graph.subplots(nrows=1, ncols=1)
 
-                    year_labels = years.keys()
-                    charging_capacity_depot = [year_data.get("kWh_charged_on_depot", 0) for year, year_data in years.items()]
-                    charging_capacity_public = [year_data.get("kWh_charged_in_public", 0) for year, year_data in years.items()]
-
-                    ax.bar(year_labels, charging_capacity_depot, label="Op depot")
-                    ax.bar(year_labels, charging_capacity_public, label="Onderweg", bottom=charging_capacity_depot)
+                year_labels = years.keys()
+                charging_capacity_depot = [year_data.get("kWh_charged_on_depot", 0) for year, year_data in years.items()]
+                charging_capacity_public = [year_data.get("kWh_charged_in_public", 0) for year, year_data in years.items()]
 
-                    # Set labels
-                    ax.set_title(f"Laadcapaciteit per strategie {strategy.split('_')[1]}")
-                    ax.set_xlabel("jaar")
-                    ax.set_ylabel("Laadcapaciteit per dag (uur)")
-                    ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
+                ax.bar(year_labels, charging_capacity_depot, label="Op depot")
+                ax.bar(year_labels, charging_capacity_public, label="Onderweg", bottom=charging_capacity_depot)
 
-                    # change axes limits
-                    ymax = max(charging_capacity_public) + max(charging_capacity_depot)
-                    ax.set_ylim(bottom=0, top=ymax + 20)
+                # Set labels
+                ax.set_title(f"Laadcapaciteit per strategie {strategy.split('_')[1]}")
+                ax.set_xlabel("jaar")
+                ax.set_ylabel("Laadcapaciteit per dag (uur)")
+                ax.get_yaxis().set_major_formatter(ticker.FuncFormatter(lambda x, p: format(int(x), ',')))
 
-                    # Set legend
-                    ax.legend(loc="best")
-                    # ax.legend(loc="lower center", bbox_to_anchor=(0.5, -0.3))
+                # change axes limits
+                ymax = max(charging_capacity_public) + max(charging_capacity_depot)
+                ax.set_ylim(bottom=0, top=ymax + 20)
 
-                    # Encode graph
-                    graphs[scenario][strategy] = self.encode_graph_to_base64(graph)
+                # Set legend
+                ax.legend(loc="best")
+                # ax.legend(loc="lower center", bbox_to_anchor=(0.5, -0.3))
 
-                    # Close figure
-                    close()
+                # Encode graph
+                graphs[scenario][strategy] = self.encode_graph_to_base64(graph)
 
         return graphs
 
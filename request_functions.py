@@ -1,12 +1,19 @@
+from AdmissionController import AdmissionController
 from database_interfaces.ScenarioDatabaseInterface import ScenarioDatabaseInterface
+from datetime import date
+from Deadline import Deadline
 from data_objects.Scenario import from_dict as scenario_from_dict
 from data_objects.Vehicle import from_dict as vehicle_from_dict
 from excel_interfaces.FleetInterface import FleetInterface
+from excel_interfaces.PANTEIAInterfacePool import PANTEIAInterfacePool
 from excel_interfaces.ScenariosInterface import ScenariosInterface
-from flask import make_response, render_template, Request
+from flask import make_response, render_template, Request, Response
+from itertools import chain
 from json import loads, dumps
 from jsonschema import validate
 from Logger import Logger
+from ProgressTracker import ProgressTracker
+from RequestCoalescer import RequestCoalescer, get_analysis_key
 from TCOModel import TCOModel
 from utility_functions import parameter_string_to_tupled_list, base64_decode_file
 
@@ -128,10 +135,80 @@ def get_output_from_parameters(request: Request):
     """
 
     data_array = get_data_from_parameters(request, "output", "graphs,results").split(",")
-    actual_outputs = [output for output in data_array if output in ["graphs", "input", "results"]]
+    actual_outputs = [output for output in data_array if output in ["graphs", "input", "results", "transition_year"]]
     return actual_outputs if len(actual_outputs) > 0 else ["graphs", "results"]
 
 
+def get_horizon_from_parameters(request: Request):
+    """
+    Get the current_year and final_year parameters from the request URL parameters.
+    The years from the current year up to but excluding the final year are calculated.
+    Defaults to this year and 10 years later.
+
+    Parameters:
+    request (Request): The request.
+
+    Returns:
+    tuple: The current year and the final year.
+    """
+
+    current_year = int(get_data_from_parameters(request, "current_year", str(date.today().year),
+                                                lambda x: x.isdigit()))
+    final_year = int(get_data_from_parameters(request, "final_year", str(current_year + 10),
+                                              lambda x: x.isdigit() and int(x) > current_year))
+    return current_year, final_year
+
+
+def get_calculation_model_from_parameters(request: Request):
+    """
+    Get the model parameter from the request URL parameters, which selects how the fleet is calculated:
+    "vectorized" calculates the vehicles at once, "per_vehicle" calculates them one at a time with the PANTEIA
+    interface. Defaults to the calculation model of the server.
+
+    Parameters:
+        request (Request): The request.
+
+    Returns:
+        str: The calculation model.
+    """
+
+    return get_data_from_parameters(request, "model", TCOModel.default_calculation_model,
+                                    lambda x: x in TCOModel.calculation_models)
+
+
+def get_progress_tracker_from_parameters(request: Request):
+    """
+    Starts tracking the progress of the request, with the progress_id parameter from the request URL parameters.
+    The client can follow the progress with /progress/<progress_id>, without the parameter only the stages are logged.
+
+    Parameters:
+        request (Request): The request.
+
+    Returns:
+        ProgressTracker: The tracker of the request.
+    """
+
+    return ProgressTracker.start(request.args.get("progress_id"))
+
+
+def get_deadline_from_parameters(request: Request):
+    """
+    Get the deadline of the request from the timeout_ms parameter of the request URL parameters.
+    Defaults to the default timeout of the server. The request is also cancelled when the client disconnects,
+    if the server can detect it.
+
+    Parameters:
+        request (Request): The request.
+
+    Returns:
+        Deadline: The deadline of the request.
+    """
+
+    timeout_ms = get_data_from_parameters(request, "timeout_ms", "", lambda x: x.isdigit())
+    timeout = int(timeout_ms) / 1000 if timeout_ms else Deadline.default_timeout
+    return Deadline(timeout, request.environ.get("waitress.client_disconnected"))
+
+
 def get_fleet_data_from_parameters(request: Request, company: str):
 
     """
@@ -261,13 +338,82 @@ def get_scenarios():
     return (scenarios, valid_scenario_names)
 
 
+def get_analysis_cost(fleet: dict,
+                      scenarios: dict,
+                      comparing: str,
+                      selected_scenarios: tuple,
+                      selected_strategies: tuple):
+    """
+    Estimates the cost of an analysis in work units, one unit is a vehicle calculated for one scenario and strategy.
+    Without a selection all 5 strategies or all scenarios are calculated, see TCOModel.
+
+    Parameters:
+        fleet (dict): The fleet data.
+        scenarios (dict): The scenario data.
+        comparing (str): The specified comparison mode.
+        selected_scenarios (tuple): The selected scenarios.
+        selected_strategies (tuple): The selected strategies.
+
+    Returns:
+        int: The estimated amount of work units.
+    """
+
+    if comparing == "scenarios":
+        return len(fleet) * max(1, len(selected_scenarios) or len(scenarios))
+
+    return len(fleet) * (len(selected_strategies) or 5)
+
+
+def admit_analysis(fleet: dict,
+                   scenarios: dict,
+                   comparing: str,
+                   selected_scenarios: tuple,
+                   selected_strategies: tuple,
+                   progress_tracker: ProgressTracker = None,
+                   deadline: Deadline = None):
+    """
+    Waits until the server has the capacity to calculate the analysis, see AdmissionController.
+    The analysis doesn't wait longer than its deadline.
+
+    Parameters:
+        fleet (dict): The fleet data.
+        scenarios (dict): The scenario data.
+        comparing (str): The specified comparison mode.
+        selected_scenarios (tuple): The selected scenarios.
+        selected_strategies (tuple): The selected strategies.
+        progress_tracker (ProgressTracker): Reports the time the request waited, defaults to None.
+        deadline (Deadline): The deadline of the request, defaults to None.
+
+    Returns:
+        AdmissionTicket: The admission of the analysis, it should be released when the response is closed.
+
+    Raises:
+        ServerOverloaded: Raised if the server can't admit the analysis within the queue timeout.
+    """
+
+    cost = get_analysis_cost(fleet, scenarios, comparing, selected_scenarios, selected_strategies)
+    if progress_tracker is not None:
+        progress_tracker.start_stage("admission")
+
+    return AdmissionController.admit(cost, None if deadline is None else deadline.remaining())
+
+
 def process_data(fleet: dict,
                  scenarios: dict,
                  valid_scenario_names: tuple,
                  output: tuple,
                  comparing: str,
                  selected_scenarios: tuple,
-                 selected_strategies: tuple):
+                 selected_strategies: tuple,
+                 current_year: int = None,
+                 final_year: int = None,
+                 progress_callback: callable = None,
+                 stream: bool = False,
+                 progress_tracker: ProgressTracker = None,
+                 coalesce: bool = False,
+                 deadline: Deadline = None,
+                 calculation_model: str = None,
+                 admit: callable = None):
 
     """Processes the input data using the TCO Model.
 
@@ -285,50 +431,333 @@ def process_data(fleet: dict,
     :type selected_scenarios: tuple
     :param selected_strategies: The selected strategies.
     :type selected_strategies: tuple,
+    :param current_year: The first year of calculation, defaults to this year.
+    :type current_year: int
+    :param final_year: The year after the last year of calculation, the final year itself isn't calculated.
+        Defaults to 10 years after the current year.
+    :type final_year: int
+    :param progress_callback: Called with the amount of calculated vehicles and the size of the fleet.
+    :type progress_callback: callable
+    :param stream: Whether the results are yielded line by line while they're calculated, see stream_data.
+    :type stream: bool
+    :param progress_tracker: Reports the progress of the request, see ProgressTracker.
+    :type progress_tracker: ProgressTracker
+    :param coalesce: Whether identical analyses that run at the same time are calculated once, see RequestCoalescer.
+        The result is shared by the requests, so it shouldn't be changed. Streams are never coalesced.
+    :type coalesce: bool
+    :param deadline: The deadline of the request, the calculation stops when it passes or the request is cancelled.
+    :type deadline: Deadline
+    :param calculation_model: "vectorized" or "per_vehicle", defaults to the calculation model of the server.
+    :type calculation_model: str
+    :param admit: Called before the analysis is calculated, to wait for the capacity of the server.
+        Requests that wait for an identical analysis don't call it, see admit_analysis.
+    :type admit: callable
     :param logger: The logger to allow for logging.
     :type logger: Logger
 
     :raise NoScenarioSpecified: Raised if the comparison mode is "strategies", but no scenario is specified.
     :raise NoStrategySpecified: Raised if the comparison mode is "scenarios", but no strategy is specified.
+    :raise DeadlineExceeded: Raised if the deadline passed.
+    :raise RequestCancelled: Raised if the request has been cancelled.
+    :raise ServerOverloaded: Raised if the server can't admit the analysis within the queue timeout.
 
     :return: The results of the TCO Model. This depends on the output parameter.
-    :rtype: dict
+    :rtype: dict or Iterator[dict]
     """
 
+    if stream:
+        if admit is not None:
+            admit()
+        return stream_data(fleet, scenarios, valid_scenario_names, output, comparing, selected_scenarios,
+                           selected_strategies, current_year, final_year, progress_callback, progress_tracker,
+                           deadline, calculation_model)
+
     Logger.warning("Processing data")
 
-    # Initialise model
-    model = TCOModel(fleet, scenarios, valid_scenario_names, output)
+    # Default to a horizon of 10 years
+    if current_year is None:
+        current_year = date.today().year
+    if final_year is None:
+        final_year = current_year + 10
+    if calculation_model is None:
+        calculation_model = TCOModel.default_calculation_model
+
+    # The first of the identical analyses calculates the result, the others wait for it
+    if coalesce:
+        key = get_analysis_key({
+            "fleet": list(fleet.values()),
+            "scenarios": scenarios,
+            "valid_scenario_names": valid_scenario_names,
+            "output": output,
+            "comparing": comparing,
+            "selected_scenarios": selected_scenarios,
+            "selected_strategies": selected_strategies,
+            "current_year": current_year,
+            "final_year": final_year,
+            "calculation_model": calculation_model
+        })
+        on_wait = None if progress_tracker is None else lambda: progress_tracker.start_stage("coalesced")
+
+        # A request that waits stops at its own deadline, and calculates the analysis itself if the other is cancelled
+        return RequestCoalescer.run(key,
+                                    lambda: process_data(fleet, scenarios, valid_scenario_names, output, comparing,
+                                                         selected_scenarios, selected_strategies, current_year,
+                                                         final_year, progress_callback,
+                                                         progress_tracker=progress_tracker, deadline=deadline,
+                                                         calculation_model=calculation_model, admit=admit),
+                                    on_wait=on_wait,
+                                    check=None if deadline is None else deadline.check,
+                                    retry_on=(Exceptions.DeadlineExceeded, Exceptions.RequestCancelled))
+
+    # Only the request that calculates the analysis takes capacity, requests that wait for it don't
+    if admit is not None:
+        admit()
+
+    # Check out a warm interface, it's reset and returned to the pool afterwards
+    with PANTEIAInterfacePool.checkout() as PANTEIA_interface:
+
+        # Initialise model
+        model = TCOModel(fleet, scenarios, valid_scenario_names, output, current_year=current_year,
+                         final_year=final_year, PANTEIA_interface=PANTEIA_interface, use_process_pool=True,
+                         use_vectorized_model=calculation_model == "vectorized",
+                         progress_callback=progress_callback, progress_tracker=progress_tracker, deadline=deadline)
+
+        # Process data
+        data: dict = {}
+
+        if comparing == "strategies":
+            if len(selected_scenarios) < 1:
+                raise Exceptions.NoScenarioSpecified
+            else:
+                if len(selected_strategies) < 1:
+                    selected_strategies = None
+                data = model.compare_strategies(selected_scenarios[0], selected_strategies)
+
+        elif comparing == "scenarios":
+            if len(selected_strategies) < 1:
+                raise Exceptions.NoStrategySpecified
+            else:
+                if len(selected_scenarios) < 1:
+                    selected_scenarios = None
+                data = model.compare_scenarios(selected_strategies[0],  selected_scenarios)
+
+        # The counters are kept since the process started
+        cache_statistics = PANTEIA_interface.get_results_cache().get_statistics()
+        Logger.warning(f"PANTEIA results cache: {cache_statistics['hits']} hits, {cache_statistics['misses']} misses")
+
+    return data
+
 
-    # Process data
-    data: dict = {}
+def stream_data(fleet: dict,
+                scenarios: dict,
+                valid_scenario_names: tuple,
+                output: tuple,
+                comparing: str,
+                selected_scenarios: tuple,
+                selected_strategies: tuple,
+                current_year: int = None,
+                final_year: int = None,
+                progress_callback: callable = None,
+                progress_tracker: ProgressTracker = None,
+                deadline: Deadline = None,
+                calculation_model: str = None):
+
+    """Processes the input data using the TCO Model and yields the results line by line while they're calculated.
+    A line is yielded for every vehicle, followed by lines for the sum, the transition years and the metadata.
+    The PANTEIA interface is checked out until the last line has been yielded or the stream is closed.
 
-    if comparing == "strategies":
-        if len(selected_scenarios) < 1:
-            raise Exceptions.NoScenarioSpecified
-        else:
+    :param fleet: The fleet data.
+    :type fleet: dict
+    :param scenarios: The scenario data.
+    :type scenarios: dict
+    :param valid_scenario_names: The valid scenario names.
+    :type valid_scenario_names: tuple
+    :param output: The specified output.
+    :type output: tuple
+    :param comparing: The specified comparison mode.
+    :type comparing: str
+    :param selected_scenarios: The selected scenarios.
+    :type selected_scenarios: tuple
+    :param selected_strategies: The selected strategies.
+    :type selected_strategies: tuple,
+    :param current_year: The first year of calculation, defaults to this year.
+    :type current_year: int
+    :param final_year: The year after the last year of calculation, the final year itself isn't calculated.
+        Defaults to 10 years after the current year.
+    :type final_year: int
+    :param progress_callback: Called with the amount of calculated vehicles and the size of the fleet.
+    :type progress_callback: callable
+    :param progress_tracker: Reports the progress of the request, see ProgressTracker.
+    :type progress_tracker: ProgressTracker
+    :param deadline: The deadline of the request, the calculation stops when it passes or the request is cancelled.
+    :type deadline: Deadline
+    :param calculation_model: "vectorized" or "per_vehicle", defaults to the calculation model of the server.
+    :type calculation_model: str
+
+    :raise NoScenarioSpecified: Raised if the comparison mode is "strategies", but no scenario is specified.
+    :raise NoStrategySpecified: Raised if the comparison mode is "scenarios", but no strategy is specified.
+    :raise DeadlineExceeded: Raised if the deadline passed.
+    :raise RequestCancelled: Raised if the request has been cancelled.
+
+    :return: The lines of the results, organised by the name of the output.
+    :rtype: Iterator[dict]
+    """
+
+    Logger.warning("Streaming data")
+
+    # Default to a horizon of 10 years
+    if current_year is None:
+        current_year = date.today().year
+    if final_year is None:
+        final_year = current_year + 10
+    if calculation_model is None:
+        calculation_model = TCOModel.default_calculation_model
+
+    # Check out a warm interface, it's reset and returned to the pool afterwards
+    with PANTEIAInterfacePool.checkout() as PANTEIA_interface:
+
+        # Initialise model
+        model = TCOModel(fleet, scenarios, valid_scenario_names, output, current_year=current_year,
+                         final_year=final_year, PANTEIA_interface=PANTEIA_interface,
+                         use_vectorized_model=calculation_model == "vectorized",
+                         progress_callback=progress_callback, progress_tracker=progress_tracker,
+                         deadline=deadline)
+
+        if comparing == "strategies":
+            if len(selected_scenarios) < 1:
+                raise Exceptions.NoScenarioSpecified
             if len(selected_strategies) < 1:
                 selected_strategies = None
-            data = model.compare_strategies(selected_scenarios[0], selected_strategies)
+            yield from model.stream_fleet_TCO(*model.select_strategies(selected_scenarios[0], selected_strategies))
 
-    elif comparing == "scenarios":
-        if len(selected_strategies) < 1:
-            raise Exceptions.NoStrategySpecified
-        else:
+        elif comparing == "scenarios":
+            if len(selected_strategies) < 1:
+                raise Exceptions.NoStrategySpecified
             if len(selected_scenarios) < 1:
                 selected_scenarios = None
-            data = model.compare_scenarios(selected_strategies[0],  selected_scenarios)
+            yield from model.stream_fleet_TCO(*model.select_scenarios(selected_strategies[0], selected_scenarios))
 
-    return data
 
+def get_job_parameters(request: Request):
+    """
+    Gets the parameters of a job from the request.
+    The fleet is read from the encoded Excel file in the request body, like /external_excel,
+    or from the fleet_data URL parameter if the request has no body, like /local_excel.
+
+    Parameters:
+        request (Request): The request.
 
-def format_output(output_format: str, data: dict, errors: dict=None):
+    Returns:
+        dict: The parameters of the job, see process_job.
+
+    Raises:
+        NoCompanySpecified: The company parameter is not specified.
+        ValidationError: Raised if the request body does not match with the validation schema.
+    """
+
+    company = get_company_from_parameters(request)
+    current_year, final_year = get_horizon_from_parameters(request)
+
+    # Read the fleet now, so the uploaded file doesn't have to be kept until a worker calculates the job
+    if get_body(request, error_on_empty=False) is not None:
+        fleet, fleet_errors = get_excel_fleet_data_from_body(request, company)
+    else:
+        fleet, fleet_errors = get_fleet_data_from_parameters(request, company)
+
+    return {
+        "fleet": fleet,
+        "fleet_errors": fleet_errors,
+        "output": get_output_from_parameters(request),
+        "comparing": get_comparing_from_parameters(request),
+        "selected_scenarios": get_scenarios_from_parameters(request),
+        "selected_strategies": get_strategies_from_parameters(request),
+        "current_year": current_year,
+        "final_year": final_year,
+        "calculation_model": get_calculation_model_from_parameters(request)
+    }
+
+
+def process_job(parameters: dict, progress_callback: callable = None):
+    """
+    Processes a job of the job queue, the scenarios are read from the database when the job starts.
+
+    Parameters:
+        parameters (dict): The parameters of the job, see get_job_parameters.
+        progress_callback (callable): Called with the amount of calculated vehicles and the size of the fleet.
+
+    Returns:
+        tuple: The results of the TCO Model and the errors of the fleet data.
+    """
+
+    scenarios, valid_scenario_names = get_scenarios()
+    data = process_data(parameters["fleet"],
+                        scenarios,
+                        valid_scenario_names,
+                        parameters["output"],
+                        parameters["comparing"],
+                        parameters["selected_scenarios"],
+                        parameters["selected_strategies"],
+                        parameters["current_year"],
+                        parameters["final_year"],
+                        progress_callback,
+                        calculation_model=parameters.get("calculation_model"))
+
+    return (data, parameters["fleet_errors"])
+
+
+def get_lines_from_data(data: dict):
+    """
+    Splits the results of the TCO Model into the lines of stream_data, for results that weren't streamed.
+
+    Parameters:
+        data (dict): The results of the TCO Model.
+
+    Returns:
+        Iterator[dict]: The lines of the results, organised by the name of the output.
+    """
+
+    results = data.get("results", {})
+    for number_plate, vehicle_results in results.items():
+        if number_plate != "sum":
+            yield {"number_plate": number_plate, "results": vehicle_results}
+
+    for name in ("sum", "transition_year", "metadata"):
+        if name == "sum" and "sum" in results:
+            yield {"sum": results["sum"]}
+        elif name in data:
+            yield {name: data[name]}
+
+
+def stream_lines(lines: iter, progress_tracker: ProgressTracker):
+    """
+    Serializes the lines of the results as ndjson while they're calculated.
+    The tracker finishes after the last line, or fails if the calculation raises an exception.
+
+    Parameters:
+        lines (Iterator[dict]): The lines of the results.
+        progress_tracker (ProgressTracker): The tracker of the request.
+
+    Returns:
+        Iterator[str]: The lines of the response.
+    """
+
+    with progress_tracker:
+        for line in lines:
+            yield dumps(line, separators=(",", ":")) + "\n"
+    progress_tracker.finish()
+
+
+def format_output(output_format: str, data: dict, errors: dict=None, progress_tracker: ProgressTracker=None):
     """Format the model output.
 
     :param output_format: The format in which the results will be formatted.
     :type output_format: str
-    :param data: The results of the TCO model.
-    :type data: dict
+    :param data: The results of the TCO model, or the lines of the results when they're streamed as ndjson.
+    :type data: dict or Iterator[dict]
+    :param errors: The errors of the fleet data.
+    :type errors: dict
+    :param progress_tracker: The tracker of the request, it finishes when the output is formatted or streamed.
+    :type progress_tracker: ProgressTracker
 
     :raise OutputFormatIsNotSupported: Raised if an unknown format is specified.
 
@@ -341,13 +770,20 @@ def format_output(output_format: str, data: dict, errors: dict=None):
     # Define accepted output formats
     output_formats = [
         "html",
-        "json"
+        "json",
+        "ndjson"
     ]
 
     # If output mode is invalid, then default to html
     if output_format not in output_formats:
         output_format = "html"
 
+    # The stream is serialized while it's calculated, the calculation reports its own stages
+    if progress_tracker is None:
+        progress_tracker = ProgressTracker()
+    if output_format != "ndjson":
+        progress_tracker.start_stage("serialization")
+
     # Return results
     if output_format == "html":
 
@@ -375,17 +811,29 @@ def format_output(output_format: str, data: dict, errors: dict=None):
                     )[0]["years"].values()
                 )[0].keys()
 
-        return render_template("results.html",
+        html = render_template("results.html",
                                data=data,
                                result_properties=result_properties,
                                fleet_properties=fleet_properties,
                                scenario_year_properties=scenario_year_properties,
                                errors=errors)
+        progress_tracker.finish()
+        return html
 
 
     if output_format == "json":
         stringified_json = dumps(data, separators=(",", ":"))
+        progress_tracker.finish()
         return make_response((stringified_json, 200, {"Content-Type": "application/json"}))
 
+    if output_format == "ndjson":
+        # The first line is calculated before the response starts, so invalid requests still return an error page
+        lines = iter(data) if not isinstance(data, dict) else get_lines_from_data(data)
+        first_line = next(lines)
+        if errors:
+            lines = chain(lines, [{"errors": errors}])
+        return Response(stream_lines(chain([first_line], lines), progress_tracker),
+                        200, mimetype="application/x-ndjson")
+
     # Raise error, if output mode isn't supported
     raise Exceptions.OutputFormatIsNotSupported
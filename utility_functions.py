@@ -1,5 +1,6 @@
 from base64 import b64decode, b64encode
 from datetime import datetime
+from hashlib import sha256
 from tempfile import NamedTemporaryFile
 from pytz import timezone
 
@@ -148,3 +149,23 @@ def base64_decode_file(encoded_string: str, file_extension: str = ".xlsx"):
 
     # Return the temporary file
     return file
+
+
+def get_file_hash(file_path: str):
+    """
+    Gets the SHA-256 hash of a file, which changes whenever the contents of the file change.
+
+    Parameters:
+        file_path (str): The path to the file to hash.
+
+    Returns:
+        str: The hexadecimal hash of the file.
+    """
+
+    # Read the file in chunks and hash it
+    file_hash = sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(65536), b""):
+            file_hash.update(chunk)
+
+    return file_hash.hexdigest()